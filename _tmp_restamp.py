@@ -3,7 +3,7 @@ from sqlalchemy import create_engine, text
 from app.live_filter import backfill_live_pass
 eng = create_engine(os.environ["DATABASE_URL"].replace("postgresql://","postgresql+psycopg://"))
 n = backfill_live_pass(eng)
-print("re-stamped live_pass=true count:", n)
+print("re-stamp changed rows:", n)
 from datetime import date
 with eng.connect() as c:
     for lid in (3930,3935,3940,3905):
@@ -8,10 +8,12 @@
 #   Flow A (BofA/Absorption/Paradigm): entry + stop + single limit @ +10pts
 #   Flow B (GEX/AG/DD): entry + stop + T1 @ +10pts + T2 @ full target (DD: trail-only)
 
-import os, json, math, time, calendar, requests
+import os, json, math, time, calendar
 from datetime import datetime, date, timedelta
 from threading import Lock
 
+from app import ts_client
+
 # ====== MES CONTRACT AUTO-ROLLOVER ======
 _MES_MONTHS = [(3, "H"), (6, "M"), (9, "U"), (12, "Z")]
 
@@ -1171,8 +1173,8 @@ def test_order() -> dict:
 
     # 1. Check balance
     try:
-        r = requests.get(f"{SIM_BASE}/brokerage/accounts/{SIM_ACCOUNT_ID}/balances",
-                         headers=headers, timeout=10)
+        r = ts_client.request("GET", f"{SIM_BASE}/brokerage/accounts/{SIM_ACCOUNT_ID}/balances",
+                              headers=headers, timeout=10)
         if r.status_code == 200:
             bal = r.json().get("Balances", [{}])[0]
             results["balance"] = {
@@ -1196,8 +1198,8 @@ def test_order() -> dict:
         "Route": "Intelligent",
     }
     try:
-        r = requests.post(f"{SIM_BASE}/orderexecution/orders",
-                          headers=headers, json=entry_payload, timeout=10)
+        r = ts_client.request("POST", f"{SIM_BASE}/orderexecution/orders",
+                              headers=headers, json=entry_payload, timeout=10)
         results["entry"] = {"status": r.status_code, "body": r.json() if r.text else {}}
         entry_oid = None
         if r.status_code == 200:
@@ -1215,8 +1217,8 @@ def test_order() -> dict:
                 "TimeInForce": {"Duration": "DAY"},
                 "Route": "Intelligent",
             }
-            sr = requests.post(f"{SIM_BASE}/orderexecution/orders",
-                               headers=headers, json=stop_payload, timeout=10)
+            sr = ts_client.request("POST", f"{SIM_BASE}/orderexecution/orders",
+                                   headers=headers, json=stop_payload, timeout=10)
             results["stop"] = {"status": sr.status_code, "body": sr.json() if sr.text else {}}
             stop_oid = None
             if sr.status_code == 200:
@@ -1226,8 +1228,8 @@ def test_order() -> dict:
             _time.sleep(3)
 
             # 4. Check order status + margin
-            or_ = requests.get(f"{SIM_BASE}/brokerage/accounts/{SIM_ACCOUNT_ID}/orders",
-                               headers=headers, timeout=10)
+            or_ = ts_client.request("GET", f"{SIM_BASE}/brokerage/accounts/{SIM_ACCOUNT_ID}/orders",
+                                    headers=headers, timeout=10)
             if or_.status_code == 200:
                 for o in or_.json().get("Orders", []):
                     if o.get("OrderID") == entry_oid:
@@ -1236,8 +1238,8 @@ def test_order() -> dict:
                             "filled_price": o.get("FilledPrice"),
                         }
 
-            br = requests.get(f"{SIM_BASE}/brokerage/accounts/{SIM_ACCOUNT_ID}/balances",
-                              headers=headers, timeout=10)
+            br = ts_client.request("GET", f"{SIM_BASE}/brokerage/accounts/{SIM_ACCOUNT_ID}/balances",
+                                   headers=headers, timeout=10)
             if br.status_code == 200:
                 bal = br.json().get("Balances", [{}])[0]
                 results["margin_with_position"] = {
@@ -1248,11 +1250,11 @@ def test_order() -> dict:
 
             # 5. Clean up: cancel stop, close position
             if stop_oid:
-                requests.delete(f"{SIM_BASE}/orderexecution/orders/{stop_oid}",
-                                headers=headers, timeout=5)
+                ts_client.request("DELETE", f"{SIM_BASE}/orderexecution/orders/{stop_oid}",
+                                  headers=headers, timeout=5)
             _time.sleep(1)
-            requests.post(f"{SIM_BASE}/orderexecution/orders", headers=headers,
-                          json={**entry_payload, "TradeAction": "Sell"}, timeout=10)
+            ts_client.request("POST", f"{SIM_BASE}/orderexecution/orders", headers=headers,
+                              json={**entry_payload, "TradeAction": "Sell"}, timeout=10)
             results["cleaned_up"] = True
 
     except Exception as e:
@@ -1291,16 +1293,11 @@ def _sim_api(method: str, path: str, json_body: dict | None) -> dict | None:
             }
             url = f"{SIM_BASE}{path}"
 
-            if method == "GET":
-                r = requests.get(url, headers=headers, timeout=10)
-            elif method == "POST":
-                r = requests.post(url, headers=headers, json=json_body, timeout=10)
-            elif method == "PUT":
-                r = requests.put(url, headers=headers, json=json_body, timeout=10)
-            elif method == "DELETE":
-                r = requests.delete(url, headers=headers, timeout=10)
-            else:
+            if method not in ("GET", "POST", "PUT", "DELETE"):
                 return None
+            r = ts_client.request(method, url, lane="order", headers=headers,
+                                  json=json_body if method in ("POST", "PUT") else None,
+                                  timeout=10)
 
             if r.status_code == 401 and attempt == 0:
                 continue
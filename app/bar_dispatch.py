@@ -0,0 +1,175 @@
+"""Completed-bar dispatcher — one bounded worker runs every bar detector.
+
+Before this, every completed ES range bar started its own short-lived threads
+(`_run_absorption_in_thread` for the 5pt detectors, `_run_sb10_in_thread` for 10pt),
+serialised on a lock. Each detector re-read the Volland stats, re-parsed SPX spot and
+wrote its own setup_log transaction, so a fast tape produced a burst of threads
+queued on the lock, contending for the GIL and the DB pool.
+
+Now the bar callbacks only `submit(range_pts, bars)` onto a bounded queue. A single
+worker thread takes one event at a time and:
+  1. builds the shared context ONCE (`build_context(range_pts, bars)` — Volland
+     stats, spot, VIX, greek inputs),
+  2. runs every detector registered for that range size:
+     `evaluate(bars, ctx) -> result_wrapper | None`,
+  3. logs all result wrappers of the bar in one batch (`log_batch([rw, ...])`),
+  4. runs each detector's `after(rw)` (Telegram, outcome tracking, trading), which
+     needs the setup_log ids written in 3.
+
+A full queue drops the OLDEST event (a bar that old is stale for entry anyway) and
+counts it. status() reports queue depth, drops, queue wait and per-detector
+latency (evaluate + after).
+
+Init from main.py:  bar_dispatch.init(_bar_context, log_setups)
+                    bar_dispatch.register("ES Absorption", 5.0, _run_absorption_detection,
+                                          _after_absorption)
+"""
+from __future__ import annotations
+
+import os
+import queue
+import time
+from threading import Lock, Thread
+
+QUEUE_MAX = int(os.getenv("BAR_DISPATCH_QUEUE_MAX", "64"))
+
+_q: queue.Queue = queue.Queue(maxsize=QUEUE_MAX)
+_detectors = []          # [(name, range_pts, evaluate, after)] in registration order
+_build_context = None
+_log_batch = None
+_thread = None
+_lock = Lock()           # guards _stats / _lat
+_stats = {"submitted": 0, "processed": 0, "dropped": 0, "max_depth": 0,
+          "wait_ms_max": 0.0, "wait_ms_last": 0.0, "errors": 0, "last_error": None}
+_lat: dict = {}          # name -> run/signal/error counts + evaluate / after timings (ms)
+
+
+def init(build_context, log_batch):
+    """Start the worker. Called from main.py on_startup().
+
+    Args:
+        build_context: callable(range_pts, bars) -> dict shared by that bar's detectors
+        log_batch:     callable([result_wrapper, ...]) — writes them to setup_log
+    """
+    global _build_context, _log_batch, _thread
+    _build_context = build_context
+    _log_batch = log_batch
+    if _thread is None or not _thread.is_alive():
+        _thread = Thread(target=_run, name="bar-dispatch", daemon=True)
+        _thread.start()
+    print(f"[bar-dispatch] worker started ({len(_detectors)} detectors, "
+          f"queue max {QUEUE_MAX})", flush=True)
+
+
+def register(name: str, range_pts: float, evaluate, after=None):
+    """Add a detector for completed bars of `range_pts` (runs in registration order)."""
+    _detectors.append((name, float(range_pts), evaluate, after))
+    with _lock:
+        _lat.setdefault(name, {"runs": 0, "signals": 0, "errors": 0,
+                               "eval_ms": 0.0, "eval_ms_max": 0.0, "eval_ms_last": 0.0,
+                               "after_ms": 0.0, "after_ms_max": 0.0})
+
+
+def submit(range_pts: float, bars) -> bool:
+    """Queue a completed-bar event. Never blocks; False if the worker isn't running."""
+    if _thread is None:
+        return False
+    item = (float(range_pts), bars, time.monotonic())
+    while True:
+        try:
+            _q.put_nowait(item)
+            break
+        except queue.Full:
+            try:
+                _q.get_nowait()
+                _q.task_done()
+                with _lock:
+                    _stats["dropped"] += 1
+                print("[bar-dispatch] queue full — dropped oldest bar event", flush=True)
+            except queue.Empty:
+                pass
+    with _lock:
+        _stats["submitted"] += 1
+        _stats["max_depth"] = max(_stats["max_depth"], _q.qsize())
+    return True
+
+
+def status() -> dict:
+    with _lock:
+        out = dict(_stats)
+        det = {}
+        for name, d in _lat.items():
+            det[name] = {
+                "runs": d["runs"], "signals": d["signals"], "errors": d["errors"],
+                "eval_ms_mean": round(d["eval_ms"] / d["runs"], 2) if d["runs"] else None,
+                "eval_ms_max": round(d["eval_ms_max"], 2),
+                "eval_ms_last": round(d["eval_ms_last"], 2),
+                "after_ms_mean": round(d["after_ms"] / d["signals"], 2) if d["signals"] else None,
+                "after_ms_max": round(d["after_ms_max"], 2),
+            }
+    out["running"] = bool(_thread and _thread.is_alive())
+    out["queue_depth"] = _q.qsize()
+    out["detectors"] = det
+    return out
+
+
+def _timed(name, phase, fn, *args):
+    """fn(*args) with errors contained; adds its wall time to _lat[name][phase]."""
+    t0 = time.perf_counter()
+    out = err = None
+    try:
+        out = fn(*args)
+    except Exception as e:
+        err = e
+        print(f"[bar-dispatch] {name} {phase[:-3]} error: {e}", flush=True)
+    ms = (time.perf_counter() - t0) * 1000
+    with _lock:
+        d = _lat[name]
+        d[phase] += ms
+        d[phase + "_max"] = max(d[phase + "_max"], ms)
+        if phase == "eval_ms":
+            d["runs"] += 1
+            d["eval_ms_last"] = ms
+            if out:
+                d["signals"] += 1
+        if err is not None:
+            d["errors"] += 1
+    return out
+
+
+def _dispatch(range_pts, bars):
+    dets = [d for d in _detectors if d[1] == range_pts]
+    if not dets:
+        return
+    ctx = _build_context(range_pts, bars)
+    hits = []
+    for name, _rp, evaluate, after in dets:
+        rw = _timed(name, "eval_ms", evaluate, bars, ctx)
+        if rw:
+            hits.append((name, after, rw))
+    if not hits:
+        return
+    _log_batch([rw for _, _, rw in hits])
+    for name, after, rw in hits:
+        if after is not None:
+            _timed(name, "after_ms", after, rw)
+
+
+def _run():
+    while True:
+        range_pts, bars, t_in = _q.get()
+        wait_ms = (time.monotonic() - t_in) * 1000
+        with _lock:
+            _stats["wait_ms_last"] = round(wait_ms, 1)
+            _stats["wait_ms_max"] = max(_stats["wait_ms_max"], round(wait_ms, 1))
+        try:
+            _dispatch(range_pts, bars)
+        except Exception as e:
+            with _lock:
+                _stats["errors"] += 1
+                _stats["last_error"] = str(e)[:200]
+            print(f"[bar-dispatch] dispatch error ({range_pts:g}pt): {e}", flush=True)
+        finally:
+            with _lock:
+                _stats["processed"] += 1
+            _q.task_done()
@@ -0,0 +1,322 @@
+"""Incremental per-series range-bar features for the bar detectors.
+
+Before this, ES Absorption, SB / SB10, SB2 and Delta Absorption each re-filtered the
+whole session (`[b for b in bars if b.get("status") == "closed"]`) on every completed
+bar and rebuilt their volume averages and CVD/price windows with fresh comprehensions,
+and Vanna Pivot Bounce re-scanned every bar for swing pivots each cycle — O(session)
+work per bar, several times over, on the 5pt and 10pt series.
+
+A BarFeatures object follows one bar series and only ingests the closed bars it has
+not seen yet, keeping append-only columns:
+  - prefix sums (volume, |delta|, positive volumes, non-zero deltas, green bars), so
+    any trailing-window sum / mean is two lookups;
+  - a monotonic-deque running max/min per (field, window) a detector asks for, stored
+    per bar, so windowed CVD/price extremes are one lookup;
+  - confirmed swing pivots and the consecutive-swing CVD divergences Vanna Pivot
+    Bounce trades (a pivot is confirmed once PIVOT_N bars have closed after it).
+
+Callers hand over the same bars they always did (rithmic BarsView or a list of dicts,
+app format `low/high/...` or DB format `bar_low/bar_high/...`): features_for(bars)
+picks the series by its first bar and returns a Features snapshot at the current
+closed-bar count. A list that doesn't extend what was seen (new session, replayed
+day, a different feed) is re-ingested from scratch, so results always match a full
+recompute. Snapshots stay valid while another thread appends (columns only grow; a
+re-ingest builds new columns).
+
+    f = features_for(bars)
+    f.n, f.bar(-1)                      # closed-bar count, last closed bar
+    f.mean("volume", 20, lag=1)         # mean of the 20 closed bars before the last
+    f.high("cvd", 9), f.low("cvd", 9)   # CVD extremes of the last 9 closed bars
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from threading import Lock
+
+PIVOT_N = 2          # swing pivot half-width (Vanna Pivot Bounce)
+_MAX_SERIES = 8      # series tracked at once (5pt/10pt x rithmic/sierra, VPB, replays)
+
+_DB_KEYS = {"idx": "bar_idx", "open": "bar_open", "high": "bar_high", "low": "bar_low",
+            "close": "bar_close", "volume": "bar_volume", "delta": "bar_delta"}
+
+# prefix-sum columns (the *_n ones count bars passing the filter)
+_SUMS = ("volume", "abs_delta", "pos_volume", "pos_volume_n", "nz_delta_n", "green")
+
+# divergence type -> rank of its group in _vp_detect_divergences (tie order at equal ts)
+_DIV_RANK = {"sell_exhaustion": 0, "sell_absorption": 1, "buy_exhaustion": 2,
+             "buy_absorption": 3}
+
+
+class _Series:
+    """Append-only columns of one series' closed bars (replaced wholesale on re-ingest)."""
+
+    __slots__ = ("db", "bars", "sums", "ext", "lows", "highs", "divs")
+
+    def __init__(self, db):
+        self.db = db
+        self.bars = []
+        self.sums = {k: [0] for k in _SUMS}
+        self.ext = {}        # (field, size, is_max) -> (deque[(pos, value)], column)
+        self.lows = []       # confirmed swing lows / highs (positions < n - PIVOT_N)
+        self.highs = []
+        self.divs = []       # divergences in bar order
+
+    def get(self, b, name):
+        if self.db:
+            if name == "cvd":
+                return b["cvd"] if "cvd" in b else b.get("cumulative_delta", 0)
+            name = _DB_KEYS.get(name, name)
+        return b.get(name)
+
+    def append(self, b):
+        pos = len(self.bars)
+        self.bars.append(b)
+        vol = self.get(b, "volume") or 0
+        delta = self.get(b, "delta") or 0
+        close, open_ = self.get(b, "close"), self.get(b, "open")
+        s = self.sums
+        for name, v in (("volume", vol), ("abs_delta", abs(delta)),
+                        ("pos_volume", vol if vol > 0 else 0), ("pos_volume_n", vol > 0),
+                        ("nz_delta_n", delta != 0),
+                        ("green", close is not None and open_ is not None and close >= open_)):
+            col = s[name]
+            col.append(col[-1] + v)
+        for key, (q, col) in self.ext.items():
+            col.append(_push(q, pos, self.get(b, key[0]), key[1], key[2]))
+        i = pos - PIVOT_N
+        if i >= PIVOT_N:
+            self._pivot(i)
+
+    def extreme(self, field, size, is_max):
+        key = (field, size, is_max)
+        if key not in self.ext:
+            q, col = deque(), []
+            for pos, b in enumerate(self.bars):
+                col.append(_push(q, pos, self.get(b, field), size, is_max))
+            self.ext[key] = (q, col)
+        return self.ext[key][1]
+
+    def _pivot(self, i):
+        """Confirm swing low/high at position i (needs bars i-PIVOT_N .. i+PIVOT_N)."""
+        for sw in _swings_at(self, self.bars, i):
+            chain = self.lows if sw["type"] == "low" else self.highs
+            if chain:
+                div = _divergence(chain[-1], sw)
+                if div:
+                    self.divs.append(div)
+            chain.append(sw)
+
+
+def _push(q, pos, v, size, is_max):
+    """Monotonic-deque step: add value v at pos, return max/min of the last `size`."""
+    if is_max:
+        while q and q[-1][1] <= v:
+            q.pop()
+    else:
+        while q and q[-1][1] >= v:
+            q.pop()
+    q.append((pos, v))
+    while q[0][0] <= pos - size:
+        q.popleft()
+    return q[0][1]
+
+
+def _swings_at(s, bars, i):
+    """Swing low/high at position i, same rule as setup_detector._vp_find_swings."""
+    lo, hi = s.get(bars[i], "low"), s.get(bars[i], "high")
+    out = []
+    if all(lo <= s.get(bars[i - j], "low") and lo <= s.get(bars[i + j], "low")
+           for j in range(1, PIVOT_N + 1)):
+        out.append({"type": "low", "price": lo, "cvd": s.get(bars[i], "cvd"),
+                    "ts": bars[i]["ts_start"], "bar_idx": i})
+    if all(hi >= s.get(bars[i - j], "high") and hi >= s.get(bars[i + j], "high")
+           for j in range(1, PIVOT_N + 1)):
+        out.append({"type": "high", "price": hi, "cvd": s.get(bars[i], "cvd"),
+                    "ts": bars[i]["ts_start"], "bar_idx": i})
+    return out
+
+
+def _divergence(prev, curr):
+    """CVD divergence between consecutive same-type swings (see _vp_detect_divergences)."""
+    dp, dc = curr["price"] - prev["price"], curr["cvd"] - prev["cvd"]
+    if curr["type"] == "low":
+        if dp < 0 and dc > 0:
+            kind, direction = "sell_exhaustion", "long"
+        elif dp > 0 and dc < 0:
+            kind, direction = "sell_absorption", "long"
+        else:
+            return None
+    else:
+        if dp > 0 and dc < 0:
+            kind, direction = "buy_exhaustion", "short"
+        elif dp < 0 and dc > 0:
+            kind, direction = "buy_absorption", "short"
+        else:
+            return None
+    return {"type": kind, "direction": direction, "price": curr["price"], "ts": curr["ts"],
+            "bar_idx": curr["bar_idx"], "price_diff": dp, "cvd_diff": dc}
+
+
+class Features:
+    """Snapshot of a series at `n` closed bars. Positions are closed-bar order."""
+
+    __slots__ = ("_s", "_lock", "n")
+
+    def __init__(self, series, lock, n):
+        self._s = series
+        self._lock = lock
+        self.n = n
+
+    def bar(self, k):
+        """Closed bar by negative offset from the end (-1 = last closed bar)."""
+        return self._s.bars[self.n + k]
+
+    def _span(self, size, lag):
+        b = max(0, self.n - lag)
+        return max(0, b - size), b
+
+    def total(self, name, size, lag=0):
+        """Sum of prefix column `name` over the `size` closed bars ending `lag` bars back."""
+        a, b = self._span(size, lag)
+        col = self._s.sums[name]
+        return col[b] - col[a]
+
+    def count(self, size, lag=0):
+        a, b = self._span(size, lag)
+        return b - a
+
+    def mean(self, name, size, lag=0, count=None):
+        """total(name) / bars in the window (or / total(count) for filtered means);
+        None when the divisor is 0."""
+        d = self.total(count, size, lag) if count else self.count(size, lag)
+        return self.total(name, size, lag) / d if d else None
+
+    def high(self, field, size):
+        """Max of `field` over the last `size` closed bars."""
+        return self._extreme(field, size, True)
+
+    def low(self, field, size):
+        """Min of `field` over the last `size` closed bars."""
+        return self._extreme(field, size, False)
+
+    def _extreme(self, field, size, is_max):
+        with self._lock:
+            return self._s.extreme(field, size, is_max)[self.n - 1]
+
+    def vp_divergences(self, bars, since):
+        """(swing count, divergences with bar_idx >= since) over `bars` — the list this
+        snapshot was taken from, which may end in forming bars past the closed ones.
+
+        Matches _vp_find_swings + _vp_detect_divergences on `bars` (same swings, same
+        order). Returns None when `bars` isn't closed bars followed only by a tail
+        (positions would differ) — the caller recomputes from scratch.
+        """
+        s, n, L = self._s, self.n, len(bars)
+        if n == 0 or L < n:
+            return None
+        ik = "bar_idx" if s.db else "idx"
+        mine, theirs = s.bars[n - 1], bars[n - 1]
+        if theirs.get(ik) != mine.get(ik) or theirs.get("ts_end") != mine.get("ts_end"):
+            return None
+        confirmed = n - PIVOT_N                     # pivots < this are in s.lows/highs
+        with self._lock:
+            lows = [w for w in s.lows if w["bar_idx"] < confirmed]
+            highs = [w for w in s.highs if w["bar_idx"] < confirmed]
+            divs = []
+            for d in reversed(s.divs):
+                if d["bar_idx"] >= confirmed:
+                    continue
+                if d["bar_idx"] < since:
+                    break
+                divs.append(d)
+        divs.reverse()
+        # pivots that need bars past the closed ones (forming bar) — recomputed each call
+        n_swings = len(lows) + len(highs)
+        for i in range(max(PIVOT_N, confirmed), L - PIVOT_N):
+            for sw in _swings_at(s, bars, i):
+                chain = lows if sw["type"] == "low" else highs
+                if chain:
+                    div = _divergence(chain[-1], sw)
+                    if div and div["bar_idx"] >= since:
+                        divs.append(div)
+                chain.append(sw)
+                n_swings += 1
+        divs.sort(key=lambda d: (d["ts"], _DIV_RANK[d["type"]]))
+        return n_swings, divs
+
+
+class BarFeatures:
+    """Incremental feature state of one bar series."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._s = None
+        self._last = None     # (idx, ts_end) of the last ingested closed bar
+
+    def sync(self, bars) -> Features:
+        """Ingest closed bars of `bars` not seen yet; return a snapshot."""
+        with self._lock:
+            if not self._extend(bars):
+                self._rebuild(bars)
+            s = self._s
+            return Features(s, self._lock, len(s.bars))
+
+    def _extend(self, bars):
+        s = self._s
+        if s is None or not s.bars:
+            return False
+        last_idx, last_ts = self._last
+        ik = "bar_idx" if s.db else "idx"
+        p = len(bars) - 1
+        while p >= 0:
+            bi = bars[p].get(ik)
+            if bi is None:
+                return False
+            if bi <= last_idx:
+                break
+            p -= 1
+        if p < 0 or bars[p].get(ik) != last_idx or bars[p].get("ts_end") != last_ts:
+            return False
+        for q in range(p + 1, len(bars)):
+            b = bars[q]
+            if b.get("status") == "closed":
+                s.append(b)
+                self._last = (b.get(ik), b.get("ts_end"))
+        return True
+
+    def _rebuild(self, bars):
+        s = _Series(bool(len(bars)) and "bar_low" in bars[0])
+        for b in bars:
+            if b.get("status") == "closed":
+                s.append(b)
+        self._s = s
+        if s.bars:
+            b = s.bars[-1]
+            self._last = (b.get("bar_idx" if s.db else "idx"), b.get("ts_end"))
+
+
+_series: OrderedDict = OrderedDict()
+_series_lock = Lock()
+
+
+def _series_key(bars):
+    b = bars[0]
+    if "bar_low" in b:
+        return ("db", b.get("bar_idx"), b.get("ts_start"), b.get("ts_end"),
+                b.get("bar_high"), b.get("bar_low"))
+    return ("app", b.get("idx"), b.get("ts_start"), b.get("ts_end"), b.get("high"), b.get("low"))
+
+
+def features_for(bars) -> Features:
+    """Features snapshot of `bars`, reusing the state of the series it extends."""
+    key = _series_key(bars) if len(bars) else None
+    with _series_lock:
+        bf = _series.get(key)
+        if bf is None:
+            bf = _series[key] = BarFeatures()
+            while len(_series) > _MAX_SERIES:
+                _series.popitem(last=False)
+        else:
+            _series.move_to_end(key)
+    return bf.sync(bars)
+
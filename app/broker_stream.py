@@ -0,0 +1,281 @@
+"""TradeStation brokerage streams — order and position events for real_trader.
+
+Before this, main._real_trade_fast_poll ran real_trader.poll_order_status every 3s: one
+GET /brokerage/accounts/{id}/orders per account (the whole day's order list, so the
+payload grew with every order placed) and _check_order_fills for every tracked lid, and
+the 30s reconcile job GET'd /positions on top. A fill was seen up to a poll interval plus
+a request round-trip after it happened.
+
+Now one daemon thread per stream keeps
+    /v3/brokerage/stream/accounts/{ids}/orders
+    /v3/brokerage/stream/accounts/{ids}/positions
+open for the whitelisted accounts and folds every message into a per-account book
+(OrderID -> latest order, PositionID -> position). Every order message is handed to the
+on_order callback — real_trader runs the same audited _check_order_fills for the lids
+that reference the order, so fill / stop / target transitions follow the event.
+Polling stays, as the consistency check: while live(account) is true,
+poll_order_status does its full GET only every CONSISTENCY_POLL_SEC, and the reconcile
+reads positions() instead of GETting them. A stream that is silent for
+STREAM_READ_TIMEOUT (TS heartbeats every few seconds) is down; the 3s poll and the
+position GET take over again until it is back.
+
+A (re)connect replays the account's current orders / positions before `EndSnapshot`.
+The snapshot is built aside and swapped in at EndSnapshot (a position closed while
+disconnected doesn't linger); its order messages still go to on_order, which is how a
+fill missed during the outage is caught.
+
+Latency: real_trader calls note_transition(source, broker_order, recv) for every state
+transition it makes. status() has, per source — stream / poll (stream down) /
+consistency (the slow poll caught what the stream did not) / heal — broker_ms (the
+order's ClosedDateTime -> state change; TS stamps whole seconds) and, for the stream,
+event_ms (message received -> state change).
+
+Init from real_trader.init():  broker_stream.start(accounts, get_token, on_order)
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime
+from threading import Event, Lock, Thread
+
+from app import ts_client
+
+BASE = "https://api.tradestation.com/v3/brokerage/stream/accounts"
+KINDS = ("orders", "positions")
+
+# TS sends a Heartbeat every few seconds, so 30s of silence means the stream is dead.
+STREAM_READ_TIMEOUT = 30
+# Full /orders GET per account while the order stream is live (the old poll: every 3s)
+CONSISTENCY_POLL_SEC = float(os.getenv("REAL_TRADE_CONSISTENCY_POLL_SEC", "30"))
+
+_TERMINAL = ("FLL", "REJ", "CAN", "EXP")
+
+
+def enabled() -> bool:
+    return os.getenv("REAL_TRADE_ORDER_STREAM", "true").lower() == "true"
+
+
+# ── State ───────────────────────────────────────────────────────────
+
+_lock = Lock()
+_stop = Event()
+_get_token = None
+_on_order = None           # callable(account_id, order dict, recv epoch)
+_accounts: tuple = ()
+_threads: dict = {}        # kind -> Thread
+_streams = {kind: {"connected": False, "live": False, "last_msg_at": 0.0, "snapshot_at": None,
+                   "messages": 0, "reconnects": 0, "last_error": None} for kind in KINDS}
+_books = {kind: {} for kind in KINDS}   # kind -> {account: {OrderID / PositionID: dict}}
+_latency: dict = {}        # source -> counters (note_transition)
+
+
+def start(accounts, get_token_fn, on_order):
+    """Open the order and position streams for `accounts` (no-op when disabled or
+    already running)."""
+    global _get_token, _on_order, _accounts
+    if not enabled() or _threads:
+        return
+    _accounts = tuple(sorted({a for a in accounts if a}))
+    if not _accounts:
+        return
+    _get_token, _on_order = get_token_fn, on_order
+    for kind in KINDS:
+        t = Thread(target=_run, args=(kind,), daemon=True, name=f"broker-stream-{kind}")
+        _threads[kind] = t
+        t.start()
+    print(f"[broker-stream] started for {','.join(_accounts)} "
+          f"(consistency poll {CONSISTENCY_POLL_SEC:g}s while live)", flush=True)
+
+
+def _merge(book: dict, key, obj: dict):
+    prev = book.get(key)
+    if prev is None:
+        book[key] = dict(obj)
+    else:
+        # Updates can be partial — only overwrite the fields that arrived.
+        prev.update({k: v for k, v in obj.items() if v is not None})
+
+
+def _consume(kind: str, r):
+    """Read the stream until it ends (error, GoAway, silence or stop())."""
+    st = _streams[kind]
+    pending: dict = {}         # snapshot book, swapped in at EndSnapshot
+    snapshot_done = False
+    for line in r.iter_lines(decode_unicode=True):
+        if _stop.is_set():
+            return
+        now = time.time()
+        with _lock:
+            st["last_msg_at"] = now
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except Exception:
+            continue
+        if not isinstance(obj, dict) or "Heartbeat" in obj:
+            continue
+        if "Error" in obj:
+            with _lock:
+                st["last_error"] = str(obj)[:200]
+            print(f"[broker-stream] {kind} stream error msg: {obj}", flush=True)
+            return
+        status = obj.get("StreamStatus")
+        if status == "GoAway":
+            print(f"[broker-stream] {kind} GoAway received, reconnecting", flush=True)
+            return
+        if status == "EndSnapshot":
+            with _lock:
+                _books[kind] = pending
+                st["live"] = True
+                st["snapshot_at"] = now
+            snapshot_done = True
+            print(f"[broker-stream] {kind} snapshot: "
+                  f"{sum(len(b) for b in pending.values())} items", flush=True)
+            continue
+        acct = obj.get("AccountID")
+        key = obj.get("OrderID") if kind == "orders" else (obj.get("PositionID") or obj.get("Symbol"))
+        if not acct or not key:
+            continue
+        with _lock:
+            st["messages"] += 1
+            book = (_books[kind] if snapshot_done else pending).setdefault(acct, {})
+            if kind == "positions" and obj.get("Deleted"):
+                book.pop(key, None)
+                continue
+            _merge(book, key, obj)
+            merged = dict(book[key])
+        if kind == "orders" and _on_order:
+            try:
+                _on_order(acct, merged, now)
+            except Exception as e:
+                print(f"[broker-stream] on_order error {key} acct={acct}: "
+                      f"{type(e).__name__}: {e}", flush=True)
+
+
+def _run(kind: str):
+    st = _streams[kind]
+    backoff = 1.0
+    url = f"{BASE}/{','.join(_accounts)}/{kind}"
+    while not _stop.is_set():
+        try:
+            r = ts_client.request("GET", url, headers={"Authorization": f"Bearer {_get_token()}"},
+                                  stream=True, timeout=STREAM_READ_TIMEOUT)
+            if r.status_code != 200:
+                raise RuntimeError(f"[{r.status_code}] {r.text[:200]}")
+            with _lock:
+                st["connected"] = True
+            print(f"[broker-stream] {kind} connected", flush=True)
+            backoff = 1.0
+            try:
+                _consume(kind, r)
+            finally:
+                try:
+                    r.close()
+                except Exception:
+                    pass
+        except Exception as e:
+            with _lock:
+                st["last_error"] = str(e)[:200]
+            print(f"[broker-stream] {kind} stream error: {e}", flush=True)
+        with _lock:
+            st["connected"] = False
+            st["live"] = False
+            st["reconnects"] += 1
+        if _stop.is_set():
+            break
+        wait = min(backoff, 60)
+        print(f"[broker-stream] {kind} down — polling covers it, reconnecting in {wait:.0f}s",
+              flush=True)
+        _stop.wait(wait)
+        backoff *= 2
+
+
+def stop():
+    _stop.set()
+
+
+# ── Read API ────────────────────────────────────────────────────────
+
+def live(account_id: str, kind: str = "orders") -> bool:
+    """True while the `kind` stream covers `account_id` and has delivered its snapshot."""
+    st = _streams[kind]
+    with _lock:
+        return (account_id in _accounts and st["live"]
+                and time.time() - st["last_msg_at"] < STREAM_READ_TIMEOUT)
+
+
+def orders(account_id: str) -> dict:
+    """{OrderID: order} as last streamed for `account_id` (copy)."""
+    with _lock:
+        return {k: dict(v) for k, v in _books["orders"].get(account_id, {}).items()}
+
+
+def positions(account_id: str) -> list | None:
+    """Streamed positions of `account_id`, or None when the position stream is not live
+    (callers then GET /positions)."""
+    if not live(account_id, "positions"):
+        return None
+    with _lock:
+        return [dict(p) for p in _books["positions"].get(account_id, {}).values()]
+
+
+# ── Latency ─────────────────────────────────────────────────────────
+
+def transition_order(ids, broker_orders: dict) -> dict | None:
+    """The broker order behind a state transition: of `ids` (entry / stop / target), the
+    one in a terminal status that closed last."""
+    done = [broker_orders[i] for i in ids if i in broker_orders
+            and broker_orders[i].get("Status") in _TERMINAL]
+    return max(done, key=lambda o: o.get("ClosedDateTime") or "", default=None)
+
+
+def _acc(lat: dict, name: str, ms: float):
+    ms = round(ms, 1)
+    lat[f"{name}_n"] = lat.get(f"{name}_n", 0) + 1
+    lat[f"{name}_total"] = lat.get(f"{name}_total", 0.0) + ms
+    lat[f"{name}_last"] = ms
+    lat[f"{name}_max"] = max(lat.get(f"{name}_max", 0.0), ms)
+
+
+def note_transition(source: str, broker_order: dict | None, recv: float | None = None):
+    """real_trader changed a lid's state in `source` (stream / poll / consistency / heal)."""
+    now = time.time()
+    closed = None
+    try:
+        ts = (broker_order or {}).get("ClosedDateTime")
+        if ts:
+            closed = datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        pass
+    with _lock:
+        lat = _latency.setdefault(source, {"transitions": 0})
+        lat["transitions"] += 1
+        if closed is not None:
+            _acc(lat, "broker_ms", max(0.0, (now - closed) * 1000))
+        if recv is not None:
+            _acc(lat, "event_ms", (now - recv) * 1000)
+
+
+def status() -> dict:
+    now = time.time()
+    with _lock:
+        streams = {}
+        for kind, st in _streams.items():
+            streams[kind] = {**st, "last_msg_age_s": round(now - st["last_msg_at"], 1)
+                             if st["last_msg_at"] else None,
+                             "items": sum(len(b) for b in _books[kind].values())}
+            streams[kind].pop("last_msg_at")
+        lat = {}
+        for source, d in _latency.items():
+            out = {"transitions": d["transitions"]}
+            for name in ("broker_ms", "event_ms"):
+                n = d.get(f"{name}_n")
+                if n:
+                    out[name] = {"last": d[f"{name}_last"], "max": d[f"{name}_max"],
+                                 "mean": round(d[f"{name}_total"] / n, 1)}
+            lat[source] = out
+    return {"enabled": enabled(), "accounts": list(_accounts),
+            "consistency_poll_sec": CONSISTENCY_POLL_SEC, "streams": streams, "latency": lat}
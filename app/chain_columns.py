@@ -0,0 +1,254 @@
+"""Columnar (struct-of-arrays) options chain — the one in-memory chain shape.
+
+Before this, every 30s cycle built a list of dicts, pivoted it with Python loops into a
+DataFrame (`to_side_by_side`), ran several concat/sort passes to centre it
+(`pick_centered`), and then every consumer took its own `latest_df.copy()` and re-ran
+`pd.to_numeric(...).fillna(0.0)` over the same columns just to find the max-GEX strikes.
+
+A `ChainSnapshot` holds one strike-sorted float64 array per CANONICAL_COLS column
+(missing = NaN). Arrays are frozen (`writeable=False`) and the snapshot is never mutated,
+so main.py publishes it by plain reference swap and readers use it WITHOUT copying.
+Every snapshot carries a monotonically increasing `version` so consumers can tell a new
+chain from the one they already processed.
+
+DataFrames are produced only on demand (`to_frame()`) — the HTML table and the
+DataFrame-shaped helpers. The persisted JSON layout (`to_rows()`) is unchanged:
+positional lists in CANONICAL_COLS order with NaN written as "".
+
+Build from main.py:  build_chain(rows, spot, TARGET_STRIKES, exp=exp)
+
+Storage (chain_snapshots.packed / spy_chain_snapshots.packed, BYTEA): `pack()` writes a
+small versioned header followed by the CANONICAL_COLS arrays as float32, column-major,
+byte-shuffled and zlib-compressed per snapshot. NaN survives the round trip, so "" in
+the JSON layout and NaN in the packed layout mean the same thing. float32 keeps ~7
+significant digits — exact for strikes/OI/volume/quotes, ~1e-7 relative on greeks/IV.
+
+Read historical rows with `decode(packed, rows)`: it prefers `packed` and falls back to
+the legacy JSONB `rows`, so readers work on any mix of old, dual-written and packed-only
+rows during the cutover (see CHAIN_SNAPSHOT_FORMAT in main.py and
+chain_snapshot_pack_backfill.py).
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import struct
+import time
+import zlib
+
+import numpy as np
+
+CANONICAL_COLS = [
+    "C_Volume","C_OpenInterest","C_IV","C_Gamma","C_Delta","C_Bid","C_BidSize","C_Ask","C_AskSize","C_Last",
+    "Strike",
+    "P_Last","P_Ask","P_AskSize","P_Bid","P_BidSize","P_Delta","P_Gamma","P_IV","P_OpenInterest","P_Volume"
+]
+
+# column -> (side, get_chain_rows() row key)
+_SOURCE = {c: (c[0], c[2:]) for c in CANONICAL_COLS if c != "Strike"}
+
+_versions = itertools.count(1)
+
+
+def _f(v) -> float:
+    if v is None or v == "":
+        return np.nan
+    try:
+        return float(str(v).replace(",", "")) if isinstance(v, str) else float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ChainSnapshot:
+    """Immutable, versioned, strike-sorted chain. Read it, never copy it."""
+
+    __slots__ = ("version", "ts", "spot", "exp", "strikes", "_cols")
+
+    def __init__(self, strikes: np.ndarray, cols: dict, spot: float | None = None,
+                 exp: str | None = None):
+        strikes = np.asarray(strikes, dtype=np.float64)
+        strikes.setflags(write=False)
+        for a in cols.values():
+            a.setflags(write=False)
+        self.strikes = strikes
+        self._cols = cols
+        self.spot = spot
+        self.exp = exp
+        self.ts = time.time()
+        self.version = next(_versions)
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.strikes) == 0
+
+    # ── column access ──
+
+    def col(self, name: str) -> np.ndarray:
+        """Read-only float array for a CANONICAL_COLS column (NaN = missing)."""
+        if name == "Strike":
+            return self.strikes
+        return self._cols[name]
+
+    def col0(self, name: str) -> np.ndarray:
+        """Column with NaN -> 0.0 (what the old `pd.to_numeric(...).fillna(0.0)` gave)."""
+        return np.nan_to_num(self.col(name), nan=0.0)
+
+    # ── strike lookup (O(log n)) ──
+
+    def index_of(self, strike: float) -> int | None:
+        i = int(np.searchsorted(self.strikes, strike))
+        if i < len(self.strikes) and self.strikes[i] == strike:
+            return i
+        return None
+
+    def value(self, strike: float, name: str) -> float | None:
+        """Value of `name` at an exact strike, or None when absent / NaN."""
+        i = self.index_of(strike)
+        if i is None:
+            return None
+        v = self._cols[name][i]
+        return None if np.isnan(v) else float(v)
+
+    def window(self, lo: float, hi: float) -> slice:
+        """Index slice of strikes in [lo, hi]."""
+        return slice(int(np.searchsorted(self.strikes, lo, side="left")),
+                     int(np.searchsorted(self.strikes, hi, side="right")))
+
+    # ── derived ──
+
+    def net_gex(self, scale: float = 100.0) -> np.ndarray:
+        """Per-strike call_gamma*call_OI - put_gamma*put_OI, times `scale`."""
+        return (self.col0("C_Gamma") * self.col0("C_OpenInterest")
+                - self.col0("P_Gamma") * self.col0("P_OpenInterest")) * scale
+
+    def max_gex_strikes(self) -> tuple:
+        """(max +GEX strike, max -GEX strike) — same first-occurrence semantics as
+        the old `net_gex.idxmax()` / `idxmin()` on the sorted frame."""
+        if self.empty:
+            return None, None
+        net = self.net_gex()
+        return float(self.strikes[int(np.argmax(net))]), float(self.strikes[int(np.argmin(net))])
+
+    # ── on-demand views ──
+
+    def to_rows(self) -> list:
+        """Positional rows in CANONICAL_COLS order, NaN -> "" (chain_snapshots layout)."""
+        if self.empty:
+            return []
+        mat = np.column_stack([self.col(c) for c in CANONICAL_COLS]).tolist()
+        return [["" if x != x else x for x in r] for r in mat]
+
+    def to_frame(self):
+        """Fresh DataFrame (CANONICAL_COLS). Built per call — only for the HTML table and
+        DataFrame-shaped helpers; hot paths should read the arrays."""
+        import pandas as pd
+        return pd.DataFrame({c: self.col(c) for c in CANONICAL_COLS}, columns=CANONICAL_COLS)
+
+
+def build_chain(rows: list, spot: float | None, n: int, exp: str | None = None) -> ChainSnapshot:
+    """get_chain_rows() output -> centred ChainSnapshot.
+
+    Replaces `pick_centered(to_side_by_side(rows), spot, n)`: n/2 strikes at/above spot,
+    n/2 below, topped up from the nearest remaining strikes when one side is short.
+    A later row for the same (side, strike) wins, as in the dict pivot it replaces.
+    """
+    calls, puts = {}, {}
+    for r in rows:
+        k = r.get("Strike")
+        if k is None:
+            continue
+        (calls if r.get("Type") == "C" else puts)[float(k)] = r
+    strikes = np.array(sorted(set(calls) | set(puts)), dtype=np.float64)
+
+    if spot and len(strikes) > n:
+        half = n // 2
+        split = int(np.searchsorted(strikes, spot, side="left"))  # first strike >= spot
+        keep = np.zeros(len(strikes), dtype=bool)
+        keep[max(0, split - half):split] = True
+        keep[split:split + half] = True
+        short = n - int(keep.sum())
+        if short > 0:
+            rest = np.flatnonzero(~keep)
+            order = np.argsort(np.abs(strikes[rest] - spot), kind="stable")
+            keep[rest[order[:short]]] = True
+        strikes = strikes[keep]
+
+    cols = {}
+    for c, (side, key) in _SOURCE.items():
+        book = calls if side == "C" else puts
+        cols[c] = np.fromiter((_f(book.get(k, {}).get(key)) for k in strikes),
+                              dtype=np.float64, count=len(strikes))
+    return ChainSnapshot(strikes, cols, spot=spot, exp=exp)
+
+
+# ── packed storage ──
+
+PACK_MAGIC = b"CS"
+PACK_VERSION = 1                      # v1: float32, column-major, byte-shuffled, zlib
+_HEADER = struct.Struct("<2sBBI")     # magic, version, n_cols, n_strikes
+
+
+def pack(chain: ChainSnapshot, level: int = 6) -> bytes:
+    """ChainSnapshot -> versioned compressed blob for the `packed` BYTEA column."""
+    n = len(chain.strikes)
+    mat = np.empty((len(CANONICAL_COLS), n), dtype="<f4")
+    for i, c in enumerate(CANONICAL_COLS):
+        mat[i] = chain.col(c)
+    # Byte-shuffle (all 1st bytes, then all 2nd, ...): neighbouring strikes share
+    # exponent bytes, which zlib then compresses far better than interleaved floats.
+    shuffled = mat.view(np.uint8).reshape(-1, 4).T.tobytes()
+    return _HEADER.pack(PACK_MAGIC, PACK_VERSION, len(CANONICAL_COLS), n) + zlib.compress(shuffled, level)
+
+
+def unpack(blob, spot: float | None = None, exp: str | None = None) -> ChainSnapshot:
+    """Blob written by `pack()` -> ChainSnapshot. Raises ValueError on a foreign blob."""
+    blob = bytes(blob)  # psycopg hands BYTEA back as memoryview
+    if len(blob) < _HEADER.size:
+        raise ValueError("packed chain too short")
+    magic, version, n_cols, n = _HEADER.unpack_from(blob)
+    if magic != PACK_MAGIC:
+        raise ValueError("not a packed chain")
+    if version != PACK_VERSION or n_cols != len(CANONICAL_COLS):
+        raise ValueError(f"unsupported packed chain v{version} ({n_cols} cols)")
+    raw = np.frombuffer(zlib.decompress(blob[_HEADER.size:]), dtype=np.uint8)
+    if raw.size != n_cols * n * 4:
+        raise ValueError("packed chain size mismatch")
+    mat = raw.reshape(4, -1).T.copy().view("<f4").reshape(n_cols, n).astype(np.float64)
+    cols = {c: mat[i] for i, c in enumerate(CANONICAL_COLS) if c != "Strike"}
+    return ChainSnapshot(mat[CANONICAL_COLS.index("Strike")], cols, spot=spot, exp=exp)
+
+
+def from_positional_rows(rows, spot: float | None = None, exp: str | None = None) -> ChainSnapshot:
+    """Legacy JSONB `rows` (positional lists, "" = missing) -> ChainSnapshot."""
+    if isinstance(rows, (str, bytes)):
+        rows = json.loads(rows)
+    width = len(CANONICAL_COLS)
+    mat = np.array([[_f(v) for v in (list(r) + [None] * width)[:width]] for r in rows or []],
+                   dtype=np.float64).reshape(-1, width)
+    si = CANONICAL_COLS.index("Strike")
+    mat = mat[~np.isnan(mat[:, si])]
+    mat = mat[np.argsort(mat[:, si], kind="stable")]
+    cols = {c: np.ascontiguousarray(mat[:, i]) for i, c in enumerate(CANONICAL_COLS) if c != "Strike"}
+    return ChainSnapshot(np.ascontiguousarray(mat[:, si]), cols, spot=spot, exp=exp)
+
+
+def decode(packed=None, rows=None, spot: float | None = None,
+           exp: str | None = None) -> ChainSnapshot | None:
+    """Dual-read: `packed` when present, else the legacy JSONB `rows`; None when neither."""
+    if packed is not None:
+        return unpack(packed, spot=spot, exp=exp)
+    if rows is not None:
+        return from_positional_rows(rows, spot=spot, exp=exp)
+    return None
+
+
+def decode_rows(packed=None, rows=None) -> list:
+    """Dual-read for positional readers: always the legacy row layout ([] when empty)."""
+    if packed is None:
+        if rows is None:
+            return []
+        return json.loads(rows) if isinstance(rows, (str, bytes)) else rows
+    return unpack(packed).to_rows()
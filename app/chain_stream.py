@@ -0,0 +1,379 @@
+"""Persistent options-chain stream — one long-lived subscription per symbol/expiration.
+
+Before this, every `run_market_job` cycle opened `/marketdata/stream/options/chains`,
+waited up to STREAM_SECONDS for `EndSnapshot`, and closed it again — the `chain=` step
+in the `[timing]` log was most of the 30s cycle budget, and every cycle paid a fresh
+TLS + snapshot download for data that had barely moved.
+
+Here each (symbol, expiration) gets ONE background thread that keeps the stream open and
+folds every update into a per-strike book. The cycle reads the book under a lock — a
+consistent snapshot, no network wait. Whenever the book does not serve a request (stream
+down, or a caller asking for another expiration/window) `main.get_chain_rows` falls back
+to the legacy one-shot stream, then the snapshot endpoint (404s for SPY, S258).
+
+Why only CHAIN_STREAM_SYMBOLS: concurrent chain streams took the TS API down in March
+2026 (S258). The SPX/SPY cycle symbols get a book; the scanners (QQQ, IWM, stocks) keep
+the legacy one-shot path so the number of open chain streams stays fixed at two.
+
+Per-strike staleness: every side of every strike carries the time.time() of its last
+update. `status()` summarises it for /api/health; `staleness()` returns the full map.
+
+Init from main.py:  chain_stream.init(api_get, _chain_item_row)
+Read path:          chain_stream.get_rows(symbol, exp, spot, interval, proximity, own)
+                    -> list[dict] in get_chain_rows() format, or None when not served.
+                    Only own=True (the SPX/SPY cycle) starts, retires or recentres a book.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime
+from threading import Event, Lock, Thread
+
+# ── Config ──────────────────────────────────────────────────────────
+
+CHAIN_STREAM_SYMBOLS = {s.strip() for s in
+                        os.getenv("CHAIN_STREAM_SYMBOLS", "$SPXW.X,SPY").split(",") if s.strip()}
+
+# Resubscribe (recentred on spot) once spot has drifted this fraction of the strike
+# window away from the subscription's priceCenter. strikeProximity is a strike COUNT
+# per side, so the window is proximity * interval points: SPX 125 * 5 = +/-625 pt,
+# recentre after 125 pt (25 strikes); SPY 25 * 1 = +/-$25, recentre after $5. Either
+# way at least 100 / 20 strikes stay on each side of spot — build_chain needs +/-20.
+RECENTER_FRACTION = 0.2
+
+# A book that nobody has read for this long is shut down (market close, expiration
+# rollover, a symbol the cycle stopped asking for).
+IDLE_STOP_SEC = 300
+
+# Read timeout on the stream socket. TS sends a Heartbeat every few seconds, so 30s of
+# silence means the stream is dead, not quiet.
+STREAM_READ_TIMEOUT = 30
+
+# ── State ───────────────────────────────────────────────────────────
+
+_api_get = None
+_row_fn = None
+_initialized = False
+
+_books: dict = {}  # {(symbol, exp): ChainBook}
+_books_lock = Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("CHAIN_STREAM_ENABLED", "true").lower() == "true"
+
+
+def init(api_get_fn, row_fn):
+    """Initialize the chain stream layer. Called from main.py on_startup().
+
+    Args:
+        api_get_fn: main.api_get (auth + 401 retry + pooled session)
+        row_fn:     main._chain_item_row — raw stream item -> get_chain_rows() row dict
+    """
+    global _api_get, _row_fn, _initialized
+    _api_get = api_get_fn
+    _row_fn = row_fn
+    _initialized = True
+    print(f"[chain-stream] initialized (enabled={enabled()}, "
+          f"symbols={sorted(CHAIN_STREAM_SYMBOLS)})", flush=True)
+
+
+def _expiration_variants(ymd: str) -> list:
+    out = [ymd]
+    try:
+        out.append(datetime.strptime(ymd, "%Y-%m-%d").strftime("%m-%d-%Y"))
+    except Exception:
+        pass
+    out.append(ymd + "T00:00:00Z")
+    return out
+
+
+def _item_key(it: dict):
+    """(side, strike) for a raw chain item, or None when the item carries no leg."""
+    legs = it.get("Legs") or []
+    leg0 = legs[0] if legs else {}
+    side = (leg0.get("OptionType") or it.get("OptionType") or "").lower()
+    side = "C" if side.startswith("c") else "P" if side.startswith("p") else None
+    try:
+        strike = float(str(leg0.get("StrikePrice")).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+    if side is None:
+        return None
+    return side, strike
+
+
+# ── Book ────────────────────────────────────────────────────────────
+
+class ChainBook:
+    """Per-strike book for one (symbol, expiration), fed by a daemon stream thread."""
+
+    def __init__(self, symbol: str, exp: str, strike_interval: int, strike_proximity: int,
+                 center: float):
+        self.symbol = symbol
+        self.exp = exp
+        self.strike_interval = strike_interval
+        self.strike_proximity = strike_proximity
+        self.center = center
+
+        self._lock = Lock()
+        self._items: dict = {}     # {(side, strike): merged raw item}
+        self._updated: dict = {}   # {(side, strike): time.time() of last update}
+        self._live = False         # True once EndSnapshot landed and the stream is up
+        self._connected = False
+        self._last_msg_at = 0.0
+        self._book_at = 0.0        # when the current book was swapped in (EndSnapshot)
+        self._last_read_at = time.time()
+        self._recenter_to = None
+        self._exp_idx = 0
+        self._reconnects = 0
+        self._updates = 0
+        self._last_error = None
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True,
+                              name=f"chain-stream-{symbol}-{exp}")
+
+    # -- lifecycle --
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def request_recenter(self, spot: float):
+        with self._lock:
+            self._recenter_to = spot
+
+    # -- read side --
+
+    def ready(self) -> bool:
+        with self._lock:
+            return self._live and (time.time() - self._last_msg_at) < STREAM_READ_TIMEOUT
+
+    def rows(self) -> list:
+        """Consistent copy of the book, in get_chain_rows() row format."""
+        with self._lock:
+            self._last_read_at = time.time()
+            items = [dict(it) for it in self._items.values()]
+        return [_row_fn(it) for it in items]
+
+    def staleness(self) -> dict:
+        """{strike: {"C": age_s, "P": age_s}} for every strike in the book."""
+        now = time.time()
+        out: dict = {}
+        with self._lock:
+            for (side, strike), t in self._updated.items():
+                out.setdefault(strike, {})[side] = round(now - t, 1)
+        return dict(sorted(out.items()))
+
+    def status(self) -> dict:
+        now = time.time()
+        with self._lock:
+            ages = sorted(now - t for t in self._updated.values())
+            return {
+                "symbol": self.symbol,
+                "exp": self.exp,
+                "center": self.center,
+                "connected": self._connected,
+                "live": self._live,
+                "strikes": len({k for _, k in self._items}),
+                "last_msg_age_s": round(now - self._last_msg_at, 1) if self._last_msg_at else None,
+                "book_age_s": round(now - self._book_at, 1) if self._book_at else None,
+                "strike_age_median_s": round(ages[len(ages) // 2], 1) if ages else None,
+                "strike_age_max_s": round(ages[-1], 1) if ages else None,
+                "updates": self._updates,
+                "reconnects": self._reconnects,
+                "last_error": self._last_error,
+            }
+
+    # -- stream thread --
+
+    def _merge(self, target: dict, it: dict, now: float):
+        key = _item_key(it)
+        if key is None:
+            return
+        prev = target.get(key)
+        if prev is None:
+            target[key] = dict(it)
+        else:
+            # Updates can be partial — only overwrite the fields that arrived.
+            for k, v in it.items():
+                if v is not None:
+                    prev[k] = v
+        self._updated[key] = now
+        self._updates += 1
+
+    def _consume(self, r) -> str:
+        """Read the stream until it ends. Returns 'recenter', 'stop' or 'down'."""
+        pending: dict = {}
+        snapshot_done = False
+        for line in r.iter_lines(decode_unicode=True):
+            if self._stop.is_set():
+                return "stop"
+            now = time.time()
+            with self._lock:
+                self._last_msg_at = now
+                if self._recenter_to is not None:
+                    return "recenter"
+            if time.time() - self._last_read_at > IDLE_STOP_SEC:
+                return "stop"
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except Exception:
+                continue
+            if not isinstance(obj, dict) or "Heartbeat" in obj:
+                continue
+            if "Error" in obj:
+                self._last_error = str(obj)[:200]
+                print(f"[chain-stream] {self.symbol} stream error msg: {obj}", flush=True)
+                return "down"
+            status = obj.get("StreamStatus")
+            if status == "GoAway":
+                print(f"[chain-stream] {self.symbol} GoAway received, reconnecting", flush=True)
+                return "down"
+            if status == "EndSnapshot":
+                # Swap the freshly built book in atomically — readers never see a half book.
+                with self._lock:
+                    self._items = pending
+                    self._updated = {k: v for k, v in self._updated.items() if k in pending}
+                    self._live = True
+                    self._book_at = now
+                snapshot_done = True
+                print(f"[chain-stream] {self.symbol} {self.exp} snapshot: {len(pending)} legs "
+                      f"center={self.center:.2f}", flush=True)
+                continue
+            with self._lock:
+                self._merge(self._items if snapshot_done else pending, obj, now)
+        return "down"
+
+    def _run(self):
+        backoff = 1.0
+        encoded = self.symbol.replace("$", "%24")
+        variants = _expiration_variants(self.exp)
+        while not self._stop.is_set():
+            if time.time() - self._last_read_at > IDLE_STOP_SEC:
+                break
+            with self._lock:
+                if self._recenter_to is not None:
+                    self.center = self._recenter_to
+                    self._recenter_to = None
+            params = {
+                "spreadType": "Single",
+                "enableGreeks": "true",
+                "priceCenter": f"{self.center:.2f}" if self.center else "",
+                "strikeProximity": self.strike_proximity,
+                "optionType": "All",
+                "strikeInterval": self.strike_interval,
+                "expiration": variants[self._exp_idx % len(variants)],
+            }
+            outcome = "down"
+            try:
+                r = _api_get(f"/marketdata/stream/options/chains/{encoded}", params=params,
+                             stream=True, timeout=STREAM_READ_TIMEOUT)
+                with self._lock:
+                    self._connected = True
+                print(f"[chain-stream] {self.symbol} {self.exp} connected "
+                      f"(center={self.center:.2f}, exp={params['expiration']})", flush=True)
+                backoff = 1.0
+                try:
+                    outcome = self._consume(r)
+                finally:
+                    try:
+                        r.close()
+                    except Exception:
+                        pass
+            except Exception as e:
+                self._last_error = str(e)[:200]
+                print(f"[chain-stream] {self.symbol} stream error: {e}", flush=True)
+                if "[4" in str(e):
+                    self._exp_idx += 1  # 4xx: try the next expiration format
+            with self._lock:
+                self._connected = False
+                if outcome != "recenter":
+                    self._live = False
+            if outcome == "stop":
+                break
+            self._reconnects += 1
+            if outcome == "recenter":
+                continue  # keep serving the old book until the new EndSnapshot swaps in
+            wait = min(backoff, 60)
+            print(f"[chain-stream] {self.symbol} reconnecting in {wait:.0f}s", flush=True)
+            self._stop.wait(wait)
+            backoff *= 2
+        with self._lock:
+            self._live = False
+            self._connected = False
+        with _books_lock:
+            if _books.get((self.symbol, self.exp)) is self:
+                _books.pop((self.symbol, self.exp), None)
+        print(f"[chain-stream] {self.symbol} {self.exp} stopped", flush=True)
+
+
+# ── Public API ──────────────────────────────────────────────────────
+
+def handles(symbol: str) -> bool:
+    """True when `symbol` can be served by a persistent book."""
+    return _initialized and enabled() and symbol in CHAIN_STREAM_SYMBOLS
+
+
+def get_rows(symbol: str, exp: str, spot: float, strike_interval: int,
+             strike_proximity: int, own: bool = False) -> list | None:
+    """Rows from the live book, or None when the book cannot serve this request.
+
+    The book only serves a request whose (exp, strike_interval, strike_proximity) all
+    match its own. Only the owner (the SPX/SPY cycle, `own=True`) lazily starts the
+    book, retires one left on an old expiration, and asks for a recentred resubscribe
+    once spot has drifted too far. Other callers (the GEX scanners, with their own
+    expirations and windows) read a matching book or get None and never touch the stream.
+    """
+    if not handles(symbol):
+        return None
+    key = (symbol, exp)
+    with _books_lock:
+        book = _books.get(key)
+        if book is not None and (book.strike_interval != strike_interval
+                                 or book.strike_proximity != strike_proximity):
+            return None  # a caller with a different window — don't thrash the stream
+        if own:
+            for (sym, old_exp), old in list(_books.items()):
+                if sym == symbol and old_exp != exp:
+                    old.stop()
+                    _books.pop((sym, old_exp), None)
+            if book is None:
+                book = ChainBook(symbol, exp, strike_interval, strike_proximity, spot)
+                _books[key] = book
+                book.start()
+                return None
+        elif book is None:
+            return None
+    if own and spot and book.center and \
+            abs(spot - book.center) > strike_proximity * strike_interval * RECENTER_FRACTION:
+        book.request_recenter(spot)
+    if not book.ready():
+        if own:
+            book._last_read_at = time.time()
+        return None
+    return book.rows() or None
+
+
+def status() -> dict:
+    """Summary per book for /api/health."""
+    with _books_lock:
+        books = list(_books.values())
+    return {
+        "enabled": enabled(),
+        "books": [b.status() for b in books],
+    }
+
+
+def staleness(symbol: str | None = None) -> dict:
+    """Per-strike age in seconds, {symbol: {exp, strikes: {strike: {C, P}}}}."""
+    with _books_lock:
+        books = list(_books.values())
+    return {b.symbol: {"exp": b.exp, "strikes": b.staleness()}
+            for b in books if symbol is None or b.symbol == symbol}
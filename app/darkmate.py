@@ -12,6 +12,8 @@ from datetime import datetime, timedelta, time as dtime
 from collections import defaultdict
 from zoneinfo import ZoneInfo
 from sqlalchemy import text
+from app import migrations
+from app import volland_exposure as vexp
 from app.live_filter import passes_v16, load_gaps, COLS
 
 ET = ZoneInfo("America/New_York")
@@ -39,11 +41,19 @@ def init(engine, api_get_fn, get_spot_fn=None):
 
 
 def _db_init():
-    if not _engine:
-        return
-    with _engine.begin() as c:
-        c.execute(text("""CREATE TABLE IF NOT EXISTS semi_basket (
-            et timestamp PRIMARY KEY, basket_pct numeric, n_names int, details jsonb)"""))
+    if _engine:
+        migrations.apply(_engine, "darkmate", _MIGRATIONS)
+
+
+def _schema_v1(c):
+    c.execute(text("""CREATE TABLE IF NOT EXISTS semi_basket (
+        et timestamp PRIMARY KEY, basket_pct numeric, n_names int, details jsonb)"""))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "semi_basket", _schema_v1),
+]
 
 
 def _now_et():
@@ -116,11 +126,11 @@ def _gamma_fav(conn, ts_utc, spot, isLong):
     Uses the ALL bucket = the true total exposure. (The TODAY/WEEK/30DAYS buckets are
     CUMULATIVE/nested — summing them double-counts; ALL is the correct full total.)"""
     rows = conn.execute(text("""
-        SELECT DISTINCT ON (strike) strike, value
-        FROM volland_exposure_points
-        WHERE greek='gamma' AND expiration_option='ALL' AND ts_utc<=:t
-          AND ts_utc >= :t0 AND strike BETWEEN :lo AND :hi
-        ORDER BY strike, ts_utc DESC"""),
+        SELECT DISTINCT ON (u.strike) u.strike, u.value
+        FROM volland_exposure_snapshots s, unnest(s.strikes, s.vals) AS u(strike, value)
+        WHERE s.greek='gamma' AND s.expiration_option='ALL' AND s.ts_utc<=:t
+          AND s.ts_utc >= :t0 AND u.strike BETWEEN :lo AND :hi
+        ORDER BY u.strike, s.ts_utc DESC"""),
         {"t": ts_utc, "t0": ts_utc - timedelta(hours=8),
          "lo": spot - 200, "hi": spot + 200}).fetchall()
     prof = {float(k): float(v) / 1e6 for k, v in rows}
@@ -271,37 +281,26 @@ def levels(at_iso=None, greek='gamma', rng=150):
         return {"error": "no engine"}
     try:
         with _engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # latest snapshot per expiration (<= at_iso in history mode)
+            EXPS4 = ['TODAY', 'THIS_WEEK', 'THIRTY_NEXT_DAYS', 'ALL']
             if at_iso:
-                tcut = text("ts_utc <= :t")
-                params = {"t": at_iso}
+                snaps = {e: vexp.at_or_before(conn, greek, at_iso, e) for e in EXPS4}
+                snaps = {e: sn for e, sn in snaps.items() if sn}
             else:
-                tcut = text("TRUE")
-                params = {}
-            # latest snapshot ts per expiration <= cut
-            EXPS4 = ['TODAY', 'THIS_WEEK', 'THIRTY_NEXT_DAYS', 'ALL']
-            base = conn.execute(text(f"""
-                SELECT expiration_option, MAX(ts_utc) mt FROM volland_exposure_points
-                WHERE greek=:g AND expiration_option=ANY(:e) AND {tcut.text}
-                GROUP BY expiration_option"""), {"g": greek, "e": EXPS4, **params}).fetchall()
-            if not base:
+                snaps = vexp.latest_many(conn, greek, EXPS4)
+            if not snaps:
                 return {"error": "no data"}
             spot = None
             per_exp = {}
             snap_ts = None
-            for exp, mt in base:
-                rows = conn.execute(text("""SELECT strike, value, current_price FROM volland_exposure_points
-                    WHERE greek=:g AND expiration_option=:exp AND ts_utc=:mt"""),
-                    {"g": greek, "exp": exp, "mt": mt}).fetchall()
-                d = {}
-                for k, v, cp in rows:
-                    d[float(k)] = float(v) / 1e6
-                    if cp and spot is None:
-                        spot = float(cp)
+            for exp, sn in snaps.items():
+                per_exp[exp] = {float(k): float(v) / 1e6 for k, v in vexp.points(sn)}
+                if sn["current_price"] and spot is None:
+                    spot = sn["current_price"]
                 if exp == 'ALL':
-                    snap_ts = mt.isoformat()
-                per_exp[exp] = d
-            if snap_ts is None and base:
-                snap_ts = max(mt for _, mt in base).isoformat()
+                    snap_ts = sn["ts_utc"].isoformat()
+            if snap_ts is None:
+                snap_ts = max(sn["ts_utc"] for sn in snaps.values()).isoformat()
             volland_spot = spot
             # LIVE mode: use the freshest spot for the marker — the in-memory live spot (30s)
             # when available, else the chain_snapshots DB (which only saves every ~2 min).
@@ -59,8 +59,8 @@ async function load(){
   document.getElementById('status').textContent='loading...';
   try{
     const [gr,vr]=await Promise.all([
-      fetch('/api/darkmate/levels?greek=gamma'+q,{cache:'no-store'}).then(r=>r.json()),
-      fetch('/api/darkmate/levels?greek=vanna'+q,{cache:'no-store'}).then(r=>r.json())
+      fetch('/api/darkmate/levels?greek=gamma'+q,{cache:'no-cache'}).then(r=>r.json()),
+      fetch('/api/darkmate/levels?greek=vanna'+q,{cache:'no-cache'}).then(r=>r.json())
     ]);
     if(gr.error||vr.error){document.getElementById('status').textContent='err';return;}
     renderOne('chartV',vr,true); keyChips('keyV',vr);
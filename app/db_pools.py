@@ -0,0 +1,158 @@
+"""Per-workload Postgres pools — a slow dashboard read never delays a live write.
+
+Before this, main.py had one engine (pool 5 + overflow 10, 30s statement_timeout) for
+everything: the market cycle, log_setup, the outcome tracker, real_trader's
+`_persist_order`, and the heavy dashboard reads (`/api/setup/log_with_outcomes`, the
+playback range / exports, `/api/setup/export`, the gex_long_v3 overlay rebuild). A few
+of those on a busy afternoon held every connection, and the next order persist queued
+behind them.
+
+Now there is one engine per workload class, on the same DATABASE_URL:
+  trading    main.engine — market cycle, setup_log writes, outcome tracker, traders,
+             VPS / Sierra ingest. Sized as the old shared pool.
+  api        main.api_engine — dashboard and admin endpoints.
+  analytics  main.analytics_engine — the heavy read endpoints; small pool, long timeout.
+Each has its own pool_size / max_overflow / pool_timeout / statement_timeout
+(DB_POOL_<CLASS>_SIZE, _OVERFLOW, _TIMEOUT (s), _STATEMENT_TIMEOUT (ms)). A request
+that finds its pool exhausted waits in THAT pool's queue (and fails after its
+pool_timeout) — it cannot borrow a trading connection. Postgres sees at most
+sum(size + overflow) connections from this process.
+
+Each pool counts checkouts, queued checkouts (no idle connection and no overflow left),
+queue wait (last / max / total ms), pool timeouts, current and peak use — status().
+
+API:
+  create(url) -> {"trading": engine, "api": engine, "analytics": engine}
+  status()    -> {class: {size, max_overflow, checked_out, overflow, checkouts, queued,
+                          peak_checked_out, wait_ms_last, wait_ms_max, wait_ms_mean,
+                          timeouts}}
+"""
+from __future__ import annotations
+
+import os
+import time
+from threading import Lock
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+# class -> (pool_size, max_overflow, pool_timeout s, statement_timeout ms)
+DEFAULTS = {
+    "trading": (5, 10, 30, 30000),
+    "api": (4, 4, 10, 30000),
+    "analytics": (2, 1, 30, 120000),
+}
+
+_lock = Lock()
+_pools: dict = {}          # class -> _MeteredPool
+_config: dict = {}         # class -> _cfg() tuple the engine was created with
+
+
+def _cfg(name: str) -> tuple:
+    size, overflow, timeout, stmt = DEFAULTS[name]
+    env = f"DB_POOL_{name.upper()}_"
+    return (int(os.getenv(env + "SIZE", size)), int(os.getenv(env + "OVERFLOW", overflow)),
+            float(os.getenv(env + "TIMEOUT", timeout)), int(os.getenv(env + "STATEMENT_TIMEOUT", stmt)))
+
+
+class _MeteredPool(QueuePool):
+    """QueuePool that times every checkout and counts the ones that had to queue.
+
+    Only public pool API: connect() is timed around the parent's, "queued" is read from
+    checkedin() / overflow() against the configured max_overflow, and checkouts / peak
+    use come from the checkout / checkin pool events (_on_checkout / _on_checkin).
+    """
+
+    workload = "?"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = {"checkouts": 0, "in_use": 0, "peak_checked_out": 0, "queued": 0, "timeouts": 0,
+                      "wait_ms_last": 0.0, "wait_ms_max": 0.0, "wait_ms_total": 0.0}
+
+    def connect(self):
+        max_overflow = _config[self.workload][1] if self.workload in _config else 0
+        queued = self.checkedin() == 0 and self.overflow() >= max_overflow
+        t0 = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeout:
+            with _lock:
+                self.stats["timeouts"] += 1
+            print(f"[db-pool] {self.workload}: pool timeout after {time.perf_counter() - t0:.1f}s "
+                  f"({self.checkedout()} checked out)", flush=True)
+            raise
+        finally:
+            if queued:
+                ms = round((time.perf_counter() - t0) * 1000, 1)
+                with _lock:
+                    st = self.stats
+                    st["queued"] += 1
+                    st["wait_ms_last"] = ms
+                    st["wait_ms_max"] = max(st["wait_ms_max"], ms)
+                    st["wait_ms_total"] += ms
+
+    def recreate(self):
+        # pool_pre_ping / invalidation may swap the pool; keep the class and counters
+        # (the event listeners travel with the pool's dispatch)
+        new = super().recreate()
+        new.workload = self.workload
+        new.stats = self.stats
+        with _lock:
+            _pools[self.workload] = new
+        return new
+
+
+def _listen(pool, name: str):
+    """Count checkouts and peak use from the pool events (they survive recreate())."""
+    stats = pool.stats
+
+    def _checkout(dbapi_conn, record, proxy):
+        with _lock:
+            stats["checkouts"] += 1
+            stats["in_use"] += 1
+            stats["peak_checked_out"] = max(stats["peak_checked_out"], stats["in_use"])
+
+    def _checkin(dbapi_conn, record):
+        with _lock:
+            stats["in_use"] = max(0, stats["in_use"] - 1)
+
+    event.listen(pool, "checkout", _checkout)
+    event.listen(pool, "checkin", _checkin)
+
+
+def create(url: str) -> dict:
+    """One engine per workload class on `url` (see module docstring)."""
+    engines = {}
+    for name in DEFAULTS:
+        size, overflow, timeout, stmt = cfg = _cfg(name)
+        with _lock:
+            _config[name] = cfg
+        eng = create_engine(
+            url, pool_pre_ping=True, poolclass=_MeteredPool,
+            pool_size=size, max_overflow=overflow, pool_timeout=timeout,
+            connect_args={"options": f"-c statement_timeout={stmt}",
+                          "application_name": f"0dte-alpha-{name}"},
+        )
+        eng.pool.workload = name
+        _listen(eng.pool, name)
+        with _lock:
+            _pools[name] = eng.pool
+        engines[name] = eng
+        print(f"[db-pool] {name}: size={size} overflow={overflow} "
+              f"pool_timeout={timeout:g}s statement_timeout={stmt}ms", flush=True)
+    return engines
+
+
+def status() -> dict:
+    out = {}
+    with _lock:
+        for name, pool in _pools.items():
+            st = dict(pool.stats)
+            st.pop("in_use")
+            total = st.pop("wait_ms_total")
+            st["wait_ms_mean"] = round(total / st["queued"], 1) if st["queued"] else None
+            out[name] = {"size": pool.size(), "max_overflow": _config[name][1],
+                         "checked_out": pool.checkedout(), "overflow": pool.overflow(), **st}
+    return out
@@ -30,6 +30,8 @@ from datetime import time as dtime, datetime
 from zoneinfo import ZoneInfo
 from sqlalchemy import text
 
+from app import signal_feed
+
 ET = ZoneInfo("America/New_York")
 SETUP_NAME = "Dip-Buy"
 V2_NAME = "Dip-Buy v2"
@@ -265,7 +267,7 @@ def _fire(et, entry, vix, v2=False):
                 f"VXdiv={vx_div_ok}, grade {grade}")
     try:
         with _engine.begin() as conn:
-            res = conn.execute(text("""
+            res = conn.execute(text(f"""
                 INSERT INTO setup_log
                     (setup_name, direction, grade, score, spot, target,
                      vix, first_hour, notified, comments, abs_details,
@@ -274,14 +276,17 @@ def _fire(et, entry, vix, v2=False):
                     (:n, 'long', :g, :s, :spot, :tgt,
                      :vix, :fh, FALSE, :c, :ad,
                      :tl, :sl)
-                RETURNING id
+                RETURNING {signal_feed.COLUMNS}
             """), {
                 "n": name, "g": grade, "s": score, "spot": entry,
                 "tgt": entry + tgt_pts, "vix": vix, "fh": (mins < 30),
                 "c": comments, "ad": json.dumps(factors),
                 "tl": entry + tgt_pts, "sl": entry - stp_pts,
             })
-            log_id = res.fetchone()[0]
+            row = dict(res.mappings().first())
+        log_id = row["id"]
+        # Eval signal feed: /api/eval/signals and the stream serve from its journal
+        signal_feed.logged([row])
         _open_trades.append({
             "id": log_id, "entry": entry, "entry_ts": et,
             "target": entry + tgt_pts, "stop": entry - stp_pts,
@@ -324,6 +329,7 @@ def _track_outcomes(et, spot):
                 """), {"r": result, "p": pnl, "mp": round(tr["max_fav"], 2),
                        "ml": round(tr["max_adv"], 2), "fe": first_event,
                        "em": elapsed, "i": tr["id"]})
+            signal_feed.outcome(tr["id"], result, pnl)
             print(f"[dipbuy] RESOLVED id={tr['id']} {result} {pnl:+.1f}pt", flush=True)
         except Exception:
             print(f"[dipbuy] outcome update failed: {traceback.format_exc()}", flush=True)
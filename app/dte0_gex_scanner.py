@@ -3,7 +3,7 @@
 
 Independent from SPX 0DTE pipeline (lazy imports, separate table).
 Schedule: 14 scans/day per symbol (every 30 min, 9:30-16:00 ET, on the wall clock).
-Symbols: SPX (SPXW.X), SPY, QQQ, IWM.
+Symbols: SPX (SPXW.X), SPY, QQQ, IWM — chains fetched concurrently (app/scan_executor.py).
 Data collection only — no alerts, no setup detection, no live signals.
 
 Replaces dead app/stock_gex_scanner.py for 0DTE-focused index/ETF analysis.
@@ -32,6 +32,9 @@ SYMBOLS = [
 
 DISPLAY_TO_CFG = {s["display"]: s for s in SYMBOLS}
 
+# Per-symbol deadline for the 0DTE exp lookup + chain (app/scan_executor.py)
+SCAN_TIMEOUT_SEC = 30
+
 # ── State ───────────────────────────────────────────────────────────
 
 _engine = None
@@ -59,31 +62,41 @@ def init(engine, api_get_fn):
 # ── Database ────────────────────────────────────────────────────────
 
 def _db_init():
-    from sqlalchemy import text
-    with _engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS dte0_gex_scans (
-                id              BIGSERIAL PRIMARY KEY,
-                symbol          VARCHAR(10) NOT NULL,
-                scan_ts         TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                scan_date       DATE NOT NULL,
-                spot            DOUBLE PRECISION NOT NULL,
-                expiration      DATE,
-                exp_label       VARCHAR(10) NOT NULL DEFAULT '0dte',
-                key_levels      JSONB NOT NULL DEFAULT '{}',
-                gex_data        JSONB NOT NULL DEFAULT '[]',
-                total_call_gex  DOUBLE PRECISION,
-                total_put_gex   DOUBLE PRECISION,
-                total_net_gex   DOUBLE PRECISION
-            );
-            CREATE INDEX IF NOT EXISTS ix_dte0_gex_scans_ts
-                ON dte0_gex_scans (scan_ts DESC);
-            CREATE INDEX IF NOT EXISTS ix_dte0_gex_scans_date_sym
-                ON dte0_gex_scans (scan_date, symbol);
-        """))
+    from app import migrations
+    migrations.apply(_engine, "dte0_gex", _MIGRATIONS)
     print("[dte0-gex] table ready", flush=True)
 
 
+def _schema_v1(conn):
+    from sqlalchemy import text
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS dte0_gex_scans (
+            id              BIGSERIAL PRIMARY KEY,
+            symbol          VARCHAR(10) NOT NULL,
+            scan_ts         TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            scan_date       DATE NOT NULL,
+            spot            DOUBLE PRECISION NOT NULL,
+            expiration      DATE,
+            exp_label       VARCHAR(10) NOT NULL DEFAULT '0dte',
+            key_levels      JSONB NOT NULL DEFAULT '{}',
+            gex_data        JSONB NOT NULL DEFAULT '[]',
+            total_call_gex  DOUBLE PRECISION,
+            total_put_gex   DOUBLE PRECISION,
+            total_net_gex   DOUBLE PRECISION
+        );
+        CREATE INDEX IF NOT EXISTS ix_dte0_gex_scans_ts
+            ON dte0_gex_scans (scan_ts DESC);
+        CREATE INDEX IF NOT EXISTS ix_dte0_gex_scans_date_sym
+            ON dte0_gex_scans (scan_date, symbol);
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "dte0_gex_scans", _schema_v1),
+]
+
+
 def _load_latest():
     """Load today's most recent scan per symbol into memory on startup."""
     global _latest
@@ -248,33 +261,39 @@ def run_scan():
         print("[dte0-gex] batch quote failed — skipping scan", flush=True)
         return
 
-    scanned, failed = 0, 0
-    per_symbol = {}
+    from app import scan_executor
 
-    for cfg in SYMBOLS:
-        disp = cfg["display"]
+    def fetch(disp):
+        """(exp, chain rows) for one symbol; raises (retried) on a missing exp / thin chain."""
+        cfg = DISPLAY_TO_CFG[disp]
         ts_sym = cfg["ts_symbol"]
-        try:
-            spot = quotes.get(cfg["quote_symbol"])
-            if not spot:
-                failed += 1
-                per_symbol[disp] = {"ok": False, "msg": "no quote"}
-                continue
+        exp = get_0dte_exp(symbol=ts_sym)
+        if not exp:
+            raise ValueError("no 0dte exp")
+        rows = get_chain_rows(exp, quotes[cfg["quote_symbol"]], symbol=ts_sym,
+                              strike_interval=cfg["interval"],
+                              strike_proximity=cfg["proximity"])
+        if not rows or len(rows) < 10:
+            raise ValueError(f"thin chain ({len(rows) if rows else 0})")
+        return exp, rows
 
-            exp = get_0dte_exp(symbol=ts_sym)
-            if not exp:
-                failed += 1
-                per_symbol[disp] = {"ok": False, "msg": "no 0dte exp"}
-                continue
+    scanned, failed = 0, 0
+    per_symbol = {}
+    for cfg in SYMBOLS:
+        if not quotes.get(cfg["quote_symbol"]):
+            failed += 1
+            per_symbol[cfg["display"]] = {"ok": False, "msg": "no quote"}
 
-            rows = get_chain_rows(exp, spot, symbol=ts_sym,
-                                  strike_interval=cfg["interval"],
-                                  strike_proximity=cfg["proximity"])
-            if not rows or len(rows) < 10:
-                failed += 1
-                per_symbol[disp] = {"ok": False, "msg": f"thin chain ({len(rows) if rows else 0})"}
-                continue
+    fetched, report = scan_executor.run(
+        "dte0_gex", [c["display"] for c in SYMBOLS if c["display"] not in per_symbol], fetch,
+        timeout=SCAN_TIMEOUT_SEC)
+    for disp, reason in report["failed"].items():
+        failed += 1
+        per_symbol[disp] = {"ok": False, "msg": reason}
 
+    for disp, (exp, rows) in fetched.items():
+        spot = quotes[DISPLAY_TO_CFG[disp]["quote_symbol"]]
+        try:
             gex_data = _compute_gex(rows)
             if not gex_data:
                 failed += 1
@@ -324,8 +343,10 @@ def run_scan():
         "ts": str(now), "ok": scanned > 0,
         "msg": f"scanned {scanned}/{len(SYMBOLS)}, failed {failed}",
         "scanned": scanned, "failed": failed, "per_symbol": per_symbol,
+        "duration_s": report["duration_s"], "skew_s": report["skew_s"],
     }
-    print(f"[dte0-gex] scan done: {scanned}/{len(SYMBOLS)} ok, {failed} failed", flush=True)
+    print(f"[dte0-gex] scan done: {scanned}/{len(SYMBOLS)} ok, {failed} failed "
+          f"in {report['duration_s']}s (skew {report['skew_s']}s)", flush=True)
 
 
 # ── API Helpers ─────────────────────────────────────────────────────
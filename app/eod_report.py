@@ -459,7 +459,7 @@ def _query_range_bars(engine, trade_date):
                     SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
                            bar_volume, bar_delta, cvd_close, ts_start
                     FROM es_range_bars
-                    WHERE trade_date = :d AND source = :src
+                    WHERE trade_date = :d AND source = :src AND range_pts = 5.0
                     ORDER BY bar_idx
                 """), {"d": date_str, "src": source}).fetchall()
                 if rows:
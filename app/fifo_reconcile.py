@@ -43,6 +43,8 @@ from zoneinfo import ZoneInfo
 import requests
 from sqlalchemy import text
 
+from app import ts_client
+
 NY = ZoneInfo("America/New_York")
 REAL_BASE = "https://api.tradestation.com/v3"
 
@@ -77,7 +79,8 @@ def _ts_get(path: str) -> dict | None:
         return None
     try:
         token = _get_token()
-        r = requests.get(REAL_BASE + path, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        r = ts_client.request("GET", REAL_BASE + path, lane="bulk",
+                              headers={"Authorization": f"Bearer {token}"}, timeout=30)
         if r.status_code != 200:
             return None
         return r.json() if r.text else None
@@ -65,11 +65,12 @@ from zoneinfo import ZoneInfo
 
 from sqlalchemy import text
 
-ET = ZoneInfo("America/New_York")
+import numpy as np
+
+from app import migrations, ts_client
+from app.chain_columns import decode
 
-# chain_snapshots row layout (verified against chain_snapshots.columns)
-IDX_C_DELTA, IDX_C_BID, IDX_C_ASK = 4, 5, 7
-IDX_STRIKE = 10
+ET = ZoneInfo("America/New_York")
 
 _engine = None
 _get_token = None
@@ -170,37 +171,45 @@ def init(engine, get_token_fn=None, send_telegram_fn=None):
 
 
 def _db_init():
-    if not _engine:
-        return
-    with _engine.begin() as c:
-        c.execute(text("""
-            CREATE TABLE IF NOT EXISTS friday_spread_log (
-                id            SERIAL PRIMARY KEY,
-                trade_date    DATE NOT NULL UNIQUE,
-                entry_et      TIMESTAMP,
-                mode          TEXT,
-                spot_entry    DOUBLE PRECISION,
-                vix           DOUBLE PRECISION,
-                short_strike  DOUBLE PRECISION,
-                long_strike   DOUBLE PRECISION,
-                width         DOUBLE PRECISION,
-                short_delta   DOUBLE PRECISION,
-                qty           INTEGER,
-                credit_pts    DOUBLE PRECISION,
-                credit_usd    DOUBLE PRECISION,
-                max_profit_usd DOUBLE PRECISION,
-                max_loss_usd  DOUBLE PRECISION,
-                breakeven     DOUBLE PRECISION,
-                order_id      TEXT,
-                fill_credit   DOUBLE PRECISION,
-                settle_spot   DOUBLE PRECISION,
-                settle_cost   DOUBLE PRECISION,
-                pnl_pts       DOUBLE PRECISION,
-                pnl_usd       DOUBLE PRECISION,
-                result        TEXT,
-                details       JSONB
-            )
-        """))
+    if _engine:
+        migrations.apply(_engine, "friday_spread", _MIGRATIONS)
+
+
+def _schema_v1(c):
+    c.execute(text("""
+        CREATE TABLE IF NOT EXISTS friday_spread_log (
+            id            SERIAL PRIMARY KEY,
+            trade_date    DATE NOT NULL UNIQUE,
+            entry_et      TIMESTAMP,
+            mode          TEXT,
+            spot_entry    DOUBLE PRECISION,
+            vix           DOUBLE PRECISION,
+            short_strike  DOUBLE PRECISION,
+            long_strike   DOUBLE PRECISION,
+            width         DOUBLE PRECISION,
+            short_delta   DOUBLE PRECISION,
+            qty           INTEGER,
+            credit_pts    DOUBLE PRECISION,
+            credit_usd    DOUBLE PRECISION,
+            max_profit_usd DOUBLE PRECISION,
+            max_loss_usd  DOUBLE PRECISION,
+            breakeven     DOUBLE PRECISION,
+            order_id      TEXT,
+            fill_credit   DOUBLE PRECISION,
+            settle_spot   DOUBLE PRECISION,
+            settle_cost   DOUBLE PRECISION,
+            pnl_pts       DOUBLE PRECISION,
+            pnl_usd       DOUBLE PRECISION,
+            result        TEXT,
+            details       JSONB
+        )
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "friday_spread_log", _schema_v1),
+]
 
 
 def _hydrate(d: _date | None = None):
@@ -225,60 +234,44 @@ def _hydrate(d: _date | None = None):
 # ------------------------------------------------------------ chain reads ---
 
 def _latest_chain():
-    """(et_naive, spot, vix, rows) of the newest 0DTE chain snapshot, or None."""
+    """(et_naive, spot, vix, chain, exp) of the newest 0DTE chain snapshot, or None.
+    `chain` is a columnar ChainSnapshot (app/chain_columns.py)."""
     if not _engine:
         return None
     with _engine.begin() as c:
         r = c.execute(text("""
-            SELECT (ts AT TIME ZONE 'America/New_York'), spot, vix, rows, exp
+            SELECT (ts AT TIME ZONE 'America/New_York'), spot, vix, rows, exp, packed
             FROM chain_snapshots
-            WHERE exp IS NOT NULL AND rows IS NOT NULL
+            WHERE exp IS NOT NULL AND (rows IS NOT NULL OR packed IS NOT NULL)
             ORDER BY ts DESC LIMIT 1
         """)).fetchone()
     if not r:
         return None
-    rows = json.loads(r[3]) if isinstance(r[3], str) else r[3]
-    return r[0], float(r[1]), (float(r[2]) if r[2] is not None else None), rows, r[4]
+    chain = decode(r[5], r[3])
+    return r[0], float(r[1]), (float(r[2]) if r[2] is not None else None), chain, r[4]
 
 
-def _call_leg(rows, strike):
+def _call_leg(chain, strike):
     """(bid, ask, delta) for one call strike, or None if unusable."""
-    for row in rows:
-        try:
-            k = float(row[IDX_STRIKE])
-        except (TypeError, ValueError, IndexError):
-            continue
-        if abs(k - strike) > 0.01:
-            continue
-        try:
-            bid = float(row[IDX_C_BID] or 0.0)
-            ask = float(row[IDX_C_ASK] or 0.0)
-            dlt = float(row[IDX_C_DELTA] or 0.0)
-        except (TypeError, ValueError, IndexError):
-            return None
-        if ask <= 0 or ask < bid:
-            return None
-        return bid, ask, dlt
-    return None
-
-
-def _pick_short_call(rows, spot, target):
+    hit = np.flatnonzero(np.abs(chain.strikes - strike) <= 0.01)
+    if not len(hit):
+        return None
+    i = int(hit[0])
+    bid, ask = float(chain.col0("C_Bid")[i]), float(chain.col0("C_Ask")[i])
+    if ask <= 0 or ask < bid:
+        return None
+    return bid, ask, float(chain.col0("C_Delta")[i])
+
+
+def _pick_short_call(chain, spot, target):
     """OTM call whose delta is nearest `target`. Returns (strike, bid, ask, delta)."""
-    best, best_gap = None, float("inf")
-    for row in rows:
-        try:
-            k = float(row[IDX_STRIKE])
-            dlt = float(row[IDX_C_DELTA] or 0.0)
-            bid = float(row[IDX_C_BID] or 0.0)
-            ask = float(row[IDX_C_ASK] or 0.0)
-        except (TypeError, ValueError, IndexError):
-            continue
-        if k <= spot or ask <= 0 or ask < bid:
-            continue
-        gap = abs(abs(dlt) - target)
-        if gap < best_gap:
-            best_gap, best = gap, (k, bid, ask, dlt)
-    return best
+    k = chain.strikes
+    bid, ask, dlt = chain.col0("C_Bid"), chain.col0("C_Ask"), chain.col0("C_Delta")
+    ok = (k > spot) & (ask > 0) & (ask >= bid)
+    if not ok.any():
+        return None
+    i = int(np.argmin(np.where(ok, np.abs(np.abs(dlt) - target), np.inf)))
+    return float(k[i]), float(bid[i]), float(ask[i]), float(dlt[i])
 
 
 # ------------------------------------------------------------- context -----
@@ -355,7 +348,7 @@ def _on_cycle(now_et: datetime, spot, vix):
     if not snap:
         print("[friday-spread] no chain snapshot — skip", flush=True)
         return
-    snap_et, snap_spot, snap_vix, rows, exp = snap
+    snap_et, snap_spot, snap_vix, chain, exp = snap
     if exp != d:
         print(f"[friday-spread] chain expiry {exp} != today {d} — skip", flush=True)
         return
@@ -373,13 +366,13 @@ def _on_cycle(now_et: datetime, spot, vix):
     vix = snap_vix if snap_vix is not None else vix
     width, qty = _width(), _qty()
 
-    short = _pick_short_call(rows, spot, _target_delta())
+    short = _pick_short_call(chain, spot, _target_delta())
     if not short:
         print("[friday-spread] no OTM call near target delta — skip", flush=True)
         return
     k_short, s_bid, s_ask, s_delta = short
     k_long = k_short + width
-    lng = _call_leg(rows, k_long)
+    lng = _call_leg(chain, k_long)
     if not lng:
         print(f"[friday-spread] no quote for the long leg C{k_long:.0f} — skip", flush=True)
         return
@@ -569,7 +562,6 @@ def _running_totals():
 
 def _place_order(k_short, k_long, credit, qty, d):
     """Atomic two-leg limit credit spread. Returns (order_id, fill_credit, error)."""
-    import requests
     acct = os.getenv("FRIDAY_SPREAD_ACCOUNT", "").strip()
     if not acct:
         return None, None, "no account configured"
@@ -600,10 +592,10 @@ def _place_order(k_short, k_long, credit, qty, d):
         ],
     }
     try:
-        resp = requests.post(f"{_api_base()}/orderexecution/orders",
-                             json=payload,
-                             headers={"Authorization": f"Bearer {token}"},
-                             timeout=15)
+        resp = ts_client.request("POST", f"{_api_base()}/orderexecution/orders",
+                                 json=payload,
+                                 headers={"Authorization": f"Bearer {token}"},
+                                 timeout=15)
         data = resp.json() if resp.content else {}
     except Exception as e:
         return None, None, f"request failed: {e}"
@@ -625,15 +617,14 @@ def _order_outcome(order_id: str):
     'unknown' (settle normally on the recorded credit) and only an explicitly
     cancelled/rejected/expired order counts as 'unfilled'.
     """
-    import requests
     if not _get_token:
         return "unknown", None
     try:
         token = _get_token()
         acct = os.getenv("FRIDAY_SPREAD_ACCOUNT", "").strip()
-        resp = requests.get(f"{_api_base()}/brokerage/accounts/{acct}/historicalorders"
-                            f"?since={datetime.now(ET).date().isoformat()}",
-                            headers={"Authorization": f"Bearer {token}"}, timeout=15)
+        resp = ts_client.request("GET", f"{_api_base()}/brokerage/accounts/{acct}/historicalorders"
+                                 f"?since={datetime.now(ET).date().isoformat()}", lane="bulk",
+                                 headers={"Authorization": f"Bearer {token}"}, timeout=15)
         data = resp.json() if resp.content else {}
     except Exception as e:
         print(f"[friday-spread] order status check failed: {e}", flush=True)
@@ -36,11 +36,12 @@ v3.1 specification:
 """
 from __future__ import annotations
 
-import json
 import time
 import threading
 from typing import Optional, Any
 
+from app.chain_columns import decode_rows
+
 # Cache: dict[lid] = {"pass": bool, "verdict": str, "result": str, "pnl": float, "max_fav": float, "reason": str}
 _v3_cache: dict[int, dict[str, Any]] = {}
 _v3_cache_built_at: Optional[float] = None
@@ -74,18 +75,20 @@ def _features(cur, t_utc, spot: float) -> Optional[dict]:
     # wrong data, so the portal overlay didn't match what TSRT actually placed.
     # chain_snapshots stores a mirrored call|strike|put row layout; positional indices
     # (validated 2026-06-08): Strike=10, C_OpenInt=1, C_Gamma=3, P_Gamma=17, P_OpenInt=19.
-    cur.execute("""SELECT rows FROM chain_snapshots
+    cur.execute("""SELECT rows, packed FROM chain_snapshots
                    WHERE ts BETWEEN %s - interval '6 min' AND %s + interval '2 min'
                    ORDER BY abs(extract(epoch FROM (ts - %s))) LIMIT 1""",
                 (t_utc, t_utc, t_utc))
     ch = cur.fetchone()
-    cur.execute("""SELECT ts_utc FROM volland_exposure_points
-                   WHERE ts_utc BETWEEN %s - interval '5 min' AND %s
-                     AND greek='charm' ORDER BY ts_utc DESC LIMIT 1""", (t_utc, t_utc))
+    # Charm: newest packed snapshot in the 5 min before entry (volland_exposure_snapshots;
+    # strike-sorted arrays — one row instead of a MAX(ts_utc) scan over per-strike rows).
+    cur.execute("""SELECT strikes, vals FROM volland_exposure_snapshots
+                   WHERE greek='charm' AND ts_utc BETWEEN %s - interval '5 min' AND %s
+                   ORDER BY ts_utc DESC LIMIT 1""", (t_utc, t_utc))
     c_snap = cur.fetchone()
     if not ch or not c_snap:
         return None
-    _chain_rows = ch[0] if isinstance(ch[0], list) else json.loads(ch[0])
+    _chain_rows = decode_rows(ch[1], ch[0])
     gex = []
     for _row in _chain_rows:
         try:
@@ -96,11 +99,8 @@ def _features(cur, t_utc, spot: float) -> Optional[dict]:
             continue
         if spot_f - 50 <= _s <= spot_f + 50:
             gex.append((_s, (_cg * _co) - (_pg * _po)))
-    cur.execute("""SELECT strike, value FROM volland_exposure_points
-                   WHERE ts_utc=%s AND greek='charm'
-                     AND strike BETWEEN %s AND %s ORDER BY strike""",
-                (c_snap[0], spot_f - 50, spot_f + 50))
-    charm = [(float(s), float(v)) for s, v in cur.fetchall()]
+    charm = [(float(s), float(v)) for s, v in zip(c_snap[0], c_snap[1])
+             if spot_f - 50 <= s <= spot_f + 50]
     if not gex or not charm:
         return None
 
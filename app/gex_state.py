@@ -28,15 +28,13 @@ import traceback
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+import numpy as np
 from sqlalchemy import text
 
-ET = ZoneInfo("America/New_York")
+from app import migrations
+from app.chain_columns import decode, from_positional_rows
 
-# chain_snapshots.rows positional layout (mirrored call | Strike | put).
-# Verified against live data 2026-08-11 — see feedback_gex_means_ts_gamma.
-C_OI, C_GAMMA, C_DELTA = 1, 3, 4
-STRIKE = 10
-P_DELTA, P_GAMMA, P_OI = 16, 17, 19
+ET = ZoneInfo("America/New_York")
 
 # Zero-gamma proximity band for the HIGH_VOLATILITY state.
 # The guide says "within 1% of zero gamma"; on SPX 1% is ~77 pt, which swallowed 43%
@@ -51,73 +49,68 @@ ZG_BAND_PTS = 8.0
 NET_CEILING_WIN = 60.0
 
 _engine = None
+_version = 0        # bumped on every successful capture() — see version()
 
 
 # ====================== PURE CORE (no I/O — unit-testable) ======================
 def compute(spot: float, rows: list) -> dict | None:
+    """compute_chain() for a positional-rows snapshot (chain_snapshots.rows layout)."""
+    if not spot or spot <= 100 or not rows:
+        return None
+    return compute_chain(spot, from_positional_rows(rows))
+
+
+def _argmax_pos(ks, vals):
+    """Strike of the largest positive value (first on ties), None when none is > 0."""
+    if not (vals > 0).any():
+        return None
+    return float(ks[int(np.argmax(np.where(vals > 0, vals, -np.inf)))])
+
+
+def compute_chain(spot: float, chain) -> dict | None:
     """Derive the six cards + state label from one chain snapshot.
 
     Args:
         spot: SPX spot at the snapshot
-        rows: chain_snapshots.rows (list of positional lists)
+        chain: ChainSnapshot (app/chain_columns.py) — read as arrays, not rows
     Returns dict, or None when the snapshot is unusable.
     """
-    if not spot or spot <= 100 or not rows:
-        return None
-    ks, cgex, pgex, ngex, dex = [], [], [], [], []
-    for r in rows:
-        try:
-            k = float(r[STRIKE])
-            cg = float(r[C_GAMMA] or 0.0); co = float(r[C_OI] or 0.0); cd = float(r[C_DELTA] or 0.0)
-            pg = float(r[P_GAMMA] or 0.0); po = float(r[P_OI] or 0.0); pd = float(r[P_DELTA] or 0.0)
-        except (TypeError, ValueError, IndexError):
-            continue
-        ks.append(k)
-        cgex.append(cg * co)
-        pgex.append(pg * po)
-        ngex.append(cg * co - pg * po)
-        dex.append(cd * co + pd * po)
-    if len(ks) < 10:
+    if not spot or spot <= 100 or chain is None or len(chain) < 10:
         return None
-    order = sorted(range(len(ks)), key=lambda i: ks[i])
-    ks = [ks[i] for i in order]
-    cgex = [cgex[i] for i in order]; pgex = [pgex[i] for i in order]
-    ngex = [ngex[i] for i in order]; dex = [dex[i] for i in order]
-
-    net_gex = sum(ngex)
-    net_dex = sum(dex)
-
-    # --- zero gamma: where the cumulative net-GEX profile (low -> high strike) crosses 0 ---
+    ks = chain.strikes
+    co, po = chain.col0("C_OpenInterest"), chain.col0("P_OpenInterest")
+    cgex = chain.col0("C_Gamma") * co
+    pgex = chain.col0("P_Gamma") * po
+    ngex = cgex - pgex
+    dex = chain.col0("C_Delta") * co + chain.col0("P_Delta") * po
+
+    # Running sums strike by strike (cumsum adds in order, like the row loop did)
+    run = np.cumsum(ngex)
+    net_gex = float(run[-1])
+    net_dex = float(np.cumsum(dex)[-1])
+
+    # --- zero gamma: where the cumulative net-GEX profile (low -> high strike) crosses 0;
+    # the last crossing wins ---
     zg = None
-    run = 0.0
-    prev_k = prev_run = None
-    for k, g in zip(ks, ngex):
-        new = run + g
-        if prev_run is not None and ((prev_run <= 0 < new) or (prev_run >= 0 > new)):
-            denom = new - prev_run
-            zg = prev_k + ((0.0 - prev_run) / denom if denom else 0.0) * (k - prev_k)
-        prev_k, prev_run = k, new
-        run = new
+    prev, new = run[:-1], run[1:]
+    cross = np.flatnonzero(((prev <= 0) & (0 < new)) | ((prev >= 0) & (0 > new)))
+    if len(cross):
+        i = int(cross[-1])
+        denom = float(new[i] - prev[i])
+        zg = float(ks[i] + ((0.0 - prev[i]) / denom if denom else 0.0) * (ks[i + 1] - ks[i]))
     zg_in_window = zg is not None
     if zg is None:
         # No crossing: the whole near-spot profile is one sign, so the flip is outside
         # the strike window. All-positive => flip is BELOW us; all-negative => ABOVE us.
         zg_side = 1 if net_gex > 0 else -1
-        zg_dist = (spot - ks[0]) if zg_side > 0 else -(ks[-1] - spot)
+        zg_dist = float(spot - ks[0]) if zg_side > 0 else -float(ks[-1] - spot)
     else:
         zg_side = 1 if spot > zg else -1
         zg_dist = spot - zg
 
-    def _argmax(vals):
-        bi = bv = None
-        for i, v in enumerate(vals):
-            if v > 0 and (bv is None or v > bv):
-                bi, bv = i, v
-        return ks[bi] if bi is not None else None
-
-    call_wall = _argmax(cgex)
-    put_wall = _argmax(pgex)
-    max_gamma = _argmax([a + b for a, b in zip(cgex, pgex)])
+    call_wall = _argmax_pos(ks, cgex)
+    put_wall = _argmax_pos(ks, pgex)
+    max_gamma = _argmax_pos(ks, cgex + pgex)
 
     # --- V18 "overhead wall": points from spot up to the LARGEST positive NET-gex
     # strike within NET_CEILING_WIN above it. None = no +net-gex strike overhead.
@@ -128,11 +121,8 @@ def compute(spot: float, rows: list) -> dict | None:
     # call-gex and nearest-strike versions both fail leave-one-month-out. The window
     # size is the one arbitrary parameter and it does not matter (40/60/80/unlimited
     # score identically), so 60 is kept for continuity with the earlier long study.
-    _nc_k = _nc_v = None
-    for _k, _g in zip(ks, ngex):
-        if _k > spot and (_k - spot) <= NET_CEILING_WIN and _g > 0 \
-           and (_nc_v is None or _g > _nc_v):
-            _nc_k, _nc_v = _k, _g
+    overhead = (ks > spot) & ((ks - spot) <= NET_CEILING_WIN)
+    _nc_k = _argmax_pos(ks, np.where(overhead, ngex, 0.0))
     net_ceiling = (_nc_k - spot) if _nc_k is not None else None
 
     state = _label(spot, net_gex, net_dex, zg, call_wall, put_wall)
@@ -147,7 +137,7 @@ def compute(spot: float, rows: list) -> dict | None:
         state=state,
         state_bias=BIAS.get(state),
         is_support=(state == "SUPPORT"),
-        k_min=ks[0], k_max=ks[-1],
+        k_min=float(ks[0]), k_max=float(ks[-1]),
     )
 
 
@@ -197,10 +187,12 @@ def init(engine):
 
 
 def _db_init():
-    if not _engine:
-        return
-    with _engine.begin() as c:
-        c.execute(text("""CREATE TABLE IF NOT EXISTS gex_state (
+    if _engine:
+        migrations.apply(_engine, "gex_state", _MIGRATIONS)
+
+
+def _schema_v1(c):
+    c.execute(text("""CREATE TABLE IF NOT EXISTS gex_state (
             et            timestamp PRIMARY KEY,
             spot          double precision,
             state         text,
@@ -211,16 +203,18 @@ def _db_init():
             put_wall      double precision,
             max_gamma     double precision,
             payload       jsonb)"""))
-    # setup_log stamps — separate short transactions so one failure cannot block the rest
+    # setup_log stamps
     for col, typ in (("gex_state", "text"), ("gex_net_dex", "double precision"),
                      ("gex_net_gex", "double precision"), ("gex_zero_gamma", "double precision"),
                      ("gex_call_wall", "double precision"), ("gex_put_wall", "double precision"),
                      ("gex_net_ceiling", "double precision")):
-        try:
-            with _engine.begin() as c:
-                c.execute(text(f"ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS {col} {typ}"))
-        except Exception:
-            pass
+        c.execute(text(f"ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS {col} {typ}"))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "gex_state table + setup_log gex_* stamps", _schema_v1),
+]
 
 
 # ====================== CAPTURE (every 2 min, market hours) ======================
@@ -231,13 +225,12 @@ def capture():
     try:
         with _engine.connect() as c:
             row = c.execute(text(
-                "SELECT ts, spot, rows FROM chain_snapshots "
+                "SELECT ts, spot, rows, packed FROM chain_snapshots "
                 "WHERE spot IS NOT NULL AND spot > 100 ORDER BY ts DESC LIMIT 1")).fetchone()
         if not row:
             return
-        ts, spot, rows = row
-        rows = rows if isinstance(rows, list) else json.loads(rows)
-        f = compute(float(spot), rows)
+        ts, spot, rows, packed = row
+        f = compute_chain(float(spot), decode(packed, rows))
         if not f:
             return
         et = ts.astimezone(ET).replace(tzinfo=None)
@@ -253,6 +246,8 @@ def capture():
                 dict(et=et, spot=f["spot"], state=f["state"], ng=f["net_gex"], nd=f["net_dex"],
                      zg=f["zero_gamma"], cw=f["call_wall"], pw=f["put_wall"], mg=f["max_gamma"],
                      pl=json.dumps(f)))
+        global _version
+        _version += 1
     except Exception:
         print(f"[gex-state] capture error (non-fatal): {traceback.format_exc()}", flush=True)
 
@@ -269,7 +264,7 @@ def stamp_setups(days: int = 3) -> int:
     try:
         with _engine.connect() as c:
             snaps = c.execute(text(
-                "SELECT ts, spot, rows FROM chain_snapshots "
+                "SELECT ts, spot, rows, packed FROM chain_snapshots "
                 "WHERE spot IS NOT NULL AND spot > 100 "
                 "  AND ts >= now() - CAST(:d AS interval) ORDER BY ts"),
                 dict(d=f"{days + 1} days")).fetchall()
@@ -298,9 +293,8 @@ def stamp_setups(days: int = 3) -> int:
             if j < 0 or (e - eps[j]) > 300:       # no snapshot within 5 min before entry
                 continue
             if j not in cache:
-                _, sp, rw = snaps[j]
-                rw = rw if isinstance(rw, list) else json.loads(rw)
-                cache[j] = compute(float(sp), rw)
+                _, sp, rw, pk = snaps[j]
+                cache[j] = compute_chain(float(sp), decode(pk, rw))
             f = cache[j]
             if not f:
                 continue
@@ -323,6 +317,11 @@ def stamp_setups(days: int = 3) -> int:
 
 
 # ====================== READ ACCESSORS (portal / API) ======================
+def version() -> int:
+    """Changes whenever capture() writes a row — the data version of latest()."""
+    return _version
+
+
 def latest() -> dict:
     """Newest state row + the derived reliability tier. {} on any failure."""
     if not _engine:
@@ -353,32 +352,26 @@ def profile(at: str | None = None) -> dict:
         with _engine.connect() as c:
             if at:
                 row = c.execute(text(
-                    "SELECT ts, spot, rows FROM chain_snapshots "
+                    "SELECT ts, spot, rows, packed FROM chain_snapshots "
                     "WHERE spot IS NOT NULL AND spot > 100 AND ts <= CAST(:at AS timestamptz) "
                     "ORDER BY ts DESC LIMIT 1"), dict(at=at)).fetchone()
             else:
                 row = c.execute(text(
-                    "SELECT ts, spot, rows FROM chain_snapshots "
+                    "SELECT ts, spot, rows, packed FROM chain_snapshots "
                     "WHERE spot IS NOT NULL AND spot > 100 ORDER BY ts DESC LIMIT 1")).fetchone()
         if not row:
             return {}
-        ts, spot, rows = row
+        ts, spot, rows, packed = row
         spot = float(spot)
-        rows = rows if isinstance(rows, list) else json.loads(rows)
-        f = compute(spot, rows)
+        chain = decode(packed, rows)
+        f = compute_chain(spot, chain)
         if not f:
             return {}
         k = 100.0 * spot * spot * 0.01 / 1e6      # -> $M per 1% move
-        out = []
-        for r in rows:
-            try:
-                strike = float(r[STRIKE])
-                cg = float(r[C_GAMMA] or 0.0) * float(r[C_OI] or 0.0)
-                pg = float(r[P_GAMMA] or 0.0) * float(r[P_OI] or 0.0)
-            except (TypeError, ValueError, IndexError):
-                continue
-            out.append(dict(strike=strike, call_gex=cg * k, put_gex=-pg * k, net_gex=(cg - pg) * k))
-        out.sort(key=lambda x: x["strike"])
+        cg = chain.col0("C_Gamma") * chain.col0("C_OpenInterest") * k
+        pg = chain.col0("P_Gamma") * chain.col0("P_OpenInterest") * k
+        out = [dict(strike=s_, call_gex=c_, put_gex=-p_, net_gex=c_ - p_)
+               for s_, c_, p_ in zip(chain.strikes.tolist(), cg.tolist(), pg.tolist())]
         f["ts"] = ts.astimezone(ET).isoformat()
         f["tier"] = TIER.get(f.get("state"))
         f["net_gex_m"] = f["net_gex"] * k
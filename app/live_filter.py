@@ -6,12 +6,19 @@ Mirrors main.py _tlPassesStrategy(l,'v16') (~line 18833). Used by:
   - live_filter_recall.py (root; backfills setup_log.live_pass for analysis)
 
 Validated against the portal: 920 trades / +3408.2 pts (all-time Feb 2026+).
-WHEN THE LIVE FILTER CHANGES (V17/...): update passes_v16() here + bump LIVE_VER.
+WHEN THE LIVE FILTER CHANGES (V17/...): update passes_v16() here + the same rule in
+frame_masks() (the column-wise copy the nightly stamp uses) + bump LIVE_VER.
 """
 import os
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
 from sqlalchemy import text
 
+from app import migrations
+
 ET = ZoneInfo("America/New_York")
 # V22's switch. It governs the LONG SIZE-UP ONLY.
 #
@@ -109,15 +116,16 @@ def passes_v20(l, gaps):
     return True
 
 
-def passes_v16_sb(l, gaps):
+def passes_v16_sb(l, gaps, moves=None):
     """THE live filter = V21 base AND Semi-Basket confirm. Single source of truth.
 
     Name kept for compatibility with every caller and study; the BASE it applies is
     V21 as of 2026-08-17 (was V16, then V20). See FILTER_VERSIONS.md.
+    moves defaults to the in-process cache the nightly stamp fills.
     """
     if not passes_v20(l, gaps):
         return False
-    if v22_blocks(l, _PREV_MOVES_CACHE):
+    if v22_blocks(l, _PREV_MOVES_CACHE if moves is None else moves):
         return False
     if basket_blocks(l):
         return False
@@ -130,23 +138,32 @@ COLS = ("id, setup_name, direction, greek_alignment, grade, paradigm, vix, overv
         "gex_net_ceiling")
 
 
-def load_gaps(conn):
-    """date_iso -> (open - prev_close) gap pts, from chain_snapshots. Mirrors /api/setup/daily_gaps."""
+def load_gaps(conn, since=None):
+    """date_iso -> (open - prev_close) gap pts, from chain_snapshots. Mirrors /api/setup/daily_gaps.
+
+    since (date): only sessions from that day on — the nightly incremental stamp. The
+    week before it is read too, so the first session still finds its previous close."""
     gaps = {}
-    rows = conn.execute(text("""
-        WITH closes AS (SELECT DISTINCT ON (date(ts AT TIME ZONE 'America/New_York')) date(ts AT TIME ZONE 'America/New_York') d, spot p FROM chain_snapshots WHERE spot IS NOT NULL ORDER BY date(ts AT TIME ZONE 'America/New_York'), ts DESC),
-             opens AS (SELECT DISTINCT ON (date(ts AT TIME ZONE 'America/New_York')) date(ts AT TIME ZONE 'America/New_York') d, spot p FROM chain_snapshots WHERE spot IS NOT NULL AND (ts AT TIME ZONE 'America/New_York')::time>='09:30' ORDER BY date(ts AT TIME ZONE 'America/New_York'), ts ASC)
-        SELECT o.d, o.p-c.p gap FROM opens o JOIN closes c ON c.d=(SELECT MAX(c2.d) FROM closes c2 WHERE c2.d<o.d)""")).fetchall()
+    flt = "" if since is None else "AND ts >= :since"
+    rows = conn.execute(text(f"""
+        WITH closes AS (SELECT DISTINCT ON (date(ts AT TIME ZONE 'America/New_York')) date(ts AT TIME ZONE 'America/New_York') d, spot p FROM chain_snapshots WHERE spot IS NOT NULL {flt} ORDER BY date(ts AT TIME ZONE 'America/New_York'), ts DESC),
+             opens AS (SELECT DISTINCT ON (date(ts AT TIME ZONE 'America/New_York')) date(ts AT TIME ZONE 'America/New_York') d, spot p FROM chain_snapshots WHERE spot IS NOT NULL {flt} AND (ts AT TIME ZONE 'America/New_York')::time>='09:30' ORDER BY date(ts AT TIME ZONE 'America/New_York'), ts ASC)
+        SELECT o.d, o.p-c.p gap FROM opens o JOIN closes c ON c.d=(SELECT MAX(c2.d) FROM closes c2 WHERE c2.d<o.d)"""),
+        _since_params(since)).fetchall()
     for r in rows:
         if r[1] is not None:
             gaps[str(r[0])] = round(float(r[1]), 1)
     return gaps
 
 
+def _since_params(since):
+    return {} if since is None else {"since": since - timedelta(days=7)}
+
+
 _PREV_MOVES_CACHE = {}
 
 
-def load_prev_moves(conn):
+def load_prev_moves(conn, since=None):
     """date_iso -> the PREVIOUS session's open-to-close move in %, from `spx_ohlc_1m`.
 
     V21 input. Uses the 1-MINUTE bars, NOT chain_snapshots, and the difference matters:
@@ -158,16 +175,19 @@ def load_prev_moves(conn):
     session in the window with no gaps.
 
     Fully known at yesterday's 16:00, so nothing here can look ahead.
+    since: as for load_gaps().
     """
     moves = {}
-    rows = conn.execute(text("""
+    flt = "" if since is None else "WHERE ts >= :since"
+    rows = conn.execute(text(f"""
         WITH day AS (
           SELECT (ts AT TIME ZONE 'America/New_York')::date d,
                  (array_agg(bar_open  ORDER BY ts ASC ))[1] o,
                  (array_agg(bar_close ORDER BY ts DESC))[1] c
-          FROM spx_ohlc_1m GROUP BY 1)
+          FROM spx_ohlc_1m {flt} GROUP BY 1)
         SELECT t.d, (p.c-p.o)/NULLIF(p.o,0)*100 mv
-        FROM day t JOIN day p ON p.d=(SELECT MAX(d2.d) FROM day d2 WHERE d2.d<t.d)""")).fetchall()
+        FROM day t JOIN day p ON p.d=(SELECT MAX(d2.d) FROM day d2 WHERE d2.d<t.d)"""),
+        _since_params(since)).fetchall()
     for r in rows:
         if r[1] is not None:
             moves[str(r[0])] = round(float(r[1]), 3)
@@ -343,24 +363,6 @@ def passes_v22(l, gaps, moves):
     return not v22_blocks(l, moves)
 
 
-def backfill_live_pass(engine):
-    """Stamp setup_log.live_pass / live_filter_ver for the whole table. Idempotent.
-    Run daily (EOD) so recent signals are recallable via WHERE live_pass=true. Returns count."""
-    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
-        c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS live_pass boolean"))
-        c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS live_filter_ver text"))
-        gaps = load_gaps(c)
-        global _PREV_MOVES_CACHE
-        _PREV_MOVES_CACHE = load_prev_moves(c)   # V21 input, used by passes_v16_sb
-        c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS basket_pct DOUBLE PRECISION"))
-        rows = c.execute(text(f"SELECT {COLS} FROM setup_log ORDER BY ts")).mappings().all()
-        lids = [r['id'] for r in rows if passes_v16_sb(r, gaps)]
-        c.execute(text("UPDATE setup_log SET live_pass=false, live_filter_ver=:v WHERE live_pass IS NOT false OR live_pass IS NULL"), {"v": LIVE_VER})
-        for i in range(0, len(lids), 1000):
-            c.execute(text("UPDATE setup_log SET live_pass=true, live_filter_ver=:v WHERE id=ANY(:ids)"), {"v": LIVE_VER, "ids": lids[i:i+1000]})
-        return len(lids)
-
-
 # ── V17 (S233, 2026-08-08) — MONITORING ONLY, not wired to the trade path ──────────────
 # The structural relaxation from S233/`S233_FILTER_STUDY.md`. V16 discards ~55% of the book
 # to pick better trades; measured over 100 sessions that selection costs more than it earns
@@ -503,8 +505,8 @@ def passes_v16(l, gaps):
         # already how this column behaves — 46 other real trades are stamped false because the
         # filter changed after they were placed (ES Abs shorts cut, SC long rules tightened).
         # `live_pass` answers "would TODAY's config trade this"; for what was ACTUALLY placed,
-        # join real_trade_orders. backfill_live_pass() re-stamps the whole table nightly, so
-        # history stays consistent by itself.
+        # join real_trade_orders. backfill_live_pass() re-stamps the whole table whenever
+        # this env changes (it is part of _stamp_config()), so history stays consistent by itself.
         if os.getenv("GEX_LONG_V3_REAL_TRADE_ENABLED", "false").lower() != "true":
             return False
         if not isLong: return False
@@ -711,3 +713,324 @@ def passes_v16_fri(l, gaps):
     if not passes_v16(l, gaps):
         return False
     return not v19_blocks(l)
+
+
+# ── Column-wise rules + incremental stamping (setup_log.live_pass) ────────────────────
+# The stamp used to load the whole of setup_log, run passes_v16_sb() row by row, reset
+# every row to false and re-write the true set — every night, so its runtime grew with
+# the table. frame_masks() is the same rule set (v16 … v22) written as boolean masks over
+# a feature frame, and backfill_live_pass() only re-evaluates rows that are new, inside the
+# recheck window, or whose inputs changed since the last run. "Changed" is a trigger on
+# setup_log that sets live_inputs_at when one of _KEY_COLS is written with a new value;
+# that column is indexed, so the nightly select is three index lookups and never reads
+# the rest of the table. The whole table is re-stamped only when LIVE_VER or an env
+# switch the rules read (_stamp_config) changes, or on full=True (live_filter_recall.py).
+# LOCKSTEP: frame_masks() must equal the row functions above on every row. _stamp()
+# re-checks that on every batch it writes (lockstep_mismatches) and, on a mismatch, logs
+# it and writes the row functions' verdict instead.
+_LONG = ('long', 'bullish')
+_V16_SETUPS = ('Skew Charm', 'AG Short', 'Vanna Pivot Bounce', 'ES Absorption',
+               'DD Exhaustion', 'GEX Long', 'VIX Divergence')
+_V17_SETUPS = ('Skew Charm', 'AG Short', 'Vanna Pivot Bounce', 'ES Absorption',
+               'DD Exhaustion', 'VIX Divergence')
+_DDQ_LONG_PARAS = ('GEX-LIS', 'AG-LIS', 'AG-PURE', 'BofA-LIS', 'BOFA-MESSY')
+
+# setup_log inputs of the stamped filter (gex_net_ceiling is V18-only, not stamped)
+_KEY_COLS = ("setup_name, direction, greek_alignment, grade, paradigm, vix, overvix, ts, "
+             "v13_gex_above, v13_dd_near, vanna_cliff_side, vanna_peak_side, basket_pct")
+# Slack on the live_inputs_at checkpoint: the trigger stamps the row at write time, so a
+# transaction still open when the stamp reads commits "in the past".
+_INPUTS_SLACK = timedelta(minutes=30)
+# Sessions re-evaluated every night even with unchanged inputs: the gap and the previous
+# move come from other tables and can land after the signal was stamped.
+LIVE_PASS_RECHECK_DAYS = int(os.getenv("LIVE_PASS_RECHECK_DAYS", "5"))
+_FULL_BATCH = 20000
+# Rows per batch compared against the row functions (all of an incremental batch).
+LOCKSTEP_SAMPLE = int(os.getenv("LIVE_PASS_LOCKSTEP_SAMPLE", "2000"))
+
+
+def feature_frame(rows, gaps, moves):
+    """COLS rows -> DataFrame of exactly what the rules read (nulls already defaulted the
+    way the row functions default them), plus the ET clock and the day's gap / move."""
+    df = pd.DataFrame([dict(r) for r in rows]).reindex(columns=[c.strip() for c in COLS.split(",")])
+    num = lambda c: pd.to_numeric(df[c], errors='coerce').astype(float)
+    et = pd.to_datetime(df['ts'], utc=True).dt.tz_convert(ET)
+    day = et.dt.tz_localize(None).dt.normalize()
+    by_day = lambda m: day.map(pd.Series(list(m.values()), index=pd.to_datetime(list(m)), dtype=float)).astype(float)
+    return pd.DataFrame({
+        'id': df['id'],
+        'sn': df['setup_name'].fillna(''),
+        'has_sn': df['setup_name'].notna(),
+        'long': df['direction'].isin(_LONG),
+        'long_ci': df['direction'].astype(str).str.lower().isin(_LONG),   # v21: str(d).lower()
+        'align': num('greek_alignment').fillna(0),
+        'grade': df['grade'].fillna(''),
+        'para': df['paradigm'].fillna(''),
+        'vix': num('vix'),
+        'overvix': num('overvix').fillna(-99),
+        'gex_above': num('v13_gex_above').fillna(0),
+        'dd_near': num('v13_dd_near').fillna(0),
+        'cliff': df['vanna_cliff_side'].fillna(''),
+        'peak': df['vanna_peak_side'].fillna(''),
+        'basket': num('basket_pct'),
+        'ceiling': num('gex_net_ceiling'),
+        'mins': (et.dt.hour * 60 + et.dt.minute).astype(float),
+        'hour': et.dt.hour.astype(float),
+        'wd': et.dt.weekday.astype(float),
+        'dom': et.dt.day.astype(float),
+        'gap': by_day(gaps),
+        'move': by_day(moves),
+    })
+
+
+def _first(n, rules):
+    """An early-return chain as masks: per row, the value of the first rule whose
+    condition holds. rules = [(cond, value), ...]; rows no rule matches -> False."""
+    out = np.zeros(n, dtype=bool)
+    done = np.zeros(n, dtype=bool)
+    for cond, val in rules:
+        hit = np.asarray(cond, dtype=bool) & ~done
+        out[hit] = np.broadcast_to(np.asarray(val, dtype=bool), (n,))[hit]
+        done |= hit
+    return out
+
+
+def frame_masks(f):
+    """Every filter version over a feature_frame() at once -> {ver: bool array}.
+
+    Keys: v16, v16fri, v17, v18, v19, v20, v21, v22, v16sb (the stamped live filter).
+    Each mask equals the matching row function (passes_v16, passes_v16_fri, ...,
+    passes_v16_sb with the same moves) on every row.
+    """
+    n = len(f)
+    a = {c: f[c].to_numpy() for c in f.columns}
+    sn, L, para, grade = a['sn'], a['long'], a['para'], a['grade']
+    align, vix, mins, hour = a['align'], a['vix'], a['mins'], a['hour']
+    vix0 = np.nan_to_num(vix, nan=0.0)
+    isin = lambda x, vals: np.isin(x, vals)
+    SC, AG, DD = sn == 'Skew Charm', sn == 'AG Short', sn == 'DD Exhaustion'
+    ESA, VPB = sn == 'ES Absorption', sn == 'Vanna Pivot Bounce'
+    GXL, VXD = sn == 'GEX Long', sn == 'VIX Divergence'
+    sidial_pm = (para == 'SIDIAL-EXTREME') & (mins >= 840) & (mins < 900)
+    opex = (a['wd'] == 4) & (a['dom'] >= 15) & (a['dom'] <= 21)
+    v13_gex = (a['gex_above'] >= 75) | (a['dd_near'] >= 3000000000)
+    vpb_on = os.getenv("VPB_REAL_TRADE_ENABLED", "false").lower() == "true"
+    gxl_on = os.getenv("GEX_LONG_V3_REAL_TRADE_ENABLED", "false").lower() == "true"
+
+    v11_block = ((SC | DD) & (((mins >= 870) & (mins < 900)) | (mins >= 930))) \
+        | ((sn == 'BofA Scalp') & (mins >= 870))
+    v13_bull = ~L & (SC | DD) & v13_gex
+    v13_vanna = ~L & ((((DD | SC) & (a['cliff'] == 'A') & (a['peak'] == 'B')))
+                      | (AG & (a['cliff'] == 'B') & (a['peak'] == 'A')))
+    v13_ddq = DD & ((L & ((align >= 3) | (vix0 >= 22) | (grade == 'C') | isin(para, _DDQ_LONG_PARAS)))
+                    | (~L & ((para == 'BOFA-PURE') | isin(grade, ('A+', 'C')))))
+
+    v16 = _first(n, [
+        (~isin(sn, _V16_SETUPS), False),
+        (DD & ~L, False),
+        (AG & (para == 'AG-TARGET'), False),
+        (L & (para == 'GEX-TARGET') & (hour >= 13) & (SC | DD | ESA), False),
+        (VXD, L & (grade != 'C') & np.char.startswith(para.astype(str), 'GEX-')),
+        (VPB, vpb_on & L & (grade == 'B') & ~(hour == 11)),
+        (GXL & (not gxl_on), False),
+        (GXL & ~L, False),
+        (GXL & (a['gap'] > 30) & (mins >= 660), False),
+        (GXL & (para == 'SIDIAL-EXTREME') & (hour == 14), False),
+        (GXL, (align >= 0) | isin(para, ('BofA-LIS', 'GEX-TARGET', 'SIDIAL-MESSY', 'BOFA-PURE'))),
+        (DD & L & sidial_pm, False),
+        (DD & L & ((align < 0) | (align >= 3) | (vix0 >= 22)), False),
+        (DD & L & (isin(para, _DDQ_LONG_PARAS) | (grade == 'C')), False),
+        (DD & L, True),
+        (L & (np.abs(a['gap']) > 30) & (mins < 600), False),          # gapFilter
+        (SC & isin(grade, ('C', 'LOG')), False),
+        (v11_block | v13_bull | v13_vanna | v13_ddq, False),
+        (ESA & ~L, False),
+        (ESA & (~isin(grade, ('A', 'A+')) | isin(para, ('AG-TARGET', 'AG-LIS'))), False),
+        (ESA & ((mins >= 945) | (align < 0)), False),
+        (ESA, True),
+        (SC & L & ((para == 'GEX-LIS') | opex), False),
+        (AG & opex, False),
+        # v10BaseV14
+        (L & SC & (sidial_pm | ((align == 3) & isin(para, ('GEX-LIS', 'AG-LIS', 'AG-PURE', 'BOFA-MESSY')))), False),
+        (L & SC, True),
+        (L & (sidial_pm | (align < 2) | ((vix0 > 22) & (a['overvix'] < 2))), False),
+        (L, True),
+        ((SC | DD) & (para == 'GEX-LIS'), False),
+        (SC | AG, True),
+        (DD, align != 0),
+    ])
+    v17 = _first(n, [
+        (~isin(sn, _V17_SETUPS), False),
+        ((vix0 >= V17_VIX_REARM) | ~isin(sn, V17_RELAXED), v16),
+        (VXD, L),
+        (DD & ~L & (v13_gex | ((a['cliff'] == 'A') & (a['peak'] == 'B'))
+                    | (para == 'BOFA-PURE') | isin(grade, ('A+', 'C')) | (para == 'GEX-LIS')), False),
+        (DD & ~L, align != 0),
+        (True, True),
+    ])
+    v18_block = ~L & (vix < V18_VIX_MAX) & (a['ceiling'] >= 0) & (a['ceiling'] <= V18_CEILING_PTS)
+    fri_block = (a['wd'] == V19_DOW) & (mins >= V19_AFTER_MIN)
+    v20 = v16 & ~(ESA & ~(vix >= ES_ABS_VIX_FLOOR)) & ~(a['wd'] == 4)
+    v21_block = a['has_sn'] & ~a['long_ci'] & (a['move'] < V21_PREV_DROP) & (vix < V21_VIX_MAX)
+    mode = _basket_sizing_mode()
+    bp = a['basket']
+    if mode == "sizeonly":
+        basket_block = np.zeros(n, dtype=bool)
+    else:
+        basket_block = ~np.isnan(bp) & np.where(np.abs(bp) < BASKET_DEADBAND, mode != "012",
+                                                (bp > 0) != L)
+    return {
+        'v16': v16, 'v16fri': v16 & ~fri_block, 'v17': v17,
+        'v18': v16 & ~v18_block, 'v19': v16 & ~v18_block & ~fri_block,
+        'v20': v20, 'v21': v20 & ~v21_block, 'v22': v20 & ~v21_block,
+        'v16sb': v20 & ~v21_block & ~basket_block,
+    }
+
+
+def _stamp_config():
+    """Env switches the stamped rules read besides LIVE_VER — a change re-stamps everything."""
+    return ";".join(f"{k}={os.getenv(k, d).lower()}" for k, d in (
+        ("VPB_REAL_TRADE_ENABLED", "false"), ("GEX_LONG_V3_REAL_TRADE_ENABLED", "false"),
+        ("BASKET_SIZING_MODE", "sizeonly")))
+
+
+# frame_masks() key -> the row function it must equal
+_ROW_RULES = {
+    'v16': lambda l, g, m: passes_v16(l, g),
+    'v16fri': lambda l, g, m: passes_v16_fri(l, g),
+    'v17': lambda l, g, m: passes_v17(l, g),
+    'v18': lambda l, g, m: passes_v18(l, g),
+    'v19': lambda l, g, m: passes_v19(l, g),
+    'v20': lambda l, g, m: passes_v20(l, g),
+    'v21': passes_v21,
+    'v22': passes_v22,
+    'v16sb': passes_v16_sb,
+}
+
+
+def lockstep_mismatches(rows, gaps, moves, masks=None):
+    """Compare frame_masks() with the row functions on rows -> {ver: [ids that differ]}.
+    Empty dict = in lockstep."""
+    masks = masks if masks is not None else frame_masks(feature_frame(rows, gaps, moves))
+    out = {}
+    for ver, rule in _ROW_RULES.items():
+        bad = [r['id'] for r, m in zip(rows, masks[ver]) if bool(rule(r, gaps, moves)) != bool(m)]
+        if bad:
+            out[ver] = bad
+    return out
+
+
+def _stamp(c, rows, gaps, moves):
+    """Evaluate rows column-wise; write only the stamps that change. Returns rows written."""
+    masks = frame_masks(feature_frame(rows, gaps, moves))
+    ok = masks['v16sb'].tolist()
+    bad = lockstep_mismatches(rows[:LOCKSTEP_SAMPLE], gaps, moves, {k: v[:LOCKSTEP_SAMPLE] for k, v in masks.items()})
+    if bad:
+        print("[live_pass] LOCKSTEP MISMATCH frame_masks vs row functions: "
+              + ", ".join(f"{v}: {len(ids)} (ids {ids[:5]})" for v, ids in bad.items())
+              + " — stamping this batch row by row", flush=True)
+        ok = [bool(passes_v16_sb(r, gaps, moves)) for r in rows]
+    res = c.execute(text("""
+        UPDATE setup_log s SET live_pass=v.p, live_filter_ver=:ver
+        FROM unnest(CAST(:ids AS bigint[]), CAST(:ps AS boolean[])) AS v(id, p)
+        WHERE s.id=v.id AND (s.live_pass IS DISTINCT FROM v.p OR s.live_filter_ver IS DISTINCT FROM :ver)"""),
+        {"ver": LIVE_VER, "ids": [r['id'] for r in rows], "ps": ok})
+    return res.rowcount
+
+
+def _schema_v1(c):
+    c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS live_pass boolean"))
+    c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS live_filter_ver text"))
+    c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS basket_pct DOUBLE PRECISION"))
+
+
+def _schema_v2(c):
+    # The trigger marks rows whose stamped inputs are written with a new value, so the
+    # nightly stamp finds them by index instead of re-reading the table.
+    cols = [x.strip() for x in _KEY_COLS.split(",")]
+    changed = " OR ".join(f"NEW.{x} IS DISTINCT FROM OLD.{x}" for x in cols)
+    c.execute(text("ALTER TABLE setup_log ADD COLUMN IF NOT EXISTS live_inputs_at TIMESTAMPTZ"))
+    c.execute(text("CREATE INDEX IF NOT EXISTS ix_setup_log_live_inputs_at "
+                   "ON setup_log (live_inputs_at) WHERE live_inputs_at IS NOT NULL"))
+    c.execute(text(f"""CREATE OR REPLACE FUNCTION setup_log_live_inputs_at() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' OR {changed} THEN
+                NEW.live_inputs_at := clock_timestamp();
+            END IF;
+            RETURN NEW;
+        END $$ LANGUAGE plpgsql"""))
+    c.execute(text("DROP TRIGGER IF EXISTS trg_setup_log_live_inputs ON setup_log"))
+    c.execute(text(f"""CREATE TRIGGER trg_setup_log_live_inputs
+        BEFORE INSERT OR UPDATE OF {_KEY_COLS} ON setup_log
+        FOR EACH ROW EXECUTE FUNCTION setup_log_live_inputs_at()"""))
+    c.execute(text("""CREATE TABLE IF NOT EXISTS live_pass_progress (
+        id SMALLINT PRIMARY KEY, live_ver TEXT NOT NULL, config TEXT NOT NULL,
+        max_id BIGINT NOT NULL, inputs_at TIMESTAMPTZ NOT NULL,
+        updated_at TIMESTAMPTZ DEFAULT now())"""))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "setup_log live_pass / live_filter_ver / basket_pct", _schema_v1),
+    (2, "incremental stamp: live_inputs_at trigger + live_pass_progress", _schema_v2),
+]
+
+
+def backfill_live_pass(engine, full=False):
+    """Stamp setup_log.live_pass / live_filter_ver. Idempotent. Returns the number of rows
+    whose stamp this pass changed (no full-table count — that would grow with setup_log).
+
+    Run daily (EOD) so recent signals are recallable via WHERE live_pass=true. Incremental:
+    only rows past the last run's max id, from the last LIVE_PASS_RECHECK_DAYS days, or
+    whose inputs were written since the last run (live_inputs_at, set by a trigger) are
+    re-evaluated. Everything is re-stamped on full=True, or when LIVE_VER / _stamp_config()
+    differ from the last run (live_pass_progress)."""
+    migrations.apply(engine, "live_filter", _MIGRATIONS)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
+        cfg = _stamp_config()
+        started = c.execute(text("SELECT now()")).scalar()
+        st = c.execute(text("SELECT live_ver, config, max_id, inputs_at FROM live_pass_progress "
+                            "WHERE id=1")).fetchone()
+        full = full or st is None or st[0] != LIVE_VER or st[1] != cfg
+        max_id = 0 if full else int(st[2])
+        checked = written = 0
+        if full:
+            gaps = load_gaps(c)
+            moves = load_prev_moves(c)
+            while True:
+                rows = c.execute(text(f"SELECT {COLS} FROM setup_log "
+                                      "WHERE id > :a ORDER BY id LIMIT :n"),
+                                 {"a": max_id, "n": _FULL_BATCH}).mappings().all()
+                if not rows:
+                    break
+                checked += len(rows)
+                written += _stamp(c, rows, gaps, moves)
+                max_id = rows[-1]['id']
+        else:
+            since = datetime.now(ET).date() - timedelta(days=LIVE_PASS_RECHECK_DAYS)
+            inputs_since = st[3] - _INPUTS_SLACK
+            rows = c.execute(text(f"""
+                SELECT {COLS} FROM setup_log
+                WHERE id > :max_id OR ts >= :since OR live_inputs_at >= :inputs_since
+                ORDER BY id"""), {"max_id": max_id, "since": since,
+                                  "inputs_since": inputs_since}).mappings().all()
+            if rows:
+                days = [r['ts'].astimezone(ET).date() for r in rows if r['ts'] is not None]
+                d0 = min(days) if days else since
+                gaps = load_gaps(c, since=d0)
+                moves = load_prev_moves(c, since=d0)
+                checked = len(rows)
+                written = _stamp(c, rows, gaps, moves)
+                max_id = max(max_id, max(r['id'] for r in rows))
+            else:
+                moves = {}
+        _PREV_MOVES_CACHE.update(moves)   # V21 input of passes_v16_sb for in-process callers
+        c.execute(text("""
+            INSERT INTO live_pass_progress (id, live_ver, config, max_id, inputs_at, updated_at)
+            VALUES (1, :v, :cfg, :m, :at, now())
+            ON CONFLICT (id) DO UPDATE SET live_ver=EXCLUDED.live_ver, config=EXCLUDED.config,
+                max_id=EXCLUDED.max_id, inputs_at=EXCLUDED.inputs_at, updated_at=now()"""),
+            {"v": LIVE_VER, "cfg": cfg, "m": max_id, "at": started})
+        print(f"[live_pass] {'full' if full else 'incremental'} stamp ({LIVE_VER}): "
+              f"{checked} rows evaluated, {written} changed", flush=True)
+        return written
@@ -0,0 +1,204 @@
+"""Dashboard server push — one versioned event per data update, fanned out to every tab.
+
+Before this, the dashboard polled: ~46 `fetch('/api/...')` call sites on setInterval
+timers (`drawOrUpdate` / `tickUnified` / `fetchDataFreshness` every PULL_EVERY,
+`drawEsDelta` every 5s, ...). Every open tab re-ran the same `/api/series`,
+`/api/volland/*`, `/api/es/delta/rangebars` and `/api/spx_candles` work, so DB and TS API
+load grew with the number of browsers.
+
+Now the producers only `notify(topic)` — non-blocking, safe from any thread:
+    series   end of every run_market_job cycle (chain, freshness, candles, levels)
+    volland  every new Volland snapshot (the volland_notify handler)
+    es       every completed 5pt ES bar (all feeds go through _on_rithmic_bar_complete),
+             and at most every ES_FORMING_SEC from the @ES quote listener so the forming
+             bar and last price move as fast as the 5s poll they replace
+A single worker thread calls the topic's registered builder ONCE, serialises the result
+ONCE and hands the same bytes to every subscriber, so the work per event is constant in
+the number of tabs. Pending notifies of one topic coalesce into one build. With nobody
+connected nothing is built; a new subscriber gets the last event of every topic replayed
+and triggers a build of any topic it has no event for.
+
+Wire format (text/event-stream), one event per build:
+    id: <version>              global, increases by one per event
+    event: <topic>
+    data: {"v": <version>, "topic": ..., "ts": <epoch s>, "data": <builder result>}
+Subscribers live on the event loop (asyncio.Queue per connection). A queue that fills
+up (a stalled tab) drops its OLDEST event — every event is a full replacement for its
+topic, so only the newest one matters.
+
+Init from main.py:  live_push.register("series", _push_series) ... ; live_push.init()
+Endpoint:           /api/stream -> StreamingResponse(live_push.events(sub), ...)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from threading import Condition, Lock, Thread
+
+MAX_SUBSCRIBERS = int(os.getenv("LIVE_PUSH_MAX_SUBSCRIBERS", "50"))
+QUEUE_MAX = int(os.getenv("LIVE_PUSH_QUEUE_MAX", "8"))
+# Throttle of the ES forming-bar notify (the dashboard polled /api/es/delta/rangebars at 5s).
+ES_FORMING_SEC = float(os.getenv("LIVE_PUSH_ES_FORMING_SEC", "5"))
+# Comment line sent on an idle stream so proxies don't time the connection out.
+KEEPALIVE_SEC = 15
+
+_builders: dict = {}       # topic -> callable() -> JSON-able payload
+_dirty: set = set()        # topics notified since the worker last looked
+_cv = Condition()
+_thread = None
+_lock = Lock()             # guards _subs / _last / _version / _stats
+_subs: set = set()
+_last: dict = {}           # topic -> (version, encoded event) — replayed to new subscribers
+_throttled: dict = {}      # topic -> epoch of its last notify_throttled() that went through
+_version = 0
+_stats = {"events": 0, "skipped_idle": 0, "dropped": 0, "errors": 0, "last_error": None,
+          "build_ms_max": 0.0, "build_ms_last": 0.0, "subscribers_max": 0}
+
+
+class _Subscriber:
+    """One /api/stream connection: an asyncio.Queue fed from the worker thread."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX)
+
+    def put(self, msg: bytes):
+        self.loop.call_soon_threadsafe(self._put, msg)
+
+    def _put(self, msg: bytes):
+        if self.queue.full():
+            self.queue.get_nowait()
+            with _lock:
+                _stats["dropped"] += 1
+        self.queue.put_nowait(msg)
+
+
+def register(topic: str, build):
+    """Builder for `topic`: callable() -> JSON-able payload, run on the push worker."""
+    _builders[topic] = build
+
+
+def init():
+    """Start the worker. Called from main.py on_startup() after the register() calls."""
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = Thread(target=_run, name="live-push", daemon=True)
+        _thread.start()
+    print(f"[live-push] worker started (topics {sorted(_builders)}, "
+          f"max {MAX_SUBSCRIBERS} subscribers)", flush=True)
+
+
+def notify(*topics: str):
+    """Mark topics changed. Never blocks; repeated notifies before the build coalesce."""
+    with _cv:
+        _dirty.update(t for t in topics if t in _builders)
+        _cv.notify()
+
+
+def notify_throttled(topic: str, min_interval: float):
+    """notify(topic) at most once per min_interval seconds — for high-rate producers
+    (a tick / quote listener). Calls inside the interval are dropped."""
+    now = time.time()
+    with _lock:
+        if now - _throttled.get(topic, 0.0) < min_interval:
+            return
+        _throttled[topic] = now
+    notify(topic)
+
+
+def subscribe(loop):
+    """New subscriber on `loop`, primed with the last event of every topic.
+    None when MAX_SUBSCRIBERS are already connected."""
+    sub = _Subscriber(loop)
+    with _lock:
+        if len(_subs) >= MAX_SUBSCRIBERS:
+            return None
+        _subs.add(sub)
+        _stats["subscribers_max"] = max(_stats["subscribers_max"], len(_subs))
+        replay = sorted(_last.values())
+        missing = [t for t in _builders if t not in _last]
+    for _v, msg in replay[-QUEUE_MAX:]:
+        sub.queue.put_nowait(msg)
+    if missing:
+        notify(*missing)
+    return sub
+
+
+def unsubscribe(sub):
+    with _lock:
+        _subs.discard(sub)
+
+
+async def events(sub):
+    """Async generator for StreamingResponse: the subscriber's events + keepalives."""
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(sub.queue.get(), KEEPALIVE_SEC)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+    finally:
+        unsubscribe(sub)
+
+
+def status() -> dict:
+    with _lock:
+        out = dict(_stats)
+        out["subscribers"] = len(_subs)
+        out["version"] = _version
+        out["topics"] = {t: v for t, (v, _msg) in _last.items()}
+    out["running"] = bool(_thread and _thread.is_alive())
+    return out
+
+
+def _publish(topic: str):
+    global _version
+    with _lock:
+        subs = list(_subs)
+    if not subs:
+        # Nobody to send to: skip the build, and forget the old event so the next
+        # subscriber triggers a fresh one instead of being replayed a stale copy.
+        with _lock:
+            _last.pop(topic, None)
+            _stats["skipped_idle"] += 1
+        return
+    t0 = time.perf_counter()
+    data = _builders[topic]()
+    with _lock:
+        _version += 1
+        v = _version
+    body = json.dumps({"v": v, "topic": topic, "ts": round(time.time(), 3), "data": data},
+                      default=str, separators=(",", ":"))
+    msg = f"id: {v}\nevent: {topic}\ndata: {body}\n\n".encode()
+    ms = (time.perf_counter() - t0) * 1000
+    with _lock:
+        _last[topic] = (v, msg)
+        _stats["events"] += 1
+        _stats["build_ms_last"] = round(ms, 1)
+        _stats["build_ms_max"] = max(_stats["build_ms_max"], round(ms, 1))
+        subs = list(_subs)
+    for sub in subs:
+        try:
+            sub.put(msg)
+        except RuntimeError:
+            unsubscribe(sub)            # its event loop is gone
+
+
+def _run():
+    while True:
+        with _cv:
+            while not _dirty:
+                _cv.wait()
+            topics = list(_dirty)
+            _dirty.clear()
+        for topic in topics:
+            try:
+                _publish(topic)
+            except Exception as e:
+                with _lock:
+                    _stats["errors"] += 1
+                    _stats["last_error"] = f"{topic}: {str(e)[:200]}"
+                print(f"[live-push] {topic} build error: {e}", flush=True)
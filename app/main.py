@@ -1,10 +1,12 @@
 # 0DTE Alpha – live chain + 5-min history (FastAPI + APScheduler + Postgres + Plotly front-end)
 from fastapi import FastAPI, Response, Query, Request, Cookie, Form, Body
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse, StreamingResponse
+from bisect import bisect_left, bisect_right
 from datetime import datetime, time as dtime, timedelta
-import os, time, json, re, random, requests, pandas as pd, pytz, secrets
+from functools import partial
+import asyncio, os, time, json, re, random, requests, pandas as pd, pytz, secrets
 from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from threading import Lock, Thread
 from typing import Any, Optional
 import bcrypt as _bcrypt
@@ -25,7 +27,7 @@ VOLLAND_TABLE       = os.getenv("VOLLAND_TABLE", "volland_exposures")
 VOLLAND_TS_COL      = os.getenv("VOLLAND_TS_COL", "ts")
 VOLLAND_PAYLOAD_COL = os.getenv("VOLLAND_PAYLOAD_COL", "payload")
 
-# Charm exposure points are read directly from volland_exposure_points table
+# Exposure points are read from the packed volland_exposure_snapshots table (app/volland_exposure.py)
 
 # SQLAlchemy psycopg v3 URI
 if DB_URL.startswith("postgresql://"):
@@ -121,50 +123,16 @@ _alert_settings = {
     "cooldown_minutes": 10,
 }
 
-def _log_telegram(channel: str, message: str) -> None:
-    """Persist every outgoing Telegram alert to `telegram_alerts`.
-
-    S243 (2026-08-11). A bot cannot read back messages it posted to a channel, so the
-    only way to review what was actually alerted is to record it at send time. Without
-    this, "monitoring Telegram" can only mean pinging getMe — checking the bot is
-    reachable, not what it said. On 2026-08-10 a GHOST POSITION alert and a FIFO WARN
-    both fired and neither was noticed until the user pasted them in by hand.
-
-    Fail-soft in every direction: never raises, never blocks the send.
-    """
-    try:
-        if engine is None:
-            return
-        with engine.begin() as conn:
-            conn.execute(text(
-                "INSERT INTO telegram_alerts (channel, message) VALUES (:c, :m)"),
-                {"c": channel, "m": message[:4000]})
-    except Exception:
-        pass
-
-
-def send_telegram(message: str) -> bool:
-    """Send a message via Telegram bot."""
+def send_telegram(message: str, wait: bool = False) -> bool:
+    """Queue a message for the main Telegram channel (app/telegram_queue.py delivers it
+    and records it in `telegram_alerts`). wait=True: synchronous send, for the test
+    endpoint. Returns False only when Telegram is not configured."""
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         print("[telegram] missing token or chat_id", flush=True)
         return False
-    try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        resp = requests.post(url, json={
-            "chat_id": TELEGRAM_CHAT_ID,
-            "text": message,
-            "parse_mode": "HTML"
-        }, timeout=10)
-        if resp.status_code == 200:
-            print(f"[telegram] sent: {message[:50]}...", flush=True)
-            _log_telegram("alerts", message)
-            return True
-        else:
-            print(f"[telegram] error: {resp.status_code} {resp.text}", flush=True)
-            return False
-    except Exception as e:
-        print(f"[telegram] exception: {e}", flush=True)
-        return False
+    if wait:
+        return telegram_queue.send_now(TELEGRAM_CHAT_ID, message)
+    return telegram_queue.enqueue(TELEGRAM_CHAT_ID, message, channel="alerts", tag="telegram")
 
 def is_market_hours() -> bool:
     """Check if current time is within market hours (9:30 AM - 4:00 PM ET)."""
@@ -352,6 +320,21 @@ NY = pytz.timezone("US/Eastern")
 
 # V2 Dashboard (separate file, access at /v2)
 from app.dashboard_v2 import router as _v2_router
+from app import volland_exposure as vexp
+from app import bar_dispatch
+from app import live_push
+from app import response_cache
+from app import playback_stream
+from app import migrations
+from app import startup
+from app import db_pools
+from app import signal_feed
+from app import ts_client
+from app import broker_stream
+from app import quote_feed
+from app import telegram_queue
+from app import scan_executor
+from app import trail_sim
 app.include_router(_v2_router)
 
 # Public paths that don't require authentication
@@ -382,7 +365,7 @@ async def auth_middleware(request: Request, call_next):
         return await call_next(request)
 
     # Eval API — authenticate via API key in Authorization header
-    if path == "/api/eval/signals":
+    if path in ("/api/eval/signals", "/api/eval/stream", "/api/eval/quote"):
         if EVAL_API_KEY:
             auth = request.headers.get("Authorization", "")
             if auth == f"Bearer {EVAL_API_KEY}":
@@ -410,10 +393,12 @@ async def auth_middleware(request: Request, call_next):
 
     return await call_next(request)
 
-latest_df: pd.DataFrame | None = None
+# Latest SPX chain — an immutable, versioned ChainSnapshot (app/chain_columns.py).
+# Published by reference swap; readers use it as-is, never copy it.
+latest_chain = None
 last_run_status = {"ts": None, "ok": False, "msg": "boot"}
 _last_saved_at = 0.0
-_spx_data_ts = 0.0  # time.time() when latest_df was last refreshed with fresh API data
+_spx_data_ts = 0.0  # time.time() when latest_chain was last refreshed with fresh API data
 _df_lock = Lock()
 _vix_last: float | None = None  # latest VIX value from TS quotes
 _spot_last: float | None = None  # latest SPX spot (30s pull, fresher than 2-min chain_snapshots save)
@@ -436,10 +421,10 @@ _vol_svb_session_peak = -99.0    # highest SVB seen this session
 _vol_svb_prev: float | None = None  # previous SVB reading for direction tracking
 
 # SPY chain state
-latest_spy_df: pd.DataFrame | None = None
+latest_spy_chain = None  # ChainSnapshot, same contract as latest_chain
 _last_spy_run_status = {"ts": None, "ok": False, "msg": "boot"}
 _last_spy_saved_at = 0.0
-_spy_data_ts = 0.0  # time.time() when latest_spy_df was last refreshed with fresh API data
+_spy_data_ts = 0.0  # time.time() when latest_spy_chain was last refreshed with fresh API data
 _spy_df_lock = Lock()
 
 # ====== SETUP DETECTOR DEFAULTS ======
@@ -503,752 +488,809 @@ _DEFAULT_SETUP_SETTINGS = {
 }
 
 # ====== DB ======
-engine = create_engine(
-    DB_URL, pool_pre_ping=True,
-    pool_size=5, max_overflow=10,
-    connect_args={"options": "-c statement_timeout=30000"},  # 30s max per query — prevents hung threads
-) if DB_URL else None
-
-def db_init():
-    if not engine:
-        print("[db] DATABASE_URL missing; history disabled", flush=True)
-        return
-    with engine.begin() as conn:
-        # Increase statement timeout for migrations — Railway default is too short
-        # for ALTER TABLE on large tables (even no-op duplicate_column checks)
-        conn.execute(text("SET LOCAL statement_timeout = '30s'"))
-        # Fail fast if another session holds a lock on a table we're ALTERing
-        # (idle-in-transaction analysis scripts) — the retry loop in on_startup
-        # handles it instead of burning the full statement_timeout.
-        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS chain_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            exp DATE,
-            spot DOUBLE PRECISION,
-            columns JSONB NOT NULL,
-            rows JSONB NOT NULL
-        );
-        CREATE INDEX IF NOT EXISTS ix_chain_snapshots_ts ON chain_snapshots (ts DESC);
-        """))
-        # Add vix3m and overvix columns to chain_snapshots (migration safety)
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE chain_snapshots ADD COLUMN vix3m REAL;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE chain_snapshots ADD COLUMN overvix REAL;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE chain_snapshots ADD COLUMN data_ts TIMESTAMPTZ;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-
-        # SPY chain snapshots — separate table, same schema as chain_snapshots
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS spy_chain_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            exp DATE,
-            spot DOUBLE PRECISION,
-            columns JSONB NOT NULL,
-            rows JSONB NOT NULL
-        );
-        CREATE INDEX IF NOT EXISTS ix_spy_chain_snapshots_ts ON spy_chain_snapshots (ts DESC);
-        """))
-        # Add vix3m and overvix columns to spy_chain_snapshots (migration safety)
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE spy_chain_snapshots ADD COLUMN vix3m REAL;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE spy_chain_snapshots ADD COLUMN overvix REAL;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE spy_chain_snapshots ADD COLUMN data_ts TIMESTAMPTZ;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-
-        conn.execute(text(f"""
-        CREATE TABLE IF NOT EXISTS {VOLLAND_TABLE} (
-            id BIGSERIAL PRIMARY KEY,
-            {VOLLAND_TS_COL} TIMESTAMPTZ NOT NULL DEFAULT now(),
-            {VOLLAND_PAYLOAD_COL} JSONB NOT NULL
-        );
-        """))
-        conn.execute(text(f"""
-        CREATE INDEX IF NOT EXISTS ix_{VOLLAND_TABLE}_{VOLLAND_TS_COL}
-        ON {VOLLAND_TABLE} ({VOLLAND_TS_COL} DESC);
-        """))
+# One pool per workload class (app/db_pools.py) so dashboard reads can't starve live writes:
+#   engine            trading — market cycle, setup_log, outcome tracker, traders, VPS ingest
+#   api_engine        dashboard / admin endpoints
+#   analytics_engine  heavy reads (log_with_outcomes, playback range/export, setup export, overlays)
+_engines = db_pools.create(DB_URL) if DB_URL else {}
+engine = _engines.get("trading")
+api_engine = _engines.get("api")
+analytics_engine = _engines.get("analytics")
+# Outbound Telegram goes through the delivery queue (workers start on first message)
+telegram_queue.init(TELEGRAM_BOT_TOKEN)
+
+def _schema_baseline(conn):
+    """Schema as of the migration ledger — the DDL db_init() used to run on every boot.
+
+    FROZEN: this is applied step 1, which never runs again on an existing database.
+    Do not add or change DDL here — a new table, column or index goes in a new
+    numbered step appended to DB_MIGRATIONS."""
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS chain_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        exp DATE,
+        spot DOUBLE PRECISION,
+        columns JSONB NOT NULL,
+        rows JSONB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_chain_snapshots_ts ON chain_snapshots (ts DESC);
+    """))
+    # Add vix3m and overvix columns to chain_snapshots (migration safety)
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE chain_snapshots ADD COLUMN vix3m REAL;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE chain_snapshots ADD COLUMN overvix REAL;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE chain_snapshots ADD COLUMN data_ts TIMESTAMPTZ;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # Packed chain (app/chain_columns.pack) — rows becomes nullable once packed-only
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE chain_snapshots ADD COLUMN packed BYTEA;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    ALTER TABLE chain_snapshots ALTER COLUMN rows DROP NOT NULL;
+    """))
+
+    # SPY chain snapshots — separate table, same schema as chain_snapshots
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS spy_chain_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        exp DATE,
+        spot DOUBLE PRECISION,
+        columns JSONB NOT NULL,
+        rows JSONB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_spy_chain_snapshots_ts ON spy_chain_snapshots (ts DESC);
+    """))
+    # Add vix3m and overvix columns to spy_chain_snapshots (migration safety)
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE spy_chain_snapshots ADD COLUMN vix3m REAL;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE spy_chain_snapshots ADD COLUMN overvix REAL;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE spy_chain_snapshots ADD COLUMN data_ts TIMESTAMPTZ;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # Packed chain (app/chain_columns.pack) — rows becomes nullable once packed-only
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE spy_chain_snapshots ADD COLUMN packed BYTEA;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    ALTER TABLE spy_chain_snapshots ALTER COLUMN rows DROP NOT NULL;
+    """))
+
+    conn.execute(text(f"""
+    CREATE TABLE IF NOT EXISTS {VOLLAND_TABLE} (
+        id BIGSERIAL PRIMARY KEY,
+        {VOLLAND_TS_COL} TIMESTAMPTZ NOT NULL DEFAULT now(),
+        {VOLLAND_PAYLOAD_COL} JSONB NOT NULL
+    );
+    """))
+    conn.execute(text(f"""
+    CREATE INDEX IF NOT EXISTS ix_{VOLLAND_TABLE}_{VOLLAND_TS_COL}
+    ON {VOLLAND_TABLE} ({VOLLAND_TS_COL} DESC);
+    """))
+    conn.execute(text(f"""
+    DO $$ BEGIN
+        ALTER TABLE {VOLLAND_TABLE} ADD COLUMN data_ts TIMESTAMPTZ;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # Packed per-snapshot exposure table + latest pointer (written by the Volland workers)
+    conn.execute(text(vexp.DDL))
+
+    # Playback snapshots table for historical visualization
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS playback_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        spot DOUBLE PRECISION,
+        strikes JSONB NOT NULL,
+        net_gex JSONB NOT NULL,
+        charm JSONB,
+        call_vol JSONB NOT NULL,
+        put_vol JSONB NOT NULL,
+        stats JSONB,
+        is_mock BOOLEAN DEFAULT FALSE
+    );
+    CREATE INDEX IF NOT EXISTS ix_playback_snapshots_ts ON playback_snapshots (ts DESC);
+    """))
+    # Add is_mock column if it doesn't exist (for existing tables)
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE playback_snapshots ADD COLUMN is_mock BOOLEAN DEFAULT FALSE;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE playback_snapshots ADD COLUMN call_gex JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE playback_snapshots ADD COLUMN put_gex JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE playback_snapshots ADD COLUMN call_oi JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE playback_snapshots ADD COLUMN put_oi JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE playback_snapshots ADD COLUMN delta_decay JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+
+    # Alert settings table
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS alert_settings (
+        id INTEGER PRIMARY KEY DEFAULT 1,
+        enabled BOOLEAN DEFAULT TRUE,
+        lis_enabled BOOLEAN DEFAULT TRUE,
+        target_enabled BOOLEAN DEFAULT TRUE,
+        max_pos_gamma_enabled BOOLEAN DEFAULT TRUE,
+        max_neg_gamma_enabled BOOLEAN DEFAULT TRUE,
+        paradigm_change_enabled BOOLEAN DEFAULT TRUE,
+        summary_10am_enabled BOOLEAN DEFAULT TRUE,
+        summary_2pm_enabled BOOLEAN DEFAULT TRUE,
+        volume_spike_enabled BOOLEAN DEFAULT TRUE,
+        threshold_points INTEGER DEFAULT 5,
+        threshold_volume INTEGER DEFAULT 500,
+        cooldown_enabled BOOLEAN DEFAULT TRUE,
+        cooldown_minutes INTEGER DEFAULT 10,
+        CHECK (id = 1)
+    );
+    INSERT INTO alert_settings (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+    """))
+
+    # Setup detector settings table
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS setup_settings (
+        id INTEGER PRIMARY KEY DEFAULT 1,
+        gex_long_enabled BOOLEAN DEFAULT TRUE,
+        weight_support INTEGER DEFAULT 20,
+        weight_upside INTEGER DEFAULT 20,
+        weight_floor_cluster INTEGER DEFAULT 20,
+        weight_target_cluster INTEGER DEFAULT 20,
+        weight_rr INTEGER DEFAULT 20,
+        brackets JSONB,
+        grade_thresholds JSONB,
+        CHECK (id = 1)
+    );
+    """))
+    conn.execute(text(
+        "INSERT INTO setup_settings (id, brackets, grade_thresholds) "
+        "VALUES (1, :brackets, :thresholds) ON CONFLICT (id) DO NOTHING"
+    ), {
+        "brackets": json.dumps(_DEFAULT_SETUP_SETTINGS["brackets"]),
+        "thresholds": json.dumps(_DEFAULT_SETUP_SETTINGS["grade_thresholds"]),
+    })
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN ag_short_enabled BOOLEAN DEFAULT TRUE;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # BofA Scalp columns
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN bofa_scalp_enabled BOOLEAN DEFAULT TRUE;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN bofa_settings JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+
+    # BofA Scalp extra columns on setup_log
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN bofa_stop_level DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN bofa_target_level DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN bofa_lis_width DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN bofa_max_hold_minutes INTEGER;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN lis_upper DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN comments TEXT;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # Absorption columns on setup_settings
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN absorption_enabled BOOLEAN DEFAULT TRUE;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN absorption_settings JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # Paradigm Reversal columns on setup_settings
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN paradigm_rev_enabled BOOLEAN DEFAULT TRUE;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_settings ADD COLUMN paradigm_rev_settings JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    # Absorption extra columns on setup_log
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN abs_vol_ratio DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN abs_es_price DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN abs_details JSONB;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+
+    # Outcome tracking columns on setup_log
+    for col, ctype in [
+        ("outcome_result", "TEXT"),          # WIN / LOSS / EXPIRED / TIMEOUT
+        ("outcome_pnl", "DOUBLE PRECISION"), # P&L in points
+        ("outcome_target_level", "DOUBLE PRECISION"),
+        ("outcome_stop_level", "DOUBLE PRECISION"),
+        ("outcome_max_profit", "DOUBLE PRECISION"),
+        ("outcome_max_loss", "DOUBLE PRECISION"),
+        ("outcome_first_event", "TEXT"),     # 10pt / target / stop / timeout
+        ("outcome_elapsed_min", "INTEGER"),  # minutes from signal to resolution
+    ]:
         conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE {VOLLAND_TABLE} ADD COLUMN data_ts TIMESTAMPTZ;
+            ALTER TABLE setup_log ADD COLUMN {col} {ctype};
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # Playback snapshots table for historical visualization
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS playback_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            spot DOUBLE PRECISION,
-            strikes JSONB NOT NULL,
-            net_gex JSONB NOT NULL,
-            charm JSONB,
-            call_vol JSONB NOT NULL,
-            put_vol JSONB NOT NULL,
-            stats JSONB,
-            is_mock BOOLEAN DEFAULT FALSE
-        );
-        CREATE INDEX IF NOT EXISTS ix_playback_snapshots_ts ON playback_snapshots (ts DESC);
-        """))
-        # Add is_mock column if it doesn't exist (for existing tables)
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE playback_snapshots ADD COLUMN is_mock BOOLEAN DEFAULT FALSE;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE playback_snapshots ADD COLUMN call_gex JSONB;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE playback_snapshots ADD COLUMN put_gex JSONB;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE playback_snapshots ADD COLUMN call_oi JSONB;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE playback_snapshots ADD COLUMN put_oi JSONB;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
+    # VIX column on chain_snapshots, playback_snapshots, setup_log
+    for tbl in ("chain_snapshots", "playback_snapshots", "setup_log"):
+        conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE playback_snapshots ADD COLUMN delta_decay JSONB;
+            ALTER TABLE {tbl} ADD COLUMN vix DOUBLE PRECISION;
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # Alert settings table
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS alert_settings (
-            id INTEGER PRIMARY KEY DEFAULT 1,
-            enabled BOOLEAN DEFAULT TRUE,
-            lis_enabled BOOLEAN DEFAULT TRUE,
-            target_enabled BOOLEAN DEFAULT TRUE,
-            max_pos_gamma_enabled BOOLEAN DEFAULT TRUE,
-            max_neg_gamma_enabled BOOLEAN DEFAULT TRUE,
-            paradigm_change_enabled BOOLEAN DEFAULT TRUE,
-            summary_10am_enabled BOOLEAN DEFAULT TRUE,
-            summary_2pm_enabled BOOLEAN DEFAULT TRUE,
-            volume_spike_enabled BOOLEAN DEFAULT TRUE,
-            threshold_points INTEGER DEFAULT 5,
-            threshold_volume INTEGER DEFAULT 500,
-            cooldown_enabled BOOLEAN DEFAULT TRUE,
-            cooldown_minutes INTEGER DEFAULT 10,
-            CHECK (id = 1)
-        );
-        INSERT INTO alert_settings (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
-        """))
-
-        # Setup detector settings table
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS setup_settings (
-            id INTEGER PRIMARY KEY DEFAULT 1,
-            gex_long_enabled BOOLEAN DEFAULT TRUE,
-            weight_support INTEGER DEFAULT 20,
-            weight_upside INTEGER DEFAULT 20,
-            weight_floor_cluster INTEGER DEFAULT 20,
-            weight_target_cluster INTEGER DEFAULT 20,
-            weight_rr INTEGER DEFAULT 20,
-            brackets JSONB,
-            grade_thresholds JSONB,
-            CHECK (id = 1)
-        );
-        """))
-        conn.execute(text(
-            "INSERT INTO setup_settings (id, brackets, grade_thresholds) "
-            "VALUES (1, :brackets, :thresholds) ON CONFLICT (id) DO NOTHING"
-        ), {
-            "brackets": json.dumps(_DEFAULT_SETUP_SETTINGS["brackets"]),
-            "thresholds": json.dumps(_DEFAULT_SETUP_SETTINGS["grade_thresholds"]),
-        })
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN ag_short_enabled BOOLEAN DEFAULT TRUE;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        # BofA Scalp columns
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN bofa_scalp_enabled BOOLEAN DEFAULT TRUE;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
+    # Greek context columns on setup_log
+    for col, dtype in [
+        ("vanna_all", "DOUBLE PRECISION"),
+        ("vanna_weekly", "DOUBLE PRECISION"),
+        ("vanna_monthly", "DOUBLE PRECISION"),
+        ("spot_vol_beta", "DOUBLE PRECISION"),
+        ("greek_alignment", "INTEGER"),
+        ("basket_pct", "DOUBLE PRECISION"),
+    ]:
+        conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN bofa_settings JSONB;
+            ALTER TABLE setup_log ADD COLUMN {col} {dtype};
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # BofA Scalp extra columns on setup_log
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN bofa_stop_level DOUBLE PRECISION;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN bofa_target_level DOUBLE PRECISION;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN bofa_lis_width DOUBLE PRECISION;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN bofa_max_hold_minutes INTEGER;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN lis_upper DOUBLE PRECISION;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN comments TEXT;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        # Absorption columns on setup_settings
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN absorption_enabled BOOLEAN DEFAULT TRUE;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN absorption_settings JSONB;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        # Paradigm Reversal columns on setup_settings
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN paradigm_rev_enabled BOOLEAN DEFAULT TRUE;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_settings ADD COLUMN paradigm_rev_settings JSONB;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        # Absorption extra columns on setup_log
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN abs_vol_ratio DOUBLE PRECISION;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
-        DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN abs_es_price DOUBLE PRECISION;
-        EXCEPTION WHEN duplicate_column THEN NULL;
-        END $$;
-        """))
-        conn.execute(text("""
+    # Charm S/R limit entry column on setup_log
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN charm_limit_entry DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+
+    # Overvix (VIX - VIX3M) column on setup_log — V8 Smart VIX Gate
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE setup_log ADD COLUMN overvix DOUBLE PRECISION;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+
+    # VIX3M raw + VIX/VIX3M ratio columns — Discord pros use ratio at 0.83/0.80 thresholds
+    # (Apollo May 6: "Trim longs when under 0.83. Long short term Vol when under 0.8")
+    # BigBill stats since 12/31/18: 296 instances of ratio<=0.83, avg +0.26% over 10 days
+    # Added 2026-05-12 (S104). Read-only metric — informs regime, no gating logic yet.
+    for col, dtype in [("vix3m", "DOUBLE PRECISION"), ("vix_vix3m_ratio", "DOUBLE PRECISION")]:
+        conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN abs_details JSONB;
+            ALTER TABLE setup_log ADD COLUMN {col} {dtype};
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # Outcome tracking columns on setup_log
-        for col, ctype in [
-            ("outcome_result", "TEXT"),          # WIN / LOSS / EXPIRED / TIMEOUT
-            ("outcome_pnl", "DOUBLE PRECISION"), # P&L in points
-            ("outcome_target_level", "DOUBLE PRECISION"),
-            ("outcome_stop_level", "DOUBLE PRECISION"),
-            ("outcome_max_profit", "DOUBLE PRECISION"),
-            ("outcome_max_loss", "DOUBLE PRECISION"),
-            ("outcome_first_event", "TEXT"),     # 10pt / target / stop / timeout
-            ("outcome_elapsed_min", "INTEGER"),  # minutes from signal to resolution
-        ]:
-            conn.execute(text(f"""
-            DO $$ BEGIN
-                ALTER TABLE setup_log ADD COLUMN {col} {ctype};
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-            """))
-
-        # VIX column on chain_snapshots, playback_snapshots, setup_log
-        for tbl in ("chain_snapshots", "playback_snapshots", "setup_log"):
-            conn.execute(text(f"""
-            DO $$ BEGIN
-                ALTER TABLE {tbl} ADD COLUMN vix DOUBLE PRECISION;
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-            """))
-
-        # Greek context columns on setup_log
-        for col, dtype in [
-            ("vanna_all", "DOUBLE PRECISION"),
-            ("vanna_weekly", "DOUBLE PRECISION"),
-            ("vanna_monthly", "DOUBLE PRECISION"),
-            ("spot_vol_beta", "DOUBLE PRECISION"),
-            ("greek_alignment", "INTEGER"),
-            ("basket_pct", "DOUBLE PRECISION"),
-        ]:
-            conn.execute(text(f"""
-            DO $$ BEGIN
-                ALTER TABLE setup_log ADD COLUMN {col} {dtype};
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-            """))
-
-        # Charm S/R limit entry column on setup_log
-        conn.execute(text("""
+    # V13 regime data per trade — enables JS portal filter
+    # vanna_regime (Apr 22 2026, VPB-Bull V3): "bullish"/"bearish"/"mixed" — VPB real-trade gate
+    for col, dtype in [
+        ("v13_gex_above", "DOUBLE PRECISION"),
+        ("v13_dd_near", "DOUBLE PRECISION"),
+        ("vanna_cliff_side", "TEXT"),
+        ("vanna_peak_side", "TEXT"),
+        ("vanna_regime", "TEXT"),
+    ]:
+        conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN charm_limit_entry DOUBLE PRECISION;
+            ALTER TABLE setup_log ADD COLUMN {col} {dtype};
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # Overvix (VIX - VIX3M) column on setup_log — V8 Smart VIX Gate
-        conn.execute(text("""
+    # Volland data age at signal time + the snapshot the setup was evaluated on
+    for col, dtype in [
+        ("volland_age_s", "DOUBLE PRECISION"),
+        ("volland_snapshot_id", "BIGINT"),
+    ]:
+        conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE setup_log ADD COLUMN overvix DOUBLE PRECISION;
+            ALTER TABLE setup_log ADD COLUMN {col} {dtype};
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # VIX3M raw + VIX/VIX3M ratio columns — Discord pros use ratio at 0.83/0.80 thresholds
-        # (Apollo May 6: "Trim longs when under 0.83. Long short term Vol when under 0.8")
-        # BigBill stats since 12/31/18: 296 instances of ratio<=0.83, avg +0.26% over 10 days
-        # Added 2026-05-12 (S104). Read-only metric — informs regime, no gating logic yet.
-        for col, dtype in [("vix3m", "DOUBLE PRECISION"), ("vix_vix3m_ratio", "DOUBLE PRECISION")]:
-            conn.execute(text(f"""
-            DO $$ BEGIN
-                ALTER TABLE setup_log ADD COLUMN {col} {dtype};
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-            """))
-
-        # V13 regime data per trade — enables JS portal filter
-        # vanna_regime (Apr 22 2026, VPB-Bull V3): "bullish"/"bearish"/"mixed" — VPB real-trade gate
-        for col, dtype in [
-            ("v13_gex_above", "DOUBLE PRECISION"),
-            ("v13_dd_near", "DOUBLE PRECISION"),
-            ("vanna_cliff_side", "TEXT"),
-            ("vanna_peak_side", "TEXT"),
-            ("vanna_regime", "TEXT"),
-        ]:
-            conn.execute(text(f"""
-            DO $$ BEGIN
-                ALTER TABLE setup_log ADD COLUMN {col} {dtype};
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-            """))
-
-        # Trail params + exit price per trade — eliminates era guessing in analysis
-        for col, dtype in [
-            ("trail_sl", "DOUBLE PRECISION"),
-            ("trail_activation", "DOUBLE PRECISION"),
-            ("trail_gap", "DOUBLE PRECISION"),
-            ("exit_price", "DOUBLE PRECISION"),
-        ]:
-            conn.execute(text(f"""
-            DO $$ BEGIN
-                ALTER TABLE setup_log ADD COLUMN {col} {dtype};
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-            """))
-
-        # Economic calendar events table
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS economic_events (
-            id SERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            title TEXT NOT NULL,
-            country TEXT,
-            impact TEXT,
-            forecast TEXT,
-            previous TEXT,
-            actual TEXT,
-            fetched_at TIMESTAMPTZ DEFAULT NOW(),
-            UNIQUE(ts, title, country)
-        )
-        """))
-
-        # Setup detection log table
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS setup_log (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-            setup_name TEXT NOT NULL,
-            direction TEXT NOT NULL DEFAULT 'long',
-            grade TEXT NOT NULL,
-            score DOUBLE PRECISION NOT NULL,
-            paradigm TEXT,
-            spot DOUBLE PRECISION,
-            lis DOUBLE PRECISION,
-            target DOUBLE PRECISION,
-            max_plus_gex DOUBLE PRECISION,
-            max_minus_gex DOUBLE PRECISION,
-            gap_to_lis DOUBLE PRECISION,
-            upside DOUBLE PRECISION,
-            rr_ratio DOUBLE PRECISION,
-            first_hour BOOLEAN DEFAULT FALSE,
-            support_score INTEGER,
-            upside_score INTEGER,
-            floor_cluster_score INTEGER,
-            target_cluster_score INTEGER,
-            rr_score INTEGER,
-            notified BOOLEAN DEFAULT FALSE
-        );
-        CREATE INDEX IF NOT EXISTS ix_setup_log_ts ON setup_log (ts DESC);
-        """))
-
-        # Users table for authentication
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS users (
-            id BIGSERIAL PRIMARY KEY,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            password_hash VARCHAR(255) NOT NULL,
-            is_admin BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMPTZ DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS ix_users_email ON users (email);
-        """))
-
-        # Contact messages table for access requests
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS contact_messages (
-            id BIGSERIAL PRIMARY KEY,
-            email VARCHAR(255) NOT NULL,
-            subject VARCHAR(500),
-            message TEXT,
-            is_read BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMPTZ DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS ix_contact_messages_created ON contact_messages (created_at DESC);
-        """))
-
-        # ES cumulative delta snapshots (written by pull_es_delta scheduler job)
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS es_delta_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL DEFAULT now(),
-            trade_date DATE NOT NULL,
-            symbol VARCHAR(20) NOT NULL,
-            cumulative_delta BIGINT NOT NULL DEFAULT 0,
-            total_volume BIGINT NOT NULL DEFAULT 0,
-            buy_volume BIGINT NOT NULL DEFAULT 0,
-            sell_volume BIGINT NOT NULL DEFAULT 0,
-            last_price DOUBLE PRECISION,
-            tick_count BIGINT NOT NULL DEFAULT 0,
-            bar_high DOUBLE PRECISION,
-            bar_low DOUBLE PRECISION
-        );
-        CREATE INDEX IF NOT EXISTS idx_es_delta_snap_ts ON es_delta_snapshots(ts DESC);
-        CREATE INDEX IF NOT EXISTS idx_es_delta_snap_date ON es_delta_snapshots(trade_date DESC);
-        """))
-        conn.execute(text("""
+    # Trail params + exit price per trade — eliminates era guessing in analysis
+    for col, dtype in [
+        ("trail_sl", "DOUBLE PRECISION"),
+        ("trail_activation", "DOUBLE PRECISION"),
+        ("trail_gap", "DOUBLE PRECISION"),
+        ("exit_price", "DOUBLE PRECISION"),
+    ]:
+        conn.execute(text(f"""
         DO $$ BEGIN
-            ALTER TABLE es_delta_snapshots ADD COLUMN data_ts TIMESTAMPTZ;
+            ALTER TABLE setup_log ADD COLUMN {col} {dtype};
         EXCEPTION WHEN duplicate_column THEN NULL;
         END $$;
         """))
 
-        # ES 1-minute delta bars from TradeStation barcharts (UpVolume/DownVolume)
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS es_delta_bars (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            trade_date DATE NOT NULL,
-            symbol VARCHAR(20) NOT NULL,
-            bar_delta BIGINT NOT NULL DEFAULT 0,
-            cumulative_delta BIGINT NOT NULL DEFAULT 0,
-            bar_volume BIGINT NOT NULL DEFAULT 0,
-            bar_buy_volume BIGINT NOT NULL DEFAULT 0,
-            bar_sell_volume BIGINT NOT NULL DEFAULT 0,
-            bar_open_price DOUBLE PRECISION,
-            bar_close_price DOUBLE PRECISION,
-            bar_high_price DOUBLE PRECISION,
-            bar_low_price DOUBLE PRECISION,
-            up_ticks INTEGER NOT NULL DEFAULT 0,
-            down_ticks INTEGER NOT NULL DEFAULT 0,
-            total_ticks INTEGER NOT NULL DEFAULT 0,
-            UNIQUE(ts, symbol)
-        );
-        CREATE INDEX IF NOT EXISTS idx_es_delta_bars_ts ON es_delta_bars(ts DESC);
-        """))
-
-        # ES range bars from streaming quotes (bid/ask delta classification)
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS es_range_bars (
-            id BIGSERIAL PRIMARY KEY,
-            trade_date DATE NOT NULL,
-            symbol VARCHAR(20) NOT NULL DEFAULT '@ES',
-            bar_idx INTEGER NOT NULL,
-            range_pts DOUBLE PRECISION NOT NULL DEFAULT 5.0,
-            bar_open DOUBLE PRECISION NOT NULL,
-            bar_high DOUBLE PRECISION NOT NULL,
-            bar_low DOUBLE PRECISION NOT NULL,
-            bar_close DOUBLE PRECISION NOT NULL,
-            bar_volume BIGINT NOT NULL DEFAULT 0,
-            bar_buy_volume BIGINT NOT NULL DEFAULT 0,
-            bar_sell_volume BIGINT NOT NULL DEFAULT 0,
-            bar_delta BIGINT NOT NULL DEFAULT 0,
-            cumulative_delta BIGINT NOT NULL DEFAULT 0,
-            cvd_open BIGINT NOT NULL DEFAULT 0,
-            cvd_high BIGINT NOT NULL DEFAULT 0,
-            cvd_low BIGINT NOT NULL DEFAULT 0,
-            cvd_close BIGINT NOT NULL DEFAULT 0,
-            ts_start TIMESTAMPTZ NOT NULL,
-            ts_end TIMESTAMPTZ NOT NULL,
-            status VARCHAR(10) NOT NULL DEFAULT 'closed',
-            source VARCHAR(10) NOT NULL DEFAULT 'live',
-            UNIQUE(trade_date, symbol, bar_idx, range_pts)
-        );
-        """))
-
-        # SPX 1-min OHLC bars for backtesting (real tick-based H/L from TS barcharts API)
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS spx_ohlc_1m (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            trade_date DATE NOT NULL,
-            bar_open DOUBLE PRECISION NOT NULL,
-            bar_high DOUBLE PRECISION NOT NULL,
-            bar_low DOUBLE PRECISION NOT NULL,
-            bar_close DOUBLE PRECISION NOT NULL,
-            volume BIGINT NOT NULL DEFAULT 0,
-            UNIQUE(ts)
-        );
-        CREATE INDEX IF NOT EXISTS idx_spx_ohlc_1m_ts ON spx_ohlc_1m(ts DESC);
-        CREATE INDEX IF NOT EXISTS idx_spx_ohlc_1m_date ON spx_ohlc_1m(trade_date);
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS setup_cooldowns (
-            trade_date DATE PRIMARY KEY,
-            state JSONB NOT NULL DEFAULT '{}'
-        );
-        """))
-
-        # S243 (2026-08-11) — every outgoing Telegram alert, recorded at send time.
-        # A bot cannot read back what it posted to a channel, so this table IS the
-        # alert history. Without it, "watch Telegram" degrades to pinging getMe.
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS telegram_alerts (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL DEFAULT now(),
-            channel TEXT NOT NULL,
-            message TEXT NOT NULL
-        );
-        """))
-        conn.execute(text(
-            "CREATE INDEX IF NOT EXISTS idx_telegram_alerts_ts ON telegram_alerts (ts DESC);"))
-
-        # S243 — 5-minute TSRT health snapshots, so a session can be reviewed afterwards
-        # instead of only watched live. `et` is the ET wall-clock minute (PK = idempotent).
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS tsrt_health (
-            et TIMESTAMP PRIMARY KEY,
-            payload JSONB NOT NULL DEFAULT '{}'
-        );
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS auto_trade_orders (
-            setup_log_id BIGINT PRIMARY KEY,
-            state JSONB NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS options_trade_orders (
-            setup_log_id BIGINT PRIMARY KEY,
-            state JSONB NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS real_trade_orders (
-            setup_log_id BIGINT PRIMARY KEY,
-            state JSONB NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        """))
-
-        # ── VPS Data Bridge tables (independent from Rithmic) ──
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS vps_es_range_bars (
-            id BIGSERIAL PRIMARY KEY,
-            trade_date DATE NOT NULL,
-            symbol VARCHAR(20) NOT NULL DEFAULT '@ES',
-            bar_idx INTEGER NOT NULL,
-            range_pts DOUBLE PRECISION NOT NULL DEFAULT 5.0,
-            bar_open DOUBLE PRECISION NOT NULL,
-            bar_high DOUBLE PRECISION NOT NULL,
-            bar_low DOUBLE PRECISION NOT NULL,
-            bar_close DOUBLE PRECISION NOT NULL,
-            bar_volume BIGINT NOT NULL DEFAULT 0,
-            bar_buy_volume BIGINT NOT NULL DEFAULT 0,
-            bar_sell_volume BIGINT NOT NULL DEFAULT 0,
-            bar_delta BIGINT NOT NULL DEFAULT 0,
-            cumulative_delta BIGINT NOT NULL DEFAULT 0,
-            cvd_open BIGINT NOT NULL DEFAULT 0,
-            cvd_high BIGINT NOT NULL DEFAULT 0,
-            cvd_low BIGINT NOT NULL DEFAULT 0,
-            cvd_close BIGINT NOT NULL DEFAULT 0,
-            ts_start TIMESTAMPTZ NOT NULL,
-            ts_end TIMESTAMPTZ NOT NULL,
-            status VARCHAR(10) NOT NULL DEFAULT 'closed',
-            UNIQUE(trade_date, symbol, bar_idx, range_pts)
-        );
-        CREATE INDEX IF NOT EXISTS idx_vps_es_rb_date ON vps_es_range_bars(trade_date);
-        """))
-
-        # ── Sierra shadow signal log (Phase 1: parallel detection, no live effects) ──
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS setup_log_shadow (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-            data_source TEXT NOT NULL DEFAULT 'sierra',
-            setup_name TEXT NOT NULL,
-            direction TEXT NOT NULL,
-            grade TEXT,
-            score DOUBLE PRECISION,
-            paradigm TEXT,
-            spot DOUBLE PRECISION,
-            es_price DOUBLE PRECISION,
-            lis DOUBLE PRECISION,
-            target DOUBLE PRECISION,
-            bar_idx INTEGER,
-            range_pts DOUBLE PRECISION,
-            vol_ratio DOUBLE PRECISION,
-            div_raw INTEGER,
-            extra JSONB
-        );
-        CREATE INDEX IF NOT EXISTS idx_setup_log_shadow_ts ON setup_log_shadow (ts DESC);
-        CREATE INDEX IF NOT EXISTS idx_setup_log_shadow_setup ON setup_log_shadow (setup_name, ts DESC);
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS vps_vix_ticks (
-            id BIGSERIAL PRIMARY KEY,
-            price DOUBLE PRECISION NOT NULL,
-            volume INTEGER NOT NULL DEFAULT 0,
-            delta INTEGER NOT NULL DEFAULT 0,
-            bid DOUBLE PRECISION,
-            ask DOUBLE PRECISION,
-            ts TIMESTAMPTZ NOT NULL,
-            received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS idx_vps_vix_ts ON vps_vix_ticks(ts DESC);
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS vps_heartbeats (
-            id BIGSERIAL PRIMARY KEY,
-            component VARCHAR(50) NOT NULL,
-            status JSONB NOT NULL,
-            ts TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS idx_vps_hb_ts ON vps_heartbeats(ts DESC);
-        """))
-
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS vps_vol_signals (
-            id BIGSERIAL PRIMARY KEY,
-            direction SMALLINT NOT NULL,
-            vx_price DOUBLE PRECISION NOT NULL,
-            delta DOUBLE PRECISION NOT NULL,
-            ask_vol DOUBLE PRECISION NOT NULL DEFAULT 0,
-            bid_vol DOUBLE PRECISION NOT NULL DEFAULT 0,
-            avg_delta DOUBLE PRECISION NOT NULL DEFAULT 0,
-            ratio DOUBLE PRECISION NOT NULL DEFAULT 0,
-            bar_ts TIMESTAMPTZ NOT NULL,
-            received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS idx_vps_vol_sig_ts ON vps_vol_signals(bar_ts DESC);
-        """))
-
-        # Phase B (Apollo-style VX depth capture) — top-N bid/ask snapshots
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS vps_vx_dom_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            symbol TEXT,
-            bid_levels JSONB NOT NULL,
-            ask_levels JSONB NOT NULL,
-            received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS idx_vps_vx_dom_ts ON vps_vx_dom_snapshots(ts DESC);
-        CREATE INDEX IF NOT EXISTS idx_vps_vx_dom_received ON vps_vx_dom_snapshots(received_at DESC);
-        """))
-
-        # ES DOM snapshots (mirrors VX DOM table — Apollo "queue laddering" alpha)
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS vps_es_dom_snapshots (
-            id BIGSERIAL PRIMARY KEY,
-            ts TIMESTAMPTZ NOT NULL,
-            symbol TEXT,
-            bid_levels JSONB NOT NULL,
-            ask_levels JSONB NOT NULL,
-            received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        CREATE INDEX IF NOT EXISTS idx_vps_es_dom_ts ON vps_es_dom_snapshots(ts DESC);
-        CREATE INDEX IF NOT EXISTS idx_vps_es_dom_received ON vps_es_dom_snapshots(received_at DESC);
-        """))
+    # Economic calendar events table
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS economic_events (
+        id SERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        title TEXT NOT NULL,
+        country TEXT,
+        impact TEXT,
+        forecast TEXT,
+        previous TEXT,
+        actual TEXT,
+        fetched_at TIMESTAMPTZ DEFAULT NOW(),
+        UNIQUE(ts, title, country)
+    )
+    """))
+
+    # Setup detection log table
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS setup_log (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        setup_name TEXT NOT NULL,
+        direction TEXT NOT NULL DEFAULT 'long',
+        grade TEXT NOT NULL,
+        score DOUBLE PRECISION NOT NULL,
+        paradigm TEXT,
+        spot DOUBLE PRECISION,
+        lis DOUBLE PRECISION,
+        target DOUBLE PRECISION,
+        max_plus_gex DOUBLE PRECISION,
+        max_minus_gex DOUBLE PRECISION,
+        gap_to_lis DOUBLE PRECISION,
+        upside DOUBLE PRECISION,
+        rr_ratio DOUBLE PRECISION,
+        first_hour BOOLEAN DEFAULT FALSE,
+        support_score INTEGER,
+        upside_score INTEGER,
+        floor_cluster_score INTEGER,
+        target_cluster_score INTEGER,
+        rr_score INTEGER,
+        notified BOOLEAN DEFAULT FALSE
+    );
+    CREATE INDEX IF NOT EXISTS ix_setup_log_ts ON setup_log (ts DESC);
+    """))
+
+    # Users table for authentication
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS users (
+        id BIGSERIAL PRIMARY KEY,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        is_admin BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS ix_users_email ON users (email);
+    """))
+
+    # Contact messages table for access requests
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS contact_messages (
+        id BIGSERIAL PRIMARY KEY,
+        email VARCHAR(255) NOT NULL,
+        subject VARCHAR(500),
+        message TEXT,
+        is_read BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS ix_contact_messages_created ON contact_messages (created_at DESC);
+    """))
+
+    # ES cumulative delta snapshots (written by pull_es_delta scheduler job)
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS es_delta_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL DEFAULT now(),
+        trade_date DATE NOT NULL,
+        symbol VARCHAR(20) NOT NULL,
+        cumulative_delta BIGINT NOT NULL DEFAULT 0,
+        total_volume BIGINT NOT NULL DEFAULT 0,
+        buy_volume BIGINT NOT NULL DEFAULT 0,
+        sell_volume BIGINT NOT NULL DEFAULT 0,
+        last_price DOUBLE PRECISION,
+        tick_count BIGINT NOT NULL DEFAULT 0,
+        bar_high DOUBLE PRECISION,
+        bar_low DOUBLE PRECISION
+    );
+    CREATE INDEX IF NOT EXISTS idx_es_delta_snap_ts ON es_delta_snapshots(ts DESC);
+    CREATE INDEX IF NOT EXISTS idx_es_delta_snap_date ON es_delta_snapshots(trade_date DESC);
+    """))
+    conn.execute(text("""
+    DO $$ BEGIN
+        ALTER TABLE es_delta_snapshots ADD COLUMN data_ts TIMESTAMPTZ;
+    EXCEPTION WHEN duplicate_column THEN NULL;
+    END $$;
+    """))
+
+    # ES 1-minute delta bars from TradeStation barcharts (UpVolume/DownVolume)
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS es_delta_bars (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        trade_date DATE NOT NULL,
+        symbol VARCHAR(20) NOT NULL,
+        bar_delta BIGINT NOT NULL DEFAULT 0,
+        cumulative_delta BIGINT NOT NULL DEFAULT 0,
+        bar_volume BIGINT NOT NULL DEFAULT 0,
+        bar_buy_volume BIGINT NOT NULL DEFAULT 0,
+        bar_sell_volume BIGINT NOT NULL DEFAULT 0,
+        bar_open_price DOUBLE PRECISION,
+        bar_close_price DOUBLE PRECISION,
+        bar_high_price DOUBLE PRECISION,
+        bar_low_price DOUBLE PRECISION,
+        up_ticks INTEGER NOT NULL DEFAULT 0,
+        down_ticks INTEGER NOT NULL DEFAULT 0,
+        total_ticks INTEGER NOT NULL DEFAULT 0,
+        UNIQUE(ts, symbol)
+    );
+    CREATE INDEX IF NOT EXISTS idx_es_delta_bars_ts ON es_delta_bars(ts DESC);
+    """))
+
+    # ES range bars from streaming quotes (bid/ask delta classification)
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS es_range_bars (
+        id BIGSERIAL PRIMARY KEY,
+        trade_date DATE NOT NULL,
+        symbol VARCHAR(20) NOT NULL DEFAULT '@ES',
+        bar_idx INTEGER NOT NULL,
+        range_pts DOUBLE PRECISION NOT NULL DEFAULT 5.0,
+        bar_open DOUBLE PRECISION NOT NULL,
+        bar_high DOUBLE PRECISION NOT NULL,
+        bar_low DOUBLE PRECISION NOT NULL,
+        bar_close DOUBLE PRECISION NOT NULL,
+        bar_volume BIGINT NOT NULL DEFAULT 0,
+        bar_buy_volume BIGINT NOT NULL DEFAULT 0,
+        bar_sell_volume BIGINT NOT NULL DEFAULT 0,
+        bar_delta BIGINT NOT NULL DEFAULT 0,
+        cumulative_delta BIGINT NOT NULL DEFAULT 0,
+        cvd_open BIGINT NOT NULL DEFAULT 0,
+        cvd_high BIGINT NOT NULL DEFAULT 0,
+        cvd_low BIGINT NOT NULL DEFAULT 0,
+        cvd_close BIGINT NOT NULL DEFAULT 0,
+        ts_start TIMESTAMPTZ NOT NULL,
+        ts_end TIMESTAMPTZ NOT NULL,
+        status VARCHAR(10) NOT NULL DEFAULT 'closed',
+        source VARCHAR(10) NOT NULL DEFAULT 'live',
+        UNIQUE(trade_date, symbol, bar_idx, range_pts)
+    );
+    """))
+
+    # SPX 1-min OHLC bars for backtesting (real tick-based H/L from TS barcharts API)
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS spx_ohlc_1m (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        trade_date DATE NOT NULL,
+        bar_open DOUBLE PRECISION NOT NULL,
+        bar_high DOUBLE PRECISION NOT NULL,
+        bar_low DOUBLE PRECISION NOT NULL,
+        bar_close DOUBLE PRECISION NOT NULL,
+        volume BIGINT NOT NULL DEFAULT 0,
+        UNIQUE(ts)
+    );
+    CREATE INDEX IF NOT EXISTS idx_spx_ohlc_1m_ts ON spx_ohlc_1m(ts DESC);
+    CREATE INDEX IF NOT EXISTS idx_spx_ohlc_1m_date ON spx_ohlc_1m(trade_date);
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS setup_cooldowns (
+        trade_date DATE PRIMARY KEY,
+        state JSONB NOT NULL DEFAULT '{}'
+    );
+    """))
+
+    # Outcome backfill checkpoint — per session day, the highest setup_log id that
+    # _backfill_outcomes has walked against that day's complete price path. Rows at or
+    # below it that are still NULL had no data / were ungradable; a restart skips them.
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS outcome_backfill_progress (
+        trade_date DATE PRIMARY KEY,
+        max_id BIGINT NOT NULL,
+        filled INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """))
+
+    # S243 (2026-08-11) — every outgoing Telegram alert, recorded at send time.
+    # A bot cannot read back what it posted to a channel, so this table IS the
+    # alert history. Without it, "watch Telegram" degrades to pinging getMe.
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS telegram_alerts (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL DEFAULT now(),
+        channel TEXT NOT NULL,
+        message TEXT NOT NULL
+    );
+    """))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_telegram_alerts_ts ON telegram_alerts (ts DESC);"))
+
+    # S243 — 5-minute TSRT health snapshots, so a session can be reviewed afterwards
+    # instead of only watched live. `et` is the ET wall-clock minute (PK = idempotent).
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS tsrt_health (
+        et TIMESTAMP PRIMARY KEY,
+        payload JSONB NOT NULL DEFAULT '{}'
+    );
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS auto_trade_orders (
+        setup_log_id BIGINT PRIMARY KEY,
+        state JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS options_trade_orders (
+        setup_log_id BIGINT PRIMARY KEY,
+        state JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS real_trade_orders (
+        setup_log_id BIGINT PRIMARY KEY,
+        state JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """))
+
+    # ── VPS Data Bridge tables (independent from Rithmic) ──
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS vps_es_range_bars (
+        id BIGSERIAL PRIMARY KEY,
+        trade_date DATE NOT NULL,
+        symbol VARCHAR(20) NOT NULL DEFAULT '@ES',
+        bar_idx INTEGER NOT NULL,
+        range_pts DOUBLE PRECISION NOT NULL DEFAULT 5.0,
+        bar_open DOUBLE PRECISION NOT NULL,
+        bar_high DOUBLE PRECISION NOT NULL,
+        bar_low DOUBLE PRECISION NOT NULL,
+        bar_close DOUBLE PRECISION NOT NULL,
+        bar_volume BIGINT NOT NULL DEFAULT 0,
+        bar_buy_volume BIGINT NOT NULL DEFAULT 0,
+        bar_sell_volume BIGINT NOT NULL DEFAULT 0,
+        bar_delta BIGINT NOT NULL DEFAULT 0,
+        cumulative_delta BIGINT NOT NULL DEFAULT 0,
+        cvd_open BIGINT NOT NULL DEFAULT 0,
+        cvd_high BIGINT NOT NULL DEFAULT 0,
+        cvd_low BIGINT NOT NULL DEFAULT 0,
+        cvd_close BIGINT NOT NULL DEFAULT 0,
+        ts_start TIMESTAMPTZ NOT NULL,
+        ts_end TIMESTAMPTZ NOT NULL,
+        status VARCHAR(10) NOT NULL DEFAULT 'closed',
+        UNIQUE(trade_date, symbol, bar_idx, range_pts)
+    );
+    CREATE INDEX IF NOT EXISTS idx_vps_es_rb_date ON vps_es_range_bars(trade_date);
+    """))
+
+    # ── Sierra shadow signal log (Phase 1: parallel detection, no live effects) ──
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS setup_log_shadow (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        data_source TEXT NOT NULL DEFAULT 'sierra',
+        setup_name TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        grade TEXT,
+        score DOUBLE PRECISION,
+        paradigm TEXT,
+        spot DOUBLE PRECISION,
+        es_price DOUBLE PRECISION,
+        lis DOUBLE PRECISION,
+        target DOUBLE PRECISION,
+        bar_idx INTEGER,
+        range_pts DOUBLE PRECISION,
+        vol_ratio DOUBLE PRECISION,
+        div_raw INTEGER,
+        extra JSONB
+    );
+    CREATE INDEX IF NOT EXISTS idx_setup_log_shadow_ts ON setup_log_shadow (ts DESC);
+    CREATE INDEX IF NOT EXISTS idx_setup_log_shadow_setup ON setup_log_shadow (setup_name, ts DESC);
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS vps_vix_ticks (
+        id BIGSERIAL PRIMARY KEY,
+        price DOUBLE PRECISION NOT NULL,
+        volume INTEGER NOT NULL DEFAULT 0,
+        delta INTEGER NOT NULL DEFAULT 0,
+        bid DOUBLE PRECISION,
+        ask DOUBLE PRECISION,
+        ts TIMESTAMPTZ NOT NULL,
+        received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_vps_vix_ts ON vps_vix_ticks(ts DESC);
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS vps_heartbeats (
+        id BIGSERIAL PRIMARY KEY,
+        component VARCHAR(50) NOT NULL,
+        status JSONB NOT NULL,
+        ts TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_vps_hb_ts ON vps_heartbeats(ts DESC);
+    """))
+
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS vps_vol_signals (
+        id BIGSERIAL PRIMARY KEY,
+        direction SMALLINT NOT NULL,
+        vx_price DOUBLE PRECISION NOT NULL,
+        delta DOUBLE PRECISION NOT NULL,
+        ask_vol DOUBLE PRECISION NOT NULL DEFAULT 0,
+        bid_vol DOUBLE PRECISION NOT NULL DEFAULT 0,
+        avg_delta DOUBLE PRECISION NOT NULL DEFAULT 0,
+        ratio DOUBLE PRECISION NOT NULL DEFAULT 0,
+        bar_ts TIMESTAMPTZ NOT NULL,
+        received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_vps_vol_sig_ts ON vps_vol_signals(bar_ts DESC);
+    """))
+
+    # Phase B (Apollo-style VX depth capture) — top-N bid/ask snapshots
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS vps_vx_dom_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        symbol TEXT,
+        bid_levels JSONB NOT NULL,
+        ask_levels JSONB NOT NULL,
+        received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_vps_vx_dom_ts ON vps_vx_dom_snapshots(ts DESC);
+    CREATE INDEX IF NOT EXISTS idx_vps_vx_dom_received ON vps_vx_dom_snapshots(received_at DESC);
+    """))
+
+    # ES DOM snapshots (mirrors VX DOM table — Apollo "queue laddering" alpha)
+    conn.execute(text("""
+    CREATE TABLE IF NOT EXISTS vps_es_dom_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        ts TIMESTAMPTZ NOT NULL,
+        symbol TEXT,
+        bid_levels JSONB NOT NULL,
+        ask_levels JSONB NOT NULL,
+        received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_vps_es_dom_ts ON vps_es_dom_snapshots(ts DESC);
+    CREATE INDEX IF NOT EXISTS idx_vps_es_dom_received ON vps_es_dom_snapshots(received_at DESC);
+    """))
+
+# db_init() schema steps, applied once each via the ledger (app/migrations.py).
+# New schema goes in a NEW numbered step appended here; an applied step is never re-run
+# (editing one in place only logs drift). Step 1 (_schema_baseline) is frozen: every
+# existing database already has it, so DDL added inside it would never be applied —
+# even a one-column change to a baseline table is its own step (2, 3, ...).
+DB_MIGRATIONS = [
+    (1, "baseline", _schema_baseline),
+]
 
+def db_init():
+    if not engine:
+        print("[db] DATABASE_URL missing; history disabled", flush=True)
+        return
+    migrations.apply(engine, "main", DB_MIGRATIONS)
+    with engine.begin() as conn:
         # Create default admin user if no users exist
         existing = conn.execute(text("SELECT COUNT(*) FROM users")).scalar()
         if existing == 0:
@@ -1263,8 +1305,8 @@ def db_init():
     load_alert_settings()
     load_setup_settings()
     _load_cooldowns()
-    _backfill_outcomes()
     _restore_open_trades()
+    # _backfill_outcomes() runs in the startup warm-up phase (on_startup)
     print("[db] ready", flush=True)
 
 def load_alert_settings():
@@ -1508,11 +1550,242 @@ def _load_cooldowns():
     except Exception as e:
         print(f"[setups] cooldown load error (non-fatal): {e}", flush=True)
 
+# Outcome backfill: session days graded concurrently at startup. Each worker holds one
+# pooled connection at a time — keep it below the engine's pool_size (5).
+_OUTCOME_BACKFILL_WORKERS = int(os.getenv("OUTCOME_BACKFILL_WORKERS", "3"))
+
+# Setups graded on ES range bars (entry = abs_es_price) instead of SPX playback spot
+_ES_OUTCOME_SETUPS = ("ES Absorption", "SB Absorption", "SB10 Absorption", "SB2 Absorption", "Delta Absorption")
+
+_OUTCOME_UPDATE_SQL = """
+    UPDATE setup_log SET
+        outcome_result = :res,
+        outcome_pnl = :pnl,
+        outcome_target_level = :tgt,
+        outcome_stop_level = :sl,
+        outcome_max_profit = :mp,
+        outcome_max_loss = :ml,
+        outcome_first_event = :fe,
+        outcome_elapsed_min = :em,
+        exit_price = :ep
+    WHERE id = :id
+"""
+
+
+def _outcome_day(ts):
+    """Session (ET) date whose price path grades a setup_log row."""
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return ts.astimezone(NY).date() if ts.tzinfo else NY.localize(ts).date()
+
+
+def _backfill_outcome_params(entry: dict, outcome: dict):
+    """UPDATE params (_OUTCOME_UPDATE_SQL) for a computed outcome; None if ungradable."""
+    if not outcome or outcome.get("no_data") or outcome.get("error"):
+        return None
+
+    fe = outcome.get("first_event")
+    if fe in ("10pt", "target"):
+        result_type = "WIN"
+    elif fe == "stop":
+        result_type = "LOSS"
+    elif fe == "timeout":
+        result_type = "EXPIRED"
+    else:
+        # No event hit — expired at market close
+        result_type = "EXPIRED"
+
+    # Calculate P&L
+    is_long = entry.get("direction", "long").lower() in ("long", "bullish")
+    spot = entry.get("spot") or 0
+    es_price = entry.get("abs_es_price")
+    _es_based_bf = entry.get("setup_name") in _ES_OUTCOME_SETUPS
+    entry_price = es_price if _es_based_bf and es_price else spot
+
+    is_trailing_setup = entry.get("setup_name") in ("DD Exhaustion", "GEX Long", "GEX Velocity", "AG Short", "Skew Charm")
+    is_absorption = _es_based_bf
+    if is_absorption:
+        # ES Absorption: split-target. P&L = average of T1 (+10) and T2 (trail).
+        t1_hit = outcome.get("hit_10pt")
+        t2_exit = outcome.get("trail_exit_pnl")
+        if t1_hit and t2_exit is not None:
+            pnl = round((10.0 + t2_exit) / 2, 1)  # average of T1 and T2
+            result_type = "WIN" if pnl > 0 else ("LOSS" if pnl < 0 else "EXPIRED")
+        elif t1_hit:
+            pnl = 10.0  # T1 hit, trail still running
+            result_type = "WIN"
+        elif t2_exit is not None:
+            pnl = round(t2_exit, 1)  # no T1, trail only
+            result_type = "WIN" if t2_exit > 0 else "LOSS"
+        elif outcome.get("hit_stop"):
+            pnl = outcome.get("max_loss", -12)
+            result_type = "LOSS"
+        else:
+            pnl = outcome.get("max_profit", 0)
+            result_type = "EXPIRED"
+    elif is_trailing_setup:
+        # Trailing stop: P&L = final stop level - entry (or timeout P&L)
+        if result_type == "EXPIRED":
+            pnl = outcome.get("timeout_pnl", 0) or 0
+        else:
+            sl = outcome.get("trail_final_stop") or outcome.get("dd_final_stop") or outcome.get("stop_level", 0)
+            pnl = (sl - entry_price) if is_long else (entry_price - sl)
+    elif result_type == "WIN":
+        # Use full target if hit, otherwise use 10pt level
+        full_tgt = outcome.get("target_level")
+        if outcome.get("hit_target") and full_tgt:
+            pnl = abs(full_tgt - entry_price) if is_long else abs(entry_price - full_tgt)
+        else:
+            tgt = outcome.get("ten_pt_level") or outcome.get("bofa_target_level")
+            if tgt:
+                pnl = abs(tgt - entry_price) if is_long else abs(entry_price - tgt)
+            else:
+                pnl = outcome.get("max_profit", 0)
+    elif result_type == "LOSS":
+        sl = outcome.get("stop_level", 0)
+        pnl = -(abs(entry_price - sl)) if is_long else -(abs(sl - entry_price))
+    else:
+        pnl = outcome.get("max_profit", 0) if outcome.get("max_profit", 0) != 0 else outcome.get("max_loss", 0)
+
+    # Elapsed time
+    elapsed = None
+    time_key = {"10pt": "time_to_10pt", "target": "time_to_target", "stop": "time_to_stop"}.get(fe)
+    if time_key and outcome.get(time_key):
+        try:
+            t = datetime.fromisoformat(outcome[time_key])
+            elapsed = int((t - entry["ts"]).total_seconds() / 60)
+        except Exception:
+            pass
+
+    return {
+        "res": result_type,
+        "pnl": round(pnl, 2) if pnl is not None else None,
+        "tgt": outcome.get("target_level") or outcome.get("ten_pt_level") or outcome.get("bofa_target_level"),
+        "sl": outcome.get("initial_stop") or outcome.get("stop_level"),
+        "mp": outcome.get("max_profit"),
+        "ml": outcome.get("max_loss"),
+        "fe": fe,
+        "em": elapsed,
+        "ep": round(spot, 2) if spot else None,
+        "id": entry["id"],
+    }
+
+
+# A session's playback path counts as complete when it runs to 5 min before the close
+# without a hole longer than this (snapshots are ~2 min apart); ES bars when each size
+# has closed bars through 10 min before the close (range bars legitimately pause in
+# quiet tape, so no hole check there).
+_OUTCOME_PATH_MAX_GAP_SEC = 600
+
+
+def _session_close(day) -> dtime:
+    """Cash close (ET) of a session day: 13:00 on the NYSE early-close days (Jul 3 and
+    Dec 24 when they fall Mon-Thu, the day after Thanksgiving), 16:00 otherwise."""
+    if day.weekday() <= 3 and (day.month, day.day) in ((7, 3), (12, 24)):
+        return dtime(13, 0)
+    if day.month == 11 and day.weekday() == 4 and 23 <= day.day <= 29:
+        return dtime(13, 0)     # 4th Thursday falls on the 22nd-28th
+    return dtime(16, 0)
+
+
+def _outcome_path_complete(day, spx, es, day_prices, day_bars) -> bool:
+    """True when the day's loaded price path covers the whole session, so entries it
+    could not grade are ungradable for good (safe to checkpoint past)."""
+    try:
+        close = NY.localize(datetime.combine(day, _session_close(day)))
+        if spx:
+            if not day_prices or day_prices[-1]["ts"] < close - timedelta(minutes=5):
+                return False
+            ts = [r["ts"] for r in day_prices]
+            if any((b - a).total_seconds() > _OUTCOME_PATH_MAX_GAP_SEC for a, b in zip(ts, ts[1:])):
+                return False
+        if es:
+            cut = close - timedelta(minutes=10)
+            if not day_bars or any(not bars or bars[-1]["ts_end"] < cut for bars in day_bars.values()):
+                return False
+    except (TypeError, KeyError):
+        return False
+    return True
+
+
+def _backfill_outcome_day(day, entries) -> int:
+    """Grade one session day's pending setup_log rows; returns how many were filled.
+
+    The day's price path is loaded ONCE — playback_snapshots from the first entry to the
+    16:00 close for SPX setups, the closed ES range bars per bar size for ES setups — and
+    every entry is walked against that copy instead of re-querying per row. The outcomes
+    and the day's checkpoint go out in one transaction (one executemany UPDATE), so an
+    interrupted backfill never leaves a day half-written.
+    """
+    spx = [e for e in entries if e.get("setup_name") not in _ES_OUTCOME_SETUPS]
+    es = [e for e in entries if e.get("setup_name") in _ES_OUTCOME_SETUPS]
+    day_prices = day_bars = None
+    with engine.begin() as conn:
+        if spx:
+            day_prices = conn.execute(text("""
+                SELECT ts, spot FROM playback_snapshots
+                WHERE ts >= :start_ts AND ts <= :end_ts
+                ORDER BY ts ASC
+            """), {"start_ts": min(e["ts"] for e in spx),
+                   "end_ts": NY.localize(datetime.combine(day, dtime(16, 0)))}).mappings().all()
+        if es:
+            _tbl, _src = _es_bars_table_filter()
+            day_bars = {}
+            for rp in sorted({10.0 if e.get("setup_name") == "SB10 Absorption" else 5.0 for e in es}):
+                day_bars[rp] = conn.execute(text(f"""
+                    SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
+                           ts_start, ts_end, status
+                    FROM {_tbl}
+                    WHERE trade_date = :td {_src} AND status = 'closed'
+                      AND range_pts = :rp
+                    ORDER BY bar_idx ASC
+                """), {"td": day.isoformat(), "rp": rp}).mappings().all()
+
+    updates, errors = [], 0
+    for entry in entries:
+        outcome = _calculate_setup_outcome(entry, day_prices=day_prices, day_bars=day_bars)
+        if outcome and outcome.get("error"):
+            errors += 1
+        params = _backfill_outcome_params(entry, outcome)
+        if params:
+            updates.append(params)
+
+    with engine.begin() as conn:
+        if updates:
+            conn.execute(text(_OUTCOME_UPDATE_SQL), updates)
+        # Checkpoint only closed sessions with no calculation errors AND a complete price
+        # path: today's path is still growing, an errored row should be retried on the
+        # next start, and a row left ungraded by an empty / short path (ES bars uploaded
+        # later by GapBackfiller or vps_historical_upload, late playback snapshots) must
+        # be walked again once the data is there. Graded rows leave the query by
+        # themselves — the checkpoint only ever skips ungraded ones.
+        if (day < now_et().date() and not errors
+                and _outcome_path_complete(day, spx, es, day_prices, day_bars)):
+            conn.execute(text("""
+                INSERT INTO outcome_backfill_progress (trade_date, max_id, filled, skipped)
+                VALUES (:td, :mid, :filled, :skipped)
+                ON CONFLICT (trade_date) DO UPDATE SET
+                    max_id = GREATEST(outcome_backfill_progress.max_id, EXCLUDED.max_id),
+                    filled = outcome_backfill_progress.filled + EXCLUDED.filled,
+                    skipped = outcome_backfill_progress.skipped + EXCLUDED.skipped,
+                    updated_at = now()
+            """), {"td": day, "mid": max(e["id"] for e in entries),
+                   "filled": len(updates), "skipped": len(entries) - len(updates)})
+    # A post-16:05 run grades today's signals: resolve them for the eval feed's live
+    # subscribers too, as the live outcome trackers do.
+    if day == now_et().date():
+        for u in updates:
+            signal_feed.outcome(u["id"], u["res"], u["pnl"])
+    return len(updates)
+
+
 def _backfill_outcomes():
     """Backfill outcome results for setup_log entries that have no outcome yet.
 
     Runs once on startup. Uses _calculate_setup_outcome() to compute
-    WIN/LOSS/EXPIRED for each historical signal from price history.
+    WIN/LOSS/EXPIRED for each historical signal from price history — grouped by
+    session day (_backfill_outcome_day), days run in parallel, checkpointed in
+    outcome_backfill_progress so a restart resumes where the last run stopped.
     """
     if not engine:
         return
@@ -1562,115 +1835,48 @@ def _backfill_outcomes():
             print(msg, flush=True)
             return
 
-        print(f"[backfill] computing outcomes for {len(rows)} signals...", flush=True)
-        filled = 0
+        # Resume: rows at or below their day's checkpoint were already walked against
+        # that day's complete path and stayed ungradable — don't redo them every boot.
+        with engine.begin() as conn:
+            done = dict(conn.execute(text(
+                "SELECT trade_date, max_id FROM outcome_backfill_progress")).fetchall())
+        # The warm-up backfill runs after _restore_open_trades (critical phase): a trade the
+        # live tracker holds in _setup_open_trades is its to resolve — grading it here
+        # too (a boot just before 16:05, backfill starting after it) writes two outcomes.
+        live_ids = {t.get("setup_log_id") for t in list(_setup_open_trades)}
+        days = {}
         for row in rows:
             entry = dict(row)
-            outcome = _calculate_setup_outcome(entry)
-            if not outcome or outcome.get("no_data") or outcome.get("error"):
+            day = _outcome_day(entry["ts"])
+            if entry["id"] <= done.get(day, 0) or entry["id"] in live_ids:
                 continue
-
-            fe = outcome.get("first_event")
-            if fe in ("10pt", "target"):
-                result_type = "WIN"
-            elif fe == "stop":
-                result_type = "LOSS"
-            elif fe == "timeout":
-                result_type = "EXPIRED"
-            else:
-                # No event hit — expired at market close
-                result_type = "EXPIRED"
-
-            # Calculate P&L
-            is_long = entry.get("direction", "long").lower() in ("long", "bullish")
-            spot = entry.get("spot") or 0
-            es_price = entry.get("abs_es_price")
-            _es_based_bf = entry.get("setup_name") in ("ES Absorption", "SB Absorption", "SB10 Absorption", "SB2 Absorption", "Delta Absorption")
-            entry_price = es_price if _es_based_bf and es_price else spot
-
-            is_trailing_setup = entry.get("setup_name") in ("DD Exhaustion", "GEX Long", "GEX Velocity", "AG Short", "Skew Charm")
-            is_absorption = _es_based_bf
-            if is_absorption:
-                # ES Absorption: split-target. P&L = average of T1 (+10) and T2 (trail).
-                t1_hit = outcome.get("hit_10pt")
-                t2_exit = outcome.get("trail_exit_pnl")
-                if t1_hit and t2_exit is not None:
-                    pnl = round((10.0 + t2_exit) / 2, 1)  # average of T1 and T2
-                    result_type = "WIN" if pnl > 0 else ("LOSS" if pnl < 0 else "EXPIRED")
-                elif t1_hit:
-                    pnl = 10.0  # T1 hit, trail still running
-                    result_type = "WIN"
-                elif t2_exit is not None:
-                    pnl = round(t2_exit, 1)  # no T1, trail only
-                    result_type = "WIN" if t2_exit > 0 else "LOSS"
-                elif outcome.get("hit_stop"):
-                    pnl = outcome.get("max_loss", -12)
-                    result_type = "LOSS"
-                else:
-                    pnl = outcome.get("max_profit", 0)
-                    result_type = "EXPIRED"
-            elif is_trailing_setup:
-                # Trailing stop: P&L = final stop level - entry (or timeout P&L)
-                if result_type == "EXPIRED":
-                    pnl = outcome.get("timeout_pnl", 0) or 0
-                else:
-                    sl = outcome.get("trail_final_stop") or outcome.get("dd_final_stop") or outcome.get("stop_level", 0)
-                    pnl = (sl - entry_price) if is_long else (entry_price - sl)
-            elif result_type == "WIN":
-                # Use full target if hit, otherwise use 10pt level
-                full_tgt = outcome.get("target_level")
-                if outcome.get("hit_target") and full_tgt:
-                    pnl = abs(full_tgt - entry_price) if is_long else abs(entry_price - full_tgt)
-                else:
-                    tgt = outcome.get("ten_pt_level") or outcome.get("bofa_target_level")
-                    if tgt:
-                        pnl = abs(tgt - entry_price) if is_long else abs(entry_price - tgt)
-                    else:
-                        pnl = outcome.get("max_profit", 0)
-            elif result_type == "LOSS":
-                sl = outcome.get("stop_level", 0)
-                pnl = -(abs(entry_price - sl)) if is_long else -(abs(sl - entry_price))
-            else:
-                pnl = outcome.get("max_profit", 0) if outcome.get("max_profit", 0) != 0 else outcome.get("max_loss", 0)
-
-            # Elapsed time
-            elapsed = None
-            time_key = {"10pt": "time_to_10pt", "target": "time_to_target", "stop": "time_to_stop"}.get(fe)
-            if time_key and outcome.get(time_key):
-                try:
-                    t = datetime.fromisoformat(outcome[time_key])
-                    elapsed = int((t - entry["ts"]).total_seconds() / 60)
-                except Exception:
-                    pass
-
-            with engine.begin() as conn:
-                conn.execute(text("""
-                    UPDATE setup_log SET
-                        outcome_result = :res,
-                        outcome_pnl = :pnl,
-                        outcome_target_level = :tgt,
-                        outcome_stop_level = :sl,
-                        outcome_max_profit = :mp,
-                        outcome_max_loss = :ml,
-                        outcome_first_event = :fe,
-                        outcome_elapsed_min = :em,
-                        exit_price = :ep
-                    WHERE id = :id
-                """), {
-                    "res": result_type,
-                    "pnl": round(pnl, 2) if pnl is not None else None,
-                    "tgt": outcome.get("target_level") or outcome.get("ten_pt_level") or outcome.get("bofa_target_level"),
-                    "sl": outcome.get("initial_stop") or outcome.get("stop_level"),
-                    "mp": outcome.get("max_profit"),
-                    "ml": outcome.get("max_loss"),
-                    "fe": fe,
-                    "em": elapsed,
-                    "ep": round(spot, 2) if spot else None,
-                    "id": entry["id"],
-                })
-            filled += 1
-
-        print(f"[backfill] filled {filled}/{len(rows)} outcomes", flush=True)
+            days.setdefault(day, []).append(entry)
+        pending = sum(len(v) for v in days.values())
+
+        if days:
+            # One task per session day: the day's path is loaded once and all its trades
+            # are walked against it. Days run concurrently (each task holds one pooled
+            # connection at a time, so keep the worker count below pool_size).
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+            print(f"[backfill] computing outcomes for {pending} signals over {len(days)} days "
+                  f"({len(rows) - pending} checkpointed or held by the live tracker)...",
+                  flush=True)
+            t0 = time.time()
+            filled = 0
+            workers = max(1, min(_OUTCOME_BACKFILL_WORKERS, len(days)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outcome-backfill") as pool:
+                futs = {pool.submit(_backfill_outcome_day, day, entries): day
+                        for day, entries in sorted(days.items())}
+                for fut in as_completed(futs):
+                    try:
+                        filled += fut.result()
+                    except Exception as e:
+                        print(f"[backfill] {futs[fut]} error (non-fatal, retried next start): {e}",
+                              flush=True)
+            print(f"[backfill] filled {filled}/{pending} outcomes in {time.time() - t0:.1f}s "
+                  f"({workers} workers)", flush=True)
+        else:
+            print(f"[backfill] {len(rows)} signals without outcome, all checkpointed", flush=True)
 
         # Second pass: patch legacy rows that have outcome_result but NULL outcome_first_event
         # (live-resolved trades before this fix was deployed)
@@ -1683,7 +1889,7 @@ def _backfill_outcomes():
             """)).mappings().all()
 
         if legacy_rows:
-            patched = 0
+            patches = []
             trailing_setups = ("DD Exhaustion", "GEX Long", "GEX Velocity", "AG Short")
             for lr in legacy_rows:
                 res = lr["outcome_result"]
@@ -1700,14 +1906,15 @@ def _backfill_outcomes():
                 mp = lr["outcome_max_profit"]
                 if mp is None and pnl_val is not None:
                     mp = max(pnl_val, 0)  # conservative: at least the final P&L if positive
-                with engine.begin() as conn:
-                    conn.execute(text("""
-                        UPDATE setup_log SET
-                            outcome_first_event = COALESCE(outcome_first_event, :fe),
-                            outcome_max_profit = COALESCE(outcome_max_profit, :mp)
-                        WHERE id = :id
-                    """), {"fe": fe, "mp": mp, "id": lr["id"]})
-                patched += 1
+                patches.append({"fe": fe, "mp": mp, "id": lr["id"]})
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    UPDATE setup_log SET
+                        outcome_first_event = COALESCE(outcome_first_event, :fe),
+                        outcome_max_profit = COALESCE(outcome_max_profit, :mp)
+                    WHERE id = :id
+                """), patches)
+            patched = len(patches)
             print(f"[backfill] patched outcome_first_event/max_profit for {patched} legacy rows", flush=True)
 
     except Exception as e:
@@ -1821,7 +2028,7 @@ def _restore_open_trades():
                             SELECT MAX(bar_high) as hi, MIN(bar_low) as lo,
                                    MAX(bar_idx) as max_idx
                             FROM {_tbl}
-                            WHERE trade_date = :td {_src}
+                            WHERE trade_date = :td {_src} AND range_pts = 5.0
                               AND ts_end >= :entry_ts AND ts_end <= NOW()
                         """), {"td": ts.strftime("%Y-%m-%d"), "entry_ts": ts}).mappings().first()
                     if extremes and extremes["hi"] is not None:
@@ -1971,24 +2178,18 @@ def _compute_charm_limit_entry(spot: float, direction: str) -> dict | None:
         return None
     try:
         with engine.begin() as conn:
-            rows = conn.execute(text("""
-                SELECT strike, value FROM volland_exposure_points
-                WHERE greek = 'charm'
-                  AND ts_utc > NOW() - INTERVAL '5 minutes'
-                  AND strike BETWEEN :lo AND :hi
-                  AND value != 0
-                ORDER BY ts_utc DESC, abs(value) DESC
-            """), {"lo": spot - 25, "hi": spot + 25}).fetchall()
-        if not rows:
-            return None
+            _t1 = datetime.now(NY)
+            snaps = vexp.between(conn, "charm", _t1 - timedelta(minutes=5), _t1)
         # Dedupe strikes (keep most recent value per strike)
         seen = set()
         strikes = []
-        for r in rows:
-            sk = float(r.strike)
-            if sk not in seen:
-                seen.add(sk)
-                strikes.append({"strike": sk, "value": float(r.value)})
+        for snap in reversed(snaps):
+            for sk, v in vexp.points(snap, spot - 25, spot + 25):
+                if v != 0 and sk not in seen:
+                    seen.add(sk)
+                    strikes.append({"strike": sk, "value": float(v)})
+        if not strikes:
+            return None
         # Find resistance (strongest positive above spot) and support (strongest negative below)
         pos_above = [x for x in strikes if x["strike"] > spot and x["value"] > 0]
         neg_below = [x for x in strikes if x["strike"] <= spot and x["value"] < 0]
@@ -2039,19 +2240,47 @@ def log_setup(result_wrapper):
     - new/reformed: INSERT new row, store log ID
     - grade_upgrade/gap_improvement: UPDATE existing row
     """
+    log_setups([result_wrapper])
+
+
+def log_setups(result_wrappers):
+    """log_setup() for several detections in ONE transaction (the bar dispatcher logs
+    every signal of a completed bar this way). Each row runs in its own SAVEPOINT, so
+    one failed row doesn't roll back the others."""
     global _current_setup_log
-    if not engine:
+    if not engine or not result_wrappers:
         return
 
-    r = result_wrapper["result"]
-    reason = result_wrapper.get("notify_reason")
-    setup_name = r["setup_name"]
-
     # Reset tracking on new day
     today = now_et().date()
     if _current_setup_log["last_date"] != today:
         _current_setup_log = {"GEX Long": None, "GEX Velocity": None, "AG Short": None, "BofA Scalp": None, "ES Absorption": None, "SB Absorption": None, "SB10 Absorption": None, "SB2 Absorption": None, "Delta Absorption": None, "Paradigm Reversal": None, "DD Exhaustion": None, "Skew Charm": None, "Vanna Pivot Bounce": None, "Vanna Butterfly": None, "VIX Divergence": None, "last_date": today}
 
+    committed = []
+    try:
+        with engine.begin() as conn:
+            for rw in result_wrappers:
+                try:
+                    with conn.begin_nested():
+                        row = _log_setup_row(conn, rw)
+                    if row:
+                        committed.append(row)
+                except Exception as e:
+                    print(f"[setups] failed to log {rw['result'].get('setup_name')}: {e}", flush=True)
+    except Exception as e:
+        print(f"[setups] failed to log: {e}", flush=True)
+        return
+    # Eval signal feed: filter verdict + levels once per logged row (app/signal_feed.py)
+    signal_feed.logged(committed)
+
+
+def _log_setup_row(conn, result_wrapper):
+    """One log_setup() row on an open transaction. Returns the row for the eval signal
+    feed (new row: the inserted values; re-graded row: the updated fields), or None."""
+    r = result_wrapper["result"]
+    reason = result_wrapper.get("notify_reason")
+    setup_name = r["setup_name"]
+
     # AUDIT-TRAIL FIX (2026-05-06): never UPDATE setup_log row in-place when a real
     # trade was placed against it. Today's lid=2530 was traded as grade=A @ 10:27,
     # then re-fire at 10:49 UPDATE'd the same row to grade=C — destroying audit of
@@ -2061,8 +2290,8 @@ def log_setup(result_wrapper):
     if (_existing_lid is not None
             and reason not in ("new", "reformed")):
         try:
-            with engine.begin() as _conn_chk:
-                _rt_exists = _conn_chk.execute(text(
+            with conn.begin_nested():
+                _rt_exists = conn.execute(text(
                     "SELECT 1 FROM real_trade_orders WHERE setup_log_id = :lid LIMIT 1"
                 ), {"lid": _existing_lid}).first()
             if _rt_exists:
@@ -2072,216 +2301,192 @@ def log_setup(result_wrapper):
         except Exception as _e:
             print(f"[setups] audit check failed: {_e}", flush=True)
 
-    try:
-        with engine.begin() as conn:
-            if reason in ("new", "reformed") or _current_setup_log.get(setup_name) is None:
-                # DEDUP: skip if same setup+direction inserted recently (deploy overlap guard)
-                # Once-per-day setups (Vanna Butterfly) use full-day dedup window
-                _dedup_interval = '1 day' if setup_name == 'Vanna Butterfly' else '90 seconds'
-                dup_check = conn.execute(text(f"""
-                    SELECT id FROM setup_log
-                    WHERE setup_name = :name AND direction = :dir
-                      AND ts > NOW() - INTERVAL '{_dedup_interval}'
-                    ORDER BY id DESC LIMIT 1
-                """), {"name": setup_name, "dir": r["direction"]}).first()
-                if dup_check:
-                    _current_setup_log[setup_name] = dup_check[0]
-                    print(f"[setups] {setup_name} DEDUP: skipped INSERT, existing id={dup_check[0]}", flush=True)
-                    return
-
-                # INSERT new row
-                insert_params = dict(r)
-                # BofA Scalp extra columns (NULL for GEX/AG/Absorption)
-                insert_params.setdefault("bofa_stop_level", r.get("bofa_stop_level"))
-                insert_params.setdefault("bofa_target_level", r.get("bofa_target_level"))
-                insert_params.setdefault("bofa_lis_width", r.get("bofa_lis_width"))
-                insert_params.setdefault("bofa_max_hold_minutes", r.get("bofa_max_hold_minutes"))
-                insert_params["lis_upper_val"] = r.get("lis_upper")
-                # Absorption extra columns (NULL for other setups)
-                insert_params.setdefault("abs_vol_ratio", r.get("abs_vol_ratio"))
-                insert_params.setdefault("abs_es_price", r.get("abs_es_price"))
-                insert_params["vix"] = _vix_last
-                insert_params.setdefault("comments", None)
-                insert_params.setdefault("abs_details", None)
-                # Greek context columns
-                insert_params.setdefault("vanna_all", None)
-                insert_params.setdefault("vanna_weekly", None)
-                insert_params.setdefault("vanna_monthly", None)
-                insert_params.setdefault("spot_vol_beta", None)
-                insert_params.setdefault("greek_alignment", None)
-                # Charm S/R limit entry
-                insert_params.setdefault("charm_limit_entry", None)
-                # Ensure all required bind params exist (some setups don't produce all fields)
-                for _req_key in ("target", "lis", "paradigm", "max_plus_gex", "max_minus_gex",
-                                 "gap_to_lis", "upside", "rr_ratio", "first_hour",
-                                 "support_score", "upside_score", "floor_cluster_score",
-                                 "target_cluster_score", "rr_score"):
-                    insert_params.setdefault(_req_key, None)
-                # Overvix (VIX - VIX3M) — V8 Smart VIX Gate
-                insert_params["overvix"] = _overvix
-                # VIX3M + VIX/VIX3M ratio — Discord-pro regime metric (Apollo: <0.83 trim longs, <0.80 long-short-vol)
-                insert_params["vix3m"] = _vix3m_last
-                try:
-                    insert_params["vix_vix3m_ratio"] = (
-                        float(_vix_last) / float(_vix3m_last)
-                        if _vix_last and _vix3m_last and _vix3m_last > 0 else None
-                    )
-                except Exception:
-                    insert_params["vix_vix3m_ratio"] = None
-                # Trail params snapshot — for clean backtesting (no era guessing)
-                from app.setup_detector import is_gex_long_v3_enabled as _v3_on
-                _gex_long_tp_tuple = (14, 15, 5) if _v3_on() else (8, 10, 5)
-                _tp_lookup = {
-                    "DD Exhaustion": (12, 20, 5),
-                    "GEX Long": _gex_long_tp_tuple,
-                    "GEX Velocity": (8, 10, 5),
-                    "AG Short": (14, 12, 5),
-                    "Skew Charm": (14, 10, 5),
-                    # ES Absorption: SL8 + trail act=6 gap=2, no fixed target (2026-06-29).
-                    # Tightened from act8/gap3: mes_walk on Sierra bars (108 V16 trades May-Jun) = +101.5p
-                    # vs -10.8p, WR 50→61%, positive in BOTH months (May +70 / Jun +31) — locks the
-                    # near-target spike before fast reversals tag the real fill (fixes lid-4454 capture
-                    # leak: ES hit +9.8 then reversed in ~1min, real banked only +3). Revert: (8, 8, 3).
-                    "ES Absorption": (8, 6, 2),
-                    "SB Absorption": (12, 20, 10),
-                    "SB10 Absorption": (12, 20, 10),
-                    "SB2 Absorption": (12, 20, 10),
-                    "Delta Absorption": (8, None, 8),
-                    "BofA Scalp": (r.get("bofa_stop_level") or 10, None, None),
-                }
-                _tp = _tp_lookup.get(setup_name, (None, None, None))
-                insert_params["trail_sl"] = _tp[0]
-                insert_params["trail_activation"] = _tp[1]
-                insert_params["trail_gap"] = _tp[2]
-                insert_params["v13_gex_above"] = _v13_gex_magnet_above()
-                insert_params["v13_dd_near"] = _v13_dd_magnet_near()
-                _vanna_cliff, _vanna_peak = _v13_vanna_features()
-                insert_params["vanna_cliff_side"] = _vanna_cliff
-                insert_params["vanna_peak_side"] = _vanna_peak
-                # V16-SB (2026-06-16): stamp tech-basket %-from-open at signal time so the
-                # live filter reads a frozen value (not a live re-read at place time).
-                insert_params["basket_pct"] = _compute_basket_pct()
-                r["basket_pct"] = insert_params["basket_pct"]
-                # Auto-populate comments and abs_details for ES/SB2 Absorption
-                if setup_name in ("ES Absorption", "SB Absorption", "SB10 Absorption", "SB2 Absorption", "Delta Absorption") and not insert_params.get("comments"):
-                    _parts = [
-                        f"Vol {r.get('abs_vol_ratio', 0):.1f}x",
-                        f"Div {r.get('div_raw', 0)}/4",
-                    ]
-                    if r.get("dd_raw"):
-                        _parts.append(f"DD: {r.get('dd_hedging', '')}")
-                    if r.get("para_raw"):
-                        _parts.append(f"Para: {r.get('paradigm', '')}")
-                    if r.get("lis_raw") and r.get("lis_val") is not None:
-                        _parts.append(f"LIS: {r['lis_val']:.0f} ({r.get('lis_dist', 0):.0f}pt)")
-                    insert_params["comments"] = " | ".join(_parts)
-                    insert_params["abs_details"] = json.dumps({
-                        "bar_idx": r.get("bar_idx"),
-                        "vol_ratio": r.get("abs_vol_ratio"),
-                        "div_raw": r.get("div_raw"),
-                        "vol_raw": r.get("vol_raw"),
-                        "dd_raw": r.get("dd_raw"),
-                        "para_raw": r.get("para_raw"),
-                        "lis_raw": r.get("lis_raw"),
-                        "lookback": r.get("lookback"),
-                    })
-                # vanna_regime (VPB-Bull V3, Apr 22 2026): "bullish"/"bearish"/"mixed"
-                # Only populated for VPB signals — other setups pass None
-                insert_params["vanna_regime"] = r.get("vanna_regime")
-                result = conn.execute(text("""
-                    INSERT INTO setup_log
-                        (setup_name, direction, grade, score, paradigm, spot, lis, target,
-                         max_plus_gex, max_minus_gex, gap_to_lis, upside, rr_ratio,
-                         first_hour, support_score, upside_score, floor_cluster_score,
-                         target_cluster_score, rr_score, notified,
-                         bofa_stop_level, bofa_target_level, bofa_lis_width, bofa_max_hold_minutes, lis_upper,
-                         abs_vol_ratio, abs_es_price, vix, comments, abs_details,
-                         vanna_all, vanna_weekly, vanna_monthly, spot_vol_beta, greek_alignment,
-                         charm_limit_entry, overvix,
-                         trail_sl, trail_activation, trail_gap,
-                         v13_gex_above, v13_dd_near,
-                         vanna_cliff_side, vanna_peak_side, vanna_regime,
-                         vix3m, vix_vix3m_ratio, basket_pct)
-                    VALUES
-                        (:setup_name, :direction, :grade, :score, :paradigm, :spot, :lis, :target,
-                         :max_plus_gex, :max_minus_gex, :gap_to_lis, :upside, :rr_ratio,
-                         :first_hour, :support_score, :upside_score, :floor_cluster_score,
-                         :target_cluster_score, :rr_score, TRUE,
-                         :bofa_stop_level, :bofa_target_level, :bofa_lis_width, :bofa_max_hold_minutes, :lis_upper_val,
-                         :abs_vol_ratio, :abs_es_price, :vix, :comments, :abs_details,
-                         :vanna_all, :vanna_weekly, :vanna_monthly, :spot_vol_beta, :greek_alignment,
-                         :charm_limit_entry, :overvix,
-                         :trail_sl, :trail_activation, :trail_gap,
-                         :v13_gex_above, :v13_dd_near,
-                         :vanna_cliff_side, :vanna_peak_side, :vanna_regime,
-                         :vix3m, :vix_vix3m_ratio, :basket_pct)
-                    RETURNING id
-                """), insert_params)
-                log_id = result.fetchone()[0]
-                _current_setup_log[setup_name] = log_id
-                print(f"[setups] logged new setup id={log_id}", flush=True)
-            else:
-                # UPDATE existing row (grade_upgrade or gap_improvement)
-                log_id = _current_setup_log[setup_name]
-                conn.execute(text("""
-                    UPDATE setup_log SET
-                        grade = :grade, score = :score, spot = :spot,
-                        gap_to_lis = :gap_to_lis, upside = :upside, rr_ratio = :rr_ratio,
-                        support_score = :support_score, upside_score = :upside_score,
-                        floor_cluster_score = :floor_cluster_score, target_cluster_score = :target_cluster_score,
-                        rr_score = :rr_score, vix = :vix, ts = NOW()
-                    WHERE id = :log_id
-                """), {**r, "log_id": log_id, "vix": _vix_last})
-                print(f"[setups] updated setup id={log_id} ({reason})", flush=True)
-    except Exception as e:
-        print(f"[setups] failed to log: {e}", flush=True)
+    if reason in ("new", "reformed") or _current_setup_log.get(setup_name) is None:
+        # DEDUP: skip if same setup+direction inserted recently (deploy overlap guard)
+        # Once-per-day setups (Vanna Butterfly) use full-day dedup window
+        _dedup_interval = '1 day' if setup_name == 'Vanna Butterfly' else '90 seconds'
+        dup_check = conn.execute(text(f"""
+            SELECT id FROM setup_log
+            WHERE setup_name = :name AND direction = :dir
+              AND ts > NOW() - INTERVAL '{_dedup_interval}'
+            ORDER BY id DESC LIMIT 1
+        """), {"name": setup_name, "dir": r["direction"]}).first()
+        if dup_check:
+            _current_setup_log[setup_name] = dup_check[0]
+            print(f"[setups] {setup_name} DEDUP: skipped INSERT, existing id={dup_check[0]}", flush=True)
+            return None
 
-def send_telegram_setups(message: str) -> bool:
-    """Send a message to the setups Telegram channel (falls back to main channel)."""
+        # INSERT new row
+        insert_params = dict(r)
+        # BofA Scalp extra columns (NULL for GEX/AG/Absorption)
+        insert_params.setdefault("bofa_stop_level", r.get("bofa_stop_level"))
+        insert_params.setdefault("bofa_target_level", r.get("bofa_target_level"))
+        insert_params.setdefault("bofa_lis_width", r.get("bofa_lis_width"))
+        insert_params.setdefault("bofa_max_hold_minutes", r.get("bofa_max_hold_minutes"))
+        insert_params["lis_upper_val"] = r.get("lis_upper")
+        # Absorption extra columns (NULL for other setups)
+        insert_params.setdefault("abs_vol_ratio", r.get("abs_vol_ratio"))
+        insert_params.setdefault("abs_es_price", r.get("abs_es_price"))
+        insert_params["vix"] = _vix_last
+        insert_params.setdefault("comments", None)
+        insert_params.setdefault("abs_details", None)
+        # Greek context columns
+        insert_params.setdefault("vanna_all", None)
+        insert_params.setdefault("vanna_weekly", None)
+        insert_params.setdefault("vanna_monthly", None)
+        insert_params.setdefault("spot_vol_beta", None)
+        insert_params.setdefault("greek_alignment", None)
+        # Charm S/R limit entry
+        insert_params.setdefault("charm_limit_entry", None)
+        # Ensure all required bind params exist (some setups don't produce all fields)
+        for _req_key in ("target", "lis", "paradigm", "max_plus_gex", "max_minus_gex",
+                         "gap_to_lis", "upside", "rr_ratio", "first_hour",
+                         "support_score", "upside_score", "floor_cluster_score",
+                         "target_cluster_score", "rr_score"):
+            insert_params.setdefault(_req_key, None)
+        # Overvix (VIX - VIX3M) — V8 Smart VIX Gate
+        insert_params["overvix"] = _overvix
+        # VIX3M + VIX/VIX3M ratio — Discord-pro regime metric (Apollo: <0.83 trim longs, <0.80 long-short-vol)
+        insert_params["vix3m"] = _vix3m_last
+        try:
+            insert_params["vix_vix3m_ratio"] = (
+                float(_vix_last) / float(_vix3m_last)
+                if _vix_last and _vix3m_last and _vix3m_last > 0 else None
+            )
+        except Exception:
+            insert_params["vix_vix3m_ratio"] = None
+        # Trail params snapshot — for clean backtesting (no era guessing)
+        from app.setup_detector import is_gex_long_v3_enabled as _v3_on
+        _gex_long_tp_tuple = (14, 15, 5) if _v3_on() else (8, 10, 5)
+        _tp_lookup = {
+            "DD Exhaustion": (12, 20, 5),
+            "GEX Long": _gex_long_tp_tuple,
+            "GEX Velocity": (8, 10, 5),
+            "AG Short": (14, 12, 5),
+            "Skew Charm": (14, 10, 5),
+            # ES Absorption: SL8 + trail act=6 gap=2, no fixed target (2026-06-29).
+            # Tightened from act8/gap3: mes_walk on Sierra bars (108 V16 trades May-Jun) = +101.5p
+            # vs -10.8p, WR 50→61%, positive in BOTH months (May +70 / Jun +31) — locks the
+            # near-target spike before fast reversals tag the real fill (fixes lid-4454 capture
+            # leak: ES hit +9.8 then reversed in ~1min, real banked only +3). Revert: (8, 8, 3).
+            "ES Absorption": (8, 6, 2),
+            "SB Absorption": (12, 20, 10),
+            "SB10 Absorption": (12, 20, 10),
+            "SB2 Absorption": (12, 20, 10),
+            "Delta Absorption": (8, None, 8),
+            "BofA Scalp": (r.get("bofa_stop_level") or 10, None, None),
+        }
+        _tp = _tp_lookup.get(setup_name, (None, None, None))
+        insert_params["trail_sl"] = _tp[0]
+        insert_params["trail_activation"] = _tp[1]
+        insert_params["trail_gap"] = _tp[2]
+        insert_params["v13_gex_above"] = _v13_gex_magnet_above()
+        insert_params["v13_dd_near"] = _v13_dd_magnet_near()
+        _vanna_cliff, _vanna_peak = _v13_vanna_features()
+        insert_params["vanna_cliff_side"] = _vanna_cliff
+        insert_params["vanna_peak_side"] = _vanna_peak
+        # V16-SB (2026-06-16): stamp tech-basket %-from-open at signal time so the
+        # live filter reads a frozen value (not a live re-read at place time).
+        insert_params["basket_pct"] = _compute_basket_pct()
+        r["basket_pct"] = insert_params["basket_pct"]
+        # Auto-populate comments and abs_details for ES/SB2 Absorption
+        if setup_name in ("ES Absorption", "SB Absorption", "SB10 Absorption", "SB2 Absorption", "Delta Absorption") and not insert_params.get("comments"):
+            _parts = [
+                f"Vol {r.get('abs_vol_ratio', 0):.1f}x",
+                f"Div {r.get('div_raw', 0)}/4",
+            ]
+            if r.get("dd_raw"):
+                _parts.append(f"DD: {r.get('dd_hedging', '')}")
+            if r.get("para_raw"):
+                _parts.append(f"Para: {r.get('paradigm', '')}")
+            if r.get("lis_raw") and r.get("lis_val") is not None:
+                _parts.append(f"LIS: {r['lis_val']:.0f} ({r.get('lis_dist', 0):.0f}pt)")
+            insert_params["comments"] = " | ".join(_parts)
+            insert_params["abs_details"] = json.dumps({
+                "bar_idx": r.get("bar_idx"),
+                "vol_ratio": r.get("abs_vol_ratio"),
+                "div_raw": r.get("div_raw"),
+                "vol_raw": r.get("vol_raw"),
+                "dd_raw": r.get("dd_raw"),
+                "para_raw": r.get("para_raw"),
+                "lis_raw": r.get("lis_raw"),
+                "lookback": r.get("lookback"),
+            })
+        # vanna_regime (VPB-Bull V3, Apr 22 2026): "bullish"/"bearish"/"mixed"
+        # Only populated for VPB signals — other setups pass None
+        insert_params["vanna_regime"] = r.get("vanna_regime")
+        insert_params["volland_age_s"] = _volland_data_age_s()
+        insert_params["volland_snapshot_id"] = _volland_data_cache.get("snapshot_id")
+        result = conn.execute(text("""
+            INSERT INTO setup_log
+                (setup_name, direction, grade, score, paradigm, spot, lis, target,
+                 max_plus_gex, max_minus_gex, gap_to_lis, upside, rr_ratio,
+                 first_hour, support_score, upside_score, floor_cluster_score,
+                 target_cluster_score, rr_score, notified,
+                 bofa_stop_level, bofa_target_level, bofa_lis_width, bofa_max_hold_minutes, lis_upper,
+                 abs_vol_ratio, abs_es_price, vix, comments, abs_details,
+                 vanna_all, vanna_weekly, vanna_monthly, spot_vol_beta, greek_alignment,
+                 charm_limit_entry, overvix,
+                 trail_sl, trail_activation, trail_gap,
+                 v13_gex_above, v13_dd_near,
+                 vanna_cliff_side, vanna_peak_side, vanna_regime,
+                 vix3m, vix_vix3m_ratio, basket_pct,
+                 volland_age_s, volland_snapshot_id)
+            VALUES
+                (:setup_name, :direction, :grade, :score, :paradigm, :spot, :lis, :target,
+                 :max_plus_gex, :max_minus_gex, :gap_to_lis, :upside, :rr_ratio,
+                 :first_hour, :support_score, :upside_score, :floor_cluster_score,
+                 :target_cluster_score, :rr_score, TRUE,
+                 :bofa_stop_level, :bofa_target_level, :bofa_lis_width, :bofa_max_hold_minutes, :lis_upper_val,
+                 :abs_vol_ratio, :abs_es_price, :vix, :comments, :abs_details,
+                 :vanna_all, :vanna_weekly, :vanna_monthly, :spot_vol_beta, :greek_alignment,
+                 :charm_limit_entry, :overvix,
+                 :trail_sl, :trail_activation, :trail_gap,
+                 :v13_gex_above, :v13_dd_near,
+                 :vanna_cliff_side, :vanna_peak_side, :vanna_regime,
+                 :vix3m, :vix_vix3m_ratio, :basket_pct,
+                 :volland_age_s, :volland_snapshot_id)
+            RETURNING id, ts
+        """), insert_params)
+        log_id, log_ts = result.fetchone()
+        _current_setup_log[setup_name] = log_id
+        print(f"[setups] logged new setup id={log_id}", flush=True)
+        return {**insert_params, "id": log_id, "ts": log_ts,
+                "outcome_result": None, "outcome_pnl": None}
+    else:
+        # UPDATE existing row (grade_upgrade or gap_improvement)
+        log_id = _current_setup_log[setup_name]
+        conn.execute(text("""
+            UPDATE setup_log SET
+                grade = :grade, score = :score, spot = :spot,
+                gap_to_lis = :gap_to_lis, upside = :upside, rr_ratio = :rr_ratio,
+                support_score = :support_score, upside_score = :upside_score,
+                floor_cluster_score = :floor_cluster_score, target_cluster_score = :target_cluster_score,
+                rr_score = :rr_score, vix = :vix, ts = NOW()
+            WHERE id = :log_id
+        """), {**r, "log_id": log_id, "vix": _vix_last})
+        print(f"[setups] updated setup id={log_id} ({reason})", flush=True)
+        return {"id": log_id, "update": True, "grade": r.get("grade"), "score": r.get("score"),
+                "spot": r.get("spot"), "vix": _vix_last}
+
+def send_telegram_setups(message: str, wait: bool = False) -> bool:
+    """Queue a message for the setups Telegram channel (falls back to main channel)."""
     chat_id = TELEGRAM_CHAT_ID_SETUPS or TELEGRAM_CHAT_ID
     if not TELEGRAM_BOT_TOKEN or not chat_id:
         print("[setups-tg] missing token or chat_id", flush=True)
         return False
-    try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        resp = requests.post(url, json={
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML"
-        }, timeout=10)
-        if resp.status_code == 200:
-            print(f"[setups-tg] sent: {message[:50]}...", flush=True)
-            _log_telegram("setups", message)
-            return True
-        else:
-            print(f"[setups-tg] error: {resp.status_code} {resp.text}", flush=True)
-            return False
-    except Exception as e:
-        print(f"[setups-tg] exception: {e}", flush=True)
-        return False
+    if wait:
+        return telegram_queue.send_now(chat_id, message)
+    return telegram_queue.enqueue(chat_id, message, channel="setups", tag="setups-tg")
 
 
 def send_telegram_stock_gex(message: str) -> bool:
-    """Send to stock GEX Telegram channel (falls back to setups, then main)."""
+    """Queue a message for the stock GEX Telegram channel (falls back to setups, then
+    main). Not recorded in telegram_alerts."""
     chat_id = TELEGRAM_CHAT_ID_STOCK_GEX or TELEGRAM_CHAT_ID_SETUPS or TELEGRAM_CHAT_ID
     if not TELEGRAM_BOT_TOKEN or not chat_id:
         return False
-    try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        resp = requests.post(url, json={
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML"
-        }, timeout=10)
-        if resp.status_code == 200:
-            print(f"[stock-gex-tg] sent: {message[:60]}...", flush=True)
-            return True
-        else:
-            print(f"[stock-gex-tg] error: {resp.status_code}", flush=True)
-            return False
-    except Exception as e:
-        print(f"[stock-gex-tg] exception: {e}", flush=True)
-        return False
+    return telegram_queue.enqueue(chat_id, message, tag="stock-gex-tg")
 
 
 def _json_load_maybe(v: Any) -> Any:
@@ -2370,12 +2575,8 @@ def db_volland_history(limit: int = 500) -> list[dict]:
         out.append({"ts": ts.isoformat() if hasattr(ts, "isoformat") else str(ts), "payload": payload})
     return out
 
-def db_volland_vanna_window(limit: int = 40) -> dict:
-    """
-    Returns latest 'limit' strikes centered on the current spot price.
-    Reads directly from volland_exposure_points (greek='charm').
-    Falls back to max-abs-charm strike if current_price is not available.
-    """
+def _volland_window(greek: str, expiration_option=vexp.ANY, limit: int = 40) -> tuple:
+    """(ts_utc, mid_strike, [(strike, value, rel)]) from the latest packed snapshot."""
     if not engine:
         raise RuntimeError("DATABASE_URL not set")
 
@@ -2383,258 +2584,126 @@ def db_volland_vanna_window(limit: int = 40) -> dict:
     if lim < 5: lim = 5
     if lim > 200: lim = 200
 
-    sql = text("""
-    WITH latest AS (
-      SELECT max(ts_utc) AS ts_utc
-      FROM volland_exposure_points
-      WHERE greek = 'charm'
-    ),
-    center AS (
-      SELECT COALESCE(
-        (SELECT v.current_price::numeric
-         FROM volland_exposure_points v
-         JOIN latest l ON v.ts_utc = l.ts_utc
-         WHERE v.greek = 'charm' AND v.current_price IS NOT NULL
-         LIMIT 1),
-        (SELECT v.strike::numeric
-         FROM volland_exposure_points v
-         JOIN latest l ON v.ts_utc = l.ts_utc
-         WHERE v.greek = 'charm'
-         ORDER BY abs(v.value::numeric) DESC
-         LIMIT 1)
-      ) AS mid_strike
-    ),
-    ranked AS (
-      SELECT
-        v.ts_utc,
-        v.strike::numeric AS strike,
-        v.value::numeric  AS vanna,
-        c.mid_strike,
-        (v.strike::numeric - c.mid_strike) AS rel,
-        ROW_NUMBER() OVER (
-          ORDER BY abs(v.strike::numeric - c.mid_strike), v.strike::numeric
-        ) AS rn
-      FROM volland_exposure_points v
-      JOIN latest l ON v.ts_utc = l.ts_utc
-      CROSS JOIN center c
-      WHERE v.greek = 'charm'
-    )
-    SELECT ts_utc, strike, vanna, mid_strike, rel
-    FROM ranked
-    WHERE rn <= :lim
-    ORDER BY strike;
-    """)
     with engine.begin() as conn:
-        rows = conn.execute(sql, {"lim": lim}).mappings().all()
+        snap = vexp.latest(conn, greek, expiration_option)
+    mid_strike, pts = vexp.window(snap, lim)
+    if not pts:
+        return None, None, []
+    return snap["ts_utc"], mid_strike, pts
 
+def db_volland_vanna_window(limit: int = 40) -> dict:
+    """
+    Returns latest 'limit' strikes centered on the current spot price.
+    Reads the latest charm snapshot (volland_exposure_snapshots).
+    Falls back to max-abs-charm strike if current_price is not available.
+    """
+    ts_utc, mid_strike, rows = _volland_window("charm", limit=limit)
     if not rows:
         return {"ts_utc": None, "mid_strike": None, "mid_vanna": None, "points": []}
 
-    ts_utc = rows[0]["ts_utc"]
-    mid_strike = rows[0]["mid_strike"]
-
-    pts = []
-    for r in rows:
-        pts.append({
-            "strike": float(r["strike"]) if r["strike"] is not None else None,
-            "vanna":  float(r["vanna"])  if r["vanna"]  is not None else None,
-            "rel":    float(r["rel"])    if r["rel"]    is not None else None,
-        })
-
     return {
         "ts_utc": ts_utc.isoformat() if hasattr(ts_utc, "isoformat") else str(ts_utc),
         "mid_strike": float(mid_strike) if mid_strike is not None else None,
         "mid_vanna": None,
-        "points": pts
+        "points": [{"strike": k, "vanna": v, "rel": rel} for k, v, rel in rows]
     }
 
 def db_volland_delta_decay_window(limit: int = 40) -> dict:
     """
     Returns latest 'limit' strikes centered on the current spot price.
-    Reads directly from volland_exposure_points (greek='deltaDecay').
+    Reads the latest deltaDecay snapshot (volland_exposure_snapshots).
     Falls back to max-abs-value strike if current_price is not available.
     """
-    if not engine:
-        raise RuntimeError("DATABASE_URL not set")
-
-    lim = int(limit)
-    if lim < 5: lim = 5
-    if lim > 200: lim = 200
-
-    sql = text("""
-    WITH latest AS (
-      SELECT max(ts_utc) AS ts_utc
-      FROM volland_exposure_points
-      WHERE greek = 'deltaDecay'
-    ),
-    center AS (
-      SELECT COALESCE(
-        (SELECT v.current_price::numeric
-         FROM volland_exposure_points v
-         JOIN latest l ON v.ts_utc = l.ts_utc
-         WHERE v.greek = 'deltaDecay' AND v.current_price IS NOT NULL
-         LIMIT 1),
-        (SELECT v.strike::numeric
-         FROM volland_exposure_points v
-         JOIN latest l ON v.ts_utc = l.ts_utc
-         WHERE v.greek = 'deltaDecay'
-         ORDER BY abs(v.value::numeric) DESC
-         LIMIT 1)
-      ) AS mid_strike
-    ),
-    ranked AS (
-      SELECT
-        v.ts_utc,
-        v.strike::numeric AS strike,
-        v.value::numeric  AS delta_decay,
-        c.mid_strike,
-        (v.strike::numeric - c.mid_strike) AS rel,
-        ROW_NUMBER() OVER (
-          ORDER BY abs(v.strike::numeric - c.mid_strike), v.strike::numeric
-        ) AS rn
-      FROM volland_exposure_points v
-      JOIN latest l ON v.ts_utc = l.ts_utc
-      CROSS JOIN center c
-      WHERE v.greek = 'deltaDecay'
-    )
-    SELECT ts_utc, strike, delta_decay, mid_strike, rel
-    FROM ranked
-    WHERE rn <= :lim
-    ORDER BY strike;
-    """)
-    with engine.begin() as conn:
-        rows = conn.execute(sql, {"lim": lim}).mappings().all()
-
+    ts_utc, mid_strike, rows = _volland_window("deltaDecay", limit=limit)
     if not rows:
         return {"ts_utc": None, "mid_strike": None, "points": []}
 
-    ts_utc = rows[0]["ts_utc"]
-    mid_strike = rows[0]["mid_strike"]
-
-    pts = []
-    for r in rows:
-        pts.append({
-            "strike":      float(r["strike"])      if r["strike"]      is not None else None,
-            "delta_decay": float(r["delta_decay"])  if r["delta_decay"] is not None else None,
-            "rel":         float(r["rel"])          if r["rel"]         is not None else None,
-        })
-
     return {
         "ts_utc": ts_utc.isoformat() if hasattr(ts_utc, "isoformat") else str(ts_utc),
         "mid_strike": float(mid_strike) if mid_strike is not None else None,
-        "points": pts
+        "points": [{"strike": k, "delta_decay": v, "rel": rel} for k, v, rel in rows]
     }
 
 def db_volland_exposure_window(greek: str, expiration_option: str = None, limit: int = 40) -> dict:
     """
     Generic query: returns latest 'limit' strikes centered on spot for any
-    greek + expiration_option combo stored in volland_exposure_points.
+    greek + expiration_option combo stored in volland_exposure_snapshots.
     When expiration_option is None, does not filter by it (useful for 0DTE greeks).
     """
-    if not engine:
-        raise RuntimeError("DATABASE_URL not set")
-
-    lim = int(limit)
-    if lim < 5: lim = 5
-    if lim > 200: lim = 200
-
-    exp_filter = "AND expiration_option = :exp_option" if expiration_option else ""
-
-    sql = text(f"""
-    WITH latest AS (
-      SELECT max(ts_utc) AS ts_utc
-      FROM volland_exposure_points
-      WHERE greek = :greek {exp_filter}
-    ),
-    center AS (
-      SELECT COALESCE(
-        (SELECT v.current_price::numeric
-         FROM volland_exposure_points v
-         JOIN latest l ON v.ts_utc = l.ts_utc
-         WHERE v.greek = :greek {exp_filter}
-               AND v.current_price IS NOT NULL
-         LIMIT 1),
-        (SELECT v.strike::numeric
-         FROM volland_exposure_points v
-         JOIN latest l ON v.ts_utc = l.ts_utc
-         WHERE v.greek = :greek {exp_filter}
-         ORDER BY abs(v.value::numeric) DESC
-         LIMIT 1)
-      ) AS mid_strike
-    ),
-    ranked AS (
-      SELECT
-        v.ts_utc,
-        v.strike::numeric AS strike,
-        v.value::numeric  AS value,
-        c.mid_strike,
-        (v.strike::numeric - c.mid_strike) AS rel,
-        ROW_NUMBER() OVER (
-          ORDER BY abs(v.strike::numeric - c.mid_strike), v.strike::numeric
-        ) AS rn
-      FROM volland_exposure_points v
-      JOIN latest l ON v.ts_utc = l.ts_utc
-      CROSS JOIN center c
-      WHERE v.greek = :greek {exp_filter}
-    )
-    SELECT ts_utc, strike, value, mid_strike, rel
-    FROM ranked
-    WHERE rn <= :lim
-    ORDER BY strike;
-    """)
-    params = {"greek": greek, "lim": lim}
-    if expiration_option:
-        params["exp_option"] = expiration_option
-    with engine.begin() as conn:
-        rows = conn.execute(sql, params).mappings().all()
-
+    ts_utc, mid_strike, rows = _volland_window(
+        greek, expiration_option if expiration_option else vexp.ANY, limit)
     if not rows:
         return {"ts_utc": None, "mid_strike": None, "points": []}
 
-    ts_utc = rows[0]["ts_utc"]
-    mid_strike = rows[0]["mid_strike"]
-
-    pts = []
-    for r in rows:
-        pts.append({
-            "strike": float(r["strike"]) if r["strike"] is not None else None,
-            "value":  float(r["value"])  if r["value"]  is not None else None,
-            "rel":    float(r["rel"])    if r["rel"]    is not None else None,
-        })
-
     return {
         "ts_utc": ts_utc.isoformat() if hasattr(ts_utc, "isoformat") else str(ts_utc),
         "mid_strike": float(mid_strike) if mid_strike is not None else None,
-        "points": pts
+        "points": [{"strike": k, "value": v, "rel": rel} for k, v, rel in rows]
     }
 
-# ====== Volland Data Cache (90s TTL) ======
-# Replaces 8 individual DB queries per cycle with 2 batched queries every 90s.
-_VOLLAND_CACHE_TTL = 90  # seconds — Volland refreshes every 120s
-_volland_data_cache: dict = {"ts": 0.0}
+# ====== Volland Data Cache (event-driven, TTL fallback) ======
+# Replaces 8 individual DB queries per cycle with 2 batched queries per Volland cycle.
+# The workers NOTIFY on every new snapshot (app/volland_notify.py) and the listener
+# refreshes the cache right then — once per Volland cycle, nothing in between. The 90s
+# TTL only applies while the listener is down.
+_VOLLAND_CACHE_TTL = 90  # seconds — fallback only; Volland refreshes every 120s
+_volland_data_cache: dict = {"ts": 0.0}
+_volland_cache_lock = Lock()
+
+def _on_volland_snapshot(payload: dict | None):
+    """volland_notify handler: refresh unless the cache already holds this snapshot."""
+    if payload and payload.get("id") is not None \
+            and payload.get("id") == _volland_data_cache.get("snapshot_id"):
+        return
+    _refresh_volland_cache(force=True)
+    live_push.notify("volland")
+
+def _volland_data_age_s() -> float | None:
+    """Seconds since the Volland data the cache holds was produced (its lastModified,
+    else the snapshot insert time). None before the first refresh."""
+    ref = _volland_data_cache.get("data_ts") or _volland_data_cache.get("snapshot_ts")
+    if ref is None:
+        return None
+    return round(max(0.0, time.time() - ref.timestamp()), 1)
+
+def _refresh_volland_cache(force: bool = False) -> dict:
+    """Fetch all Volland data in 2 queries. Returns cached dict.
 
-def _refresh_volland_cache() -> dict:
-    """Fetch all Volland data in 2 queries, cache for 90s. Returns cached dict."""
+    force=True (the NOTIFY handler) always refreshes. Otherwise the cache is served as-is
+    while the listener is connected, and refreshed on the TTL when it is not."""
+    from app import volland_notify
     now_ts = time.time()
-    if now_ts - _volland_data_cache.get("ts", 0) < _VOLLAND_CACHE_TTL:
-        return _volland_data_cache  # cache hit
+    if not force and _volland_data_cache.get("ts", 0) > 0:
+        if volland_notify.listening():
+            return _volland_data_cache  # the listener keeps it current
+        if now_ts - _volland_data_cache["ts"] < _VOLLAND_CACHE_TTL:
+            return _volland_data_cache  # cache hit
 
     if not engine:
         return _volland_data_cache
+    with _volland_cache_lock:
+        return _refresh_volland_cache_locked(now_ts)
+
+def _refresh_volland_cache_locked(now_ts: float) -> dict:
+    if _volland_data_cache.get("ts", 0) >= now_ts:
+        return _volland_data_cache  # refreshed by the other thread while we waited
 
     # Query A: volland_snapshots — paradigm, LIS, target, DD, charm, SVB
     stats_result = {"paradigm": None, "target": None, "lines_in_sand": None}
     statistics_raw = {}
     spy_statistics_raw = {}
+    snap_meta = {"snapshot_id": None, "snapshot_ts": None, "data_ts": None}
     try:
         with engine.begin() as conn:
             snap_row = conn.execute(text("""
-                SELECT ts, payload FROM volland_snapshots
+                SELECT id, ts, data_ts, payload FROM volland_snapshots
                 WHERE payload->>'error_event' IS NULL
                   AND payload->'statistics' IS NOT NULL
                 ORDER BY ts DESC LIMIT 1
             """)).mappings().first()
         if snap_row:
+            snap_meta = {"snapshot_id": snap_row["id"], "snapshot_ts": snap_row["ts"],
+                         "data_ts": snap_row["data_ts"]}
             payload = _json_load_maybe(snap_row["payload"])
             if payload and isinstance(payload, dict):
                 statistics_raw = payload.get("statistics", {}) or {}
@@ -2645,7 +2714,7 @@ def _refresh_volland_cache() -> dict:
     except Exception as e:
         print(f"[volland-cache] snapshot query error: {e}", flush=True)
 
-    # Query B: volland_exposure_points — all vanna data in one query
+    # Query B: packed vanna snapshots — latest per expiration via the pointer table
     vanna_sums = {"ALL": None, "THIS_WEEK": None, "THIRTY_NEXT_DAYS": None}
     vanna_pin_strike = None
     vanna_pin_value = None
@@ -2653,26 +2722,13 @@ def _refresh_volland_cache() -> dict:
     vanna_levels = []
     try:
         with engine.begin() as conn:
-            rows = conn.execute(text("""
-                WITH latest_ts AS (
-                    SELECT expiration_option, MAX(ts_utc) AS ts_utc
-                    FROM volland_exposure_points
-                    WHERE greek = 'vanna'
-                      AND expiration_option IN ('ALL', 'THIS_WEEK', 'THIRTY_NEXT_DAYS', 'TODAY')
-                    GROUP BY expiration_option
-                )
-                SELECT vep.expiration_option, vep.strike, vep.value::float AS value
-                FROM volland_exposure_points vep
-                JOIN latest_ts l ON vep.expiration_option = l.expiration_option
-                                 AND vep.ts_utc = l.ts_utc
-                WHERE vep.greek = 'vanna'
-            """)).mappings().all()
+            snaps = vexp.latest_many(conn, "vanna", ("ALL", "THIS_WEEK", "THIRTY_NEXT_DAYS", "TODAY"))
 
         # Process into all needed forms
-        by_exp: dict[str, list] = {}
-        for r in rows:
-            exp_opt = r["expiration_option"]
-            by_exp.setdefault(exp_opt, []).append({"strike": float(r["strike"]), "value": float(r["value"])})
+        by_exp: dict[str, list] = {
+            exp_opt: [{"strike": k, "value": v} for k, v in vexp.points(snap)]
+            for exp_opt, snap in snaps.items()
+        }
 
         # Vanna sums (ALL, THIS_WEEK, THIRTY_NEXT_DAYS)
         for exp_key in ("ALL", "THIS_WEEK", "THIRTY_NEXT_DAYS"):
@@ -2718,6 +2774,7 @@ def _refresh_volland_cache() -> dict:
 
     _volland_data_cache.update({
         "ts": now_ts,
+        **snap_meta,
         "stats": stats_result,
         "statistics_raw": statistics_raw,
         "spy_statistics_raw": spy_statistics_raw,
@@ -2729,7 +2786,8 @@ def _refresh_volland_cache() -> dict:
         "vanna_pin_value": vanna_pin_value,
         "vanna_0dte_ratio": vanna_0dte_ratio,
     })
-    print(f"[volland-cache] refreshed: paradigm={stats_result.get('paradigm')} "
+    print(f"[volland-cache] refreshed: snapshot={snap_meta['snapshot_id']} "
+          f"age={_volland_data_age_s()}s paradigm={stats_result.get('paradigm')} "
           f"vanna_all={vanna_sums['ALL']} levels={len(vanna_levels)}", flush=True)
     return _volland_data_cache
 
@@ -2753,17 +2811,9 @@ def _get_vanna_sum(expiration_option: str = "ALL") -> float | None:
     if not engine:
         return None
     try:
-        sql = text("""
-            SELECT SUM(value::numeric)::float as total
-            FROM volland_exposure_points
-            WHERE greek = 'vanna'
-              AND expiration_option = :exp
-              AND ts_utc = (SELECT MAX(ts_utc) FROM volland_exposure_points
-                           WHERE greek = 'vanna' AND expiration_option = :exp)
-        """)
         with engine.begin() as conn:
-            r = conn.execute(sql, {"exp": expiration_option}).mappings().first()
-        return float(r["total"]) if r and r["total"] is not None else None
+            snap = vexp.latest(conn, "vanna", expiration_option)
+        return float(sum(snap["vals"])) if snap and snap["vals"] else None
     except Exception as e:
         print(f"[vanna] query error ({expiration_option}): {e}", flush=True)
         return None
@@ -2784,31 +2834,14 @@ def _get_dominant_vanna_levels(min_pct: float = 12.0) -> list:
     if not engine:
         return []
     try:
-        sql = text("""
-            WITH latest AS (
-                SELECT expiration_option, MAX(ts_utc) AS ts
-                FROM volland_exposure_points
-                WHERE greek = 'vanna'
-                  AND expiration_option IN ('THIS_WEEK', 'THIRTY_NEXT_DAYS')
-                GROUP BY expiration_option
-            )
-            SELECT vep.strike, vep.value::float AS value, vep.expiration_option AS timeframe
-            FROM volland_exposure_points vep
-            JOIN latest l ON vep.expiration_option = l.expiration_option AND vep.ts_utc = l.ts
-            WHERE vep.greek = 'vanna'
-        """)
         with engine.begin() as conn:
-            rows = conn.execute(sql).mappings().all()
-        if not rows:
+            snaps = vexp.latest_many(conn, "vanna", ("THIS_WEEK", "THIRTY_NEXT_DAYS"))
+        if not snaps:
             return []
 
         # Group by timeframe, compute total and per-strike pct
-        by_tf = {}
-        for r in rows:
-            tf = r["timeframe"]
-            if tf not in by_tf:
-                by_tf[tf] = []
-            by_tf[tf].append({"strike": float(r["strike"]), "value": float(r["value"])})
+        by_tf = {tf: [{"strike": k, "value": v} for k, v in vexp.points(snap)]
+                 for tf, snap in snaps.items()}
 
         levels = []
         strike_tfs = {}  # track which strikes appear in which timeframes
@@ -2995,33 +3028,15 @@ def ts_access_token() -> str:
     print("[auth] token refreshed; expires_in:", tok.get("expires_in"), flush=True)
     return _access_token
 
-# Shared HTTP session for TS API — connection pooling with periodic refresh
-_ts_http_session: requests.Session | None = None
-_ts_http_session_created: float = 0.0
-_TS_SESSION_MAX_AGE = 1800  # refresh session every 30 min to prevent stale connections
-
-def _get_ts_session() -> requests.Session:
-    """Get or create the shared TS API HTTP session. Recreated every 30 min."""
-    global _ts_http_session, _ts_http_session_created
-    now = time.time()
-    if _ts_http_session is None or (now - _ts_http_session_created) > _TS_SESSION_MAX_AGE:
-        if _ts_http_session is not None:
-            try:
-                _ts_http_session.close()
-            except Exception:
-                pass
-        _ts_http_session = requests.Session()
-        _ts_http_session_created = now
-        print(f"[http] new TS API session (age limit {_TS_SESSION_MAX_AGE}s)", flush=True)
-    return _ts_http_session
-
-def api_get(path, params=None, stream=False, timeout=10):
+def api_get(path, params=None, stream=False, timeout=10, lane="data"):
+    """GET {BASE}{path} through the shared TS client (app/ts_client.py) in `lane` —
+    "data" for the market cycle, "bulk" for the scanners (handed a partial)."""
     # Use (connect_timeout, read_timeout) tuple — prevents hanging on stale TCP connections
     if isinstance(timeout, (int, float)):
         timeout = (5, timeout)  # 5s connect, original value as read timeout
-    sess = _get_ts_session()
     def do_req(h):
-        return sess.get(f"{BASE}{path}", headers=h, params=params or {}, timeout=timeout, stream=stream)
+        return ts_client.request("GET", f"{BASE}{path}", lane=lane, headers=h,
+                                 params=params or {}, timeout=timeout, stream=stream)
     token = ts_access_token()
     headers = {"Authorization": f"Bearer {token}"}
     r = do_req(headers)
@@ -3042,6 +3057,9 @@ def api_get(path, params=None, stream=False, timeout=10):
         raise RuntimeError(f"GET {path} [{r.status_code}] {r.text[:300]}")
     return r
 
+# Scanners / monitoring captures: lowest-priority rate-limiter lane
+api_get_bulk = partial(api_get, lane="bulk")
+
 # ====== Time helpers ======
 def now_et():
     return datetime.now(NY)
@@ -3057,8 +3075,12 @@ def market_open_now() -> bool:
 
 # ====== TS helpers ======
 def _get_es_price_fallback() -> float | None:
-    """REST fallback for ES price when quote stream is dead.
-    Single API call to TS /marketdata/quotes/@ES. Rate limit: 250/5min."""
+    """ES price when the range-bar tape has no last trade: the shared @ES quote feed
+    while its stream is up, else a single REST call to TS /marketdata/quotes/@ES
+    (rate limit: 250/5min)."""
+    px = quote_feed.last("@ES")
+    if px:
+        return px
     try:
         js = api_get("/marketdata/quotes/%40ES", timeout=5).json()
         for q in js.get("Quotes", []):
@@ -3204,8 +3226,45 @@ def _consume_chain_stream(r, max_seconds: float) -> list[dict]:
         print(f"[stream] completed normally with {len(out)} items in {time.time()-start:.1f}s", flush=True)
     return out
 
+def _chain_item_row(it: dict) -> dict:
+    """One raw TS chain item (stream or snapshot) -> get_chain_rows() row dict."""
+    legs = it.get("Legs") or []
+    leg0 = legs[0] if legs else {}
+    side = (leg0.get("OptionType") or it.get("OptionType") or "").lower()
+    side = "C" if side.startswith("c") else "P" if side.startswith("p") else "?"
+    return {
+        "Type": side,
+        "Strike": _fnum(leg0.get("StrikePrice")),
+        "Bid": _fnum(it.get("Bid")), "Ask": _fnum(it.get("Ask")), "Last": _fnum(it.get("Last")),
+        "BidSize": it.get("BidSize"), "AskSize": it.get("AskSize"),
+        "Delta": _fnum(it.get("Delta") or it.get("TheoDelta")),
+        "Gamma": _fnum(it.get("Gamma") or it.get("TheoGamma")),
+        "Theta": _fnum(it.get("Theta") or it.get("TheoTheta")),
+        "IV": _fnum(it.get("ImpliedVolatility") or it.get("TheoIV")),
+        "Vega": _fnum(it.get("Vega")),
+        "Volume": _fnum(it.get("TotalVolume") or it.get("Volume")),
+        "OpenInterest": it.get("OpenInterest") or it.get("DailyOpenInterest"),
+    }
+
+_last_chain_source = None  # "book" | "stream-oneshot" | "snapshot" — shown in [timing]
+
 def get_chain_rows(exp_ymd: str, spot: float, symbol: str = "$SPXW.X",
-                    strike_interval: int = 5, strike_proximity: int = 125) -> list[dict]:
+                    strike_interval: int = 5, strike_proximity: int = 125,
+                    own_book: bool = False) -> list[dict]:
+    global _last_chain_source
+    # Persistent chain book (app/chain_stream.py) — a consistent in-memory snapshot with no
+    # network wait. Only the SPX/SPY cycle passes own_book=True and drives the book; other
+    # callers are served only when their (exp, interval, proximity) match it. Whenever the
+    # book didn't serve, fall back to the one-shot stream (the snapshot endpoint 404s for SPY).
+    try:
+        from app import chain_stream
+        rows = chain_stream.get_rows(symbol, exp_ymd, spot, strike_interval, strike_proximity,
+                                     own=own_book)
+        if rows:
+            _last_chain_source = "book"
+            return rows
+    except Exception as e:
+        print(f"[chain-stream] read failed, falling back: {e}", flush=True)
     encoded = symbol.replace("$", "%24")
     params_stream = {
         "spreadType": "Single",
@@ -3222,26 +3281,9 @@ def get_chain_rows(exp_ymd: str, spot: float, symbol: str = "$SPXW.X",
             r = api_get(f"/marketdata/stream/options/chains/{encoded}", params=p, stream=True, timeout=8)
             objs = _consume_chain_stream(r, max_seconds=STREAM_SECONDS)
             if objs:
-                rows = []
-                for it in objs:
-                    legs = it.get("Legs") or []
-                    leg0 = legs[0] if legs else {}
-                    side = (leg0.get("OptionType") or it.get("OptionType") or "").lower()
-                    side = "C" if side.startswith("c") else "P" if side.startswith("p") else "?"
-                    rows.append({
-                        "Type": side,
-                        "Strike": _fnum(leg0.get("StrikePrice")),
-                        "Bid": _fnum(it.get("Bid")), "Ask": _fnum(it.get("Ask")), "Last": _fnum(it.get("Last")),
-                        "BidSize": it.get("BidSize"), "AskSize": it.get("AskSize"),
-                        "Delta": _fnum(it.get("Delta") or it.get("TheoDelta")),
-                        "Gamma": _fnum(it.get("Gamma") or it.get("TheoGamma")),
-                        "Theta": _fnum(it.get("Theta") or it.get("TheoTheta")),
-                        "IV": _fnum(it.get("ImpliedVolatility") or it.get("TheoIV")),
-                        "Vega": _fnum(it.get("Vega")),
-                        "Volume": _fnum(it.get("TotalVolume") or it.get("Volume")),
-                        "OpenInterest": it.get("OpenInterest") or it.get("DailyOpenInterest"),
-                    })
+                rows = [_chain_item_row(it) for it in objs]
                 if rows:
+                    _last_chain_source = "stream-oneshot"
                     return rows
         except Exception as e:
             last_err = e
@@ -3260,26 +3302,9 @@ def get_chain_rows(exp_ymd: str, spot: float, symbol: str = "$SPXW.X",
         try:
             p = dict(params_snap); p["expiration"] = exp
             js = api_get("/marketdata/options/chains", params=p, timeout=12).json()
-            rows = []
-            for it in js.get("Options", []):
-                legs = it.get("Legs") or []
-                leg0 = legs[0] if legs else {}
-                side = (leg0.get("OptionType") or it.get("OptionType") or "").lower()
-                side = "C" if side.startswith("c") else "P" if side.startswith("p") else "?"
-                rows.append({
-                    "Type": side,
-                    "Strike": _fnum(leg0.get("StrikePrice")),
-                    "Bid": _fnum(it.get("Bid")), "Ask": _fnum(it.get("Ask")), "Last": _fnum(it.get("Last")),
-                    "BidSize": it.get("BidSize"), "AskSize": it.get("AskSize"),
-                    "Delta": _fnum(it.get("Delta") or it.get("TheoDelta")),
-                    "Gamma": _fnum(it.get("Gamma") or it.get("TheoGamma")),
-                    "Theta": _fnum(it.get("Theta") or it.get("TheoTheta")),
-                    "IV": _fnum(it.get("ImpliedVolatility") or it.get("TheoIV")),
-                    "Vega": _fnum(it.get("Vega")),
-                    "Volume": _fnum(it.get("TotalVolume") or it.get("Volume")),
-                    "OpenInterest": it.get("OpenInterest") or it.get("DailyOpenInterest"),
-                })
+            rows = [_chain_item_row(it) for it in js.get("Options", [])]
             if rows:
+                _last_chain_source = "snapshot"
                 return rows
         except Exception as e:
             last_err = e
@@ -3288,79 +3313,22 @@ def get_chain_rows(exp_ymd: str, spot: float, symbol: str = "$SPXW.X",
     raise RuntimeError(f"{symbol} chain fetch failed; last_err={last_err}")
 
 # ====== shaping ======
-CANONICAL_COLS = [
-    "C_Volume","C_OpenInterest","C_IV","C_Gamma","C_Delta","C_Bid","C_BidSize","C_Ask","C_AskSize","C_Last",
-    "Strike",
-    "P_Last","P_Ask","P_AskSize","P_Bid","P_BidSize","P_Delta","P_Gamma","P_IV","P_OpenInterest","P_Volume"
-]
+# Chain shaping lives in app/chain_columns.py: build_chain() pivots + centres the rows
+# straight into strike-sorted arrays (replaced to_side_by_side + pick_centered).
+from app.chain_columns import CANONICAL_COLS, ChainSnapshot, build_chain, pack as pack_chain, decode as decode_chain, decode_rows as decode_chain_rows
+
 DISPLAY_COLS = [
     "Volume","Open Int","IV","Gamma","Delta","BID","BID QTY","ASK","ASK QTY","LAST",
     "Strike",
     "LAST","ASK","ASK QTY","BID","BID QTY","Delta","Gamma","IV","Open Int","Volume"
 ]
 
-def to_side_by_side(rows: list[dict]) -> pd.DataFrame:
-    calls, puts = {}, {}
-    for r in rows:
-        if r.get("Strike") is None:
-            continue
-        (calls if r["Type"] == "C" else puts)[r["Strike"]] = r
-    strikes = sorted(set(calls) | set(puts))
-    recs = []
-    for k in strikes:
-        c, p = calls.get(k, {}), puts.get(k, {})
-        recs.append({
-            "C_Volume": c.get("Volume"), "C_OpenInterest": c.get("OpenInterest"), "C_IV": c.get("IV"),
-            "C_Gamma": c.get("Gamma"), "C_Delta": c.get("Delta"), "C_Bid": c.get("Bid"),
-            "C_BidSize": c.get("BidSize"), "C_Ask": c.get("Ask"), "C_AskSize": c.get("AskSize"),
-            "C_Last": c.get("Last"),
-            "Strike": k,
-            "P_Last": p.get("Last"), "P_Ask": p.get("Ask"), "P_AskSize": p.get("AskSize"),
-            "P_Bid": p.get("Bid"), "P_BidSize": p.get("BidSize"),
-            "P_Delta": p.get("Delta"), "P_Gamma": p.get("Gamma"), "P_IV": p.get("IV"),
-            "P_OpenInterest": p.get("OpenInterest"), "P_Volume": p.get("Volume"),
-        })
-    df = pd.DataFrame.from_records(recs, columns=CANONICAL_COLS)
-    if not df.empty:
-        df = df.sort_values("Strike").reset_index(drop=True)
-    return df
-
-def pick_centered(df: pd.DataFrame, spot: float, n: int) -> pd.DataFrame:
-    """
-    Select n strikes centered around spot: n/2 above and n/2 below.
-    Ensures balanced distribution above and below spot price.
-    """
-    if df is None or df.empty or not spot:
-        return df
-
-    half = n // 2  # 20 above, 20 below for n=40
-
-    # Split into above and below spot
-    above = df[df["Strike"] >= spot].sort_values("Strike").head(half)
-    below = df[df["Strike"] < spot].sort_values("Strike", ascending=False).head(half)
-
-    # Combine and sort by strike
-    result = pd.concat([below, above]).sort_values("Strike").reset_index(drop=True)
-
-    # If we don't have enough strikes on one side, take more from the other
-    if len(result) < n:
-        # Get strikes we already selected
-        selected_strikes = set(result["Strike"].tolist())
-        # Get remaining strikes sorted by distance from spot
-        remaining = df[~df["Strike"].isin(selected_strikes)]
-        remaining = remaining.iloc[(remaining["Strike"] - spot).abs().argsort()]
-        needed = n - len(result)
-        extra = remaining.head(needed)
-        result = pd.concat([result, extra]).sort_values("Strike").reset_index(drop=True)
-
-    return result
-
 # ====== jobs ======
 _MARKET_JOB_TIMEOUT = 90  # seconds — relaxed after Volland cache optimization
 
 def _run_market_job_inner():
     """Actual market job logic. Called from run_market_job with timeout wrapper."""
-    global latest_df, last_run_status, _spx_session, _spx_cycle_high, _spx_cycle_low, _vix_last, _vix3m_last, _overvix, _spx_data_ts, _spot_last
+    global latest_chain, last_run_status, _spx_session, _spx_cycle_high, _spx_cycle_low, _vix_last, _vix3m_last, _overvix, _spx_data_ts, _spot_last
     try:
         if not market_open_now():
             last_run_status = {"ts": fmt_et(now_et()), "ok": True, "msg": "outside market hours"}
@@ -3396,8 +3364,7 @@ def _run_market_job_inner():
         # Update IV Momentum tracker (needs per-strike IV from chain)
         if spot:
             try:
-                with _df_lock:
-                    _iv_chain = latest_df.copy() if latest_df is not None else None
+                _iv_chain = latest_chain
                 if _iv_chain is not None and not _iv_chain.empty:
                     from app.setup_detector import update_iv_momentum_tracker
                     update_iv_momentum_tracker(spot, _iv_chain)
@@ -3434,11 +3401,11 @@ def _run_market_job_inner():
         _t_pre_chain = time.time()
         exp  = get_0dte_exp()
         _t_exp = time.time()
-        rows = get_chain_rows(exp, spot)
+        rows = get_chain_rows(exp, spot, own_book=True)
         _t_chain = time.time()
         raw_count = len(rows)
-        df   = pick_centered(to_side_by_side(rows), spot, TARGET_STRIKES)
-        final_count = len(df)
+        chain = build_chain(rows, spot, TARGET_STRIKES, exp=exp)
+        final_count = len(chain)
 
         # Validate: reject incomplete data
         if final_count < MIN_REQUIRED_STRIKES:
@@ -3449,10 +3416,10 @@ def _run_market_job_inner():
                 "msg": f"INCOMPLETE: exp={exp} spot={round(spot or 0,2)} raw={raw_count} final={final_count} (min={MIN_REQUIRED_STRIKES})"
             }
             print("[pull] REJECTED - insufficient rows:", last_run_status["msg"], flush=True)
-            return  # Don't update latest_df with bad data
+            return  # Don't update latest_chain with bad data
 
         with _df_lock:
-            latest_df = df.copy()
+            latest_chain = chain
         _spx_data_ts = time.time()
         if spot:
             _spot_last = float(spot)  # live spot for fresh consumers (e.g. Dark Mate FW)
@@ -3477,7 +3444,7 @@ def _run_market_job_inner():
         _t_end = time.time()
         _total = _t_end - _t0
         # Always log timing breakdown so we can diagnose slow cycles
-        print(f"[timing] total={_total:.1f}s | quote={_t_quote - _t0:.1f}s exp={_t_exp - _t_pre_chain:.1f}s chain={_t_chain - _t_exp:.1f}s alerts={_t_alerts - _t_pre_alerts:.1f}s setups={_t_end - _t_alerts:.1f}s", flush=True)
+        print(f"[timing] total={_total:.1f}s | quote={_t_quote - _t0:.1f}s exp={_t_exp - _t_pre_chain:.1f}s chain={_t_chain - _t_exp:.1f}s ({_last_chain_source}) alerts={_t_alerts - _t_pre_alerts:.1f}s setups={_t_end - _t_alerts:.1f}s", flush=True)
     except Exception as e:
         last_run_status = {"ts": fmt_et(now_et()), "ok": False, "msg": f"error: {e}"}
         print("[pull] ERROR", e, flush=True)
@@ -3500,10 +3467,15 @@ def run_market_job():
         print(f"[watchdog] market job wrapper error: {e}", flush=True)
     finally:
         executor.shutdown(wait=False, cancel_futures=True)
+        # One push per cycle (open or closed). ES rides along as a backstop for the
+        # forming bar when the @ES quote listener is quiet (it notifies every
+        # live_push.ES_FORMING_SEC); Volland too while its NOTIFY listener is down.
+        from app import volland_notify
+        live_push.notify("series", "es", *(() if volland_notify.listening() else ("volland",)))
 
 def run_spy_market_job():
     """Fetch SPY options chain on same interval as SPX."""
-    global latest_spy_df, _last_spy_run_status, _spy_data_ts
+    global latest_spy_chain, _last_spy_run_status, _spy_data_ts
     try:
         if not market_open_now():
             _last_spy_run_status = {"ts": fmt_et(now_et()), "ok": True, "msg": "outside market hours"}
@@ -3517,10 +3489,10 @@ def run_spy_market_job():
 
         exp = get_0dte_exp(symbol="SPY")
         rows = get_chain_rows(exp, spy_spot, symbol="SPY",
-                              strike_interval=1, strike_proximity=25)
+                              strike_interval=1, strike_proximity=25, own_book=True)
         raw_count = len(rows)
-        df = pick_centered(to_side_by_side(rows), spy_spot, TARGET_STRIKES)
-        final_count = len(df)
+        chain = build_chain(rows, spy_spot, TARGET_STRIKES, exp=exp)
+        final_count = len(chain)
 
         if final_count < MIN_REQUIRED_STRIKES:
             _last_spy_run_status = {
@@ -3532,7 +3504,7 @@ def run_spy_market_job():
             return
 
         with _spy_df_lock:
-            latest_spy_df = df.copy()
+            latest_spy_chain = chain
         _spy_data_ts = time.time()
         _last_spy_run_status = {"ts": fmt_et(now_et()), "ok": True,
                                 "msg": f"exp={exp} spot={round(spy_spot,2)} rows={final_count}"}
@@ -3541,14 +3513,27 @@ def run_spy_market_job():
         _last_spy_run_status = {"ts": fmt_et(now_et()), "ok": False, "msg": f"error: {e}"}
         print("[spy-pull] ERROR", e, flush=True)
 
+# chain_snapshots storage format:
+#   dual   (default) — JSONB rows AND packed BYTEA; nothing downstream changes
+#   packed           — packed only, rows NULL (readers must go through decode_rows/decode)
+#   json             — legacy JSONB rows only
+CHAIN_SNAPSHOT_FORMAT = os.getenv("CHAIN_SNAPSHOT_FORMAT", "dual").strip().lower()
+
+
+def _chain_storage(chain: ChainSnapshot) -> dict:
+    """INSERT params for the rows/packed pair according to CHAIN_SNAPSHOT_FORMAT."""
+    rows = None if CHAIN_SNAPSHOT_FORMAT == "packed" else json.dumps(chain.to_rows())
+    packed = None if CHAIN_SNAPSHOT_FORMAT == "json" else pack_chain(chain)
+    return {"rows": rows, "packed": packed}
+
+
 def save_history_job():
     global _last_saved_at
     if not engine:
         return
-    with _df_lock:
-        if latest_df is None or latest_df.empty:
-            return
-        df_copy = latest_df.copy()
+    chain = latest_chain
+    if chain is None or chain.empty:
+        return
     if time.time() - _last_saved_at < 60:
         return
     # Freshness gate: skip if no new data since last save
@@ -3556,9 +3541,6 @@ def save_history_job():
         print("[save] skipped – no fresh SPX data since last save", flush=True)
         return
     try:
-        df = df_copy
-        df.columns = DISPLAY_COLS
-        payload = {"columns": df.columns.tolist(), "rows": df.fillna("").values.tolist()}
         msg = (last_run_status.get("msg") or "")
         spot = None; exp = None
         try:
@@ -3570,11 +3552,11 @@ def save_history_job():
         data_ts_val = datetime.fromtimestamp(_spx_data_ts, tz=NY) if _spx_data_ts > 0 else None
         with engine.begin() as conn:
             conn.execute(
-                text("INSERT INTO chain_snapshots (ts, exp, spot, vix, vix3m, overvix, data_ts, columns, rows) VALUES (:ts, :exp, :spot, :vix, :vix3m, :overvix, :data_ts, :columns, :rows)"),
+                text("INSERT INTO chain_snapshots (ts, exp, spot, vix, vix3m, overvix, data_ts, columns, rows, packed) VALUES (:ts, :exp, :spot, :vix, :vix3m, :overvix, :data_ts, :columns, :rows, :packed)"),
                 {"ts": now_et(), "exp": exp, "spot": spot, "vix": _vix_last,
                  "vix3m": _vix3m_last, "overvix": _overvix, "data_ts": data_ts_val,
-                 "columns": json.dumps(payload["columns"]),
-                 "rows": json.dumps(payload["rows"])}
+                 "columns": json.dumps(DISPLAY_COLS),
+                 **_chain_storage(chain)}
             )
         _last_saved_at = time.time()
         print("[save] snapshot inserted", flush=True)
@@ -3588,10 +3570,9 @@ def _save_spy_history():
     global _last_spy_saved_at
     if not engine:
         return
-    with _spy_df_lock:
-        if latest_spy_df is None or latest_spy_df.empty:
-            return
-        df_copy = latest_spy_df.copy()
+    chain = latest_spy_chain
+    if chain is None or chain.empty:
+        return
     if time.time() - _last_spy_saved_at < 60:
         return
     # Freshness gate: skip if no new data since last save
@@ -3599,9 +3580,6 @@ def _save_spy_history():
         print("[save] skipped – no fresh SPY data since last save", flush=True)
         return
     try:
-        df = df_copy
-        df.columns = DISPLAY_COLS
-        payload = {"columns": df.columns.tolist(), "rows": df.fillna("").values.tolist()}
         msg = (_last_spy_run_status.get("msg") or "")
         spot = None; exp = None
         try:
@@ -3613,11 +3591,11 @@ def _save_spy_history():
         data_ts_val = datetime.fromtimestamp(_spy_data_ts, tz=NY) if _spy_data_ts > 0 else None
         with engine.begin() as conn:
             conn.execute(
-                text("INSERT INTO spy_chain_snapshots (ts, exp, spot, vix3m, overvix, data_ts, columns, rows) VALUES (:ts, :exp, :spot, :vix3m, :overvix, :data_ts, :columns, :rows)"),
+                text("INSERT INTO spy_chain_snapshots (ts, exp, spot, vix3m, overvix, data_ts, columns, rows, packed) VALUES (:ts, :exp, :spot, :vix3m, :overvix, :data_ts, :columns, :rows, :packed)"),
                 {"ts": now_et(), "exp": exp, "spot": spot,
                  "vix3m": _vix3m_last, "overvix": _overvix, "data_ts": data_ts_val,
-                 "columns": json.dumps(payload["columns"]),
-                 "rows": json.dumps(payload["rows"])}
+                 "columns": json.dumps(DISPLAY_COLS),
+                 **_chain_storage(chain)}
             )
         _last_spy_saved_at = time.time()
         print("[save] SPY snapshot inserted", flush=True)
@@ -3638,10 +3616,9 @@ def save_playback_snapshot():
 
     try:
         # Get current series data (GEX, Volume)
-        with _df_lock:
-            if latest_df is None or latest_df.empty:
-                return
-            df = latest_df.copy()
+        chain = latest_chain
+        if chain is None or chain.empty:
+            return
 
         # Extract spot price
         msg = last_run_status.get("msg") or ""
@@ -3656,17 +3633,14 @@ def save_playback_snapshot():
             return
 
         # Calculate series data
-        sdf = df.sort_values("Strike")
-        strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float).tolist()
-        call_vol = pd.to_numeric(sdf["C_Volume"], errors="coerce").fillna(0.0).astype(float).tolist()
-        put_vol = pd.to_numeric(sdf["P_Volume"], errors="coerce").fillna(0.0).astype(float).tolist()
-        call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        call_gex = (c_gamma * call_oi * 100.0).astype(float)
-        put_gex = (-p_gamma * put_oi * 100.0).astype(float)
-        net_gex = (call_gex + put_gex).astype(float).tolist()
+        strikes = chain.strikes.tolist()
+        call_vol = chain.col0("C_Volume").tolist()
+        put_vol = chain.col0("P_Volume").tolist()
+        call_oi = chain.col0("C_OpenInterest")
+        put_oi = chain.col0("P_OpenInterest")
+        call_gex = chain.col0("C_Gamma") * call_oi * 100.0
+        put_gex = -chain.col0("P_Gamma") * put_oi * 100.0
+        net_gex = (call_gex + put_gex).tolist()
 
         # Get Charm data from Volland
         charm_data = None
@@ -3757,10 +3731,9 @@ def check_alerts():
 
     try:
         # Get current data
-        with _df_lock:
-            if latest_df is None or latest_df.empty:
-                return
-            df = latest_df.copy()
+        chain = latest_chain
+        if chain is None or chain.empty:
+            return
 
         # Get spot price
         msg = last_run_status.get("msg") or ""
@@ -3778,22 +3751,8 @@ def check_alerts():
         stats_result = db_volland_stats()
         stats = stats_result.get("stats", {}) if stats_result else {}
 
-        # Calculate GEX for max gamma levels
-        sdf = df.sort_values("Strike")
-        strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float)
-        call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        call_gex = (c_gamma * call_oi * 100.0)
-        put_gex = (-p_gamma * put_oi * 100.0)
-        net_gex = (call_gex + put_gex)
-
         # Find max +GEX and -GEX strikes
-        max_pos_idx = net_gex.idxmax() if not net_gex.empty else None
-        max_neg_idx = net_gex.idxmin() if not net_gex.empty else None
-        max_pos_gamma = strikes.loc[max_pos_idx] if max_pos_idx is not None else None
-        max_neg_gamma = strikes.loc[max_neg_idx] if max_neg_idx is not None else None
+        max_pos_gamma, max_neg_gamma = chain.max_gex_strikes()
 
         # Parse LIS and Target
         threshold = _alert_settings.get("threshold_points", 5)
@@ -3871,13 +3830,13 @@ def check_alerts():
 
         # Check volume spikes
         if _alert_settings.get("volume_spike_enabled"):
-            call_vol = pd.to_numeric(sdf["C_Volume"], errors="coerce").fillna(0.0).astype(float)
-            put_vol = pd.to_numeric(sdf["P_Volume"], errors="coerce").fillna(0.0).astype(float)
+            call_vol = chain.col0("C_Volume").tolist()
+            put_vol = chain.col0("P_Volume").tolist()
             vol_threshold = _alert_settings.get("threshold_volume", 500)
 
             current_volume = {}
-            for i, strike in enumerate(strikes):
-                current_volume[strike] = {"call": call_vol.iloc[i], "put": put_vol.iloc[i]}
+            for i, strike in enumerate(chain.strikes.tolist()):
+                current_volume[strike] = {"call": call_vol[i], "put": put_vol[i]}
 
             if _alert_state["last_volume"]:
                 for strike, vols in current_volume.items():
@@ -3937,22 +3896,11 @@ def send_summary_alert(time_label: str):
         stats = stats_result.get("stats", {}) if stats_result else {}
 
         # Get max gamma
-        with _df_lock:
-            if latest_df is not None and not latest_df.empty:
-                df = latest_df.copy()
-                sdf = df.sort_values("Strike")
-                strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float)
-                call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-                put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-                c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-                p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-                net_gex = (c_gamma * call_oi * 100.0) + (-p_gamma * put_oi * 100.0)
-                max_pos_idx = net_gex.idxmax() if not net_gex.empty else None
-                max_neg_idx = net_gex.idxmin() if not net_gex.empty else None
-                max_pos_gamma = strikes.loc[max_pos_idx] if max_pos_idx is not None else None
-                max_neg_gamma = strikes.loc[max_neg_idx] if max_neg_idx is not None else None
-            else:
-                max_pos_gamma, max_neg_gamma = None, None
+        chain = latest_chain
+        if chain is not None and not chain.empty:
+            max_pos_gamma, max_neg_gamma = chain.max_gex_strikes()
+        else:
+            max_pos_gamma, max_neg_gamma = None, None
 
         summary = f"📊 <b>{time_label} Summary</b>\n\n"
         summary += f"SPX: {spot:.2f}\n" if spot else "SPX: N/A\n"
@@ -4005,29 +3953,23 @@ def _v13_gex_magnet_above() -> float:
     """Top +GEX strike above spot from latest chain. Returns raw gamma*OI (no x100).
 
     2026-05-08 (S95): Cached 30s. Without cache, two calls within same dispatch
-    cycle could return different values (latest_df refreshes ~30s) — this caused
+    cycle could return different values (latest_chain refreshes ~30s) — this caused
     portal V14 (reads stored setup_log value) to disagree with production
     _passes_live_filter (live recompute) at threshold edge. lid=2569 May 7:
     stored 74.85 (portal PASS), live 75+ at dispatch (production BLOCK), winner
     missed = $130. Cache aligns the two reads to one value per chain cycle."""
     spot = _last_known_spot
-    if not spot or latest_df is None:
+    chain = latest_chain
+    if not spot or chain is None:
         return 0.0
     now_ts = time.time()
     if (now_ts - _v13_gex_magnet_cache["ts"] < 30
             and abs(_v13_gex_magnet_cache["spot"] - spot) < 2):
         return _v13_gex_magnet_cache["value"]
     try:
-        with _df_lock:
-            df = latest_df.copy()
-        strikes = pd.to_numeric(df["Strike"], errors="coerce").fillna(0.0)
-        c_gamma = pd.to_numeric(df["C_Gamma"], errors="coerce").fillna(0.0)
-        c_oi = pd.to_numeric(df["C_OpenInterest"], errors="coerce").fillna(0.0)
-        p_gamma = pd.to_numeric(df["P_Gamma"], errors="coerce").fillna(0.0)
-        p_oi = pd.to_numeric(df["P_OpenInterest"], errors="coerce").fillna(0.0)
-        net_gex = (c_gamma * c_oi) - (p_gamma * p_oi)
-        above = net_gex[strikes > spot]
-        result = float(above.max()) if not above.empty else 0.0
+        net_gex = chain.net_gex(scale=1.0)
+        above = net_gex[chain.strikes > spot]
+        result = float(above.max()) if above.size else 0.0
         _v13_gex_magnet_cache.update({"ts": now_ts, "spot": float(spot), "value": result})
         return result
     except Exception as e:
@@ -4045,14 +3987,9 @@ def _v13_dd_magnet_near() -> float:
         return _v13_dd_magnet_cache["max_abs_near"]
     try:
         with engine.begin() as conn:
-            row = conn.execute(text("""
-                SELECT MAX(ABS(value::float)) FROM volland_exposure_points
-                WHERE greek = 'deltaDecay' AND expiration_option = 'TODAY' AND ticker = 'SPX'
-                  AND ts_utc = (SELECT MAX(ts_utc) FROM volland_exposure_points
-                                WHERE greek = 'deltaDecay' AND expiration_option = 'TODAY')
-                  AND ABS(strike::float - :spot) <= 10
-            """), {"spot": spot}).scalar()
-        val = float(row) if row else 0.0
+            snap = vexp.latest(conn, "deltaDecay", "TODAY", ticker="SPX")
+        near = vexp.points(snap, spot - 10, spot + 10)
+        val = max((abs(v) for _, v in near), default=0.0)
         _v13_dd_magnet_cache.update({"ts": now_ts, "max_abs_near": val, "spot": spot})
         return val
     except Exception as e:
@@ -4075,19 +4012,11 @@ def _v13_vanna_features() -> tuple[str | None, str | None]:
         return _v13_vanna_cache["cliff_side"], _v13_vanna_cache["peak_side"]
     try:
         with engine.begin() as conn:
-            rows = conn.execute(text("""
-                SELECT strike::float AS strike, value::float AS value
-                FROM volland_exposure_points
-                WHERE greek = 'vanna' AND expiration_option = 'THIS_WEEK' AND ticker = 'SPX'
-                  AND ts_utc = (SELECT MAX(ts_utc) FROM volland_exposure_points
-                                WHERE greek = 'vanna' AND expiration_option = 'THIS_WEEK')
-                  AND ABS(strike::float - :spot) <= 50
-                ORDER BY strike
-            """), {"spot": spot}).fetchall()
-        if len(rows) < 2:
+            snap = vexp.latest(conn, "vanna", "THIS_WEEK", ticker="SPX")
+        near = vexp.points(snap, spot - 50, spot + 50)
+        if len(near) < 2:
             _v13_vanna_cache.update({"ts": now_ts, "cliff_side": None, "peak_side": None, "spot": spot})
             return None, None
-        near = [(float(r[0]), float(r[1])) for r in rows]
         crossings = []
         for i in range(1, len(near)):
             s0, v0 = near[i-1]
@@ -4110,13 +4039,13 @@ def _v13_vanna_features() -> tuple[str | None, str | None]:
 
 # ── GEX Long v3 live features (shipped 2026-05-13 behind env flag) ─────────
 # Builds the v3 visual classifier inputs (CORE_R3 / CORE_R2 / R5_align / etc.)
-# from live data: per-strike GEX from latest_df (signed gamma*OI*100, NO x100
+# from live data: per-strike GEX from latest_chain (signed gamma*OI*100, NO x100
 # scale conflict because v3 only cares about sign + relative magnitude) and
-# per-strike charm from latest volland_exposure_points snapshot.
+# per-strike charm from the latest packed Volland charm snapshot.
 #
-# Mirrors `_features()` in app/gex_long_v3.py (which queries gamma from
-# volland_exposure_points for backtest). For LIVE use we read GEX from
-# latest_df (same source as max_plus_gex / max_minus_gex passed to detector)
+# Mirrors `_features()` in app/gex_long_v3.py (which reads the same snapshots
+# as-of each trade for backtest). For LIVE use we read GEX from
+# latest_chain (same source as max_plus_gex / max_minus_gex passed to detector)
 # to stay aligned with the rest of the production pipeline.
 
 _gex_long_v3_cache = {"ts": 0.0, "spot": 0.0, "features": None}
@@ -4128,7 +4057,8 @@ def _gex_long_v3_features() -> dict | None:
     R_charm_bullish, R_gex_regime_pos, R_VETO. Or None if data unavailable.
     Cached 30s (volland charm refreshes ~120s, chain ~30s)."""
     spot = _last_known_spot
-    if not spot or latest_df is None or not engine:
+    chain = latest_chain
+    if not spot or chain is None or not engine:
         return None
     now_ts = time.time()
     if (now_ts - _gex_long_v3_cache["ts"] < 30
@@ -4140,32 +4070,16 @@ def _gex_long_v3_features() -> dict | None:
         # Signed: call_gex - put_gex (matches v3 backtest sign convention from
         # volland gamma points — positive above spot = call wall, negative below
         # = put support).
-        with _df_lock:
-            df = latest_df.copy()
-        strikes = pd.to_numeric(df["Strike"], errors="coerce").fillna(0.0).astype(float)
-        c_gamma = pd.to_numeric(df["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        c_oi = pd.to_numeric(df["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        p_gamma = pd.to_numeric(df["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        p_oi = pd.to_numeric(df["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        net_gex = (c_gamma * c_oi) - (p_gamma * p_oi)
-        mask = (strikes >= spot - 50) & (strikes <= spot + 50)
-        gex = [(float(s), float(v)) for s, v in zip(strikes[mask], net_gex[mask])]
+        band = chain.window(spot - 50, spot + 50)
+        gex = list(zip(chain.strikes[band].tolist(), chain.net_gex(scale=1.0)[band].tolist()))
         if not gex:
             return None
 
-        # Per-strike charm from latest volland_exposure_points snapshot (TODAY
+        # Per-strike charm from the latest charm snapshot (TODAY
         # not required for charm — v3 backtest uses all-charm endpoint).
         with engine.begin() as conn:
-            rows = conn.execute(text("""
-                SELECT strike::float AS strike, value::float AS value
-                FROM volland_exposure_points
-                WHERE greek = 'charm' AND ticker = 'SPX'
-                  AND ts_utc = (SELECT MAX(ts_utc) FROM volland_exposure_points
-                                WHERE greek = 'charm')
-                  AND strike::float BETWEEN :lo AND :hi
-                ORDER BY strike
-            """), {"lo": float(spot) - 50, "hi": float(spot) + 50}).fetchall()
-        charm = [(float(r[0]), float(r[1])) for r in rows]
+            snap = vexp.latest(conn, "charm", ticker="SPX")
+        charm = vexp.points(snap, float(spot) - 50, float(spot) + 50)
         if not charm:
             return None
 
@@ -5028,6 +4942,7 @@ def _check_setup_outcomes(spot: float, cycle_high=None, cycle_low=None):
                     try:
                         with engine.begin() as c:
                             c.execute(text("UPDATE setup_log SET outcome_result = 'TIMEOUT', outcome_pnl = 0 WHERE id = :id"), {"id": _log_id})
+                        signal_feed.outcome(_log_id, "TIMEOUT", 0)
                     except Exception as e:
                         print(f"[outcome] timeout update error: {e}", flush=True)
                 continue  # drop from tracking
@@ -5391,6 +5306,7 @@ def _check_setup_outcomes(spot: float, cycle_high=None, cycle_low=None):
                             "ep": round(check_price, 2),
                             "id": log_id,
                         })
+                    signal_feed.outcome(log_id, result_type, pnl)
                 except Exception as db_err:
                     print(f"[outcome] DB persist error: {db_err}", flush=True)
 
@@ -5524,7 +5440,7 @@ def _run_setup_check():
     except Exception as _fse:
         print(f"[friday-spread] cycle hook error: {_fse}", flush=True)
 
-    # ── Volland data from cache (refreshes every 90s, not every 30s cycle) ──
+    # ── Volland data from cache (refreshed per Volland cycle by NOTIFY, not every 30s cycle) ──
     vc = _refresh_volland_cache()
     _ts_volland = time.time()
     print(f"[timing-debug] volland_cache done in {_ts_volland - _ts_outcomes:.1f}s", flush=True)
@@ -5610,37 +5526,27 @@ def _run_setup_check():
     _rithmic_db_fmt = _rithmic_bars_as_db_format(_rithmic_raw)
     es_bars = _rithmic_db_fmt[-15:]  # last 15 bars for Paradigm Reversal
 
-    # Calculate max +GEX / -GEX strikes and IV skew from latest_df
+    # Calculate max +GEX / -GEX strikes and IV skew from latest_chain
     max_plus_gex, max_minus_gex = None, None
     skew_value = None
-    with _df_lock:
-        if latest_df is not None and not latest_df.empty:
-            df = latest_df.copy()
-            sdf = df.sort_values("Strike")
-            strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float)
-            call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-            put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-            c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-            p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-            net_gex = (c_gamma * call_oi * 100.0) + (-p_gamma * put_oi * 100.0)
-            max_pos_idx = net_gex.idxmax() if not net_gex.empty else None
-            max_neg_idx = net_gex.idxmin() if not net_gex.empty else None
-            max_plus_gex = float(strikes.loc[max_pos_idx]) if max_pos_idx is not None else None
-            max_minus_gex = float(strikes.loc[max_neg_idx]) if max_neg_idx is not None else None
-
-            # IV skew: avg put IV / avg call IV for 10-20pt OTM strikes
-            try:
-                if spot:
-                    c_iv = pd.to_numeric(sdf["C_IV"], errors="coerce")
-                    p_iv = pd.to_numeric(sdf["P_IV"], errors="coerce")
-                    otm_calls = (strikes > spot) & (strikes <= spot + 20) & (c_iv > 0)
-                    otm_puts = (strikes < spot) & (strikes >= spot - 20) & (p_iv > 0)
-                    avg_call_iv = float(c_iv[otm_calls].mean()) if otm_calls.any() else 0
-                    avg_put_iv = float(p_iv[otm_puts].mean()) if otm_puts.any() else 0
-                    if avg_call_iv > 0:
-                        skew_value = avg_put_iv / avg_call_iv
-            except Exception:
-                pass
+    chain = latest_chain
+    if chain is not None and not chain.empty:
+        max_plus_gex, max_minus_gex = chain.max_gex_strikes()
+
+        # IV skew: avg put IV / avg call IV for 10-20pt OTM strikes
+        try:
+            if spot:
+                strikes = chain.strikes
+                c_iv = chain.col("C_IV")
+                p_iv = chain.col("P_IV")
+                otm_calls = (strikes > spot) & (strikes <= spot + 20) & (c_iv > 0)
+                otm_puts = (strikes < spot) & (strikes >= spot - 20) & (p_iv > 0)
+                avg_call_iv = float(c_iv[otm_calls].mean()) if otm_calls.any() else 0
+                avg_put_iv = float(p_iv[otm_puts].mean()) if otm_puts.any() else 0
+                if avg_call_iv > 0:
+                    skew_value = avg_put_iv / avg_call_iv
+        except Exception:
+            pass
 
     # Update skew tracker and get % change
     skew_change_pct = None
@@ -5672,11 +5578,8 @@ def _run_setup_check():
     _vanna_pin_value = vc.get("vanna_pin_value")
     _vanna_0dte_ratio = vc.get("vanna_0dte_ratio")
 
-    # Get chain DataFrame for butterfly pricing
-    _chain_for_butterfly = None
-    with _df_lock:
-        if latest_df is not None and not latest_df.empty:
-            _chain_for_butterfly = latest_df.copy()
+    # Chain snapshot for butterfly pricing (read-only, shared — no copy)
+    _chain_for_butterfly = chain
 
     _ts_pre_detect = time.time()
     print(f"[timing-debug] pre-detect: dd_parse+volland_parse took {_ts_pre_detect - _ts_volland:.1f}s", flush=True)
@@ -5692,7 +5595,7 @@ def _run_setup_check():
         vanna_levels=vanna_levels, es_range_bars=es_range_bars_vp,
         vix=_vix_last,
         vanna_pin_strike=_vanna_pin_strike, vanna_pin_value=_vanna_pin_value,
-        chain_df=_chain_for_butterfly,
+        chain=_chain_for_butterfly,
         vanna_all=_vanna_cache.get("all"),
         svb_correlation=svb_correlation,
         vanna_0dte_ratio=_vanna_0dte_ratio,
@@ -5821,6 +5724,16 @@ def _run_setup_check():
                     _skip_auto_trade = not _passes_live
                     if _skip_auto_trade:
                         print(f"[auto-trader] SKIPPED {setup_name} {r['direction']}: live filter blocked (align={r.get('greek_alignment',0):+d})", flush=True)
+                    elif not startup.ready():
+                        # Critical startup phase still running (traders may not be initialised)
+                        _skip_auto_trade = True
+                        print(f"[auto-trader] SKIPPED {setup_name} {r['direction']}: startup not ready", flush=True)
+                        if _current_setup_log.get(setup_name):
+                            try:
+                                from app import real_trader as _rt_skip
+                                _rt_skip._log_skip_reason(_current_setup_log.get(setup_name), "startup_not_ready")
+                            except Exception:
+                                pass
                     # Auto-trade: place MES SIM order (fire-and-forget, skip if filters blocked)
                     if not _skip_auto_trade:
                         try:
@@ -6318,15 +6231,9 @@ def _es_quote_reset():
     # Reset vol event detector for new session
     _reset_vol_event_daily()
 
-def _run_absorption_detection(bars: list) -> dict | None:
-    """Thin wrapper: evaluates absorption via setup_detector, logs, and notifies.
-
-    Returns signal dict (for chart markers) or None.
-    """
-    from app.setup_detector import (
-        evaluate_absorption, should_notify_absorption, format_absorption_message,
-    )
-
+def _bar_context(range_pts: float, bars) -> dict:
+    """Shared inputs for one completed bar's detectors — built ONCE per bar by the
+    bar dispatcher (app/bar_dispatch.py) instead of once per detector."""
     # Build volland stats dict for setup_detector
     volland_stats = None
     try:
@@ -6334,7 +6241,7 @@ def _run_absorption_detection(bars: list) -> dict | None:
         if vstat and vstat.get("stats") and vstat["stats"].get("has_statistics"):
             volland_stats = vstat["stats"]
     except Exception as e:
-        print(f"[absorption] volland lookup error: {e}", flush=True)
+        print(f"[bar-dispatch] volland lookup error: {e}", flush=True)
 
     # Override DD hedging with combined SPX+SPY value (if available)
     if volland_stats and _dd_combined_str:
@@ -6350,8 +6257,51 @@ def _run_absorption_detection(bars: list) -> dict | None:
     except Exception:
         pass
 
-    closed_count = sum(1 for b in bars if b.get("status") == "closed")
-    result = evaluate_absorption(bars, volland_stats, _setup_settings, spx_spot=spx_spot, vix=_vix_last)
+    # Greek alignment inputs: charm + SVB from volland_stats, vanna from the cache
+    charm = None
+    svb = None
+    if volland_stats and isinstance(volland_stats, dict):
+        _charm_val = volland_stats.get("aggregatedCharm")
+        if _charm_val is not None:
+            try:
+                charm = float(_charm_val)
+            except (ValueError, TypeError):
+                pass
+        _svb_raw = volland_stats.get("spot_vol_beta")
+        if _svb_raw and isinstance(_svb_raw, dict):
+            try:
+                svb = float(_svb_raw.get("correlation"))
+            except (ValueError, TypeError):
+                pass
+
+    return {
+        "range_pts": range_pts,
+        "volland_stats": volland_stats,
+        "spx_spot": spx_spot,
+        "vix": _vix_last,
+        "charm": charm,
+        "svb": svb,
+        "vanna": {"all": _vanna_cache.get("all"), "weekly": _vanna_cache.get("weekly"),
+                  "monthly": _vanna_cache.get("monthly")},
+    }
+
+
+def _run_absorption_detection(bars: list, ctx: dict) -> dict | None:
+    """Bar detector: evaluates absorption via setup_detector, adds chart marker.
+
+    Returns the setup_log result wrapper (logged by the dispatcher, then
+    _after_absorption notifies/tracks/trades) or None.
+    """
+    from app.bar_features import features_for
+    from app.setup_detector import (
+        evaluate_absorption, should_notify_absorption, format_absorption_message,
+    )
+
+    volland_stats = ctx["volland_stats"]
+    spx_spot = ctx["spx_spot"]
+
+    closed_count = features_for(bars).n
+    result = evaluate_absorption(bars, volland_stats, _setup_settings, spx_spot=spx_spot, vix=ctx["vix"])
     if result is None:
         print(f"[absorption] no signal (closed_bars={closed_count}, enabled={_setup_settings.get('absorption_enabled', True)})", flush=True)
         return None
@@ -6388,23 +6338,12 @@ def _run_absorption_detection(bars: list) -> dict | None:
 
     # Get +GEX/-GEX from latest options chain
     gex_plus, gex_minus = None, None
-    with _df_lock:
-        if latest_df is not None and not latest_df.empty:
-            try:
-                df = latest_df.copy()
-                sdf = df.sort_values("Strike")
-                strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float)
-                call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-                put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-                c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-                p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-                net_gex = (c_gamma * call_oi * 100.0) + (-p_gamma * put_oi * 100.0)
-                max_pos_idx = net_gex.idxmax() if not net_gex.empty else None
-                max_neg_idx = net_gex.idxmin() if not net_gex.empty else None
-                gex_plus = float(strikes.loc[max_pos_idx]) if max_pos_idx is not None else None
-                gex_minus = float(strikes.loc[max_neg_idx]) if max_neg_idx is not None else None
-            except Exception:
-                pass
+    _chain = latest_chain
+    if _chain is not None and not _chain.empty:
+        try:
+            gex_plus, gex_minus = _chain.max_gex_strikes()
+        except Exception:
+            pass
 
     # Override result fields with SPX context for setup_log
     # spot = SPX spot (for conversion offset), abs_es_price = ES entry price
@@ -6414,31 +6353,13 @@ def _run_absorption_detection(bars: list) -> dict | None:
     result["max_plus_gex"] = gex_plus
     result["max_minus_gex"] = gex_minus
 
-    # Inject Greek context fields for logging (absorption runs on separate thread)
-    result["vanna_all"] = _vanna_cache.get("all")
-    result["vanna_weekly"] = _vanna_cache.get("weekly")
-    result["vanna_monthly"] = _vanna_cache.get("monthly")
-    # Extract SVB from volland_stats (already fetched above)
-    _abs_svb = None
-    if volland_stats and isinstance(volland_stats, dict):
-        _svb_raw = volland_stats.get("spot_vol_beta")
-        if _svb_raw and isinstance(_svb_raw, dict):
-            try:
-                _abs_svb = float(_svb_raw.get("correlation"))
-            except (ValueError, TypeError):
-                pass
-    result["spot_vol_beta"] = _abs_svb
-    # Charm for alignment: from volland_stats
-    _abs_charm = None
-    if volland_stats and isinstance(volland_stats, dict):
-        _charm_val = volland_stats.get("aggregatedCharm")
-        if _charm_val is not None:
-            try:
-                _abs_charm = float(_charm_val)
-            except (ValueError, TypeError):
-                pass
+    # Inject Greek context fields for logging (shared bar context)
+    result["vanna_all"] = ctx["vanna"]["all"]
+    result["vanna_weekly"] = ctx["vanna"]["weekly"]
+    result["vanna_monthly"] = ctx["vanna"]["monthly"]
+    result["spot_vol_beta"] = ctx["svb"]
     result["greek_alignment"] = _compute_greek_alignment(
-        result.get("direction"), _abs_charm, _vanna_cache.get("all"),
+        result.get("direction"), ctx["charm"], ctx["vanna"]["all"],
         result.get("spot"), gex_plus)
 
     # Re-grade with real alignment (grading v3 is direction+alignment-aware)
@@ -6536,14 +6457,21 @@ def _run_absorption_detection(bars: list) -> dict | None:
     # V16-SB: stamp tech-basket %-from-open at trigger (frozen for filter + log)
     result["basket_pct"] = _compute_basket_pct()
 
-    # Always log signal to setup_log for history (regardless of cooldown)
-    rw = {
+    # Always log signal to setup_log for history (regardless of cooldown) — the
+    # dispatcher logs it, then runs _after_absorption
+    return {
         "result": result,
         "notify": fire,
         "notify_reason": reason or "cooldown",
         "message": format_absorption_message(result, alignment=result.get("greek_alignment")),
     }
-    log_setup(rw)
+
+
+def _after_absorption(rw: dict):
+    """ES Absorption after setup_log: Telegram, outcome tracking, auto/real/options trade."""
+    result = rw["result"]
+    fire = rw["notify"]
+    _abs_align_at_trigger = result["greek_alignment"]
 
     # Send Telegram only when notification gate passes AND live filter
     _abs_passes_live = _passes_live_filter("ES Absorption", result["direction"],
@@ -6607,6 +6535,15 @@ def _run_absorption_detection(bars: list) -> dict | None:
                     _rt_skip._log_skip_reason(_abs_sid, "live_filter_block")
                 except Exception:
                     pass
+        elif not startup.ready():
+            print("[auto-trader] SKIPPED ES Absorption: startup not ready", flush=True)
+            _abs_sid = _current_setup_log.get("ES Absorption")
+            if _abs_sid:
+                try:
+                    from app import real_trader as _rt_skip
+                    _rt_skip._log_skip_reason(_abs_sid, "startup_not_ready")
+                except Exception:
+                    pass
         else:
             try:
                 from app import auto_trader
@@ -6677,31 +6614,15 @@ def _run_absorption_detection(bars: list) -> dict | None:
             except Exception as e:
                 print(f"[options] CVD place error: {e}", flush=True)
 
-    return signal
 
-
-def _run_single_bar_absorption(bars: list):
-    """Evaluate single-bar absorption (LOG-ONLY). Logs to setup_log + sends Telegram."""
+def _run_single_bar_absorption(bars: list, ctx: dict):
+    """Evaluate single-bar absorption (LOG-ONLY). Returns the setup_log result wrapper."""
     from app.setup_detector import (
         evaluate_single_bar_absorption, should_notify_single_bar_abs,
         format_single_bar_abs_message,
     )
 
-    # Build volland stats dict (same as _run_absorption_detection)
-    volland_stats = None
-    try:
-        vstat = db_volland_stats()
-        if vstat and vstat.get("stats") and vstat["stats"].get("has_statistics"):
-            volland_stats = vstat["stats"]
-    except Exception as e:
-        print(f"[sb-absorption] volland lookup error: {e}", flush=True)
-
-    # Override DD hedging with combined SPX+SPY value (if available)
-    if volland_stats and _dd_combined_str:
-        volland_stats = dict(volland_stats)  # shallow copy
-        volland_stats["delta_decay_hedging"] = _dd_combined_str
-
-    result = evaluate_single_bar_absorption(bars, volland_stats, _setup_settings)
+    result = evaluate_single_bar_absorption(bars, ctx["volland_stats"], _setup_settings)
     if result is None:
         return None
 
@@ -6718,52 +6639,41 @@ def _run_single_bar_absorption(bars: list):
           f"bar_idx={result['bar_idx']}", flush=True)
 
     # SPX spot for setup_log
-    spx_spot = None
-    try:
-        msg = last_run_status.get("msg") or ""
-        parts = dict(s.split("=", 1) for s in msg.split() if "=" in s)
-        spx_spot = float(parts.get("spot", ""))
-    except Exception:
-        pass
-    if spx_spot:
-        result["spot"] = round(spx_spot, 2)
+    if ctx["spx_spot"]:
+        result["spot"] = round(ctx["spx_spot"], 2)
 
     # Greek alignment
-    _sba_charm = None
-    if volland_stats and isinstance(volland_stats, dict):
-        _c = volland_stats.get("aggregatedCharm")
-        if _c is not None:
-            try:
-                _sba_charm = float(_c)
-            except (ValueError, TypeError):
-                pass
-    result["vanna_all"] = _vanna_cache.get("all")
-    result["vanna_weekly"] = _vanna_cache.get("weekly")
-    result["vanna_monthly"] = _vanna_cache.get("monthly")
+    result["vanna_all"] = ctx["vanna"]["all"]
+    result["vanna_weekly"] = ctx["vanna"]["weekly"]
+    result["vanna_monthly"] = ctx["vanna"]["monthly"]
     result["spot_vol_beta"] = result.get("svb")
     result["greek_alignment"] = _compute_greek_alignment(
-        result.get("direction"), _sba_charm, _vanna_cache.get("all"),
+        result.get("direction"), ctx["charm"], ctx["vanna"]["all"],
         result.get("spot"), None)
     result["charm_limit_entry"] = None  # Not applicable
 
     # Notification gate
     fire, reason = should_notify_single_bar_abs(result)
 
-    # Log to setup_log (always, regardless of cooldown)
-    rw = {
+    # Log to setup_log (always, regardless of cooldown) — done by the dispatcher
+    return {
         "result": result,
         "notify": fire,
         "notify_reason": reason or "cooldown",
         "message": format_single_bar_abs_message(result, alignment=result.get("greek_alignment")),
     }
-    log_setup(rw)
+
+
+def _after_single_bar_absorption(rw: dict):
+    """SB Absorption after setup_log: outcome tracking."""
+    result = rw["result"]
 
     # SB Absorption: LOG-ONLY, not in V10 — suppress Telegram
     # if fire:
     #     send_telegram_setups(rw["message"])
 
     # Outcome tracking (LOG-ONLY: no auto-trading, but track for performance data)
-    if fire:
+    if rw["notify"]:
         stop_pts = _setup_settings.get("sba_stop_pts", 8)
         target_pts = _setup_settings.get("sba_target_pts", 10)
         es_entry = result.get("abs_es_price", result["spot"])
@@ -6789,24 +6699,22 @@ def _run_single_bar_absorption(bars: list):
 
     # No auto-trading yet: monitoring with real grades before enabling
 
-    return result
-
 
 # Track last bar idx to avoid re-evaluating same bar
 _last_absorption_bar_idx = -1
-_absorption_thread_lock = Lock()
 
 
 def _on_rithmic_bar_complete(bars: list):
     """Callback from Rithmic stream when a range bar completes.
 
-    Runs absorption detection in a background thread so the Rithmic event
-    loop isn't blocked by DB/HTTP calls (which caused stale-signal bugs
-    where the trigger bar was minutes old by the time it was logged).
+    Hands the bar to the bar dispatcher's worker so the Rithmic event loop
+    isn't blocked by DB/HTTP calls (which caused stale-signal bugs where the
+    trigger bar was minutes old by the time it was logged).
     """
     global _last_absorption_bar_idx
     if not bars:
         return
+    live_push.notify("es")
     # Only run 10:00 - 15:45 ET. 15:45 cutoff prevents EOD-expired entries
     # (signals fired in last 15 min usually expire before close, mostly noise).
     t = now_et()
@@ -6828,40 +6736,12 @@ def _on_rithmic_bar_complete(bars: list):
             return
     except Exception:
         pass
-    # Offload to thread so Rithmic tick processing isn't blocked.
-    # The bars snapshot is already a copy (list of dicts) so thread-safe.
-    bars_copy = list(bars)
-    print(f"[absorption] evaluating bar #{bar_idx} ({len(bars_copy)} bars total)", flush=True)
-    Thread(
-        target=_run_absorption_in_thread,
-        args=(bars_copy,),
-        daemon=True,
-    ).start()
-
-
-def _run_absorption_in_thread(bars: list):
-    """Thread wrapper: runs absorption detection with freshness check."""
-    # Serialize — only one absorption detection at a time
-    with _absorption_thread_lock:
-        try:
-            _run_absorption_detection(bars)
-        except Exception as e:
-            print(f"[absorption] proactive eval error: {e}", flush=True)
-        # Single-bar absorption (LOG-ONLY — separate detector, same bar data)
-        try:
-            _run_single_bar_absorption(bars)
-        except Exception as e:
-            print(f"[sb-absorption] eval error: {e}", flush=True)
-        # Two-bar absorption (LOG-ONLY — flush + recovery pattern)
-        try:
-            _run_sb2_absorption(bars)
-        except Exception as e:
-            print(f"[sb2] eval error: {e}", flush=True)
-        # Delta Absorption (LOG-ONLY — delta-vs-price divergence)
-        try:
-            _run_delta_absorption(bars)
-        except Exception as e:
-            print(f"[delta-abs] eval error: {e}", flush=True)
+    # Queue for the dispatcher so Rithmic tick processing isn't blocked.
+    # bars is a read-only rithmic_es_stream.BarsView (or a fresh Sierra/TS list) —
+    # safe to hand to the worker without copying.
+    print(f"[absorption] evaluating bar #{bar_idx} ({len(bars)} bars total)", flush=True)
+    if not bar_dispatch.submit(5.0, bars):
+        print(f"[absorption] bar #{bar_idx} dropped: bar dispatcher not running", flush=True)
 
 
 # ── 10-pt range bar callback for SB10 Absorption ──────────────────────────
@@ -6889,42 +6769,20 @@ def _on_rithmic_bar_10pt_complete(bars: list):
             return
     except Exception:
         pass
-    bars_copy = list(bars)
-    print(f"[sb10] evaluating bar #{bar_idx} ({len(bars_copy)} bars total)", flush=True)
-    Thread(target=_run_sb10_in_thread, args=(bars_copy,), daemon=True).start()
-
-
-def _run_sb10_in_thread(bars: list):
-    """Thread wrapper for SB10 Absorption detection."""
-    with _absorption_thread_lock:
-        try:
-            _run_sb10_absorption(bars)
-        except Exception as e:
-            print(f"[sb10] eval error: {e}", flush=True)
+    print(f"[sb10] evaluating bar #{bar_idx} ({len(bars)} bars total)", flush=True)
+    if not bar_dispatch.submit(10.0, bars):
+        print(f"[sb10] bar #{bar_idx} dropped: bar dispatcher not running", flush=True)
 
 
-def _run_sb10_absorption(bars: list):
-    """Evaluate SB10 Absorption (10-pt bars, LOG-ONLY)."""
+def _run_sb10_absorption(bars: list, ctx: dict):
+    """Evaluate SB10 Absorption (10-pt bars, LOG-ONLY). Returns the result wrapper."""
     from app.setup_detector import (
         evaluate_single_bar_absorption, should_notify_sb10_abs,
         format_sb10_abs_message,
     )
 
-    volland_stats = None
-    try:
-        vstat = db_volland_stats()
-        if vstat and vstat.get("stats") and vstat["stats"].get("has_statistics"):
-            volland_stats = vstat["stats"]
-    except Exception as e:
-        print(f"[sb10] volland lookup error: {e}", flush=True)
-
-    # Override DD hedging with combined SPX+SPY value (if available)
-    if volland_stats and _dd_combined_str:
-        volland_stats = dict(volland_stats)  # shallow copy
-        volland_stats["delta_decay_hedging"] = _dd_combined_str
-
     from app.setup_detector import _cooldown_sb10_abs
-    result = evaluate_single_bar_absorption(bars, volland_stats, _setup_settings, spx_spot=None,
+    result = evaluate_single_bar_absorption(bars, ctx["volland_stats"], _setup_settings, spx_spot=None,
                                             cooldown_state=_cooldown_sb10_abs)
     if result is None:
         return None
@@ -6945,52 +6803,41 @@ def _run_sb10_absorption(bars: list):
           f"bar_idx={result['bar_idx']}", flush=True)
 
     # SPX spot
-    spx_spot = None
-    try:
-        msg = last_run_status.get("msg") or ""
-        parts = dict(s.split("=", 1) for s in msg.split() if "=" in s)
-        spx_spot = float(parts.get("spot", ""))
-    except Exception:
-        pass
-    if spx_spot:
-        result["spot"] = round(spx_spot, 2)
+    if ctx["spx_spot"]:
+        result["spot"] = round(ctx["spx_spot"], 2)
 
     # Greek alignment
-    _sb10_charm = None
-    if volland_stats and isinstance(volland_stats, dict):
-        _c = volland_stats.get("aggregatedCharm")
-        if _c is not None:
-            try:
-                _sb10_charm = float(_c)
-            except (ValueError, TypeError):
-                pass
-    result["vanna_all"] = _vanna_cache.get("all")
-    result["vanna_weekly"] = _vanna_cache.get("weekly")
-    result["vanna_monthly"] = _vanna_cache.get("monthly")
+    result["vanna_all"] = ctx["vanna"]["all"]
+    result["vanna_weekly"] = ctx["vanna"]["weekly"]
+    result["vanna_monthly"] = ctx["vanna"]["monthly"]
     result["spot_vol_beta"] = result.get("svb")
     result["greek_alignment"] = _compute_greek_alignment(
-        result.get("direction"), _sb10_charm, _vanna_cache.get("all"),
+        result.get("direction"), ctx["charm"], ctx["vanna"]["all"],
         result.get("spot"), None)
     result["charm_limit_entry"] = None
 
     # Notification gate
     fire, reason = should_notify_sb10_abs(result)
 
-    # Log to setup_log
-    rw = {
+    # Log to setup_log — done by the dispatcher
+    return {
         "result": result,
         "notify": fire,
         "notify_reason": reason or "cooldown",
         "message": format_sb10_abs_message(result, alignment=result.get("greek_alignment")),
     }
-    log_setup(rw)
+
+
+def _after_sb10_absorption(rw: dict):
+    """SB10 Absorption after setup_log: outcome tracking."""
+    result = rw["result"]
 
     # SB10 Absorption: LOG-ONLY — suppress Telegram
     # if fire:
     #     send_telegram_setups(rw["message"])
 
     # Outcome tracking
-    if fire:
+    if rw["notify"]:
         stop_pts = _setup_settings.get("sba_stop_pts", 8)
         target_pts = _setup_settings.get("sba_target_pts", 10)
         es_entry = result.get("abs_es_price", result["spot"])
@@ -7017,37 +6864,15 @@ def _run_sb10_absorption(bars: list):
 
 # ── SB2 Absorption — two-bar flush + recovery ────────────────────────────
 
-def _run_sb2_absorption(bars: list):
-    """Evaluate SB2 Absorption (two-bar pattern, LOG-ONLY)."""
+def _run_sb2_absorption(bars: list, ctx: dict):
+    """Evaluate SB2 Absorption (two-bar pattern, LOG-ONLY). Returns the result wrapper."""
     from app.setup_detector import (
         evaluate_sb2_absorption, should_notify_sb2_abs,
         format_sb2_abs_message,
     )
 
-    # Get Volland stats
-    volland_stats = None
-    try:
-        vstat = db_volland_stats()
-        if vstat and vstat.get("stats") and vstat["stats"].get("has_statistics"):
-            volland_stats = vstat["stats"]
-    except Exception as e:
-        print(f"[sb2] volland lookup error: {e}", flush=True)
-
-    # Override DD hedging with combined SPX+SPY value (if available)
-    if volland_stats and _dd_combined_str:
-        volland_stats = dict(volland_stats)  # shallow copy
-        volland_stats["delta_decay_hedging"] = _dd_combined_str
-
-    # Get SPX spot
-    spx_spot = None
-    try:
-        msg = last_run_status.get("msg") or ""
-        parts = dict(s.split("=", 1) for s in msg.split() if "=" in s)
-        spx_spot = float(parts.get("spot", ""))
-    except Exception:
-        pass
-
-    result = evaluate_sb2_absorption(bars, volland_stats, _setup_settings, spx_spot=spx_spot)
+    spx_spot = ctx["spx_spot"]
+    result = evaluate_sb2_absorption(bars, ctx["volland_stats"], _setup_settings, spx_spot=spx_spot)
     if result is None:
         return None
 
@@ -7067,39 +6892,35 @@ def _run_sb2_absorption(bars: list):
         result["spot"] = round(spx_spot, 2)
 
     # Greek alignment
-    _sb2_charm = None
-    if volland_stats and isinstance(volland_stats, dict):
-        _c = volland_stats.get("aggregatedCharm")
-        if _c is not None:
-            try:
-                _sb2_charm = float(_c)
-            except (ValueError, TypeError):
-                pass
-    result["vanna_all"] = _vanna_cache.get("all")
-    result["vanna_weekly"] = _vanna_cache.get("weekly")
-    result["vanna_monthly"] = _vanna_cache.get("monthly")
+    result["vanna_all"] = ctx["vanna"]["all"]
+    result["vanna_weekly"] = ctx["vanna"]["weekly"]
+    result["vanna_monthly"] = ctx["vanna"]["monthly"]
     result["spot_vol_beta"] = result.get("svb")
     result["greek_alignment"] = _compute_greek_alignment(
-        result.get("direction"), _sb2_charm, _vanna_cache.get("all"),
+        result.get("direction"), ctx["charm"], ctx["vanna"]["all"],
         result.get("spot"), None)
     result["charm_limit_entry"] = None
 
     # Notification gate
     fire, reason = should_notify_sb2_abs(result)
 
-    # Log to setup_log
-    rw = {
+    # Log to setup_log — done by the dispatcher
+    return {
         "result": result,
         "notify": fire,
         "notify_reason": reason or "cooldown",
         "message": format_sb2_abs_message(result, alignment=result.get("greek_alignment")),
     }
-    log_setup(rw)
+
+
+def _after_sb2_absorption(rw: dict):
+    """SB2 Absorption after setup_log: outcome tracking."""
+    result = rw["result"]
 
     # SB2 Absorption: LOG-ONLY — no Telegram, no auto-trade
 
     # Outcome tracking
-    if fire:
+    if rw["notify"]:
         stop_pts = _setup_settings.get("sb2_stop_pts", 10)
         target_pts = _setup_settings.get("sb2_target_pts", 20)
         es_entry = result.get("abs_es_price", result["spot"])
@@ -7123,31 +6944,17 @@ def _run_sb2_absorption(bars: list):
         })
         print(f"[outcome] tracking SB2 Absorption: target={target_lvl:.1f} stop={stop_lvl:.1f}", flush=True)
 
-    return result
-
 
 # ── Delta Absorption — delta-vs-price divergence ────────────────────────────
 
-def _run_delta_absorption(bars: list):
-    """Evaluate Delta Absorption (LOG-ONLY). Logs to setup_log."""
+def _run_delta_absorption(bars: list, ctx: dict):
+    """Evaluate Delta Absorption (LOG-ONLY). Returns the setup_log result wrapper."""
     from app.setup_detector import (
         evaluate_delta_absorption, should_notify_delta_abs,
         format_delta_abs_message,
     )
 
-    # Get Volland stats
-    volland_stats = None
-    try:
-        vstat = db_volland_stats()
-        if vstat and vstat.get("stats") and vstat["stats"].get("has_statistics"):
-            volland_stats = vstat["stats"]
-    except Exception as e:
-        print(f"[delta-abs] volland lookup error: {e}", flush=True)
-
-    if volland_stats and _dd_combined_str:
-        volland_stats = dict(volland_stats)
-        volland_stats["delta_decay_hedging"] = _dd_combined_str
-
+    volland_stats = ctx["volland_stats"]
     result = evaluate_delta_absorption(bars, volland_stats, _setup_settings)
     if result is None:
         return None
@@ -7164,28 +6971,13 @@ def _run_delta_absorption(bars: list):
           f"sig#{result['sig_num']} bar_idx={result['bar_idx']}", flush=True)
 
     # SPX spot for setup_log
-    spx_spot = None
-    try:
-        msg = last_run_status.get("msg") or ""
-        parts = dict(s.split("=", 1) for s in msg.split() if "=" in s)
-        spx_spot = float(parts.get("spot", ""))
-    except Exception:
-        pass
-    if spx_spot:
-        result["spot"] = round(spx_spot, 2)
+    if ctx["spx_spot"]:
+        result["spot"] = round(ctx["spx_spot"], 2)
 
     # Greek alignment
-    _da_charm = None
-    if volland_stats and isinstance(volland_stats, dict):
-        _c = volland_stats.get("aggregatedCharm")
-        if _c is not None:
-            try:
-                _da_charm = float(_c)
-            except (ValueError, TypeError):
-                pass
-    result["vanna_all"] = _vanna_cache.get("all")
-    result["vanna_weekly"] = _vanna_cache.get("weekly")
-    result["vanna_monthly"] = _vanna_cache.get("monthly")
+    result["vanna_all"] = ctx["vanna"]["all"]
+    result["vanna_weekly"] = ctx["vanna"]["weekly"]
+    result["vanna_monthly"] = ctx["vanna"]["monthly"]
     result["spot_vol_beta"] = None
     if volland_stats:
         try:
@@ -7193,26 +6985,30 @@ def _run_delta_absorption(bars: list):
         except (ValueError, TypeError):
             pass
     result["greek_alignment"] = _compute_greek_alignment(
-        result.get("direction"), _da_charm, _vanna_cache.get("all"),
+        result.get("direction"), ctx["charm"], ctx["vanna"]["all"],
         result.get("spot"), None)
     result["charm_limit_entry"] = None
 
     # Notification gate
     fire, reason = should_notify_delta_abs(result)
 
-    # Log to setup_log (always)
-    rw = {
+    # Log to setup_log (always) — done by the dispatcher
+    return {
         "result": result,
         "notify": fire,
         "notify_reason": reason or "cooldown",
         "message": format_delta_abs_message(result, alignment=result.get("greek_alignment")),
     }
-    log_setup(rw)
+
+
+def _after_delta_absorption(rw: dict):
+    """Delta Absorption after setup_log: outcome tracking."""
+    result = rw["result"]
 
     # Delta Absorption: LOG-ONLY — no Telegram, no auto-trade, no live filter
 
     # Outcome tracking (for data collection)
-    if fire:
+    if rw["notify"]:
         stop_pts = 8
         es_entry = result.get("abs_es_price", result["spot"])
         if result["direction"] == "bullish":
@@ -7236,7 +7032,17 @@ def _run_delta_absorption(bars: list):
         })
         print(f"[outcome] tracking Delta Absorption: stop={stop_lvl:.1f}", flush=True)
 
-    return result
+
+# Completed-bar detectors, run in this order by the bar dispatcher's single worker
+# (one shared _bar_context, one setup_log batch per bar). Worker started in on_startup.
+bar_dispatch.register("ES Absorption", 5.0, _run_absorption_detection, _after_absorption)
+# Single-bar absorption (LOG-ONLY — separate detector, same bar data)
+bar_dispatch.register("SB Absorption", 5.0, _run_single_bar_absorption, _after_single_bar_absorption)
+# Two-bar absorption (LOG-ONLY — flush + recovery pattern)
+bar_dispatch.register("SB2 Absorption", 5.0, _run_sb2_absorption, _after_sb2_absorption)
+# Delta Absorption (LOG-ONLY — delta-vs-price divergence)
+bar_dispatch.register("Delta Absorption", 5.0, _run_delta_absorption, _after_delta_absorption)
+bar_dispatch.register("SB10 Absorption", 10.0, _run_sb10_absorption, _after_sb10_absorption)
 
 
 def _es_session_date() -> str:
@@ -7362,167 +7168,104 @@ def _es_delta_stream_loop():
             _es_delta["stream_ok"] = False
         time.sleep(5)  # brief delay before reconnect
 
-def _es_quote_stream_loop():
-    """Background thread: streams @ES quotes for bid/ask delta classification.
+# Range-bar state of the @ES listener: persistent NBBO + Volume baseline for the session
+_es_quote_tape = {"prev_daily_vol": None, "last_vals": {}}
+
+def _es_quote_on_state(connected: bool):
+    with _es_quote_lock:
+        _es_quote["stream_ok"] = connected
+
+def _es_quote_on_update(symbol: str, data: dict, quote: dict):
+    """quote_feed listener on @ES: bid/ask delta classification.
 
     Tracks DailyVolume to detect trades. Each trade is classified as buy/sell
     based on whether Last >= Ask (buy) or Last <= Bid (sell), then fed into
-    tick-perfect range bar construction.
+    tick-perfect range bar construction. The @ES subscription itself (and its
+    reconnects) belongs to app/quote_feed.py, which also serves the price to
+    every other consumer.
     """
-    backoff = 1.0
-    prev_daily_vol = None
-    last_vals = {}  # persistent NBBO: Last, Bid, Ask
-
-    while True:
-        try:
-            # Wait for ES futures session
-            if not _es_futures_open():
-                backoff = 1.0
-                time.sleep(30)
-                continue
-
-            session_date = _es_session_date()
-            if _es_quote["trade_date"] != session_date:
-                _es_quote_reset()
-                prev_daily_vol = None
-                last_vals = {}
-
-            token = ts_access_token()
-            headers = {"Authorization": f"Bearer {token}"}
-            r = requests.get(
-                f"{BASE}/marketdata/stream/quotes/%40ES",
-                headers=headers, stream=True, timeout=30,
-            )
-            if r.status_code == 401:
-                token = ts_access_token()
-                headers["Authorization"] = f"Bearer {token}"
-                r = requests.get(
-                    f"{BASE}/marketdata/stream/quotes/%40ES",
-                    headers=headers, stream=True, timeout=30,
-                )
-                if r.status_code == 401:
-                    _alert_401("es-quote stream")
-            if r.status_code != 200:
-                print(f"[es-quote] stream error [{r.status_code}] {r.text[:200]}", flush=True)
-                time.sleep(min(backoff, 60))
-                backoff *= 2
-                continue
-
-            # Connected successfully — reset backoff
-            backoff = 1.0
-            with _es_quote_lock:
-                _es_quote["stream_ok"] = True
-            print(f"[es-quote] stream connected (session {session_date})", flush=True)
-
-            for line in r.iter_lines(decode_unicode=True):
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                except Exception:
-                    continue
-
-                # Stream control messages
-                if "Heartbeat" in data:
-                    continue
-                if "Error" in data:
-                    err_msg = data.get("Error", "")
-                    print(f"[es-quote] stream error msg: {data}", flush=True)
-                    if err_msg == "DualLogon":
-                        # Another session is connected — wait longer before retry
-                        backoff = max(backoff, 15.0)
-                    break
-                if data.get("StreamStatus") == "GoAway":
-                    print("[es-quote] GoAway received, reconnecting", flush=True)
-                    break
-
-                # Session date rollover
-                new_session = _es_session_date()
-                if _es_quote["trade_date"] != new_session:
-                    print(f"[es-quote] session rollover → {new_session}", flush=True)
-                    _es_quote_reset()
-                    prev_daily_vol = None
-                    last_vals = {}
-
-                # Merge partial updates into persistent NBBO
-                # TradeStation uses "Volume" (not "DailyVolume") for cumulative daily volume
-                for key in ("Last", "Bid", "Ask", "Volume"):
-                    if key in data:
-                        last_vals[key] = data[key]
-
-                # Detect trade: Volume increased
-                daily_vol_str = last_vals.get("Volume")
-                if daily_vol_str is None:
-                    continue
-                try:
-                    daily_vol = int(daily_vol_str)
-                except (ValueError, TypeError):
-                    continue
-
-                if prev_daily_vol is None:
-                    # First snapshot — set baseline, no trade to process
-                    prev_daily_vol = daily_vol
-                    continue
-
-                if daily_vol <= prev_daily_vol:
-                    continue  # No new trade
-
-                trade_vol = daily_vol - prev_daily_vol
-                prev_daily_vol = daily_vol
-
-                # Need Last, Bid, Ask to classify
-                last_p = last_vals.get("Last")
-                bid_p = last_vals.get("Bid")
-                ask_p = last_vals.get("Ask")
-                if last_p is None or bid_p is None or ask_p is None:
-                    continue
-                try:
-                    last_f = float(last_p)
-                    bid_f = float(bid_p)
-                    ask_f = float(ask_p)
-                except (ValueError, TypeError):
-                    continue
+    if not _es_futures_open():
+        return
+    # forming bar / last price on the dashboard's ES delta chart between completed bars
+    live_push.notify_throttled("es", live_push.ES_FORMING_SEC)
+    tape = _es_quote_tape
+
+    # Session date rollover
+    new_session = _es_session_date()
+    if _es_quote["trade_date"] != new_session:
+        print(f"[es-quote] session rollover → {new_session}", flush=True)
+        _es_quote_reset()
+        with _es_quote_lock:
+            _es_quote["stream_ok"] = True
+        tape["prev_daily_vol"] = None
+        tape["last_vals"] = {}
+    last_vals = tape["last_vals"]
+
+    # Merge partial updates into persistent NBBO
+    # TradeStation uses "Volume" (not "DailyVolume") for cumulative daily volume
+    for key in ("Last", "Bid", "Ask", "Volume"):
+        if key in data:
+            last_vals[key] = data[key]
+
+    # Detect trade: Volume increased
+    daily_vol_str = last_vals.get("Volume")
+    if daily_vol_str is None:
+        return
+    try:
+        daily_vol = int(daily_vol_str)
+    except (ValueError, TypeError):
+        return
 
-                ts_now = now_et().isoformat()
-                ts_bar_snapshot = None
-                with _es_quote_lock:
-                    ts_bar_snapshot = _es_quote_process_trade(last_f, bid_f, ask_f, trade_vol, ts_now)
-                    tc = _es_quote["trade_count"]
-                    # Log first 5 trades, then every 1000th for diagnostics
-                    if tc <= 5 or tc % 1000 == 0:
-                        fb = _es_quote.get("_forming_bar")
-                        fb_range = f"{fb['high'] - fb['low']:.2f}" if fb else "?"
-                        print(f"[es-quote] trade #{tc}: last={last_f} vol={trade_vol} "
-                              f"completed={len(_es_quote['_completed_bars'])} "
-                              f"forming_range={fb_range}/{_es_quote['_range_pts']}",
-                              flush=True)
+    prev_daily_vol = tape["prev_daily_vol"]
+    if prev_daily_vol is None:
+        # First snapshot — set baseline, no trade to process
+        tape["prev_daily_vol"] = daily_vol
+        return
 
-                # Fallback absorption on TS bars: only fires when Rithmic is the
-                # active feed AND is currently disconnected. With ES_DATA_SOURCE=sierra,
-                # Sierra is primary and TS bars must NOT duplicate-fire detection.
-                if ts_bar_snapshot and _es_data_source() == "rithmic":
-                    try:
-                        from rithmic_es_stream import get_rithmic_state
-                        rithmic_ok = get_rithmic_state().get("connected", False)
-                    except Exception:
-                        rithmic_ok = False
-                    if not rithmic_ok:
-                        _on_rithmic_bar_complete(ts_bar_snapshot)
+    if daily_vol <= prev_daily_vol:
+        return  # No new trade
 
-            try:
-                r.close()
-            except Exception:
-                pass
+    trade_vol = daily_vol - prev_daily_vol
+    tape["prev_daily_vol"] = daily_vol
 
-        except Exception as e:
-            print(f"[es-quote] stream error: {e}", flush=True)
+    # Need Last, Bid, Ask to classify
+    last_p = last_vals.get("Last")
+    bid_p = last_vals.get("Bid")
+    ask_p = last_vals.get("Ask")
+    if last_p is None or bid_p is None or ask_p is None:
+        return
+    try:
+        last_f = float(last_p)
+        bid_f = float(bid_p)
+        ask_f = float(ask_p)
+    except (ValueError, TypeError):
+        return
 
-        with _es_quote_lock:
-            _es_quote["stream_ok"] = False
-        reconnect_wait = min(backoff, 60)
-        print(f"[es-quote] reconnecting in {reconnect_wait:.0f}s", flush=True)
-        time.sleep(reconnect_wait)
-        backoff *= 2
+    ts_now = now_et().isoformat()
+    ts_bar_snapshot = None
+    with _es_quote_lock:
+        ts_bar_snapshot = _es_quote_process_trade(last_f, bid_f, ask_f, trade_vol, ts_now)
+        tc = _es_quote["trade_count"]
+        # Log first 5 trades, then every 1000th for diagnostics
+        if tc <= 5 or tc % 1000 == 0:
+            fb = _es_quote.get("_forming_bar")
+            fb_range = f"{fb['high'] - fb['low']:.2f}" if fb else "?"
+            print(f"[es-quote] trade #{tc}: last={last_f} vol={trade_vol} "
+                  f"completed={len(_es_quote['_completed_bars'])} "
+                  f"forming_range={fb_range}/{_es_quote['_range_pts']}",
+                  flush=True)
+
+    # Fallback absorption on TS bars: only fires when Rithmic is the
+    # active feed AND is currently disconnected. With ES_DATA_SOURCE=sierra,
+    # Sierra is primary and TS bars must NOT duplicate-fire detection.
+    if ts_bar_snapshot and _es_data_source() == "rithmic":
+        try:
+            from rithmic_es_stream import get_rithmic_state
+            rithmic_ok = get_rithmic_state().get("connected", False)
+        except Exception:
+            rithmic_ok = False
+        if not rithmic_ok:
+            _on_rithmic_bar_complete(ts_bar_snapshot)
 
 _last_es_delta_saved_at = 0.0  # tracks last successful es_delta_snapshots INSERT
 
@@ -8008,6 +7751,7 @@ def _send_setup_eod_summary():
                         "ep": round(spot, 2) if spot else None,
                         "id": log_id,
                     })
+                signal_feed.outcome(log_id, outcome_result, pnl)
             except Exception as db_err:
                 print(f"[eod-summary] DB persist error: {db_err}", flush=True)
 
@@ -8216,7 +7960,9 @@ def start_scheduler():
                 hour=EOD_FLATTEN_ET[0], minute=EOD_FLATTEN_ET[1],
                 id="real_trade_eod", coalesce=True, max_instances=1,
                 misfire_grace_time=300)
-    # Real trader: fast 3s polling to minimize orphaned order window (cap=2 stacking safety)
+    # Real trader: fast 3s polling to minimize orphaned order window (cap=2 stacking safety).
+    # With the brokerage order stream live, fills arrive as events and poll_order_status
+    # only re-reads /orders every broker_stream.CONSISTENCY_POLL_SEC.
     _poll_hung_count = {"n": 0}
     def _real_trade_fast_poll():
         t = now_et().time()
@@ -8492,7 +8238,7 @@ def start_scheduler():
             try:
                 from app.live_filter import backfill_live_pass
                 n = backfill_live_pass(engine)
-                print(f"[live_pass] re-stamped {n} V16 trades", flush=True)
+                print(f"[live_pass] re-stamp changed {n} rows", flush=True)
             except Exception as e:
                 print(f"[live_pass] restamp error (non-fatal): {e}", flush=True)
         sch.add_job(_live_pass_restamp, "cron", day_of_week="mon-fri", hour=16, minute=25,
@@ -8576,94 +8322,12 @@ def missing_envs():
 
 scheduler: BackgroundScheduler | None = None
 
-@app.on_event("startup")
-def on_startup():
-    miss = missing_envs()
-    if miss:
-        print("[env] missing:", miss, flush=True)
-    if engine:
-        # Retry db_init on lock contention — an idle-in-transaction analysis
-        # session holding AccessShareLock on chain_snapshots blocks the
-        # idempotent ALTERs and crash-looped the whole service (2026-06-03).
-        # In steady state all tables/columns already exist, so after retries
-        # we log loudly and continue rather than dying.
-        for _attempt in range(3):
-            try:
-                db_init()
-                break
-            except Exception as e:
-                print(f"[db] db_init attempt {_attempt+1}/3 failed: {e}", flush=True)
-                if _attempt < 2:
-                    time.sleep(10)
-        else:
-            print("[db] ⚠️ db_init failed after 3 attempts — continuing startup "
-                  "(migrations skipped; tables assumed to exist)", flush=True)
-            try:
-                send_telegram("⚠️ db_init failed 3x at startup (likely lock contention "
-                              "on chain_snapshots) — service started WITHOUT running migrations.")
-            except Exception:
-                pass
-            # db_init died during DDL, so the post-init loaders at its tail never
-            # ran (alert/setup settings, cooldowns, open trades). They're plain
-            # SELECT/UPDATE work — no DDL locks — so run them here. Without this,
-            # the service ran on all-True alert defaults (2026-06-04 Telegram
-            # noise) and with no cooldowns/open-trade state after a lock outage.
-            for _loader in (load_alert_settings, load_setup_settings,
-                            _load_cooldowns, _backfill_outcomes, _restore_open_trades):
-                try:
-                    _loader()
-                except Exception as le:
-                    print(f"[db] post-init loader {_loader.__name__} failed: {le}", flush=True)
-    else:
-        print("[db] engine not created (no DATABASE_URL)", flush=True)
-    global scheduler
-    scheduler = start_scheduler()
-    # Fetch economic calendar on startup (don't wait for Monday cron)
-    Thread(target=fetch_economic_calendar, daemon=True).start()
-    # TS 1-min delta stream disabled — Rithmic is sole ES data source
-    # Thread(target=_es_delta_stream_loop, daemon=True).start()
-    print("[es-delta] TS 1-min stream DISABLED — using Rithmic only", flush=True)
-    # Start ES quote streaming thread (bid/ask delta classification)
-    Thread(target=_es_quote_stream_loop, daemon=True).start()
-    print("[es-quote] streaming thread started", flush=True)
-    # Start Rithmic ES stream (parallel pipeline — skips if RITHMIC_USER not set,
-    # RITHMIC_DISABLED=true, or ES_DATA_SOURCE=sierra)
-    from rithmic_es_stream import start_rithmic_stream, set_on_bar_complete, set_on_bar_10_complete
-    start_rithmic_stream(engine, send_telegram)
-    # Register absorption detection callbacks on Rithmic bar completion
-    set_on_bar_complete(_on_rithmic_bar_complete)
-    set_on_bar_10_complete(_on_rithmic_bar_10pt_complete)
-    print("[absorption] registered proactive callbacks on Rithmic bar completion (5pt + 10pt)", flush=True)
-    # Phase 3: hydrate Sierra in-memory mirror from DB (lets ES_DATA_SOURCE=sierra
-    # serve get_es_bars() immediately after restart, before next POST arrives).
-    try:
-        _hydrate_sierra_bars_from_db()
-    except Exception as e:
-        print(f"[sierra] hydrate error (non-fatal): {e}", flush=True)
-    # Initialize auto-trader (SIM ES execution — disabled by default)
-    try:
-        from app.auto_trader import init as auto_trader_init
-        auto_trader_init(engine, ts_access_token, send_telegram_setups)
-    except Exception as e:
-        print(f"[auto-trader] init error (non-fatal): {e}", flush=True)
-    # Initialize options trader (SPX 0DTE options on equities SIM — disabled by default)
-    try:
-        from app.options_trader import init as options_trader_init
-        options_trader_init(engine, ts_access_token, send_telegram_setups)
-    except Exception as e:
-        print(f"[options] init error (non-fatal): {e}", flush=True)
-    # Friday SPX 0DTE call credit spread (S267) — log-only collector, trade-ready by env.
-    try:
-        from app.friday_spread import init as friday_spread_init
-        friday_spread_init(engine, ts_access_token, send_telegram_setups)
-    except Exception as e:
-        print(f"[friday-spread] init error (non-fatal): {e}", flush=True)
-    # Initialize real trader (MES REAL accounts — disabled by default)
-    try:
-        from app.real_trader import init as real_trader_init
-        real_trader_init(engine, ts_access_token, send_telegram_setups)
-    except Exception as e:
-        print(f"[real-trader] init error (non-fatal): {e}", flush=True)
+def _warm_gex_long_v3_overlay():
+    from app import gex_long_v3
+    gex_long_v3.get_overlay(analytics_engine)
+
+def _init_monitors():
+    """Startup warm-up: daily reconcile/report crons, scanners and monitoring-only modules."""
     # Initialize trade reconcile (S81 — daily portal-vs-real audit at 16:15 ET)
     try:
         from app.trade_reconcile import init as reconcile_init
@@ -8702,22 +8366,23 @@ def on_startup():
         print(f"[watchdog] init error (non-fatal): {e}", flush=True)
     # Stock GEX scanner — reduced schedule (was 200+ calls/30min, now ~236/day)
     # Weekly: 3x/day (10, 12, 15 ET), Opex: 1x/day (10 ET), Spot: every 5 min (1 batch call)
-    # No startup scans. 5s delay between stocks. Independent from 0DTE pipeline.
+    # No startup scans. Chains fetched concurrently via app/scan_executor.py. Independent
+    # from 0DTE pipeline.
     try:
         from app.stock_gex_scanner import init as stock_gex_init
-        stock_gex_init(engine, api_get, send_telegram)
+        stock_gex_init(engine, api_get_bulk, send_telegram)
     except Exception as e:
         print(f"[stock-gex] init error (non-fatal): {e}", flush=True)
     # 0DTE GEX scanner — SPX/SPY/QQQ/IWM, every 30 min, data-only (S84)
     try:
         from app.dte0_gex_scanner import init as dte0_gex_init
-        dte0_gex_init(engine, api_get)
+        dte0_gex_init(engine, api_get_bulk)
     except Exception as e:
         print(f"[dte0-gex] init error (non-fatal): {e}", flush=True)
     # Stock GEX live — trade monitoring + EOD (GEX scans still from scanner above)
     try:
         from app.stock_gex_live import init as stock_gex_live_init
-        stock_gex_live_init(engine, api_get, send_telegram_stock_gex)
+        stock_gex_live_init(engine, api_get_bulk, send_telegram_stock_gex)
     except Exception as e:
         print(f"[stock-gex-live] init error (non-fatal): {e}", flush=True)
     # Dip-Buy Long — PORTAL/LOG-ONLY momentum dip-buy (2026-05-30). Not TSRT/eval.
@@ -8730,7 +8395,7 @@ def on_startup():
     # Self-contained, fail-soft, MONITORING-ONLY (zero touch to the trade loop). 2026-06-11.
     try:
         from app.darkmate import init as darkmate_init
-        darkmate_init(engine, api_get, lambda: _spot_last)
+        darkmate_init(engine, api_get_bulk, lambda: _spot_last)
     except Exception as e:
         print(f"[darkmate] init error (non-fatal): {e}", flush=True)
     # GEX dealer-positioning state (S244) — six cards + 11-state taxonomy from the chain
@@ -8749,6 +8414,139 @@ def on_startup():
         briefing_init(engine, send_telegram)
     except Exception as e:
         print(f"[briefing] init error (non-fatal): {e}", flush=True)
+
+@app.on_event("startup")
+def on_startup():
+    # Critical phase (app/startup.py): everything up to startup.critical_done() runs
+    # before trading is allowed; startup.defer() work runs after it in the background.
+    miss = missing_envs()
+    if miss:
+        print("[env] missing:", miss, flush=True)
+    if engine:
+        # Retry db_init on lock contention — an idle-in-transaction analysis
+        # session holding AccessShareLock on chain_snapshots blocks the
+        # idempotent ALTERs and crash-looped the whole service (2026-06-03).
+        # With the migration ledger (app/migrations.py) DDL only runs when a step
+        # is pending, so this matters only on a deploy that adds schema; after
+        # retries we log loudly and continue rather than dying.
+        for _attempt in range(3):
+            try:
+                db_init()
+                break
+            except Exception as e:
+                print(f"[db] db_init attempt {_attempt+1}/3 failed: {e}", flush=True)
+                if _attempt < 2:
+                    time.sleep(10)
+        else:
+            print("[db] ⚠️ db_init failed after 3 attempts — continuing startup "
+                  "(migrations skipped; tables assumed to exist)", flush=True)
+            try:
+                send_telegram("⚠️ db_init failed 3x at startup (likely lock contention "
+                              "on chain_snapshots) — service started WITHOUT running migrations.")
+            except Exception:
+                pass
+            # db_init died during DDL, so the post-init loaders at its tail never
+            # ran (alert/setup settings, cooldowns, open trades). They're plain
+            # SELECT/UPDATE work — no DDL locks — so run them here. Without this,
+            # the service ran on all-True alert defaults (2026-06-04 Telegram
+            # noise) and with no cooldowns/open-trade state after a lock outage.
+            for _loader in (load_alert_settings, load_setup_settings,
+                            _load_cooldowns, _restore_open_trades):
+                try:
+                    _loader()
+                except Exception as le:
+                    print(f"[db] post-init loader {_loader.__name__} failed: {le}", flush=True)
+        # Outcome backfill (history only — today's trades are the live tracker's) and the
+        # GEX Long v3 overlay cache (first /api/setup/gex_long_v3_overlay) can wait
+        startup.defer("outcome_backfill", _backfill_outcomes)
+        startup.defer("gex_long_v3_overlay", _warm_gex_long_v3_overlay)
+        # Eval signal feed: seed today's journal before the first log_setups()
+        signal_feed.init(api_engine, _eval_signal_entry, _es_last_price)
+        # Telegram queue: telegram_alerts rows + the undelivered-message spill
+        telegram_queue.attach(engine)
+    else:
+        print("[db] engine not created (no DATABASE_URL)", flush=True)
+    startup.mark("db")
+    # Fetch economic calendar on startup (don't wait for Monday cron)
+    startup.defer("economic_calendar", fetch_economic_calendar)
+    # TS 1-min delta stream disabled — Rithmic is sole ES data source
+    # Thread(target=_es_delta_stream_loop, daemon=True).start()
+    print("[es-delta] TS 1-min stream DISABLED — using Rithmic only", flush=True)
+    # Completed-bar dispatcher — single worker for the absorption detectors; started
+    # before any bar feed so the first completed bar has somewhere to go
+    try:
+        bar_dispatch.init(_bar_context, log_setups)
+    except Exception as e:
+        print(f"[bar-dispatch] init error (non-fatal): {e}", flush=True)
+    # Dashboard server push — one build per data event, shared by every open tab
+    try:
+        live_push.register("series", _push_series)
+        live_push.register("volland", _push_volland)
+        live_push.register("es", _push_es)
+        live_push.init()
+    except Exception as e:
+        print(f"[live-push] init error (non-fatal): {e}", flush=True)
+    startup.mark("dispatch")
+    # Shared quote feed: one TS quote stream per symbol. @ES feeds the range bars /
+    # delta classification and every in-process ES price read.
+    quote_feed.init(ts_access_token, _alert_401)
+    quote_feed.listen("@ES", _es_quote_on_update, _es_quote_on_state)
+    print("[es-quote] listening on the shared @ES quote feed", flush=True)
+    # Start Rithmic ES stream (parallel pipeline — skips if RITHMIC_USER not set,
+    # RITHMIC_DISABLED=true, or ES_DATA_SOURCE=sierra)
+    from rithmic_es_stream import start_rithmic_stream, set_on_bar_complete, set_on_bar_10_complete
+    start_rithmic_stream(engine, send_telegram)
+    # Register absorption detection callbacks on Rithmic bar completion
+    set_on_bar_complete(_on_rithmic_bar_complete)
+    set_on_bar_10_complete(_on_rithmic_bar_10pt_complete)
+    print("[absorption] registered proactive callbacks on Rithmic bar completion (5pt + 10pt)", flush=True)
+    # Phase 3: hydrate Sierra in-memory mirror from DB (lets ES_DATA_SOURCE=sierra
+    # serve get_es_bars() immediately after restart, before next POST arrives).
+    try:
+        _hydrate_sierra_bars_from_db()
+    except Exception as e:
+        print(f"[sierra] hydrate error (non-fatal): {e}", flush=True)
+    # Persistent options-chain stream — per-strike book the market job reads instead of
+    # opening a fresh chain stream every 30s cycle. Books start lazily on first read.
+    try:
+        from app.chain_stream import init as chain_stream_init
+        chain_stream_init(api_get, _chain_item_row)
+    except Exception as e:
+        print(f"[chain-stream] init error (non-fatal): {e}", flush=True)
+    # Volland "new snapshot" LISTEN — refreshes the Volland cache once per worker cycle
+    try:
+        from app.volland_notify import init as volland_notify_init
+        volland_notify_init(os.getenv("DATABASE_URL", ""), _on_volland_snapshot)
+    except Exception as e:
+        print(f"[volland-notify] init error (non-fatal): {e}", flush=True)
+    startup.mark("feeds")
+    # Initialize auto-trader (SIM ES execution — disabled by default)
+    try:
+        from app.auto_trader import init as auto_trader_init
+        auto_trader_init(engine, ts_access_token, send_telegram_setups)
+    except Exception as e:
+        print(f"[auto-trader] init error (non-fatal): {e}", flush=True)
+    # Initialize options trader (SPX 0DTE options on equities SIM — disabled by default)
+    try:
+        from app.options_trader import init as options_trader_init
+        options_trader_init(engine, ts_access_token, send_telegram_setups)
+    except Exception as e:
+        print(f"[options] init error (non-fatal): {e}", flush=True)
+    # Friday SPX 0DTE call credit spread (S267) — log-only collector, trade-ready by env.
+    try:
+        from app.friday_spread import init as friday_spread_init
+        friday_spread_init(engine, ts_access_token, send_telegram_setups)
+    except Exception as e:
+        print(f"[friday-spread] init error (non-fatal): {e}", flush=True)
+    # Initialize real trader (MES REAL accounts — disabled by default)
+    try:
+        from app.real_trader import init as real_trader_init
+        real_trader_init(engine, ts_access_token, send_telegram_setups)
+    except Exception as e:
+        print(f"[real-trader] init error (non-fatal): {e}", flush=True)
+    startup.mark("traders")
+    # Reconcile / report crons, scanners and monitoring-only modules: warm-up phase
+    startup.defer("monitors", _init_monitors)
     # Initialize V2 dashboard (separate design at /v2)
     try:
         from app.dashboard_v2 import init as dashboard_v2_init
@@ -8769,7 +8567,20 @@ def on_startup():
         dashboard_v2_init(_get_dashboard_v2_context)
         print("[dashboard-v2] initialized at /v2", flush=True)
     except Exception as e:
-        print(f"[dashboard-v2] init error (non-fatal): {e}", flush=True)
+        print(f"[dashboard-v2] init error (non-fatal): {e}", flush=True)
+    startup.mark("dashboard")
+    # Scheduler last: its jobs (market cycle, trader polling) start once feeds and
+    # traders are up, and the first market cycle runs now instead of PULL_EVERY later
+    global scheduler
+    scheduler = start_scheduler()
+    try:
+        scheduler.get_job("pull").modify(next_run_time=now_et())
+    except Exception as e:
+        print(f"[sched] first-cycle kick failed (non-fatal): {e}", flush=True)
+    startup.mark("scheduler")
+    mig = migrations.status()
+    print(f"[startup] migrations {mig['ms'] / 1000:.2f}s ({mig['applied']} step(s) applied)", flush=True)
+    startup.critical_done()
 
 @app.on_event("shutdown")
 def on_shutdown():
@@ -8777,28 +8588,42 @@ def on_shutdown():
     if scheduler:
         scheduler.shutdown()
         print("[sched] stopped", flush=True)
+    # Deliver what the workers can in a few seconds; the rest goes to telegram_outbox
+    telegram_queue.shutdown(timeout=5)
 
 # ====== API ======
 @app.get("/api/series")
-def api_series():
-    with _df_lock:
-        df = None if (latest_df is None or latest_df.empty) else latest_df.copy()
-    if df is None or df.empty:
+def api_series(request: Request):
+    return response_cache.cached(request, "series", _chain_key(), _series_payload)
+
+def _chain_key():
+    """Data version of /api/series-style reads: the SPX chain snapshot + the status msg spot."""
+    chain = latest_chain
+    return (chain.version if chain is not None else None, last_run_status.get("msg"))
+
+def _volland_version():
+    """Snapshot id the Volland cache holds. None while the NOTIFY listener is down —
+    a newer snapshot may then exist that nothing told us about, so don't cache on it."""
+    from app import volland_notify
+    if not volland_notify.listening():
+        return None
+    return _volland_data_cache.get("snapshot_id")
+
+def _series_payload():
+    chain = latest_chain
+    if chain is None or chain.empty:
         return {
             "strikes": [], "callVol": [], "putVol": [], "callOI": [], "putOI": [],
             "callGEX": [], "putGEX": [], "netGEX": [], "spot": None
         }
-    sdf = df.sort_values("Strike")
-    s  = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float)
-    call_vol = pd.to_numeric(sdf["C_Volume"],       errors="coerce").fillna(0.0).astype(float)
-    put_vol  = pd.to_numeric(sdf["P_Volume"],       errors="coerce").fillna(0.0).astype(float)
-    call_oi  = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-    put_oi   = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-    c_gamma  = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-    p_gamma  = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-    call_gex = ( c_gamma * call_oi * 100.0).astype(float)
-    put_gex  = (-p_gamma * put_oi  * 100.0).astype(float)
-    net_gex  = (call_gex + put_gex).astype(float)
+    s  = chain.strikes
+    call_vol = chain.col0("C_Volume")
+    put_vol  = chain.col0("P_Volume")
+    call_oi  = chain.col0("C_OpenInterest")
+    put_oi   = chain.col0("P_OpenInterest")
+    call_gex =  chain.col0("C_Gamma") * call_oi * 100.0
+    put_gex  = -chain.col0("P_Gamma") * put_oi  * 100.0
+    net_gex  = call_gex + put_gex
     spot = None
     try:
         parts = dict(splt.split("=", 1) for splt in (last_run_status.get("msg") or "").split() if "=" in splt)
@@ -8813,12 +8638,49 @@ def api_series():
         "spot": spot
     }
 
+# ====== Dashboard server push (app/live_push.py) ======
+# Each builder returns what the matching /api/* calls return, built once per event for
+# every connected tab. An endpoint that failed (JSONResponse) is sent as null and the
+# page falls back to fetching it itself.
+def _push_body(r):
+    return None if isinstance(r, Response) else r
+
+def _push_series():
+    """Per market-job cycle: /api/series, /api/data_freshness, /api/spx_candles?bars=60,
+    /api/statistics_levels."""
+    return {"series": _series_payload(), "freshness": api_data_freshness(),
+            "candles": _push_body(api_spx_candles(bars=60)),
+            "levels": _push_body(_statistics_levels_payload())}
+
+def _push_volland():
+    """Per Volland snapshot: the 0DTE windows the charts draw + /api/volland/stats."""
+    return {"vanna_window": _push_body(_vanna_window_payload(40)),
+            "delta_decay_window": _push_body(api_volland_delta_decay_window(limit=40)),
+            "vanna_0dte": _push_body(_exposure_window_payload("vanna", "TODAY", 40)),
+            "gamma_0dte": _push_body(_exposure_window_payload("gamma", "TODAY", 40)),
+            "stats": _push_body(api_volland_stats())}
+
+def _push_es():
+    """Per completed 5pt ES bar and every ES_FORMING_SEC of @ES quotes (forming bar):
+    /api/es/delta/rangebars?range=5."""
+    return {"rangebars": _push_body(api_es_delta_rangebars(range_pts=5.0))}
+
+@app.get("/api/stream")
+async def api_stream():
+    """Server-sent events for the dashboard: `series`, `volland` and `es` events, each
+    carrying the payload of the endpoints the page used to poll."""
+    sub = live_push.subscribe(asyncio.get_running_loop())
+    if sub is None:
+        return JSONResponse({"error": "too many stream subscribers"}, status_code=503)
+    return StreamingResponse(live_push.events(sub), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/api/economic-calendar")
 def api_economic_calendar(country: str = "USD", impact: str = None):
     """Return economic events. Filter by country (default USD) and optionally impact level."""
     if not engine:
         return JSONResponse({"error": "no db"}, 500)
-    with engine.connect() as conn:
+    with api_engine.connect() as conn:
         q = "SELECT ts, title, country, impact, forecast, previous, actual FROM economic_events WHERE country = :country"
         params = {"country": country}
         if impact:
@@ -8889,6 +8751,20 @@ def api_health(request: Request):
                 "stale": vol_stale,
             },
             "es_quote_stream": {"connected": es_quote_ok},
+            "chain_stream": _chain_stream_health(),
+            "volland_notify": _volland_notify_health(),
+            "bar_dispatch": bar_dispatch.status(),
+            "live_push": live_push.status(),
+            "response_cache": response_cache.status(),
+            "startup": {**startup.status(), "migrations_ms": migrations.status()["ms"]},
+            "migrations": migrations.status(),
+            "db_pools": db_pools.status(),
+            "signal_feed": signal_feed.status(),
+            "broker_stream": broker_stream.status(),
+            "quote_feed": quote_feed.status(),
+            "telegram_queue": telegram_queue.status(),
+            "ts_client": ts_client.status(),
+            "scan_executor": scan_executor.status(),
             "rithmic_stream": rithmic_info or {"connected": False},
             **_auto_trader_health(),
         },
@@ -8904,6 +8780,29 @@ def api_health(request: Request):
         "last": last_run_status,
     }
 
+def _chain_stream_health() -> dict:
+    """Persistent chain book status for the health endpoint (graceful if not loaded)."""
+    try:
+        from app import chain_stream
+        return chain_stream.status()
+    except Exception as e:
+        return {"error": str(e)}
+
+def _volland_notify_health() -> dict:
+    """Volland LISTEN status + age of the data the cache holds."""
+    try:
+        from app import volland_notify
+        return {**volland_notify.status(), "cache_snapshot_id": _volland_data_cache.get("snapshot_id"),
+                "cache_data_age_s": _volland_data_age_s()}
+    except Exception as e:
+        return {"error": str(e)}
+
+@app.get("/api/chain/staleness")
+def api_chain_staleness(symbol: str = Query(None)):
+    """Per-strike age (seconds since last stream update) for each live chain book."""
+    from app import chain_stream
+    return chain_stream.staleness(symbol)
+
 def _auto_trader_health() -> dict:
     """Get auto-trader status for health endpoint (graceful if not loaded)."""
     try:
@@ -9013,10 +8912,10 @@ def darkmate_fw_page(session: str = Cookie(None)):
     return HTMLResponse(DARKMATE_FW_HTML)
 
 @app.get("/api/gex-state/latest")
-def api_gex_state_latest():
+def api_gex_state_latest(request: Request):
     """Current dealer-positioning cards + state. MONITORING ONLY (S244)."""
     from app import gex_state
-    return gex_state.latest()
+    return response_cache.cached(request, "gex_state_latest", gex_state.version(), gex_state.latest)
 
 @app.get("/api/gex-state/history")
 def api_gex_state_history(date: str = None):
@@ -9041,9 +8940,14 @@ def api_darkmate_results_history(days: int = 20):
     return darkmate.results_history(days)
 
 @app.get("/api/darkmate/levels")
-def api_darkmate_levels(at: str = None, greek: str = "gamma", rng: int = 150):
+def api_darkmate_levels(request: Request, at: str = None, greek: str = "gamma", rng: int = 150):
     from app import darkmate
-    return darkmate.levels(at, greek, rng)
+    if at:
+        key = ("at", at, greek, rng)                       # history: a fixed snapshot
+    else:
+        v = _volland_version()                             # live: Volland + the live spot marker
+        key = None if v is None else (v, _chain_key()[0], greek, rng)
+    return response_cache.cached(request, "darkmate_levels", key, lambda: darkmate.levels(at, greek, rng))
 
 # ── Friday call credit spread (S267) — config, per-week ledger, running total ──
 @app.get("/api/friday-spread/status")
@@ -9297,9 +9201,10 @@ def api_0dte_gex_trigger():
 def api_debug_options_sim(date: str = "2026-03-10"):
     """Simulate options trades for a date using real chain_snapshots data."""
     from sqlalchemy import text as _text
+    import numpy as np
     result = {"date": date, "trades": [], "summary": {}}
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             # 1. Get all setup_log trades for this date
             setups = conn.execute(_text("""
                 SELECT id, setup_name, direction, grade, score, greek_alignment,
@@ -9312,15 +9217,17 @@ def api_debug_options_sim(date: str = "2026-03-10"):
 
             # 2. Get all chain_snapshots for this date (every ~2 min)
             chains = conn.execute(_text("""
-                SELECT ts, spot, rows, columns FROM chain_snapshots
+                SELECT ts, spot, rows, packed FROM chain_snapshots
                 WHERE ts::date = :d ORDER BY ts
             """), {"d": date}).fetchall()
 
+            # Columnar snapshots (app/chain_columns.decode) — the lookups below read the
+            # strike / delta / bid / ask arrays instead of walking positional rows
             chain_list = []
             for c in chains:
-                cols = json.loads(c.columns) if isinstance(c.columns, str) else c.columns
-                rows = json.loads(c.rows) if isinstance(c.rows, str) else c.rows
-                chain_list.append({"ts": c.ts, "spot": c.spot, "cols": cols, "rows": rows})
+                ch = decode_chain(c.packed, c.rows)
+                if ch is not None:
+                    chain_list.append({"ts": c.ts, "spot": c.spot, "chain": ch})
 
             def find_nearest_chain(target_ts):
                 best = None
@@ -9332,49 +9239,28 @@ def api_debug_options_sim(date: str = "2026-03-10"):
                         best = ch
                 return best, best_diff
 
+            def _quote_at(ch, i, side):
+                p = "C_" if side == "call" else "P_"
+                vals = [ch.col(p + n)[i] for n in ("Ask", "Bid", "Delta")]
+                ask, bid, delta = (None if np.isnan(v) else float(v) for v in vals)
+                return {"strike": float(ch.strikes[i]), "ask": ask, "bid": bid, "delta": delta}
+
             def find_strike_at_delta(chain, target_delta, side="call"):
                 """Find strike nearest to target delta. Returns (strike, ask, bid, delta)."""
-                best = None
-                best_diff = 999
-                for row in chain["rows"]:
-                    try:
-                        strike = float(row[10])
-                        if side == "call":
-                            delta = float(row[4]) if row[4] != "" else None
-                            ask = float(row[7]) if row[7] != "" else None
-                            bid = float(row[5]) if row[5] != "" else None
-                        else:  # put
-                            delta = float(row[16]) if row[16] != "" else None
-                            ask = float(row[12]) if row[12] != "" else None
-                            bid = float(row[14]) if row[14] != "" else None
-                        if delta is None or ask is None:
-                            continue
-                        diff = abs(abs(delta) - target_delta)
-                        if diff < best_diff:
-                            best_diff = diff
-                            best = {"strike": strike, "ask": ask, "bid": bid, "delta": delta}
-                    except (ValueError, IndexError):
-                        continue
-                return best
+                ch = chain["chain"]
+                p = "C_" if side == "call" else "P_"
+                delta, ask = ch.col(p + "Delta"), ch.col(p + "Ask")
+                diff = np.where(np.isnan(delta) | np.isnan(ask), np.inf,
+                                np.abs(np.abs(delta) - target_delta))
+                if not len(diff) or not np.isfinite(diff.min()):
+                    return None
+                return _quote_at(ch, int(np.argmin(diff)), side)
 
             def find_strike_price(chain, strike, side="call"):
                 """Get bid/ask for a specific strike in a chain snapshot."""
-                for row in chain["rows"]:
-                    try:
-                        s = float(row[10])
-                        if abs(s - strike) < 0.5:
-                            if side == "call":
-                                ask = float(row[7]) if row[7] != "" else None
-                                bid = float(row[5]) if row[5] != "" else None
-                                delta = float(row[4]) if row[4] != "" else None
-                            else:
-                                ask = float(row[12]) if row[12] != "" else None
-                                bid = float(row[14]) if row[14] != "" else None
-                                delta = float(row[16]) if row[16] != "" else None
-                            return {"strike": s, "ask": ask, "bid": bid, "delta": delta}
-                    except (ValueError, IndexError):
-                        continue
-                return None
+                ch = chain["chain"]
+                hit = np.flatnonzero(np.abs(ch.strikes - strike) < 0.5)
+                return _quote_at(ch, int(hit[0]), side) if len(hit) else None
 
             # 3. For each setup, simulate 3 strategies with REAL chain prices
             # A) Naked long (0.30 delta) — current strategy
@@ -9776,7 +9662,7 @@ def api_debug_sim_orders():
     # 6. Options trades from DB (theo prices)
     try:
         from sqlalchemy import text as _text
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             rows = conn.execute(_text("""
                 SELECT setup_log_id, state->>'setup_name' as setup_name,
                        state->>'symbol' as symbol,
@@ -9807,7 +9693,7 @@ def api_debug_gex_analysis():
     from sqlalchemy import text as _text
     result = {}
     try:
-        with engine.connect() as conn:
+        with analytics_engine.connect() as conn:
             # 1. Per-day: paradigm, GEX, SVB from volland (first snapshot each day)
             volland_days = conn.execute(_text("""
                 SELECT DISTINCT ON (d)
@@ -9929,7 +9815,7 @@ def api_auto_trade_log(limit: int = Query(200)):
     if not engine:
         return []
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text("""
                 SELECT ato.setup_log_id, ato.state, ato.created_at, ato.updated_at,
                        sl.setup_name, sl.direction, sl.grade, sl.ts, sl.spot,
@@ -10028,7 +9914,7 @@ def api_eval_log(limit: int = Query(200)):
     _EVAL_STOPS = {"Skew Charm": 14, "DD Exhaustion": 12, "Paradigm Reversal": 12, "AG Short": 12, "ES Absorption": 8}
     _GREEK_FILTER = True   # asymmetric: +3 longs, per-setup+SVB shorts
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text("""
                 SELECT id, ts, setup_name, direction, grade, score, spot,
                        abs_es_price, outcome_result, outcome_pnl,
@@ -10094,7 +9980,7 @@ def api_options_log(limit: int = Query(200)):
     if not engine:
         return []
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text("""
                 SELECT o.setup_log_id, o.state,
                        s.setup_name, s.direction, s.grade, s.ts, s.spot,
@@ -10173,126 +10059,120 @@ def api_options_log(limit: int = Query(200)):
         print(f"[options] log query error: {e}", flush=True)
         return []
 
+def _eval_signal_entry(row: dict):
+    """setup_log row -> /api/eval/signals entry, or None when the live filter rejects it.
+    Run once per logged row by app/signal_feed.py, not per poll."""
+    # V11: filter at API level so all consumers (eval, real) get clean signals
+    # S115 fix (2026-05-13): pass vanna_regime so VPB gate works on eval path
+    if not _passes_live_filter(
+        row["setup_name"], row["direction"],
+        row.get("greek_alignment") or 0,
+        vix=float(row["vix"]) if row.get("vix") else None,
+        overvix=float(row["overvix"]) if row.get("overvix") else None,
+        paradigm=row.get("paradigm"),
+        grade=row.get("grade"),
+        vanna_regime=row.get("vanna_regime"),
+        basket_pct=row.get("basket_pct"),
+    ):
+        return None
+    # Compute target/stop levels
+    tgt_lvl, stop_lvl = _compute_setup_levels(row)
+    return {
+        "id": row["id"],
+        "ts": row["ts"].isoformat() if row["ts"] else None,
+        "setup_name": row["setup_name"],
+        "direction": row["direction"],
+        "grade": row["grade"],
+        "score": row["score"],
+        "spot": row["spot"],
+        "target": row["target"],
+        "lis": row["lis"],
+        "paradigm": row["paradigm"],
+        "bofa_stop_level": row["bofa_stop_level"],
+        "bofa_target_level": row["bofa_target_level"],
+        "abs_es_price": row["abs_es_price"],
+        "stop_level": stop_lvl,
+        "target_level": tgt_lvl,
+        "outcome_result": row["outcome_result"],
+        "vanna_all": row.get("vanna_all"),
+        "vanna_weekly": row.get("vanna_weekly"),
+        "vanna_monthly": row.get("vanna_monthly"),
+        "spot_vol_beta": row.get("spot_vol_beta"),
+        "greek_alignment": row.get("greek_alignment"),
+        "charm_limit_entry": None,  # Disabled: market orders only (charm-limit backtest showed -226 pts vs market)
+        "overvix": row.get("overvix"),
+        "vix": row.get("vix"),
+    }
+
+def _es_last_price():
+    px = quote_feed.last("@ES")
+    if px:
+        return px
+    with _es_quote_lock:
+        return _es_quote.get("last_price")
+
 @app.get("/api/eval/signals")
 def api_eval_signals(since_id: int = Query(0, ge=0)):
     """Return today's setup signals and outcomes for the eval trader.
 
     Auth: Bearer token via EVAL_API_KEY (checked in middleware).
     Query: since_id=N returns entries with id > N.
+    Served from the eval signal feed journal (app/signal_feed.py); /api/eval/stream
+    pushes the same entries as they are logged.
     """
     if not engine:
         return JSONResponse({"error": "DATABASE_URL not set"}, status_code=500)
-    now_et = datetime.now(pytz.timezone("US/Eastern"))
-    today_str = now_et.strftime("%Y-%m-%d")
     try:
-        with engine.begin() as conn:
-            rows = conn.execute(text(
-                "SELECT id, ts, setup_name, direction, grade, score, spot, target, lis, "
-                "paradigm, bofa_stop_level, bofa_target_level, abs_es_price, "
-                "max_plus_gex, max_minus_gex, "
-                "outcome_result, outcome_pnl, "
-                "vanna_all, vanna_weekly, vanna_monthly, spot_vol_beta, greek_alignment, "
-                "charm_limit_entry, overvix, vix, vanna_regime, basket_pct "
-                "FROM setup_log "
-                "WHERE id > :since AND ts::date = :today AND grade != 'LOG' "
-                "ORDER BY id ASC"
-            ), {"since": since_id, "today": today_str}).mappings().all()
-
-        signals, outcomes = [], []
-        for r in rows:
-            row = dict(r)
-            # V11: filter at API level so all consumers (eval, real) get clean signals
-            # S115 fix (2026-05-13): pass vanna_regime so VPB gate works on eval path
-            if not _passes_live_filter(
-                row["setup_name"], row["direction"],
-                row.get("greek_alignment") or 0,
-                vix=float(row["vix"]) if row.get("vix") else None,
-                overvix=float(row["overvix"]) if row.get("overvix") else None,
-                paradigm=row.get("paradigm"),
-                grade=row.get("grade"),
-                vanna_regime=row.get("vanna_regime"),
-                basket_pct=row.get("basket_pct"),
-            ):
-                continue
-            # Compute target/stop levels
-            tgt_lvl, stop_lvl = _compute_setup_levels(row)
-            entry = {
-                "id": row["id"],
-                "ts": row["ts"].isoformat() if row["ts"] else None,
-                "setup_name": row["setup_name"],
-                "direction": row["direction"],
-                "grade": row["grade"],
-                "score": row["score"],
-                "spot": row["spot"],
-                "target": row["target"],
-                "lis": row["lis"],
-                "paradigm": row["paradigm"],
-                "bofa_stop_level": row["bofa_stop_level"],
-                "bofa_target_level": row["bofa_target_level"],
-                "abs_es_price": row["abs_es_price"],
-                "stop_level": stop_lvl,
-                "target_level": tgt_lvl,
-                "outcome_result": row["outcome_result"],
-                "vanna_all": row.get("vanna_all"),
-                "vanna_weekly": row.get("vanna_weekly"),
-                "vanna_monthly": row.get("vanna_monthly"),
-                "spot_vol_beta": row.get("spot_vol_beta"),
-                "greek_alignment": row.get("greek_alignment"),
-                "charm_limit_entry": None,  # Disabled: market orders only (charm-limit backtest showed -226 pts vs market)
-                "overvix": row.get("overvix"),
-                "vix": row.get("vix"),
-            }
-            signals.append(entry)
-            if row["outcome_result"]:
-                outcomes.append({
-                    "id": row["id"],
-                    "setup_name": row["setup_name"],
-                    "outcome_result": row["outcome_result"],
-                    "outcome_pnl": row["outcome_pnl"],
-                })
-        # Include current ES price so eval_trader can compute stop/target
-        # relative to MES (SPX and MES differ by ~15-20 pts spread)
-        with _es_quote_lock:
-            es_price = _es_quote.get("last_price")
-        # Sanitize NaN/Inf floats that crash JSON serialization
-        import math
-        def _sanitize(obj):
-            if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
-                return None
-            if isinstance(obj, dict):
-                return {k: _sanitize(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [_sanitize(i) for i in obj]
-            return obj
-        return _sanitize({"signals": signals, "outcomes": outcomes, "es_price": es_price})
+        return signal_feed.signals(since_id)
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+@app.get("/api/eval/stream")
+async def api_eval_stream(cursor: str = Query(None)):
+    """Server-sent events of today's filtered signals and outcomes (app/signal_feed.py).
+    Reconnect with ?cursor=<last event id> to resume; a `quote` event carries es_price."""
+    if not engine:
+        return JSONResponse({"error": "DATABASE_URL not set"}, status_code=500)
+    sub = signal_feed.subscribe(asyncio.get_running_loop())
+    if sub is None:
+        return JSONResponse({"error": "too many stream subscribers"}, status_code=503)
+    return StreamingResponse(signal_feed.events(sub, cursor), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/eval/quote")
+def api_eval_quote(symbol: str = Query("@ES")):
+    """Last / bid / ask with ages from the shared quote feed (app/quote_feed.py), for the
+    VPS traders. 404 for a symbol this process does not stream."""
+    q = quote_feed.quote(symbol)
+    if q is None:
+        return JSONResponse({"error": f"{symbol} not streamed"}, status_code=404)
+    return q
+
 @app.get("/api/snapshot")
-def snapshot(symbol: str = Query("SPXW")):
-    if symbol.upper() == "SPY":
-        with _spy_df_lock:
-            df = None if (latest_spy_df is None or latest_spy_df.empty) else latest_spy_df.copy()
-    else:
-        with _df_lock:
-            df = None if (latest_df is None or latest_df.empty) else latest_df.copy()
-    if df is None or df.empty:
-        return {"columns": DISPLAY_COLS, "rows": []}
-    df.columns = DISPLAY_COLS
-    return {"columns": df.columns.tolist(), "rows": df.fillna("").values.tolist()}
+def snapshot(request: Request, symbol: str = Query("SPXW")):
+    spy = symbol.upper() == "SPY"
+    chain = latest_spy_chain if spy else latest_chain
+
+    def build():
+        if chain is None or chain.empty:
+            return {"columns": DISPLAY_COLS, "rows": []}
+        return {"columns": DISPLAY_COLS, "rows": chain.to_rows()}
+    key = ("SPY" if spy else "SPXW", chain.version if chain is not None else None)
+    return response_cache.cached(request, "snapshot", key, build)
 
 @app.get("/api/history")
 def api_history(limit: int = Query(288, ge=1, le=5000), symbol: str = Query("SPXW")):
     if not engine:
         return {"error": "DATABASE_URL not set"}
     table = "spy_chain_snapshots" if symbol.upper() == "SPY" else "chain_snapshots"
-    with engine.begin() as conn:
+    with api_engine.begin() as conn:
         rows = conn.execute(text(
-            f"SELECT ts, exp, spot, columns, rows FROM {table} ORDER BY ts DESC LIMIT :lim"
+            f"SELECT ts, exp, spot, columns, rows, packed FROM {table} ORDER BY ts DESC LIMIT :lim"
         ), {"lim": limit}).mappings().all()
+    rows = [dict(r) for r in rows]
     for r in rows:
         r["columns"] = json.loads(r["columns"]) if isinstance(r["columns"], str) else r["columns"]
-        r["rows"]    = json.loads(r["rows"])    if isinstance(r["rows"], str) else r["rows"]
+        r["rows"]    = decode_chain_rows(r.pop("packed"), r["rows"])
         r["ts"]      = r["ts"].isoformat()
     return rows
 
@@ -10301,19 +10181,24 @@ def download_history_csv(limit: int = Query(288, ge=1, le=5000), symbol: str = Q
     if not engine:
         return Response("DATABASE_URL not set", media_type="text/plain", status_code=500)
     table = "spy_chain_snapshots" if symbol.upper() == "SPY" else "chain_snapshots"
-    with engine.begin() as conn:
+    with analytics_engine.begin() as conn:
         recs = conn.execute(text(
-            f"SELECT ts, exp, spot, columns, rows FROM {table} ORDER BY ts DESC LIMIT :lim"
+            f"SELECT ts, exp, spot, columns, rows, packed FROM {table} ORDER BY ts DESC LIMIT :lim"
         ), {"lim": limit}).mappings().all()
-    out = []
+    # One frame per snapshot straight from the columnar arrays (app/chain_columns.decode).
+    # Same columns as the per-row dicts this replaced: a repeated display name (the put
+    # side of "Volume", "IV", ...) overwrites the call-side value in place.
+    frames = []
     for r in recs:
+        chain = decode_chain(r["packed"], r["rows"])
+        if chain is None or chain.empty:
+            continue
         cols = json.loads(r["columns"]) if isinstance(r["columns"], str) else r["columns"]
-        rows = json.loads(r["rows"])    if isinstance(r["rows"], str) else r["rows"]
-        for arr in rows:
-            obj = {"ts": r["ts"].isoformat(), "exp": r["exp"], "spot": r["spot"]}
-            obj.update({cols[i]: arr[i] for i in range(len(cols))})
-            out.append(obj)
-    df = pd.DataFrame(out)
+        data = {"ts": r["ts"].isoformat(), "exp": r["exp"], "spot": r["spot"]}
+        for name, col in zip(cols, CANONICAL_COLS):
+            data[name] = chain.col(col)
+        frames.append(pd.DataFrame(data))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
     csv = df.to_csv(index=False)
     return Response(csv, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=history.csv"})
 
@@ -10340,11 +10225,16 @@ def api_volland_history(limit: int = Query(500, ge=1, le=5000)):
         return JSONResponse({"error": str(e)}, status_code=500)
 
 @app.get("/api/volland/vanna_window")
-def api_volland_vanna_window(limit: int = Query(40, ge=5, le=200)):
+def api_volland_vanna_window(request: Request, limit: int = Query(40, ge=5, le=200)):
     """
     Latest strikes around mid_strike (mid_strike = strike where abs(vanna) is max).
     UI draws the vertical line at SPOT (from /api/series).
     """
+    v = _volland_version()
+    return response_cache.cached(request, "volland_vanna_window", None if v is None else (v, limit),
+                                 lambda: _vanna_window_payload(limit))
+
+def _vanna_window_payload(limit: int):
     try:
         if not engine:
             return JSONResponse({"error": "DATABASE_URL not set"}, status_code=500)
@@ -10366,6 +10256,7 @@ def api_volland_delta_decay_window(limit: int = Query(40, ge=5, le=200)):
 
 @app.get("/api/volland/exposure_window")
 def api_volland_exposure_window(
+    request: Request,
     greek: str = Query(..., description="Greek name: vanna or gamma"),
     expiration: str = Query(None, description="Expiration option: THIS_WEEK, THIRTY_NEXT_DAYS, ALL (omit for 0DTE)"),
     limit: int = Query(40, ge=5, le=200),
@@ -10380,6 +10271,12 @@ def api_volland_exposure_window(
         return JSONResponse({"error": f"greek must be one of {ALLOWED_GREEKS}"}, status_code=400)
     if expiration is not None and expiration not in ALLOWED_EXPIRATIONS:
         return JSONResponse({"error": f"expiration must be one of {ALLOWED_EXPIRATIONS}"}, status_code=400)
+    v = _volland_version()
+    return response_cache.cached(request, "volland_exposure_window",
+                                 None if v is None else (v, greek, expiration, limit),
+                                 lambda: _exposure_window_payload(greek, expiration, limit))
+
+def _exposure_window_payload(greek: str, expiration: str | None, limit: int):
     try:
         if not engine:
             return JSONResponse({"error": "DATABASE_URL not set"}, status_code=500)
@@ -10536,7 +10433,7 @@ def api_es_delta_history(limit: int = Query(500, ge=1, le=2000)):
         today = datetime.now(pytz.timezone("US/Eastern")).strftime("%Y-%m-%d")
         # Phase 3: route by ES_DATA_SOURCE
         _tbl, _src = _es_bars_table_filter()
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text(f"""
                 SELECT ts_end AS ts, trade_date, 'rithmic' AS symbol,
                        cumulative_delta, bar_volume AS total_volume,
@@ -10544,7 +10441,7 @@ def api_es_delta_history(limit: int = Query(500, ge=1, le=2000)):
                        bar_close AS last_price, 0 AS tick_count,
                        bar_high AS session_high, bar_low AS session_low
                 FROM {_tbl}
-                WHERE trade_date = :today {_src}
+                WHERE trade_date = :today {_src} AND range_pts = 5.0
                 ORDER BY bar_idx ASC
                 LIMIT :lim
             """), {"today": today, "lim": limit}).mappings().all()
@@ -10567,7 +10464,7 @@ def api_es_delta_bars(limit: int = Query(1400, ge=1, le=2000)):
         today = datetime.now(pytz.timezone("US/Eastern")).strftime("%Y-%m-%d")
         # Phase 3: route by ES_DATA_SOURCE
         _tbl, _src = _es_bars_table_filter()
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text(f"""
                 SELECT ts_end AS ts, trade_date, 'rithmic' AS symbol,
                        bar_delta, cumulative_delta,
@@ -10576,7 +10473,7 @@ def api_es_delta_bars(limit: int = Query(1400, ge=1, le=2000)):
                        bar_high AS bar_high_price, bar_low AS bar_low_price,
                        0 AS up_ticks, 0 AS down_ticks, 0 AS total_ticks
                 FROM {_tbl}
-                WHERE trade_date = :today {_src}
+                WHERE trade_date = :today {_src} AND range_pts = 5.0
                 ORDER BY bar_idx ASC
                 LIMIT :lim
             """), {"today": today, "lim": limit}).mappings().all()
@@ -10975,7 +10872,7 @@ def api_spx_ohlc_history(date: str = Query(None, description="YYYY-MM-DD"),
     if not engine:
         return JSONResponse({"error": "no db"}, status_code=500)
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             if date:
                 rows = conn.execute(text("""
                     SELECT ts AT TIME ZONE 'America/New_York' as ts_et,
@@ -11015,7 +10912,7 @@ def api_spx_ohlc_backfill(barsback: int = Query(5000, ge=100, le=10000)):
             return {"saved": 0, "message": "No bars returned"}
 
         saved = 0
-        with engine.connect() as conn:
+        with analytics_engine.connect() as conn:
             for bar in bars_list:
                 ts_raw = bar.get("TimeStamp", "")
                 if not ts_raw:
@@ -11047,7 +10944,7 @@ def api_spx_ohlc_backfill(barsback: int = Query(5000, ge=100, le=10000)):
         return JSONResponse({"error": str(e)}, status_code=500)
 
 @app.get("/api/statistics_levels")
-def api_statistics_levels():
+def api_statistics_levels(request: Request):
     """
     Get key price levels for Statistics chart:
     - Target (from stats)
@@ -11055,6 +10952,12 @@ def api_statistics_levels():
     - Max positive gamma strike
     - Max negative gamma strike
     """
+    v = _volland_version()
+    return response_cache.cached(request, "statistics_levels",
+                                 None if v is None else (v,) + _chain_key(),
+                                 _statistics_levels_payload)
+
+def _statistics_levels_payload():
     try:
         result = {
             "target": None,
@@ -11092,26 +10995,15 @@ def api_statistics_levels():
                     pass
 
         # Get GEX data for max gamma strikes
-        with _df_lock:
-            if latest_df is not None and not latest_df.empty:
-                df = latest_df.copy()
-                sdf = df.sort_values("Strike")
-                strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float).tolist()
-                call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-                put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-                c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-                p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-                net_gex = (c_gamma * call_oi * 100.0) + (-p_gamma * put_oi * 100.0)
-
-                # Find max positive and max negative gamma strikes
-                if len(strikes) > 0 and len(net_gex) > 0:
-                    max_pos_idx = net_gex.idxmax() if net_gex.max() > 0 else None
-                    max_neg_idx = net_gex.idxmin() if net_gex.min() < 0 else None
-
-                    if max_pos_idx is not None:
-                        result["max_pos_gamma"] = strikes[max_pos_idx]
-                    if max_neg_idx is not None:
-                        result["max_neg_gamma"] = strikes[max_neg_idx]
+        chain = latest_chain
+        if chain is not None and not chain.empty:
+            net_gex = chain.net_gex()
+            max_pos_gamma, max_neg_gamma = chain.max_gex_strikes()
+            # Only report a side that actually exists (max > 0 / min < 0)
+            if net_gex.max() > 0:
+                result["max_pos_gamma"] = max_pos_gamma
+            if net_gex.min() < 0:
+                result["max_neg_gamma"] = max_neg_gamma
 
         # Get spot price
         try:
@@ -11135,10 +11027,9 @@ def api_playback_save_now():
         if not engine:
             return {"error": "DATABASE_URL not set"}
 
-        with _df_lock:
-            if latest_df is None or latest_df.empty:
-                return {"error": "No chain data available yet. Wait for market data to load."}
-            df = latest_df.copy()
+        chain = latest_chain
+        if chain is None or chain.empty:
+            return {"error": "No chain data available yet. Wait for market data to load."}
 
         msg = last_run_status.get("msg") or ""
         spot = None
@@ -11151,15 +11042,10 @@ def api_playback_save_now():
         if not spot:
             return {"error": "No spot price available"}
 
-        sdf = df.sort_values("Strike")
-        strikes = pd.to_numeric(sdf["Strike"], errors="coerce").fillna(0.0).astype(float).tolist()
-        call_vol = pd.to_numeric(sdf["C_Volume"], errors="coerce").fillna(0.0).astype(float).tolist()
-        put_vol = pd.to_numeric(sdf["P_Volume"], errors="coerce").fillna(0.0).astype(float).tolist()
-        call_oi = pd.to_numeric(sdf["C_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        put_oi = pd.to_numeric(sdf["P_OpenInterest"], errors="coerce").fillna(0.0).astype(float)
-        c_gamma = pd.to_numeric(sdf["C_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        p_gamma = pd.to_numeric(sdf["P_Gamma"], errors="coerce").fillna(0.0).astype(float)
-        net_gex = ((c_gamma * call_oi * 100.0) + (-p_gamma * put_oi * 100.0)).astype(float).tolist()
+        strikes = chain.strikes.tolist()
+        call_vol = chain.col0("C_Volume").tolist()
+        put_vol = chain.col0("P_Volume").tolist()
+        net_gex = chain.net_gex().tolist()
 
         charm_data = None
         try:
@@ -11181,7 +11067,7 @@ def api_playback_save_now():
         except:
             pass
 
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(
                 text("""INSERT INTO playback_snapshots (ts, spot, strikes, net_gex, charm, call_vol, put_vol, stats)
                         VALUES (:ts, :spot, :strikes, :net_gex, :charm, :call_vol, :put_vol, :stats)"""),
@@ -11204,7 +11090,7 @@ def api_playback_generate_mock(force: bool = Query(False, description="Set to tr
 
     try:
         # Check if existing mock data exists (only delete mock data, never real data)
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             mock_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock = TRUE")).scalar()
             real_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock = FALSE OR is_mock IS NULL")).scalar()
 
@@ -11212,7 +11098,7 @@ def api_playback_generate_mock(force: bool = Query(False, description="Set to tr
             return {"error": f"Refusing to delete {mock_count} existing mock snapshots. Use force=true to confirm.", "mock_count": mock_count, "real_count": real_count}
 
         # Delete only mock data (real data is always preserved)
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(text("DELETE FROM playback_snapshots WHERE is_mock = TRUE"))
 
         # Generate 3 days of mock data, every 5 minutes during "market hours" (9:30-16:00)
@@ -11276,7 +11162,7 @@ def api_playback_generate_mock(force: bool = Query(False, description="Set to tr
                 })
 
         # Insert all snapshots with is_mock=true
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             for snap in snapshots:
                 conn.execute(
                     text("""INSERT INTO playback_snapshots (ts, spot, strikes, net_gex, charm, call_vol, put_vol, stats, is_mock)
@@ -11299,13 +11185,13 @@ def api_playback_delete_all(force: bool = Query(False, description="Must be true
 
     try:
         # Check count first
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots")).scalar()
 
         if count > 0 and not force:
             return {"error": f"Refusing to delete {count} snapshots. Use force=true to confirm deletion.", "existing_count": count}
 
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             result = conn.execute(text("DELETE FROM playback_snapshots"))
             deleted = result.rowcount
 
@@ -11320,14 +11206,14 @@ def api_playback_delete_mock():
         return {"error": "DATABASE_URL not set"}
 
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             mock_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock = TRUE")).scalar()
             real_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock = FALSE OR is_mock IS NULL")).scalar()
 
         if mock_count == 0:
             return {"message": "No mock data to delete", "mock_count": 0, "real_count": real_count}
 
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             result = conn.execute(text("DELETE FROM playback_snapshots WHERE is_mock = TRUE"))
             deleted = result.rowcount
 
@@ -11342,7 +11228,7 @@ def api_playback_mark_as_mock_before(before_date: str = Query(..., description="
         return {"error": "DATABASE_URL not set"}
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             result = conn.execute(
                 text("UPDATE playback_snapshots SET is_mock = TRUE WHERE ts < :before_date"),
                 {"before_date": before_date}
@@ -11360,7 +11246,7 @@ def api_playback_status():
         return {"error": "DATABASE_URL not set"}
 
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             mock_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock = TRUE")).scalar()
             real_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock = FALSE")).scalar()
             null_count = conn.execute(text("SELECT COUNT(*) FROM playback_snapshots WHERE is_mock IS NULL")).scalar()
@@ -11385,105 +11271,58 @@ def api_playback_status():
     except Exception as e:
         return {"error": str(e)}
 
+def _playback_window(start_date: str | None, load_all: bool):
+    """(start_dt, end_dt) for the playback readers; (None, None) with load_all."""
+    if load_all:
+        return None, None
+    # Load from start_date (or 7 days ago) until now
+    if start_date:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        start_dt = NY.localize(start_dt.replace(hour=0, minute=0, second=0))
+    else:
+        start_dt = now_et().replace(hour=0, minute=0, second=0, microsecond=0) - pd.Timedelta(days=7)
+    # Always end at current time + buffer to include latest data
+    return start_dt, now_et() + pd.Timedelta(hours=1)
+
 @app.get("/api/playback/range")
-def api_playback_range(start_date: str = Query(None, description="Start date YYYY-MM-DD, default 7 days ago"), load_all: bool = Query(False, description="Load all data ignoring date filter")):
+def api_playback_range(start_date: str = Query(None, description="Start date YYYY-MM-DD, default 7 days ago"), load_all: bool = Query(False, description="Load all data ignoring date filter"),
+                       format: str = Query("json", description="json | ndjson (streamed, one snapshot per line) | bin (streamed float32 arrays)"),
+                       every: int = Query(1, ge=1, description="Keep every Nth snapshot"),
+                       points: int = Query(None, ge=2, description="LTTB-downsample the spot line to this many snapshots")):
     """
     Get 7 days of playback snapshots starting from start_date.
     Returns timestamps, spot prices, and per-snapshot data for visualization.
     Use load_all=true to get all data regardless of date (for debugging).
+    every / points thin the range server-side for zoomed-out views; format=ndjson|bin
+    stream it in bounded memory (layouts in app/playback_stream.py).
     """
     if not engine:
         return JSONResponse({"error": "DATABASE_URL not set"}, status_code=500)
+    if format not in ("json", "ndjson", "bin"):
+        return JSONResponse({"error": f"unknown format {format!r}"}, status_code=400)
 
     try:
-        with engine.begin() as conn:
-            if load_all:
-                # Load all data for debugging
-                rows = conn.execute(text("""
-                    SELECT ts, spot, strikes, net_gex, charm, delta_decay, call_vol, put_vol, stats
-                    FROM playback_snapshots
-                    ORDER BY ts ASC
-                    LIMIT 1000
-                """)).mappings().all()
-                start_dt = None
-                end_dt = None
-            else:
-                # Load from start_date (or 7 days ago) until now
-                if start_date:
-                    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                    start_dt = NY.localize(start_dt.replace(hour=0, minute=0, second=0))
-                else:
-                    start_dt = now_et().replace(hour=0, minute=0, second=0, microsecond=0) - pd.Timedelta(days=7)
-
-                # Always end at current time + buffer to include latest data
-                end_dt = now_et() + pd.Timedelta(hours=1)
-
-                rows = conn.execute(text("""
-                    SELECT ts, spot, strikes, net_gex, charm, delta_decay, call_vol, put_vol, stats
-                    FROM playback_snapshots
-                    WHERE ts >= :start_ts AND ts < :end_ts
-                    ORDER BY ts ASC
-                """), {"start_ts": start_dt, "end_ts": end_dt}).mappings().all()
-
-            # Fallback: fetch DD from volland_exposure_points for old rows without delta_decay column
-            dd_grouped = {}
-            dd_timestamps = []
-            needs_dd_fallback = rows and any(r.get("delta_decay") is None for r in rows)
-            if needs_dd_fallback:
-                ts_min = rows[0]["ts"]
-                ts_max = rows[-1]["ts"]
-                dd_rows = conn.execute(text("""
-                    SELECT ts_utc, strike::numeric AS strike, value::numeric AS dd_val
-                    FROM volland_exposure_points
-                    WHERE greek = 'deltaDecay'
-                      AND ts_utc >= :ts_min - interval '3 minutes'
-                      AND ts_utc <= :ts_max + interval '3 minutes'
-                    ORDER BY ts_utc, strike
-                """), {"ts_min": ts_min, "ts_max": ts_max}).mappings().all()
-
-                for dr in dd_rows:
-                    ts_key = dr["ts_utc"]
-                    if ts_key not in dd_grouped:
-                        dd_grouped[ts_key] = {}
-                    dd_grouped[ts_key][float(dr["strike"])] = float(dr["dd_val"]) if dr["dd_val"] is not None else 0
-                dd_timestamps = sorted(dd_grouped.keys())
-
-        snapshots = []
-        for r in rows:
-            snap_ts = r["ts"]
-            strikes = _json_load_maybe(r["strikes"]) or []
-
-            # Use stored delta_decay if available, otherwise fallback to Volland lookup
-            dd_data = _json_load_maybe(r.get("delta_decay"))
-            if dd_data is None and dd_timestamps:
-                best_ts = None
-                best_diff = 999
-                for dt in dd_timestamps:
-                    diff = abs((dt - snap_ts).total_seconds())
-                    if diff < best_diff:
-                        best_diff = diff
-                        best_ts = dt
-                    elif diff > best_diff:
-                        break
-                if best_ts and best_diff <= 180 and dd_grouped.get(best_ts):
-                    dd_map = dd_grouped[best_ts]
-                    dd_data = [dd_map.get(s, 0) for s in strikes]
-
-            snapshots.append({
-                "ts": snap_ts.isoformat() if hasattr(snap_ts, "isoformat") else str(snap_ts),
-                "spot": r["spot"],
-                "strikes": strikes,
-                "net_gex": _json_load_maybe(r["net_gex"]),
-                "charm": _json_load_maybe(r["charm"]),
-                "delta_decay": dd_data,
-                "call_vol": _json_load_maybe(r["call_vol"]),
-                "put_vol": _json_load_maybe(r["put_vol"]),
-                "stats": _json_load_maybe(r["stats"]),
-            })
-
-        return {
+        start_dt, end_dt = _playback_window(start_date, load_all)
+        with analytics_engine.connect() as conn:
+            ts_list = playback_stream.plan(conn, start_dt, end_dt, limit=1000 if load_all else None,
+                                           every=every, points=points)
+        meta = {
             "start_date": start_dt.strftime("%Y-%m-%d") if start_dt else "all",
             "end_date": end_dt.strftime("%Y-%m-%d") if end_dt else "all",
+            "count": len(ts_list),
+            "every": every,
+            "points": points,
+        }
+        if format == "ndjson":
+            return StreamingResponse(playback_stream.ndjson_stream(analytics_engine, ts_list, meta),
+                                     media_type="application/x-ndjson")
+        if format == "bin":
+            return StreamingResponse(playback_stream.binary_stream(analytics_engine, ts_list, meta),
+                                     media_type="application/octet-stream")
+        snapshots = [playback_stream.snapshot(r, dd) for r, dd in playback_stream.rows(analytics_engine, ts_list)]
+        return {
+            "start_date": meta["start_date"],
+            "end_date": meta["end_date"],
             "count": len(snapshots),
             "snapshots": snapshots
         }
@@ -11492,93 +11331,29 @@ def api_playback_range(start_date: str = Query(None, description="Start date YYY
         return JSONResponse({"error": str(e)}, status_code=500)
 
 @app.get("/api/export/playback")
-def api_export_playback(start_date: str = Query(None, description="Start date YYYY-MM-DD"), load_all: bool = Query(False, description="Export all data")):
+def api_export_playback(start_date: str = Query(None, description="Start date YYYY-MM-DD"), load_all: bool = Query(False, description="Export all data"),
+                        every: int = Query(1, ge=1, description="Keep every Nth snapshot"),
+                        points: int = Query(None, ge=2, description="LTTB-downsample the spot line to this many snapshots")):
     """
     Export playback data as CSV.
     Each row is a snapshot with flattened strike-level data.
+    Streamed a chunk of snapshots at a time (app/playback_stream.py).
     """
     if not engine:
         return Response("DATABASE_URL not set", media_type="text/plain", status_code=500)
 
     try:
-        with engine.begin() as conn:
-            if load_all:
-                rows = conn.execute(text("""
-                    SELECT ts, spot, strikes, net_gex, charm, call_vol, put_vol, stats, call_gex, put_gex, call_oi, put_oi
-                    FROM playback_snapshots
-                    ORDER BY ts ASC
-                    LIMIT 5000
-                """)).mappings().all()
-                start_dt = None
-                end_dt = None
-            else:
-                if start_date:
-                    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                    start_dt = NY.localize(start_dt.replace(hour=0, minute=0, second=0))
-                else:
-                    start_dt = now_et().replace(hour=0, minute=0, second=0, microsecond=0) - pd.Timedelta(days=7)
-
-                end_dt = now_et() + pd.Timedelta(hours=1)
-
-                rows = conn.execute(text("""
-                    SELECT ts, spot, strikes, net_gex, charm, call_vol, put_vol, stats, call_gex, put_gex, call_oi, put_oi
-                    FROM playback_snapshots
-                    WHERE ts >= :start_ts AND ts < :end_ts
-                    ORDER BY ts ASC
-                """), {"start_ts": start_dt, "end_ts": end_dt}).mappings().all()
-
-        # Build CSV with one row per snapshot, strikes as columns
-        csv_rows = []
-        for r in rows:
-            # Convert timestamp to ET for readability
-            ts_raw = r["ts"]
-            if hasattr(ts_raw, "astimezone"):
-                ts_et = ts_raw.astimezone(NY)
-                ts = ts_et.strftime("%Y-%m-%d %H:%M:%S ET")
-            else:
-                ts = str(ts_raw)
-            spot = r["spot"]
-            strikes = _json_load_maybe(r["strikes"]) or []
-            net_gex = _json_load_maybe(r["net_gex"]) or []
-            charm = _json_load_maybe(r["charm"]) or []
-            call_vol = _json_load_maybe(r["call_vol"]) or []
-            put_vol = _json_load_maybe(r["put_vol"]) or []
-            stats = _json_load_maybe(r["stats"]) or {}
-            call_gex = _json_load_maybe(r["call_gex"]) or []
-            put_gex = _json_load_maybe(r["put_gex"]) or []
-            call_oi = _json_load_maybe(r["call_oi"]) or []
-            put_oi = _json_load_maybe(r["put_oi"]) or []
-
-            # Create a row for each strike
-            for i, strike in enumerate(strikes):
-                csv_rows.append({
-                    "timestamp": ts,
-                    "spot": spot,
-                    "strike": strike,
-                    "call_gex": call_gex[i] if i < len(call_gex) else None,
-                    "put_gex": put_gex[i] if i < len(put_gex) else None,
-                    "net_gex": net_gex[i] if i < len(net_gex) else None,
-                    "call_oi": call_oi[i] if i < len(call_oi) else None,
-                    "put_oi": put_oi[i] if i < len(put_oi) else None,
-                    "charm": charm[i] if i < len(charm) else None,
-                    "call_vol": call_vol[i] if i < len(call_vol) else None,
-                    "put_vol": put_vol[i] if i < len(put_vol) else None,
-                    "paradigm": stats.get("paradigm"),
-                    "target": stats.get("target"),
-                    "lis": stats.get("lis"),
-                    "dd_hedging": stats.get("dd_hedging"),
-                    "opt_volume": stats.get("opt_volume"),
-                })
-
-        df = pd.DataFrame(csv_rows)
-        csv_content = df.to_csv(index=False)
+        start_dt, end_dt = _playback_window(start_date, load_all)
+        with analytics_engine.connect() as conn:
+            ts_list = playback_stream.plan(conn, start_dt, end_dt, limit=5000 if load_all else None,
+                                           every=every, points=points)
 
         if start_dt and end_dt:
             filename = f"playback_{start_dt.strftime('%Y%m%d')}_to_{end_dt.strftime('%Y%m%d')}.csv"
         else:
             filename = f"playback_all_{now_et().strftime('%Y%m%d_%H%M')}.csv"
-        return Response(
-            csv_content,
+        return StreamingResponse(
+            playback_stream.csv_stream(analytics_engine, ts_list, NY),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -11596,7 +11371,7 @@ def api_export_playback_summary(start_date: str = Query(None, description="Start
         return Response("DATABASE_URL not set", media_type="text/plain", status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with analytics_engine.begin() as conn:
             if load_all:
                 rows = conn.execute(text("""
                     SELECT ts, spot, strikes, net_gex, charm, call_vol, put_vol, stats, call_gex, put_gex, call_oi, put_oi
@@ -11770,7 +11545,7 @@ def api_alerts_test():
             "chat_id_set": bool(TELEGRAM_CHAT_ID)
         }
 
-    success = send_telegram("🧪 <b>Test Alert</b>\n\nYour 0DTE Alpha alerts are working!")
+    success = send_telegram("🧪 <b>Test Alert</b>\n\nYour 0DTE Alpha alerts are working!", wait=True)
     if success:
         return {"status": "ok", "message": "Test alert sent successfully!"}
     else:
@@ -11995,7 +11770,7 @@ def api_setup_log(limit: int = Query(50), date_range: str = Query(None)):
             today_et = datetime.now(NY).strftime("%Y-%m-%d")
             date_filter = "WHERE ts::date = :today"
             params["today"] = today_et
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text(f"""
                 SELECT id, ts, setup_name, direction, grade, score,
                        paradigm, spot, lis, target, max_plus_gex, max_minus_gex,
@@ -12030,11 +11805,12 @@ def api_setup_log(limit: int = Query(50), date_range: str = Query(None)):
         return []
 
 
-def _calculate_absorption_outcome(entry: dict) -> dict:
+def _calculate_absorption_outcome(entry: dict, day_bars: dict = None) -> dict:
     """Calculate outcome for ES Absorption using ES range bars.
 
     Flow A (single target): SL=8pt, T=10pt (matches live tracker + auto_trader).
     Also tracks trail stats for analysis: BE@+10, gap=8.
+    day_bars: {range_pts: closed bar rows of the session}, preloaded by the backfill.
     """
     try:
         ts = entry.get("ts")
@@ -12060,15 +11836,18 @@ def _calculate_absorption_outcome(entry: dict) -> dict:
         alert_date = ts.astimezone(NY).date() if ts.tzinfo else NY.localize(ts).date()
         # Phase 3: route by ES_DATA_SOURCE
         _tbl, _src = _es_bars_table_filter()
-        with engine.begin() as conn:
-            bar_rows = conn.execute(text(f"""
-                SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
-                       ts_start, ts_end, status
-                FROM {_tbl}
-                WHERE trade_date = :td {_src} AND status = 'closed'
-                  AND range_pts = :rp
-                ORDER BY bar_idx ASC
-            """), {"td": alert_date.isoformat(), "rp": _rp}).mappings().all()
+        if day_bars is not None:
+            bar_rows = day_bars.get(_rp) or []
+        else:
+            with engine.begin() as conn:
+                bar_rows = conn.execute(text(f"""
+                    SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
+                           ts_start, ts_end, status
+                    FROM {_tbl}
+                    WHERE trade_date = :td {_src} AND status = 'closed'
+                      AND range_pts = :rp
+                    ORDER BY bar_idx ASC
+                """), {"td": alert_date.isoformat(), "rp": _rp}).mappings().all()
 
         if not bar_rows:
             return {"no_data": True}
@@ -12237,19 +12016,21 @@ def _calculate_absorption_outcome(entry: dict) -> dict:
         return {"error": str(e)}
 
 
-def _calculate_setup_outcome(entry: dict) -> dict:
+def _calculate_setup_outcome(entry: dict, day_prices=None, day_bars: dict = None) -> dict:
     """
     Calculate outcome for a setup alert by querying price history.
     Returns dict with hit_10pt, hit_target, hit_stop, max_profit, max_loss, etc.
     BofA Scalp uses different parameters: 10pt target, 12pt stop, 30-min max hold.
     ES Absorption uses ES range bars: 10pt first target, converted Volland target, 12pt stop.
+    day_prices / day_bars: the session's playback (ts, spot) rows sorted by ts / ES bars
+    by range size, preloaded by _backfill_outcome_day — sliced here instead of queried.
     """
     if not engine:
         return {}
 
     # ES-based setups: outcome tracking using ES range bars
-    if entry.get("setup_name") in ("ES Absorption", "SB Absorption", "SB10 Absorption", "SB2 Absorption", "Delta Absorption"):
-        return _calculate_absorption_outcome(entry)
+    if entry.get("setup_name") in _ES_OUTCOME_SETUPS:
+        return _calculate_absorption_outcome(entry, day_bars=day_bars)
 
     try:
         ts = entry.get("ts")
@@ -12293,13 +12074,18 @@ def _calculate_setup_outcome(entry: dict) -> dict:
         else:
             end_ts = market_close
 
-        # Query playback_snapshots
-        with engine.begin() as conn:
-            rows = conn.execute(text("""
-                SELECT ts, spot FROM playback_snapshots
-                WHERE ts >= :start_ts AND ts <= :end_ts
-                ORDER BY ts ASC
-            """), {"start_ts": ts, "end_ts": end_ts}).mappings().all()
+        # Query playback_snapshots (or slice the day's rows the backfill preloaded)
+        if day_prices is not None:
+            lo = bisect_left(day_prices, ts, key=lambda r: r["ts"])
+            hi = bisect_right(day_prices, end_ts, key=lambda r: r["ts"])
+            rows = day_prices[lo:hi]
+        else:
+            with engine.begin() as conn:
+                rows = conn.execute(text("""
+                    SELECT ts, spot FROM playback_snapshots
+                    WHERE ts >= :start_ts AND ts <= :end_ts
+                    ORDER BY ts ASC
+                """), {"start_ts": ts, "end_ts": end_ts}).mappings().all()
 
         if not rows:
             return {"no_data": True}
@@ -12414,40 +12200,31 @@ def _calculate_setup_outcome(entry: dict) -> dict:
         trail_stopped = False
         initial_stop_level = stop_level  # preserve before trail mutates stop_level
 
-        for price_ts, price in prices:
+        # Trailing stop (DD Exhaustion, GEX Long, AG Short, Skew Charm, VIX Divergence):
+        # the exit comes from app.trail_sim over the tick path; the loop below only
+        # tracks the 10pt / target events and the excursions around it.
+        trail_exit = None
+        if is_trailing:
+            _px = [p for _, p in prices]
+            _tr = trail_sim.simulate(_px, _px, _px, 0, len(_px), spot, is_long,
+                                     **trail_sim.portal_trail(tp, sl=abs(spot - stop_level)))
+            trail_max_fav = float(_tr["mfe"][0])
+            stop_level = float(_tr["stop_out"][0])
+            if _tr["reason"][0] == trail_sim.STOP:
+                trail_exit = int(_tr["exit_idx"][0])
+
+        for i, (price_ts, price) in enumerate(prices):
+            if i == trail_exit:
+                trail_stopped = True
+                hit_stop = True
+                time_to_stop = price_ts
+                pnl_at_stop = stop_level - spot if is_long else spot - stop_level
+                first_event = "target" if pnl_at_stop > 0 else "stop"
+                continue
+
             if is_long:
                 profit = price - spot
 
-                # Trailing stop logic (DD Exhaustion, GEX Long, AG Short, Skew Charm)
-                if is_trailing and not trail_stopped:
-                    if profit > trail_max_fav:
-                        trail_max_fav = profit
-                    trail_lock = None
-                    if tp["mode"] == "continuous":
-                        if trail_max_fav >= tp["activation"]:
-                            trail_lock = trail_max_fav - tp["gap"]
-                    elif tp["mode"] == "hybrid":
-                        if trail_max_fav >= tp["activation"]:
-                            trail_lock = trail_max_fav - tp["gap"]
-                        elif tp["be_trigger"] is not None and trail_max_fav >= tp["be_trigger"]:
-                            trail_lock = 0  # breakeven
-                    else:
-                        rung = tp["rung_start"]
-                        while rung <= trail_max_fav:
-                            trail_lock = rung - tp["lock_offset"]
-                            rung += tp["step"]
-                    if trail_lock is not None:
-                        new_stop = spot + trail_lock
-                        if new_stop > stop_level:
-                            stop_level = new_stop
-                    if price <= stop_level:
-                        trail_stopped = True
-                        hit_stop = True
-                        time_to_stop = price_ts
-                        pnl_at_stop = stop_level - spot
-                        first_event = "target" if pnl_at_stop > 0 else "stop"
-                        continue
-
                 if not hit_10pt and price >= ten_pt_level:
                     hit_10pt = True
                     time_to_10pt = price_ts
@@ -12472,36 +12249,6 @@ def _calculate_setup_outcome(entry: dict) -> dict:
             else:  # SHORT
                 profit = spot - price
 
-                # Trailing stop logic (DD Exhaustion, GEX Long, AG Short, Skew Charm)
-                if is_trailing and not trail_stopped:
-                    if profit > trail_max_fav:
-                        trail_max_fav = profit
-                    trail_lock = None
-                    if tp["mode"] == "continuous":
-                        if trail_max_fav >= tp["activation"]:
-                            trail_lock = trail_max_fav - tp["gap"]
-                    elif tp["mode"] == "hybrid":
-                        if trail_max_fav >= tp["activation"]:
-                            trail_lock = trail_max_fav - tp["gap"]
-                        elif tp["be_trigger"] is not None and trail_max_fav >= tp["be_trigger"]:
-                            trail_lock = 0  # breakeven
-                    else:
-                        rung = tp["rung_start"]
-                        while rung <= trail_max_fav:
-                            trail_lock = rung - tp["lock_offset"]
-                            rung += tp["step"]
-                    if trail_lock is not None:
-                        new_stop = spot - trail_lock
-                        if new_stop < stop_level:
-                            stop_level = new_stop
-                    if price >= stop_level:
-                        trail_stopped = True
-                        hit_stop = True
-                        time_to_stop = price_ts
-                        pnl_at_stop = spot - stop_level
-                        first_event = "target" if pnl_at_stop > 0 else "stop"
-                        continue
-
                 if not hit_10pt and price <= ten_pt_level:
                     hit_10pt = True
                     time_to_10pt = price_ts
@@ -12590,7 +12337,7 @@ def api_setup_log_outcome(log_id: int):
 
     try:
         # Get the setup entry
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             row = conn.execute(text("""
                 SELECT id, ts, setup_name, direction, grade, score,
                        paradigm, spot, lis, target, max_plus_gex, max_minus_gex,
@@ -12623,13 +12370,13 @@ def api_setup_log_outcome(log_id: int):
         if is_abs:
             # ES Absorption: fetch ES range bars from active feed (Phase 3 routed)
             _tbl, _src = _es_bars_table_filter()
-            with engine.begin() as conn:
+            with api_engine.begin() as conn:
                 es_rows = conn.execute(text(f"""
                     SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
                            bar_volume, bar_delta, cumulative_delta,
                            ts_start, ts_end, status
                     FROM {_tbl}
-                    WHERE trade_date = :td {_src}
+                    WHERE trade_date = :td {_src} AND range_pts = 5.0
                     ORDER BY bar_idx ASC
                 """), {"td": alert_date.isoformat()}).mappings().all()
 
@@ -12696,7 +12443,7 @@ def api_setup_log_outcome(log_id: int):
             chart_start = market_open
             chart_end = market_close
 
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             price_rows = conn.execute(text("""
                 SELECT ts, spot FROM playback_snapshots
                 WHERE ts >= :start_ts AND ts <= :end_ts
@@ -12791,7 +12538,7 @@ def api_setup_eod_review(date: str = Query(None, description="Date YYYY-MM-DD, d
                 WHERE date(ts AT TIME ZONE 'America/New_York') = :d
                 ORDER BY ts ASC
         """
-        with engine.begin() as conn:
+        with analytics_engine.begin() as conn:
             try:
                 rows = conn.execute(text(_eod_with_mes), {"d": review_date}).mappings().all()
             except Exception:
@@ -12821,13 +12568,13 @@ def api_setup_eod_review(date: str = Query(None, description="Date YYYY-MM-DD, d
             if is_abs:
                 # Phase 3: route by ES_DATA_SOURCE
                 _tbl, _src = _es_bars_table_filter()
-                with engine.begin() as conn:
+                with analytics_engine.begin() as conn:
                     es_rows = conn.execute(text(f"""
                         SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
                                bar_volume, bar_delta, cumulative_delta,
                                ts_start, ts_end, status
                         FROM {_tbl}
-                        WHERE trade_date = :td {_src}
+                        WHERE trade_date = :td {_src} AND range_pts = 5.0
                         ORDER BY bar_idx ASC
                     """), {"td": alert_date.isoformat()}).mappings().all()
                 es_bars = [
@@ -12867,7 +12614,7 @@ def api_setup_eod_review(date: str = Query(None, description="Date YYYY-MM-DD, d
                 else:
                     chart_start = market_open
                     chart_end = market_close
-                with engine.begin() as conn:
+                with analytics_engine.begin() as conn:
                     price_rows = conn.execute(text("""
                         SELECT ts, spot FROM playback_snapshots
                         WHERE ts >= :start_ts AND ts <= :end_ts
@@ -12942,7 +12689,7 @@ async def api_setup_log_comment(log_id: int, request: Request):
     try:
         body = await request.json()
         comments = body.get("comments", "")
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(text(
                 "UPDATE setup_log SET comments = :comments WHERE id = :log_id"
             ), {"comments": comments, "log_id": log_id})
@@ -12958,7 +12705,7 @@ def api_setup_stats():
     if not engine:
         return {}
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             row = conn.execute(text("""
                 SELECT
                     COUNT(*) FILTER (WHERE outcome_result IS NOT NULL) as total,
@@ -13028,7 +12775,7 @@ def api_setup_log_with_outcomes(limit: int = Query(50), offset: int = Query(0, g
                 ORDER BY ts DESC
                 LIMIT :lim OFFSET :off
         """
-        with engine.begin() as conn:
+        with analytics_engine.begin() as conn:
             try:
                 rows = conn.execute(text(_select_with_mes),
                                     {"lim": min(int(limit), 5000), "off": offset}).mappings().all()
@@ -13116,7 +12863,7 @@ def api_setup_gex_long_v3_overlay(rebuild: int = Query(0)):
         return {"error": "no engine"}
     try:
         from app import gex_long_v3
-        overlay = gex_long_v3.get_overlay(engine, force_rebuild=bool(rebuild))
+        overlay = gex_long_v3.get_overlay(analytics_engine, force_rebuild=bool(rebuild))
         return {
             "meta": gex_long_v3.overlay_meta(),
             "trades": {str(k): v for k, v in overlay.items()},
@@ -13130,7 +12877,7 @@ def api_setup_daily_moves():
     """date -> PREVIOUS session's open-to-close %, from the 1-min bars. V21 input.
     Mirrors live_filter.load_prev_moves so the portal and the trader agree."""
     try:
-        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
+        with api_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
             rows = c.execute(text("""
                 WITH day AS (
                   SELECT (ts AT TIME ZONE 'America/New_York')::date d,
@@ -13150,7 +12897,7 @@ def api_setup_daily_gaps():
     if not engine:
         return {}
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text("""
                 WITH closes AS (
                     SELECT DISTINCT ON (date(ts AT TIME ZONE 'America/New_York'))
@@ -13199,7 +12946,7 @@ def api_setup_filter_analysis(date: str = Query(None, description="Date YYYY-MM-
         day_start = datetime.combine(day, datetime.min.time())
         day_end = day_start + timedelta(days=1)
 
-        with engine.connect() as conn:
+        with analytics_engine.connect() as conn:
             rows = conn.execute(text("""
                 SELECT id, ts, setup_name, direction, grade, score,
                        outcome_result, outcome_pnl, greek_alignment, vix, overvix, paradigm, basket_pct
@@ -13321,7 +13068,7 @@ def api_setup_export(
             where_clause += " AND ts <= :end_date::date + interval '1 day'"
             params["end_date"] = end_date
 
-        with engine.begin() as conn:
+        with analytics_engine.begin() as conn:
             rows = conn.execute(text(f"""
                 SELECT id, ts, setup_name, direction, grade, score,
                        paradigm, spot, lis, target, max_plus_gex, max_minus_gex,
@@ -13448,7 +13195,8 @@ def api_setup_test():
             "chat_id_set": bool(chat_id)
         }
 
-    success = send_telegram_setups("🧪 <b>Test Setup Alert</b>\n\nYour 0DTE Alpha setup detector alerts are working!")
+    success = send_telegram_setups("🧪 <b>Test Setup Alert</b>\n\nYour 0DTE Alpha setup detector alerts are working!",
+                                   wait=True)
     if success:
         return {"status": "ok", "message": "Test setup alert sent successfully!"}
     else:
@@ -13517,7 +13265,7 @@ def api_data_freshness():
     # Volland: latest REAL snapshot (exclude errors, require actual data)
     if engine:
         try:
-            with engine.begin() as conn:
+            with api_engine.begin() as conn:
                 volland_row = conn.execute(text("""
                     SELECT ts FROM volland_snapshots
                     WHERE payload->>'error_event' IS NULL
@@ -13553,7 +13301,7 @@ def api_data_freshness():
 
         # Sierra ES: latest ts_end from vps_es_range_bars (range bars finish every few min)
         try:
-            with engine.begin() as conn:
+            with api_engine.begin() as conn:
                 es_row = conn.execute(text("""
                     SELECT ts_end FROM vps_es_range_bars
                     ORDER BY ts_end DESC LIMIT 1
@@ -13585,7 +13333,7 @@ def api_data_freshness():
 
         # Sierra VX: latest ts from vps_vix_ticks (ticks flow continuously during hours)
         try:
-            with engine.begin() as conn:
+            with api_engine.begin() as conn:
                 vx_row = conn.execute(text("""
                     SELECT ts FROM vps_vix_ticks
                     ORDER BY ts DESC LIMIT 1
@@ -16457,6 +16205,47 @@ DASH_HTML_TEMPLATE = """
   <script>
     const PULL_EVERY = __PULL_MS__;
 
+    // ===== Server push (/api/stream, app/live_push.py) =====
+    // One EventSource per tab. Events carry what the polled endpoints return: 'series'
+    // per market-job cycle, 'volland' per Volland snapshot, 'es' per completed ES bar and
+    // every 5s of ES quotes (the forming bar).
+    // While it is connected the fetch helpers read the pushed copy, the view timers stand
+    // down and the views redraw on the events instead. On error EventSource reconnects by
+    // itself and the timers poll again in the meantime.
+    const livePush = { on: false, v: 0, data: {} };
+    async function pushedOrFetch(topic, key, url) {
+      const d = livePush.on ? livePush.data[topic] : null;
+      if (d && d[key] != null) return d[key];
+      const r = await fetch(url, {cache: 'no-cache'});   // revalidates: 304 when unchanged
+      return await r.json();
+    }
+    (function startLivePush() {
+      if (!window.EventSource) return;
+      const es = new EventSource('/api/stream');
+      es.onerror = () => { livePush.on = false; };
+      ['series', 'volland', 'es'].forEach(topic => es.addEventListener(topic, ev => {
+        let m;
+        try { m = JSON.parse(ev.data); } catch (e) { return; }
+        livePush.on = true;
+        livePush.v = Math.max(livePush.v, m.v);
+        livePush.data[topic] = m.data;
+        onLivePush(topic);
+      }));
+    })();
+    function onLivePush(topic) {
+      if (topic === 'series') {
+        fetchDataFreshness();
+        if (chartsTimer) drawOrUpdate();
+        if (unifiedTimer) tickUnified();
+      } else if (topic === 'volland') {
+        fetchStats();
+        if (chartsTimer) drawOrUpdate();
+        if (unifiedTimer) tickUnified();
+      } else if (topic === 'es') {
+        if (esDeltaInterval) drawEsDelta();
+      }
+    }
+
     // ===== US Eastern Time Formatting Helpers =====
     const ET_TIMEZONE = 'America/New_York';
 
@@ -16520,8 +16309,7 @@ DASH_HTML_TEMPLATE = """
     const dataFreshnessEl = document.getElementById('dataFreshness');
     async function fetchDataFreshness() {
       try {
-        const r = await fetch('/api/data_freshness', {cache: 'no-store'});
-        const data = await r.json();
+        const data = await pushedOrFetch('series', 'freshness', '/api/data_freshness');
         renderDataFreshness(data);
       } catch (err) {
         dataFreshnessEl.innerHTML = '<span style="color:#ef4444">Error</span>';
@@ -16568,14 +16356,13 @@ DASH_HTML_TEMPLATE = """
       }
     }
     fetchDataFreshness();
-    setInterval(fetchDataFreshness, PULL_EVERY);
+    setInterval(() => { if (!livePush.on) fetchDataFreshness(); }, PULL_EVERY);
 
     // ===== SPX Statistics (persists after market close) =====
     const statsContent = document.getElementById('statsContent');
     async function fetchStats() {
       try {
-        const r = await fetch('/api/volland/stats', {cache: 'no-store'});
-        const data = await r.json();
+        const data = await pushedOrFetch('volland', 'stats', '/api/volland/stats');
         renderStats(data);
       } catch (err) {
         statsContent.innerHTML = '<span style="color:#ef4444">Error: ' + err.message + '</span>';
@@ -16680,7 +16467,7 @@ DASH_HTML_TEMPLATE = """
       statsContent.innerHTML = h;
     }
     fetchStats();
-    setInterval(fetchStats, 60000); // Refresh stats every 60 seconds
+    setInterval(() => { if (!livePush.on) fetchStats(); }, 60000); // Refresh stats every 60 seconds (pushed per snapshot)
 
     // Tabs
     const tabTable=document.getElementById('tabTable'),
@@ -16797,20 +16584,17 @@ DASH_HTML_TEMPLATE = """
 
     // ===== Shared fetch for options series (includes spot) =====
     async function fetchSeries(){
-      const r=await fetch('/api/series',{cache:'no-store'});
-      return await r.json();
+      return await pushedOrFetch('series', 'series', '/api/series');
     }
 
     // ===== Volland vanna window =====
     async function fetchVannaWindow(){
-      const r = await fetch('/api/volland/vanna_window?limit=40', {cache:'no-store'});
-      return await r.json();
+      return await pushedOrFetch('volland', 'vanna_window', '/api/volland/vanna_window?limit=40');
     }
 
     // ===== Volland delta decay window =====
     async function fetchDeltaDecayWindow(){
-      const r = await fetch('/api/volland/delta_decay_window?limit=40', {cache:'no-store'});
-      return await r.json();
+      return await pushedOrFetch('volland', 'delta_decay_window', '/api/volland/delta_decay_window?limit=40');
     }
 
     // ===== Main charts (2x4 grid) =====
@@ -17118,13 +16902,11 @@ DASH_HTML_TEMPLATE = """
     .then(w => drawDeltaDecay(w, spot))
     .catch(err => drawDeltaDecay({ error: String(err) }, spot));
 
-  fetch('/api/volland/exposure_window?greek=vanna&expiration=TODAY&limit=40',{cache:'no-store'})
-    .then(r=>r.json())
+  pushedOrFetch('volland', 'vanna_0dte', '/api/volland/exposure_window?greek=vanna&expiration=TODAY&limit=40')
     .then(w => drawExposureChart(vannaOdteDiv, w, spot, 'Vanna 0DTE'))
     .catch(err => drawExposureChart(vannaOdteDiv, {error:String(err)}, spot, 'Vanna 0DTE'));
 
-  fetch('/api/volland/exposure_window?greek=gamma&expiration=TODAY&limit=40',{cache:'no-store'})
-    .then(r=>r.json())
+  pushedOrFetch('volland', 'gamma_0dte', '/api/volland/exposure_window?greek=gamma&expiration=TODAY&limit=40')
     .then(w => drawExposureChart(gammaOdteDiv, w, spot, 'Gamma 0DTE'))
     .catch(err => drawExposureChart(gammaOdteDiv, {error:String(err)}, spot, 'Gamma 0DTE'));
 }
@@ -17133,7 +16915,7 @@ DASH_HTML_TEMPLATE = """
     function startCharts(){
       drawOrUpdate();
       if (chartsTimer) clearInterval(chartsTimer);
-      chartsTimer = setInterval(drawOrUpdate, PULL_EVERY);
+      chartsTimer = setInterval(() => { if (!livePush.on) drawOrUpdate(); }, PULL_EVERY);
     }
     function stopCharts(){
       if (chartsTimer){
@@ -17239,7 +17021,7 @@ DASH_HTML_TEMPLATE = """
       } catch(e){}
 
       const fetches = HT_COMBOS.map(c =>
-        fetch('/api/volland/exposure_window?greek='+c.greek+'&expiration='+c.exp+'&limit=40', {cache:'no-store'})
+        fetch('/api/volland/exposure_window?greek='+c.greek+'&expiration='+c.exp+'&limit=40', {cache:'no-cache'})
           .then(r=>r.json())
           .catch(err=>({error:String(err)}))
       );
@@ -17275,14 +17057,12 @@ DASH_HTML_TEMPLATE = """
 
     // Fetch statistics levels (Target, LIS, Max Gamma)
     async function fetchStatisticsLevels() {
-      const r = await fetch('/api/statistics_levels', { cache: 'no-store' });
-      return await r.json();
+      return await pushedOrFetch('series', 'levels', '/api/statistics_levels');
     }
 
     // Fetch SPX 3-minute candles from TradeStation API
     async function fetchSPXCandles() {
-      const r = await fetch('/api/spx_candles?bars=60', { cache: 'no-store' });
-      return await r.json();
+      return await pushedOrFetch('series', 'candles', '/api/spx_candles?bars=60');
     }
 
     // Compute shared Y range from strikes centered around spot
@@ -17676,7 +17456,7 @@ DASH_HTML_TEMPLATE = """
       }
       tickUnified();
       if (unifiedTimer) clearInterval(unifiedTimer);
-      unifiedTimer = setInterval(tickUnified, PULL_EVERY);
+      unifiedTimer = setInterval(() => { if (!livePush.on) tickUnified(); }, PULL_EVERY);
     }
 
     function stopSpot() {
@@ -17694,7 +17474,7 @@ DASH_HTML_TEMPLATE = """
     async function fetchStatisticsData() {
       const [candlesRes, levelsRes] = await Promise.all([
         fetch('/api/spx_candles_1m?bars=200', {cache: 'no-store'}),
-        fetch('/api/statistics_levels', {cache: 'no-store'})
+        fetch('/api/statistics_levels', {cache: 'no-cache'})
       ]);
       const candles = await candlesRes.json();
       const levels = await levelsRes.json();
@@ -17913,6 +17693,38 @@ DASH_HTML_TEMPLATE = """
       });
     }
 
+    // /api/playback/range?format=ndjson -> the format=json document, parsed line by line
+    // as it arrives (meta line first, then one snapshot per line).
+    async function fetchPlaybackNdjson(url, onProgress) {
+      const r = await fetch(url, { cache: 'no-store' });
+      if (!r.body || !(r.headers.get('content-type') || '').includes('ndjson')) return r.json();
+      const reader = r.body.getReader();
+      const decoder = new TextDecoder();
+      let buf = '', data = null;
+      const take = (line) => {
+        if (!line) return;
+        const obj = JSON.parse(line);
+        if (data === null) { data = obj; data.snapshots = []; }
+        else if (obj.error) data.error = obj.error;
+        else {
+          data.snapshots.push(obj);
+          if (onProgress && data.snapshots.length % 100 === 0) onProgress(data.snapshots.length, data.count);
+        }
+      };
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buf += decoder.decode(value, { stream: true });
+        let nl;
+        while ((nl = buf.indexOf('\\n')) >= 0) {
+          take(buf.slice(0, nl));
+          buf = buf.slice(nl + 1);
+        }
+      }
+      take(buf + decoder.decode());
+      return data || { snapshots: [] };
+    }
+
     async function loadPlaybackData() {
       const startDate = playbackDateInput.value;
 
@@ -17920,12 +17732,13 @@ DASH_HTML_TEMPLATE = """
       playbackLoadBtn.disabled = true;
 
       try {
-        let url = '/api/playback/range';
+        let url = '/api/playback/range?format=ndjson';
         if (startDate) {
-          url += '?start_date=' + startDate;
+          url += '&start_date=' + startDate;
         }
-        const r = await fetch(url, { cache: 'no-store' });
-        const data = await r.json();
+        const data = await fetchPlaybackNdjson(url, (n, total) => {
+          playbackTimestamp.textContent = 'Loading... ' + n + ' / ' + total;
+        });
 
         if (data.error) {
           playbackTimestamp.textContent = 'Error: ' + data.error;
@@ -18430,20 +18243,18 @@ DASH_HTML_TEMPLATE = """
       _esDeltaSetLive(true);
       esDeltaPlotReady = false;
       drawEsDelta();
-      esDeltaInterval = setInterval(drawEsDelta, 5000);
+      esDeltaInterval = setInterval(() => { if (!livePush.on) drawEsDelta(); }, 5000);
     }
     async function drawEsDelta() {
       try {
-        const [r, levelsR] = await Promise.all([
-          fetch('/api/es/delta/rangebars?range=5', {cache:'no-store'}),
-          fetch('/api/statistics_levels', {cache:'no-store'}).catch(() => null),
+        const [raw, levels] = await Promise.all([
+          pushedOrFetch('es', 'rangebars', '/api/es/delta/rangebars?range=5'),
+          pushedOrFetch('series', 'levels', '/api/statistics_levels').catch(() => null),
         ]);
-        const raw = await r.json();
         if (raw.error) { esDeltaStatus.textContent = raw.error; return; }
         // Handle both {bars, signals} and legacy array responses
         const bars = raw.bars || raw;
         const signals = raw.signals || [];
-        const levels = levelsR ? await levelsR.json().catch(() => null) : null;
         if (!bars.length) { esDeltaStatus.textContent = 'No data'; return; }
 
         const n = bars.length;
@@ -21868,12 +21679,9 @@ def html_table(session: str = Cookie(default=None), symbol: str = Query("SPXW"))
     spot_str = parts.get("spot", "")
     rows = parts.get("rows", "")
 
-    if is_spy:
-        with _spy_df_lock:
-            df_src = None if (latest_spy_df is None or latest_spy_df.empty) else latest_spy_df.copy()
-    else:
-        with _df_lock:
-            df_src = None if (latest_df is None or latest_df.empty) else latest_df.copy()
+    # The one place a DataFrame is still built from the chain — on demand, per request.
+    chain = latest_spy_chain if is_spy else latest_chain
+    df_src = None if (chain is None or chain.empty) else chain.to_frame()
 
     if df_src is None or df_src.empty:
         body_html = "<p>No data yet. If market is open, it will appear within ~30s.</p>"
@@ -21964,7 +21772,7 @@ def login(request: Request, email: str = Form(...), password: str = Form(...)):
         return HTMLResponse(html, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             row = conn.execute(
                 text("SELECT id, password_hash FROM users WHERE email = :email"),
                 {"email": email.lower().strip()}
@@ -22034,7 +21842,7 @@ def submit_access_request(email: str = Form(...), subject: str = Form(...), mess
         return HTMLResponse(html, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(text("""
                 INSERT INTO contact_messages (email, subject, message)
                 VALUES (:email, :subject, :message)
@@ -22059,7 +21867,7 @@ def list_users(session: str = Cookie(default=None)):
         return JSONResponse({"error": "Database not available"}, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text(
                 "SELECT id, email, is_admin, created_at FROM users ORDER BY created_at DESC"
             )).mappings().all()
@@ -22083,7 +21891,7 @@ def add_user(email: str = Query(...), password: str = Query(...), session: str =
         return JSONResponse({"error": "Database not available"}, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             # Check if user already exists
             existing = conn.execute(
                 text("SELECT id FROM users WHERE email = :email"),
@@ -22117,7 +21925,7 @@ def delete_user(user_id: int, session: str = Cookie(default=None)):
         return JSONResponse({"error": "Database not available"}, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
         return {"status": "ok", "message": "User deleted"}
     except Exception as e:
@@ -22135,7 +21943,7 @@ def list_messages(session: str = Cookie(default=None)):
         return JSONResponse({"error": "Database not available"}, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             rows = conn.execute(text(
                 "SELECT id, email, subject, message, is_read, created_at FROM contact_messages ORDER BY created_at DESC"
             )).mappings().all()
@@ -22161,7 +21969,7 @@ def mark_message_read(msg_id: int, session: str = Cookie(default=None)):
         return JSONResponse({"error": "Database not available"}, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(text("UPDATE contact_messages SET is_read = TRUE WHERE id = :id"), {"id": msg_id})
         return {"status": "ok"}
     except Exception as e:
@@ -22178,7 +21986,7 @@ def delete_message(msg_id: int, session: str = Cookie(default=None)):
         return JSONResponse({"error": "Database not available"}, status_code=500)
 
     try:
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             conn.execute(text("DELETE FROM contact_messages WHERE id = :id"), {"id": msg_id})
         return {"status": "ok"}
     except Exception as e:
@@ -22697,11 +22505,12 @@ def _shadow_detect_absorption(bars: list, cd_state: dict, today) -> dict | None:
     COOLDOWN_BARS = 10
     MIN_BARS = VOL_WINDOW + LOOKBACK
 
-    closed = [b for b in bars if b.get("status") == "closed"]
-    if len(closed) < MIN_BARS:
+    from app.bar_features import features_for
+    f = features_for(bars)
+    if f.n < MIN_BARS:
         return None
 
-    trigger = closed[-1]
+    trigger = f.bar(-1)
     trigger_idx = trigger["idx"]
 
     # Daily reset
@@ -22716,8 +22525,7 @@ def _shadow_detect_absorption(bars: list, cd_state: dict, today) -> dict | None:
     cd_state["last_checked_idx"] = trigger_idx
 
     # Volume gate
-    recent = closed[-(VOL_WINDOW + 1):-1]
-    vol_avg = sum(b["volume"] for b in recent) / len(recent) if recent else 0
+    vol_avg = f.mean("volume", VOL_WINDOW, lag=1) or 0
     if vol_avg <= 0:
         return None
     vol_ratio = trigger["volume"] / vol_avg
@@ -22725,18 +22533,15 @@ def _shadow_detect_absorption(bars: list, cd_state: dict, today) -> dict | None:
         return None
 
     # Divergence
-    win = closed[-(LOOKBACK + 1):]
-    cvds = [b["cvd"] for b in win]
-    lows = [b["low"] for b in win]
-    highs = [b["high"] for b in win]
-    cvd_range = max(cvds) - min(cvds)
-    price_range = max(highs) - min(lows)
+    first = f.bar(-(LOOKBACK + 1))
+    cvd_range = f.high("cvd", LOOKBACK + 1) - f.low("cvd", LOOKBACK + 1)
+    price_range = f.high("high", LOOKBACK + 1) - f.low("low", LOOKBACK + 1)
     if cvd_range == 0 or price_range == 0:
         return None
 
-    cvd_norm = (cvds[-1] - cvds[0]) / cvd_range
-    pl_norm = (lows[-1] - lows[0]) / price_range
-    ph_norm = (highs[-1] - highs[0]) / price_range
+    cvd_norm = (trigger["cvd"] - first["cvd"]) / cvd_range
+    pl_norm = (trigger["low"] - first["low"]) / price_range
+    ph_norm = (trigger["high"] - first["high"]) / price_range
 
     direction = None
     div_raw = 0
@@ -23108,7 +22913,7 @@ def api_sierra_shadow_status(request: Request, hours: int = Query(24, ge=1, le=1
         return JSONResponse({"error": "no database"}, status_code=503)
     try:
         state = get_sierra_state()
-        with engine.begin() as conn:
+        with api_engine.begin() as conn:
             recent_5pt = conn.execute(text("""
                 SELECT COUNT(*) AS bars, MAX(ts_end) AS last_ts
                 FROM vps_es_range_bars
@@ -23158,7 +22963,7 @@ def vps_es_last(request: Request):
     if not engine:
         return JSONResponse({"error": "no database"}, status_code=503)
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             row = conn.execute(text("""
                 SELECT bar_idx, ts_end, trade_date
                 FROM vps_es_range_bars
@@ -23180,7 +22985,7 @@ def vps_vix_last(request: Request):
     if not engine:
         return JSONResponse({"error": "no database"}, status_code=503)
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             row = conn.execute(text("""
                 SELECT ts FROM vps_vix_ticks
                 ORDER BY ts DESC LIMIT 1
@@ -23202,7 +23007,7 @@ def vps_vol_signals(session: str = Cookie(default=None), hours: int = 8):
         return JSONResponse({"error": "no database"}, status_code=503)
     try:
         cutoff = datetime.now(NY) - timedelta(hours=hours)
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             rows = conn.execute(text("""
                 SELECT direction, vx_price, delta, ask_vol, bid_vol,
                        avg_delta, ratio, bar_ts, received_at
@@ -23241,7 +23046,7 @@ def vps_vx_dom_get(session: str = Cookie(default=None), hours: int = 1, limit: i
 
     try:
         cutoff = datetime.now(NY) - timedelta(hours=hours)
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             rows = conn.execute(text("""
                 SELECT ts, symbol, bid_levels, ask_levels, received_at
                 FROM vps_vx_dom_snapshots
@@ -23277,7 +23082,7 @@ def vps_es_dom_get(session: str = Cookie(default=None), hours: int = 1, limit: i
 
     try:
         cutoff = datetime.now(NY) - timedelta(hours=hours)
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             rows = conn.execute(text("""
                 SELECT ts, symbol, bid_levels, ask_levels, received_at
                 FROM vps_es_dom_snapshots
@@ -23309,7 +23114,7 @@ def vps_status(session: str = Cookie(default=None)):
         return JSONResponse({"error": "no database"}, status_code=503)
 
     try:
-        with engine.connect() as conn:
+        with api_engine.connect() as conn:
             # Last heartbeat
             hb = conn.execute(text("""
                 SELECT status, ts FROM vps_heartbeats
@@ -33,6 +33,9 @@ from typing import Any, Optional
 
 from sqlalchemy import text
 
+from app import migrations
+from app import volland_exposure as vexp
+
 _engine = None
 _send_telegram = None
 
@@ -88,27 +91,36 @@ def init(engine, send_telegram_fn) -> None:
 
 
 def _ensure_table() -> None:
-    with _engine.begin() as c:
-        c.execute(text("""
-            CREATE TABLE IF NOT EXISTS market_briefing (
-                id            BIGSERIAL PRIMARY KEY,
-                trade_date    DATE NOT NULL,
-                slot          TEXT NOT NULL,          -- '10:00' | '14:00'
-                ts            TIMESTAMPTZ NOT NULL,
-                spot          DOUBLE PRECISION,
-                bias          TEXT,                   -- BULLISH | BEARISH | RANGE
-                confidence    INTEGER,                -- 1..5
-                score         DOUBLE PRECISION,       -- summed factor score
-                support       DOUBLE PRECISION,
-                resistance    DOUBLE PRECISION,
-                target        DOUBLE PRECISION,
-                invalidation  DOUBLE PRECISION,
-                factors       JSONB,                  -- per-rule votes + reasons
-                inputs        JSONB,                  -- raw inputs, for post-hoc re-runs
-                outcome       JSONB,                  -- filled by score_day()
-                UNIQUE (trade_date, slot)
-            )
-        """))
+    migrations.apply(_engine, "market_briefing", _MIGRATIONS)
+
+
+def _schema_v1(c):
+    c.execute(text("""
+        CREATE TABLE IF NOT EXISTS market_briefing (
+            id            BIGSERIAL PRIMARY KEY,
+            trade_date    DATE NOT NULL,
+            slot          TEXT NOT NULL,          -- '10:00' | '14:00'
+            ts            TIMESTAMPTZ NOT NULL,
+            spot          DOUBLE PRECISION,
+            bias          TEXT,                   -- BULLISH | BEARISH | RANGE
+            confidence    INTEGER,                -- 1..5
+            score         DOUBLE PRECISION,       -- summed factor score
+            support       DOUBLE PRECISION,
+            resistance    DOUBLE PRECISION,
+            target        DOUBLE PRECISION,
+            invalidation  DOUBLE PRECISION,
+            factors       JSONB,                  -- per-rule votes + reasons
+            inputs        JSONB,                  -- raw inputs, for post-hoc re-runs
+            outcome       JSONB,                  -- filled by score_day()
+            UNIQUE (trade_date, slot)
+        )
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "market_briefing", _schema_v1),
+]
 
 
 # ────────────────────────────────────────────────────────────────────────────
@@ -627,19 +639,10 @@ def _db_inputs(when: datetime) -> dict:
                 out["basket_pct"] = float(b[0])
             # All-time net vanna — the gate on the LIS rule (see _factors). Read here so
             # main.py needs no change. ts_utc IS timezone-aware, unlike semi_basket.
-            snap = c.execute(text("""
-                SELECT max(ts_utc) FROM volland_exposure_points
-                WHERE greek='vanna' AND ticker='SPX' AND expiration_option='ALL'
-                  AND ts_utc <= :t AND ts_utc > :t0
-            """), {"t": when, "t0": when - timedelta(minutes=45)}).scalar()
-            if snap:
-                v = c.execute(text("""
-                    SELECT SUM(value) FROM volland_exposure_points
-                    WHERE greek='vanna' AND ticker='SPX' AND expiration_option='ALL'
-                      AND ts_utc = :s
-                """), {"s": snap}).scalar()
-                if v is not None:
-                    out["vanna_all"] = float(v)
+            snap = vexp.at_or_before(c, "vanna", when, "ALL", ticker="SPX",
+                                     max_age=timedelta(minutes=45))
+            if snap and snap["vals"]:
+                out["vanna_all"] = float(sum(snap["vals"]))
     except Exception as e:
         print(f"[briefing] db inputs partial: {e}", flush=True)
     return out
@@ -11,7 +11,8 @@ This module is FEED-AGNOSTIC and SAFE-BY-DEFAULT:
   - It does not modify the existing chain-walk outcome path.
 
 API:
-  mes_walk(...)                      — pure simulator on a list of ES bars.
+  mes_walk(...)                      — pure simulator on a list of ES bars
+                                       (one-trade wrapper over app.trail_sim).
   compute_mes_sim_outcome(...)       — high-level wrapper that fetches bars
                                        from vps_es_range_bars and runs mes_walk.
   backfill_for_date(engine, date)    — backfills one trading day's worth
@@ -26,6 +27,8 @@ import bisect
 from datetime import datetime, timedelta, date as _date_t
 from typing import Optional, Tuple, Dict, Any, List
 
+from app import trail_sim
+
 try:
     from sqlalchemy import text
 except Exception:  # pragma: no cover - SA always present in production
@@ -99,69 +102,30 @@ def mes_walk(
             "reason": "no_bars", "exit_ts": None, "exit_price": entry_es,
         }
 
-    sl_price = entry_es - sl_pts if is_long else entry_es + sl_pts
-    stop = sl_price
-    max_fav = 0.0
-    max_adv = 0.0
-    be_done = False
-    start_ts = bars[0][0]
-    cutoff = start_ts + timedelta(minutes=max_minutes)
-
-    for ts_s, ts_e, b_o, b_h, b_l, b_c in bars:
-        if ts_s > cutoff:
-            break
-
-        # Per-bar adverse/favorable extremes
-        if is_long:
-            fav_in_bar = b_h - entry_es
-            adv_in_bar = entry_es - b_l
-        else:
-            fav_in_bar = entry_es - b_l
-            adv_in_bar = b_h - entry_es
-        if fav_in_bar > max_fav:
-            max_fav = fav_in_bar
-        if adv_in_bar > max_adv:
-            max_adv = adv_in_bar
-
-        # Check pre-bar stop FIRST (conservative — adverse-first ordering).
-        pre_bar_stop = stop
-        stopped = (
-            (is_long and b_l <= pre_bar_stop)
-            or ((not is_long) and b_h >= pre_bar_stop)
-        )
-        if stopped:
-            pnl = (pre_bar_stop - entry_es) if is_long else (entry_es - pre_bar_stop)
-            return {
-                "pnl": pnl, "mfe": max_fav, "mae": max_adv,
-                "reason": "stop", "exit_ts": ts_e, "exit_price": pre_bar_stop,
-            }
-
-        # Ratchet BE
-        if (not be_done) and be_trigger is not None and max_fav >= be_trigger:
-            be_done = True
-            new_stop = entry_es + be_lock if is_long else entry_es - be_lock
-            if is_long and new_stop > stop:
-                stop = new_stop
-            elif (not is_long) and new_stop < stop:
-                stop = new_stop
-
-        # Ratchet trail
-        if trail_act is not None and max_fav >= trail_act:
-            trail_stop = (
-                (entry_es + (max_fav - trail_gap))
-                if is_long
-                else (entry_es - (max_fav - trail_gap))
-            )
-            if is_long and trail_stop > stop:
-                stop = trail_stop
-            elif (not is_long) and trail_stop < stop:
-                stop = trail_stop
+    # The walk itself is app.trail_sim (vectorized, same semantics); this keeps the
+    # historical window rules: bars past the cutoff are not walked, and an unexited
+    # trade is marked at the close of the LAST bar passed in.
+    cutoff = bars[0][0] + timedelta(minutes=max_minutes)
+    end = next((i for i, b in enumerate(bars) if b[0] > cutoff), len(bars))
+    r = trail_sim.simulate(
+        [b[3] for b in bars], [b[4] for b in bars], [b[5] for b in bars],
+        0, end, entry_es, is_long, sl_pts,
+        be_trigger=be_trigger, be_lock=be_lock, activation=trail_act, gap=trail_gap,
+    )
+    reason = int(r["reason"][0])
+    mfe, mae = float(r["mfe"][0]), float(r["mae"][0])
+    if reason == trail_sim.STOP:
+        return {
+            "pnl": float(r["pnl"][0]), "mfe": mfe, "mae": mae,
+            "reason": "stop", "exit_ts": bars[int(r["exit_idx"][0])][1],
+            "exit_price": float(r["exit_price"][0]),
+        }
 
     # End of window — exit at last bar's close
     ts_s, ts_e, b_o, b_h, b_l, b_c = bars[-1]
     pnl = (b_c - entry_es) if is_long else (entry_es - b_c)
     return {
-        "pnl": pnl, "mfe": max_fav, "mae": max_adv,
+        "pnl": pnl, "mfe": mfe, "mae": mae,
         "reason": "eod", "exit_ts": ts_e, "exit_price": b_c,
     }
 
@@ -0,0 +1,182 @@
+"""Schema migration ledger — numbered DDL steps per scope, applied once.
+
+Before this, every boot re-ran db_init()'s ~70 `CREATE TABLE IF NOT EXISTS` and
+`DO $$ ... ALTER TABLE ... EXCEPTION WHEN duplicate_column` statements, and gex_state,
+friday_spread, live_filter.backfill_live_pass, ... their own. Even a no-op ALTER TABLE
+queues for an ACCESS EXCLUSIVE lock, so one idle-in-transaction analysis session on
+chain_snapshots or setup_log stalled startup — hence on_startup's retry/sleep loop and
+the crash-looped deploys (2026-06-03).
+
+Now each owner (`scope`: "main", "gex_state", ...) lists numbered steps and calls
+apply(). Applied steps are recorded in schema_migrations (scope, version, name,
+checksum, applied_at, ms):
+  - the ledger is read ONCE per process with a plain SELECT — no DDL, no table locks —
+    and a boot where every step is recorded runs no DDL at all;
+  - only when a step is pending: a session advisory lock (one migrator at a time across
+    replicas / one-off scripts), ledger re-read, then each pending step in its own
+    transaction under LOCK_TIMEOUT / STATEMENT_TIMEOUT, recorded with its duration.
+    A failed step raises and stops its scope (later steps may depend on it); the next
+    boot retries it.
+Steps stay idempotent (IF NOT EXISTS), so a database half-way through the old
+boot-time DDL is safe to migrate. An applied step is never re-run: re-running the
+baseline would queue its ALTERs on chain_snapshots / setup_log behind ACCESS EXCLUSIVE
+locks, which is what this ledger exists to avoid. The checksum (the step's source with
+comments and whitespace dropped) only detects a step edited in place: it is logged as
+drift and counted in status(), and the change does NOT reach the database.
+
+Adding or changing schema: append a NEW (version, name, fn) to the scope's list; never
+renumber, never edit an applied step.
+
+API:
+  apply(engine, scope, steps) -> [names applied]   steps = [(version, name, fn(conn)), ...]
+  status() -> {"ms", "read_ms", "applied", "scopes": {scope: {...}}}
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import io
+import os
+import re
+import time
+import tokenize
+from threading import Lock
+
+from sqlalchemy import text
+
+TABLE = "schema_migrations"
+# Per-step timeouts: fail fast on a blocked ALTER instead of queueing behind it.
+LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+STATEMENT_TIMEOUT = os.getenv("MIGRATION_STATEMENT_TIMEOUT", "30s")
+# How long to wait for another process's migration run to finish.
+ADVISORY_WAIT_SEC = 60
+_ADVISORY_KEY = 0x5C4E4D41   # arbitrary, fixed
+
+DDL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    scope TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ms REAL,
+    PRIMARY KEY (scope, version)
+)
+"""
+
+_lock = Lock()
+_ledger = None             # {(scope, version): checksum}, loaded on first apply()
+_stats = {"ms": 0.0, "read_ms": 0.0, "applied": 0, "drift": [], "scopes": {}}
+# Checksum format tag (md5 over the normalized source), so a later change of the
+# normalization can be told apart from a step edited in place.
+_CK_PREFIX = "n1:"
+_SKIP_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT,
+                tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER}
+_STRING_TOKENS = {tokenize.STRING, getattr(tokenize, "FSTRING_MIDDLE", tokenize.STRING)}
+_SQL_COMMENT = re.compile(r"--[^\n]*")
+
+
+def _checksum(fn) -> str:
+    """md5 of the step's source tokens — edits to Python comments, SQL `--` comments or
+    whitespace (in the code or inside the SQL strings) don't change it."""
+    try:
+        src = inspect.getsource(fn)
+        toks = []
+        for t in tokenize.generate_tokens(io.StringIO(src).readline):
+            if t.type in _SKIP_TOKENS:
+                continue
+            if t.type in _STRING_TOKENS:
+                toks.append(" ".join(_SQL_COMMENT.sub("", t.string).split()))
+            else:
+                toks.append(t.string)
+        src = " ".join(toks)
+    except (OSError, TypeError, tokenize.TokenError, IndentationError):
+        src = getattr(fn, "__qualname__", repr(fn))
+    return _CK_PREFIX + hashlib.md5(src.encode()).hexdigest()
+
+
+def _read(conn) -> dict:
+    if conn.execute(text(f"SELECT to_regclass('{TABLE}')")).scalar() is None:
+        return {}
+    return {(r[0], r[1]): r[2] for r in
+            conn.execute(text(f"SELECT scope, version, checksum FROM {TABLE}")).all()}
+
+
+def _pending(scope, steps) -> list:
+    """Steps with no ledger row. An applied step whose checksum changed is reported as
+    drift once per process, not re-applied."""
+    out = []
+    for v, name, fn in sorted(steps, key=lambda s: s[0]):
+        ck = _checksum(fn)
+        have = _ledger.get((scope, v))
+        if have is None:
+            out.append((v, name, fn, ck))
+        elif have != ck and f"{scope}#{v}" not in _stats["drift"]:
+            _stats["drift"].append(f"{scope}#{v}")
+            print(f"[migrations] WARNING {scope} #{v} {name} changed since it was applied — "
+                  f"NOT re-applied; put the change in a new step (non-fatal)", flush=True)
+    return out
+
+
+def apply(engine, scope: str, steps) -> list:
+    """Apply the steps of `scope` not yet in the ledger. Returns the names applied."""
+    global _ledger
+    t0 = time.perf_counter()
+    with _lock:
+        if _ledger is None:
+            with engine.connect() as conn:
+                _ledger = _read(conn)
+            _stats["read_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        pending = _pending(scope, steps)
+        done = []
+        if pending:
+            done = _migrate(engine, scope, steps)
+        ms = (time.perf_counter() - t0) * 1000
+        _stats["ms"] = round(_stats["ms"] + ms, 1)
+        _stats["applied"] += len(done)
+        _stats["scopes"][scope] = {"steps": len(steps), "applied": done, "ms": round(ms, 1),
+                                   "version": max((s[0] for s in steps), default=0)}
+    return done
+
+
+def _migrate(engine, scope, steps) -> list:
+    global _ledger
+    done = []
+    with engine.connect() as conn:
+        deadline = time.monotonic() + ADVISORY_WAIT_SEC
+        while not conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _ADVISORY_KEY}).scalar():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"[migrations] {scope}: another migration run holds the lock")
+            time.sleep(1)
+        conn.commit()
+        try:
+            with conn.begin():
+                conn.execute(text(DDL))
+            _ledger = _read(conn)          # another process may have just applied some
+            conn.commit()
+            for v, name, fn, ck in _pending(scope, steps):
+                t0 = time.perf_counter()
+                with conn.begin():
+                    conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                    conn.execute(text(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'"))
+                    fn(conn)
+                    ms = (time.perf_counter() - t0) * 1000
+                    conn.execute(text(f"""
+                        INSERT INTO {TABLE} (scope, version, name, checksum, ms)
+                        VALUES (:s, :v, :n, :c, :ms)
+                        ON CONFLICT (scope, version) DO UPDATE SET name = EXCLUDED.name,
+                            checksum = EXCLUDED.checksum, applied_at = now(), ms = EXCLUDED.ms
+                    """), {"s": scope, "v": v, "n": name, "c": ck, "ms": round(ms, 1)})
+                _ledger[(scope, v)] = ck
+                done.append(name)
+                print(f"[migrations] {scope} #{v} {name} applied in {ms:.0f}ms", flush=True)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _ADVISORY_KEY})
+            conn.commit()
+    return done
+
+
+def status() -> dict:
+    with _lock:
+        return {**_stats, "drift": list(_stats["drift"]),
+                "scopes": {k: dict(v) for k, v in _stats["scopes"].items()}}
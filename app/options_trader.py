@@ -12,10 +12,12 @@
 #   - SIM P&L (actual broker fills — may be unreliable for index options)
 #   - Theoretical P&L (live API bid/ask at entry/exit — accurate market prices)
 
-import os, json, time, requests
+import os, json, time
 from datetime import datetime, date
 from threading import Lock
 
+from app import ts_client
+
 # ====== CONFIG ======
 SIM_BASE = "https://sim-api.tradestation.com/v3"
 SIM_ACCOUNT_ID = os.getenv("OPTIONS_SIM_ACCOUNT", "SIM2609238M")
@@ -677,12 +679,13 @@ def _get_chain_rows():
         from sqlalchemy import text
         with _engine.begin() as conn:
             row = conn.execute(text(
-                f"SELECT rows FROM {table} ORDER BY ts DESC LIMIT 1"
+                f"SELECT rows, packed FROM {table} ORDER BY ts DESC LIMIT 1"
             )).mappings().first()
         if not row:
             print(f"[options] no {table} snapshot available", flush=True)
             return None
-        rows = json.loads(row["rows"]) if isinstance(row["rows"], str) else row["rows"]
+        from app.chain_columns import decode_rows
+        rows = decode_rows(row["packed"], row["rows"])
         return rows
     except Exception as e:
         print(f"[options] chain query error: {e}", flush=True)
@@ -769,14 +772,10 @@ def _sim_api(method: str, path: str, json_body: dict | None) -> dict | None:
             }
             url = f"{SIM_BASE}{path}"
 
-            if method == "GET":
-                r = requests.get(url, headers=headers, timeout=10)
-            elif method == "POST":
-                r = requests.post(url, headers=headers, json=json_body, timeout=10)
-            elif method == "DELETE":
-                r = requests.delete(url, headers=headers, timeout=10)
-            else:
+            if method not in ("GET", "POST", "DELETE"):
                 return None
+            r = ts_client.request(method, url, lane="order", headers=headers,
+                                  json=json_body if method == "POST" else None, timeout=10)
 
             if r.status_code == 401 and attempt == 0:
                 continue
@@ -851,8 +850,8 @@ def _get_option_quote(symbol: str) -> dict | None:
         headers = {"Authorization": f"Bearer {token}"}
         import urllib.parse
         encoded = urllib.parse.quote(symbol)
-        r = requests.get(
-            f"https://api.tradestation.com/v3/marketdata/quotes/{encoded}",
+        r = ts_client.request(
+            "GET", f"https://api.tradestation.com/v3/marketdata/quotes/{encoded}",
             headers=headers, timeout=10)
         if r.status_code == 200:
             quotes = r.json().get("Quotes", [])
@@ -0,0 +1,293 @@
+"""Playback range / export readers — chunked, optionally downsampled, JSON / NDJSON / binary.
+
+Before this, `/api/playback/range` loaded up to 7 days of playback_snapshots (every JSON
+column of every row) in one query, decoded all of it, scanned the Volland DD fallback
+linearly per row and returned one large JSON document; `/api/export/playback` built the
+whole per-strike CSV in a DataFrame first. Peak memory grew with the range, and a
+zoomed-out chart paid for thousands of snapshots it could not draw.
+
+Now a read is two passes:
+  1. plan():  only (ts, spot) for the range — cheap — and pick which snapshots to send:
+              all, every Nth, or an LTTB reduction of the spot line to `points`;
+  2. rows():  the full rows of the picked timestamps, CHUNK at a time, each chunk on its
+              own short connection. The DD fallback (old rows without delta_decay) is
+              loaded only within 180s of the chunk's rows that need it (overlapping
+              windows merged, so a downsampled chunk spanning days reads a few minutes
+              per row, not the span) and matched with bisect (nearest Volland snapshot
+              within 180s, as before).
+So memory is bounded by one chunk, whatever the range, and the encoders below stream.
+
+Formats (`/api/playback/range?format=`):
+  json    the original document {start_date, end_date, count, snapshots: [...]}
+  ndjson  line 1 the meta object (the document without `snapshots`, plus `fields`),
+          then one snapshot object per line
+  bin     little-endian, float32 arrays; NaN = missing value
+            b"PBK1", u32 meta_len, meta JSON (as ndjson line 1)
+            per snapshot:
+              u32 rec_len (bytes after this field), f64 ts (epoch s), f32 spot,
+              u16 n_strikes, u8 field_mask (bit i = fields[i] present),
+              f32[n] strikes, f32[n] per present field (padded/truncated to n),
+              u32 stats_len, stats JSON
+`/api/export/playback` streams the per-strike CSV with csv_stream() using the same reader.
+
+API:
+  plan(conn, start_dt, end_dt, limit=None, every=1, points=None) -> [ts, ...]
+  rows(engine, ts_list, cols)           -> iterator of (row mapping, dd list | None)
+  snapshot(row, dd)                     -> the /api/playback/range snapshot dict
+  ndjson_stream / binary_stream(engine, ts_list, meta), csv_stream(engine, ts_list, tz)
+                                        -> generators for StreamingResponse
+  lttb(x, y, n)                         -> indices of the n points kept
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import struct
+from bisect import bisect_left
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+from app import volland_exposure as vexp
+
+# Snapshots fetched (and held decoded) per chunk.
+CHUNK = 200
+# Nearest Volland DD snapshot accepted for a row without delta_decay.
+DD_MAX_GAP_SEC = 180
+
+RANGE_COLS = ("ts", "spot", "strikes", "net_gex", "charm", "delta_decay", "call_vol", "put_vol", "stats")
+EXPORT_COLS = ("ts", "spot", "strikes", "net_gex", "charm", "call_vol", "put_vol", "stats",
+               "call_gex", "put_gex", "call_oi", "put_oi")
+# Per-strike series of a range snapshot, in binary field_mask bit order.
+FIELDS = ("net_gex", "charm", "delta_decay", "call_vol", "put_vol")
+
+BIN_MAGIC = b"PBK1"
+_REC = struct.Struct("<dfHB")          # ts, spot, n_strikes, field_mask
+_U32 = struct.Struct("<I")
+
+
+def _load(v):
+    """JSONB/text column -> Python (main._json_load_maybe)."""
+    if v is None or isinstance(v, (dict, list)):
+        return v
+    if isinstance(v, (bytes, bytearray)):
+        v = v.decode("utf-8", "ignore")
+    if isinstance(v, str):
+        s = v.strip()
+        if not s:
+            return None
+        try:
+            return json.loads(s)
+        except Exception:
+            return v
+    return v
+
+
+# ---- downsampling ----
+
+def lttb(x, y, n: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `n` points that keep the shape of y(x).
+
+    First and last points are always kept; each bucket in between keeps the point that
+    spans the largest triangle with the previous pick and the next bucket's mean.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    m = len(x)
+    if n >= m:
+        return np.arange(m)
+    if n < 3:
+        return np.array([0, m - 1][:max(n, 1)], dtype=np.int64)
+    edges = np.linspace(1, m - 1, n - 1).astype(np.int64)   # n-2 buckets over [1, m-1)
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, m - 1
+    a = 0
+    for b in range(n - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < n - 2:
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[b + 1] = a
+    return out
+
+
+def plan(conn, start_dt, end_dt, limit: int | None = None, every: int = 1,
+         points: int | None = None) -> list:
+    """Timestamps to send for [start_dt, end_dt) (None, None = from the first row),
+    ascending. `limit` caps the rows considered; `every` keeps every Nth; `points`
+    reduces to that many by LTTB on spot (applied after `every`)."""
+    where, params = "", {}
+    if start_dt is not None:
+        where = "WHERE ts >= :start_ts AND ts < :end_ts"
+        params = {"start_ts": start_dt, "end_ts": end_dt}
+    lim = f"LIMIT {int(limit)}" if limit else ""
+    res = conn.execute(text(f"SELECT ts, spot FROM playback_snapshots {where} ORDER BY ts ASC {lim}"),
+                       params).all()
+    if every and every > 1:
+        res = res[::every]
+    if points and len(res) > points:
+        x = np.array([r[0].timestamp() for r in res])
+        y = np.array([np.nan if r[1] is None else float(r[1]) for r in res])
+        if np.isnan(y).any():                       # carry spot over gaps for the geometry
+            ok = ~np.isnan(y)
+            y = np.interp(x, x[ok], y[ok]) if ok.any() else np.zeros_like(y)
+        res = [res[i] for i in lttb(x, y, points)]
+    return [r[0] for r in res]
+
+
+# ---- chunked reader ----
+
+def _dd_lookup(conn, ts_list):
+    """DD fallback for rows at ts_list (ascending): (sorted ts list, {ts: {strike: value}}).
+    Reads only the DD_MAX_GAP_SEC windows around those rows, overlapping ones merged."""
+    gap = timedelta(seconds=DD_MAX_GAP_SEC)
+    spans: list = []
+    for ts in ts_list:
+        if spans and ts - gap <= spans[-1][1]:
+            spans[-1][1] = ts + gap
+        else:
+            spans.append([ts - gap, ts + gap])
+    grouped: dict = {}
+    for t0, t1 in spans:
+        for snap in vexp.between(conn, "deltaDecay", t0, t1):
+            grouped.setdefault(snap["ts_utc"], {}).update(vexp.points(snap))
+    return sorted(grouped), grouped
+
+
+def _nearest_dd(dd_ts, grouped, ts):
+    i = bisect_left(dd_ts, ts)
+    best = min((dd_ts[j] for j in (i - 1, i) if 0 <= j < len(dd_ts)),
+               key=lambda t: abs((t - ts).total_seconds()), default=None)
+    if best is None or abs((best - ts).total_seconds()) > DD_MAX_GAP_SEC:
+        return None
+    return grouped.get(best) or None
+
+
+def rows(engine, ts_list: list, cols=RANGE_COLS):
+    """Yield (row, dd) for each timestamp in ts_list, CHUNK rows per query.
+
+    dd is the Volland fallback for a row whose delta_decay column is NULL (a list
+    aligned with its strikes), else None. Only requested when "delta_decay" in cols.
+    """
+    sel = ", ".join(cols)
+    for i in range(0, len(ts_list), CHUNK):
+        chunk = ts_list[i:i + CHUNK]
+        with engine.connect() as conn:
+            batch = conn.execute(text(f"""
+                SELECT {sel} FROM playback_snapshots
+                WHERE ts >= :t0 AND ts <= :t1 AND ts = ANY(:ts)
+                ORDER BY ts ASC
+            """), {"t0": chunk[0], "t1": chunk[-1], "ts": chunk}).mappings().all()
+            dd_ts, grouped = [], {}
+            need = [r["ts"] for r in batch if r["delta_decay"] is None] if "delta_decay" in cols else []
+            if need:
+                dd_ts, grouped = _dd_lookup(conn, need)
+        for r in batch:
+            dd = None
+            if dd_ts and r["delta_decay"] is None:
+                dd_map = _nearest_dd(dd_ts, grouped, r["ts"])
+                if dd_map:
+                    dd = [dd_map.get(s, 0) for s in (_load(r["strikes"]) or [])]
+            yield r, dd
+
+
+def snapshot(r, dd=None) -> dict:
+    ts = r["ts"]
+    return {
+        "ts": ts.isoformat() if hasattr(ts, "isoformat") else str(ts),
+        "spot": r["spot"],
+        "strikes": _load(r["strikes"]) or [],
+        "net_gex": _load(r["net_gex"]),
+        "charm": _load(r["charm"]),
+        "delta_decay": _load(r["delta_decay"]) if dd is None else dd,
+        "call_vol": _load(r["call_vol"]),
+        "put_vol": _load(r["put_vol"]),
+        "stats": _load(r["stats"]),
+    }
+
+
+# ---- encoders ----
+
+def ndjson_stream(engine, ts_list: list, meta: dict):
+    yield (json.dumps({**meta, "fields": list(FIELDS)}, default=str) + "\n").encode()
+    try:
+        for r, dd in rows(engine, ts_list):
+            yield (json.dumps(snapshot(r, dd), default=str) + "\n").encode()
+    except Exception as e:
+        print(f"[playback/stream] ndjson error: {e}", flush=True)
+        yield (json.dumps({"error": str(e)}) + "\n").encode()
+
+
+def _f32(v, n: int) -> np.ndarray | None:
+    if not isinstance(v, list):
+        return None
+    try:
+        a = np.array([np.nan if x is None else x for x in v[:n]], dtype="<f4")
+    except (TypeError, ValueError):
+        return None
+    if len(a) < n:
+        a = np.concatenate([a, np.full(n - len(a), np.nan, dtype="<f4")])
+    return a
+
+
+def encode_record(snap: dict, ts: float) -> bytes:
+    """One binary record (see module docstring) for a snapshot() dict."""
+    n = min(len(snap["strikes"]), 0xFFFF)
+    strikes = _f32(snap["strikes"], n)
+    parts = [strikes if strikes is not None else np.full(n, np.nan, dtype="<f4")]
+    mask = 0
+    for bit, f in enumerate(FIELDS):
+        a = _f32(snap[f], n)
+        if a is not None:
+            mask |= 1 << bit
+            parts.append(a)
+    stats = json.dumps(snap["stats"], default=str).encode() if snap["stats"] is not None else b""
+    spot = np.nan if snap["spot"] is None else float(snap["spot"])
+    body = b"".join([_REC.pack(ts, spot, n, mask)] + [p.tobytes() for p in parts]
+                    + [_U32.pack(len(stats)), stats])
+    return _U32.pack(len(body)) + body
+
+
+def binary_stream(engine, ts_list: list, meta: dict):
+    head = json.dumps({**meta, "fields": list(FIELDS)}, default=str).encode()
+    yield BIN_MAGIC + _U32.pack(len(head)) + head
+    try:
+        for r, dd in rows(engine, ts_list):
+            yield encode_record(snapshot(r, dd), r["ts"].timestamp())
+    except Exception as e:
+        # Truncated stream: the reader sees fewer than meta["count"] records.
+        print(f"[playback/stream] binary error: {e}", flush=True)
+
+
+CSV_HEADER = ["timestamp", "spot", "strike", "call_gex", "put_gex", "net_gex", "call_oi", "put_oi",
+              "charm", "call_vol", "put_vol", "paradigm", "target", "lis", "dd_hedging", "opt_volume"]
+_CSV_SERIES = ("call_gex", "put_gex", "net_gex", "call_oi", "put_oi", "charm", "call_vol", "put_vol")
+
+
+def csv_stream(engine, ts_list: list, tz):
+    """Per-strike playback CSV (one line per snapshot x strike), streamed per chunk."""
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(CSV_HEADER)
+    yield buf.getvalue()
+    try:
+        for r, _dd in rows(engine, ts_list, EXPORT_COLS):
+            buf.seek(0)
+            buf.truncate()
+            ts = r["ts"]
+            ts = ts.astimezone(tz).strftime("%Y-%m-%d %H:%M:%S ET") if hasattr(ts, "astimezone") else str(ts)
+            stats = _load(r["stats"]) or {}
+            series = [_load(r[c]) or [] for c in _CSV_SERIES]
+            tail = [stats.get(k) for k in ("paradigm", "target", "lis", "dd_hedging", "opt_volume")]
+            for i, strike in enumerate(_load(r["strikes"]) or []):
+                w.writerow([ts, r["spot"], strike] + [s[i] if i < len(s) else None for s in series] + tail)
+            yield buf.getvalue()
+    except Exception as e:
+        print(f"[playback/stream] csv error: {e}", flush=True)
+        yield f"# error: {e}\n"
@@ -0,0 +1,262 @@
+"""Shared live quote feed — one TS quote stream per symbol, fanned out in process.
+
+Before this, MES/ES prices came from five places: the @ES quote stream loop in main
+(range bars / delta — only its trade-driven last_price was reusable),
+main._get_es_price_fallback (REST @ES whenever that was empty),
+real_trader._get_current_mes_price (a REST MES quote on every trail / SPX-exit / stop
+modify check), the es_price of /api/eval/signals, and eval_trader.TSQuotePoller on the
+VPS (its own OAuth refresh + REST @ES). Nothing said how old any of those prices were.
+
+Now each symbol has at most ONE /marketdata/stream/quotes subscription, on a daemon
+thread, merged into a book: last / bid / ask / volume, the TS TradeTime, and when each
+arrived here.
+  listen(symbol, fn)   permanent subscription: fn(symbol, update, quote) for every
+                       message, on the stream thread (main's ES range bars / delta)
+  last(symbol)         Last price while the stream is up, else None — the caller keeps
+                       its REST path as the fallback. Starts the stream on first use;
+                       one nobody reads for IDLE_STOP_SEC is shut down (MES roll).
+  quote(symbol)        the book entry with ages — /api/eval/quote serves it to the VPS.
+"Up" means connected, snapshot received and a message (heartbeats included) within
+STREAM_READ_TIMEOUT: a quiet tape is a valid price, a silent socket is not.
+
+status() per symbol: connected, quote age, last_msg age, messages, reconnects, reads
+served from the stream vs misses (the caller fell back to REST).
+
+Init from main.py:  quote_feed.init(ts_access_token, _alert_401)
+"""
+from __future__ import annotations
+
+import json
+import time
+from threading import Event, Lock, Thread
+from urllib.parse import quote as _urlquote
+
+from app import ts_client
+
+BASE = "https://api.tradestation.com/v3/marketdata/stream/quotes"
+# TS sends a Heartbeat every few seconds, so 30s of silence means the stream is dead.
+STREAM_READ_TIMEOUT = 30
+# A symbol nobody has read (and nobody listens to) for this long is unsubscribed.
+IDLE_STOP_SEC = 300
+FIELDS = ("Last", "Bid", "Ask", "Volume", "TradeTime")
+
+_token_fn = None
+_alert_401 = None
+_lock = Lock()
+_feeds: dict = {}          # symbol -> _Feed
+
+
+def init(token_fn, alert_401_fn=None):
+    global _token_fn, _alert_401
+    _token_fn, _alert_401 = token_fn, alert_401_fn
+    print("[quote-feed] initialized", flush=True)
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Feed:
+    """Book + stream thread for one symbol."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.listeners = []       # [(fn, on_state)]
+        self.book = {}            # merged TS fields (FIELDS)
+        self.updated_at = 0.0     # receipt of the last field change
+        self.last_msg_at = 0.0    # receipt of the last message, heartbeats included
+        self.last_read_at = time.time()
+        self.connected = False
+        self.live = False         # snapshot (first quote) received on this connection
+        self.messages = 0
+        self.reconnects = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_error = None
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True, name=f"quote-feed-{symbol}")
+
+    def up(self, now: float) -> bool:
+        return self.connected and self.live and now - self.last_msg_at < STREAM_READ_TIMEOUT
+
+    def _state(self, connected: bool):
+        for _, on_state in list(self.listeners):
+            if on_state:
+                try:
+                    on_state(connected)
+                except Exception as e:
+                    print(f"[quote-feed] {self.symbol} state listener error: {e}", flush=True)
+
+    def _consume(self, r) -> float:
+        """Read the stream until it ends. Returns the backoff floor for the reconnect."""
+        for line in r.iter_lines(decode_unicode=True):
+            if self._stop.is_set():
+                return 0.0
+            now = time.time()
+            with _lock:
+                self.last_msg_at = now
+                idle = not self.listeners and now - self.last_read_at > IDLE_STOP_SEC
+            if idle:
+                self._stop.set()
+                return 0.0
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except Exception:
+                continue
+            if not isinstance(data, dict) or "Heartbeat" in data:
+                continue
+            if "Error" in data:
+                with _lock:
+                    self.last_error = str(data)[:200]
+                print(f"[quote-feed] {self.symbol} stream error msg: {data}", flush=True)
+                # Another session is connected — wait longer before retry
+                return 15.0 if data.get("Error") == "DualLogon" else 0.0
+            if data.get("StreamStatus") == "GoAway":
+                print(f"[quote-feed] {self.symbol} GoAway received, reconnecting", flush=True)
+                return 0.0
+            with _lock:
+                self.messages += 1
+                changed = {k: data[k] for k in FIELDS if k in data and data[k] != self.book.get(k)}
+                if changed:
+                    self.book.update(changed)
+                    self.updated_at = now
+                self.live = True
+                quote = self._quote(now)
+                listeners = list(self.listeners)
+            for fn, _ in listeners:
+                try:
+                    fn(self.symbol, data, quote)
+                except Exception as e:
+                    print(f"[quote-feed] {self.symbol} listener error: {e}", flush=True)
+        return 0.0
+
+    def _run(self):
+        backoff = 1.0
+        url = f"{BASE}/{_urlquote(self.symbol, safe='')}"
+        while not self._stop.is_set():
+            floor = 0.0
+            try:
+                r = ts_client.request("GET", url, headers={"Authorization": f"Bearer {_token_fn()}"},
+                                      stream=True, timeout=STREAM_READ_TIMEOUT)
+                if r.status_code == 401:
+                    r = ts_client.request("GET", url,
+                                          headers={"Authorization": f"Bearer {_token_fn()}"},
+                                          stream=True, timeout=STREAM_READ_TIMEOUT)
+                    if r.status_code == 401 and _alert_401:
+                        _alert_401(f"quote-feed {self.symbol}")
+                if r.status_code != 200:
+                    raise RuntimeError(f"[{r.status_code}] {r.text[:200]}")
+                with _lock:
+                    self.connected = True
+                self._state(True)
+                print(f"[quote-feed] {self.symbol} stream connected", flush=True)
+                backoff = 1.0
+                try:
+                    floor = self._consume(r)
+                finally:
+                    try:
+                        r.close()
+                    except Exception:
+                        pass
+            except Exception as e:
+                with _lock:
+                    self.last_error = str(e)[:200]
+                print(f"[quote-feed] {self.symbol} stream error: {e}", flush=True)
+            with _lock:
+                was_connected = self.connected
+                self.connected = False
+                self.live = False
+            if was_connected:
+                self._state(False)
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            backoff = max(backoff, floor)
+            wait = min(backoff, 60)
+            print(f"[quote-feed] {self.symbol} reconnecting in {wait:.0f}s", flush=True)
+            self._stop.wait(wait)
+            backoff *= 2
+        with _lock:
+            if _feeds.get(self.symbol) is self:
+                _feeds.pop(self.symbol, None)
+        print(f"[quote-feed] {self.symbol} stopped", flush=True)
+
+    def _quote(self, now: float) -> dict:
+        """Book entry for readers. Caller holds _lock."""
+        b = self.book
+        return {"symbol": self.symbol, "last": _float(b.get("Last")), "bid": _float(b.get("Bid")),
+                "ask": _float(b.get("Ask")), "volume": b.get("Volume"),
+                "trade_time": b.get("TradeTime"),
+                "age_s": round(now - self.updated_at, 1) if self.updated_at else None,
+                "stream_up": self.up(now)}
+
+
+def _feed(symbol: str, start: bool = True):
+    """The symbol's feed (started on first use when `start`), or None."""
+    if _token_fn is None or not symbol:
+        return None
+    with _lock:
+        f = _feeds.get(symbol)
+        if f is None and start:
+            f = _feeds[symbol] = _Feed(symbol)
+            f._thread.start()
+        if f is not None:
+            f.last_read_at = time.time()
+    return f
+
+
+def listen(symbol: str, fn, on_state=None):
+    """Permanent subscription: fn(symbol, update, quote) for every quote message of
+    `symbol`; on_state(connected) on (dis)connect. Runs on the stream thread."""
+    if _token_fn is None:
+        return
+    with _lock:
+        f = _feeds.get(symbol)
+        new = f is None
+        if new:
+            f = _feeds[symbol] = _Feed(symbol)
+        f.listeners.append((fn, on_state))
+    if new:
+        f._thread.start()
+
+
+def last(symbol: str) -> float | None:
+    """Last price of `symbol` while its stream is up, else None (use REST)."""
+    f = _feed(symbol)
+    if f is None:
+        return None
+    now = time.time()
+    with _lock:
+        px = _float(f.book.get("Last")) if f.up(now) else None
+        if px is None:
+            f.misses += 1
+        else:
+            f.hits += 1
+    return px
+
+
+def quote(symbol: str, start: bool = False) -> dict | None:
+    """{symbol, last, bid, ask, volume, trade_time, age_s, stream_up} for a fed symbol."""
+    f = _feed(symbol, start=start)
+    if f is None:
+        return None
+    with _lock:
+        return f._quote(time.time())
+
+
+def status() -> dict:
+    now = time.time()
+    with _lock:
+        return {sym: {"connected": f.connected, "stream_up": f.up(now),
+                      "quote_age_s": round(now - f.updated_at, 1) if f.updated_at else None,
+                      "last_msg_age_s": round(now - f.last_msg_at, 1) if f.last_msg_at else None,
+                      "last": _float(f.book.get("Last")), "listeners": len(f.listeners),
+                      "messages": f.messages, "reconnects": f.reconnects,
+                      "reads_stream": f.hits, "reads_missed": f.misses,
+                      "last_error": f.last_error}
+                for sym, f in _feeds.items()}
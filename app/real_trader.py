@@ -10,10 +10,12 @@
 # Cap: 2 concurrent per direction.
 # Trail: SC trail (BE trigger=10, activation=10, gap=5).
 
-import os, json, math, time, calendar, html, requests, zoneinfo
+import os, json, math, time, calendar, html, zoneinfo
 from datetime import datetime, date, timedelta
 from threading import Lock
 
+from app import broker_stream, quote_feed, trail_sim, ts_client
+
 NY = zoneinfo.ZoneInfo("US/Eastern")
 
 # ====== MES CONTRACT AUTO-ROLLOVER ======
@@ -63,8 +65,8 @@ def _front_by_volume(token: str) -> str:
     front, nxt = cands[0], cands[1]
     try:
         syms = ",".join(s.replace("@", "%40") for s in cands)
-        r = requests.get(f"{REAL_BASE}/marketdata/quotes/{syms}",
-                         headers={"Authorization": f"Bearer {token}"}, timeout=5)
+        r = ts_client.request("GET", f"{REAL_BASE}/marketdata/quotes/{syms}",
+                              headers={"Authorization": f"Bearer {token}"}, timeout=5)
         if r.status_code != 200:
             return _auto_mes_symbol()
         vol = {}
@@ -312,17 +314,21 @@ def check_spx_trail_exit(setup_log_id: int, current_mes_price: float | None = No
 
 
 def _get_current_mes_price() -> float | None:
-    """Fetch current MES Last price via REST for side-of-market validation.
+    """Fetch current MES Last price for side-of-market validation.
     Used by update_stop() to avoid submitting a stop that market has already
     crossed (TS rejects such modifies and may wipe the original stop).
-    ~100-200ms network call. Returns None on any failure."""
+    Served from the shared quote feed while its MES stream is up; otherwise a
+    ~100-200ms REST call. Returns None on any failure."""
+    px = quote_feed.last(MES_SYMBOL)
+    if px:
+        return px
     if not _get_token:
         return None
     try:
         token = _get_token()
         sym = MES_SYMBOL.replace("@", "%40")
-        r = requests.get(
-            f"{REAL_BASE}/marketdata/quotes/{sym}",
+        r = ts_client.request(
+            "GET", f"{REAL_BASE}/marketdata/quotes/{sym}", lane="order",  # stop-modify path
             headers={"Authorization": f"Bearer {token}"},
             timeout=5,
         )
@@ -392,6 +398,10 @@ _get_token = None       # callable -> str (access token)
 _send_telegram = None   # callable(msg) -> bool
 _lock = Lock()
 _active_orders: dict[int, dict] = {}  # keyed by setup_log_id
+# One _check_order_fills at a time across its callers — the order stream thread, the
+# poll and the S279 healer — so one fill is never acted on twice.
+_fill_check_lock = Lock()
+_last_full_poll: dict[str, float] = {}  # account -> monotonic of the last /orders GET
 # Position reconciliation is now driven by a 30s scheduler job calling
 # reconcile_positions() — no throttle variable needed here.
 
@@ -419,6 +429,14 @@ def init(engine, get_token_fn, send_telegram_fn):
         print(f"[real-trader] FATAL: longs account {_LONGS_ACCOUNT} not in whitelist!", flush=True)
     if _SHORTS_ACCOUNT not in ACCOUNT_WHITELIST:
         print(f"[real-trader] FATAL: shorts account {_SHORTS_ACCOUNT} not in whitelist!", flush=True)
+    # Order / position events drive the fill checks; poll_order_status falls back to the
+    # 3s poll whenever the stream is down (see broker_stream).
+    if (LONGS_ENABLED or SHORTS_ENABLED) and _get_token:
+        try:
+            broker_stream.start([a for a in _all_accounts() if a in ACCOUNT_WHITELIST],
+                                _get_token, _on_stream_order)
+        except Exception as e:
+            print(f"[real-trader] broker stream start error (non-fatal, polling): {e}", flush=True)
     if _LONGS_ACCOUNT == _SHORTS_ACCOUNT:
         print(f"[real-trader] WARNING: longs and shorts using same account {_LONGS_ACCOUNT}", flush=True)
 
@@ -2515,7 +2533,7 @@ def heal_stuck_entries() -> int:
             print(f"[real-trader] S279 heal: lid={lid} pending_entry for {age/60:.0f} min, "
                   f"broker says {bs or 'ABSENT'} acct={account_id}", flush=True)
             try:
-                _check_order_fills(lid, order, broker_orders)
+                _check_fills(lid, order, broker_orders, "heal")
             except Exception as e:
                 print(f"[real-trader] S279 heal error lid={lid}: {type(e).__name__}: {e}", flush=True)
                 continue
@@ -2543,7 +2561,8 @@ def heal_stuck_entries() -> int:
 # ====== POLL ORDER STATUS ======
 
 def poll_order_status():
-    """Check order fills via TS API. Called each ~30s cycle."""
+    """Check order fills via TS API. Called every 3s by main._real_trade_fast_poll; an
+    account whose order stream is live is only re-read every CONSISTENCY_POLL_SEC."""
     if not (LONGS_ENABLED or SHORTS_ENABLED):
         return
     with _lock:
@@ -2564,6 +2583,14 @@ def poll_order_status():
     for account_id, order_list in by_account.items():
         if account_id not in ACCOUNT_WHITELIST:
             continue
+        # Order stream live: fills arrive as events (_on_stream_order) and this full GET
+        # is only the consistency check, every CONSISTENCY_POLL_SEC instead of every 3s.
+        streamed = broker_stream.live(account_id)
+        now = time.monotonic()
+        last = _last_full_poll.get(account_id)
+        if streamed and last is not None and now - last < broker_stream.CONSISTENCY_POLL_SEC:
+            continue
+        _last_full_poll[account_id] = now
         try:
             orders_data = _ts_api("GET",
                 f"/brokerage/accounts/{account_id}/orders", None, account_id)
@@ -2593,7 +2620,8 @@ def poll_order_status():
                 if _eid and _eid not in broker_orders and order["status"].startswith("pending"):
                     print(f"[real-trader] S279 entry {_eid} (lid={lid}) NOT in /orders payload "
                           f"({len(broker_orders)} orders returned) acct={account_id}", flush=True)
-                _check_order_fills(lid, order, broker_orders)
+                _check_fills(lid, order, broker_orders,
+                             "consistency" if streamed else "poll")
             except Exception as _e:
                 print(f"[real-trader] S279 fill-check error lid={lid} acct={account_id}: "
                       f"{type(_e).__name__}: {_e}", flush=True)
@@ -2605,6 +2633,42 @@ def poll_order_status():
     # which runs regardless of tracked-order state.
 
 
+def _check_fills(lid, order, broker_orders, source: str, recv: float | None = None):
+    """_check_order_fills under _fill_check_lock; a state change it makes is timed into
+    broker_stream's latency stats under `source`."""
+    with _fill_check_lock:
+        before = order.get("status")
+        _check_order_fills(lid, order, broker_orders)
+        after = order.get("status")
+    if after != before:
+        broker_stream.note_transition(source, broker_stream.transition_order(
+            (order.get("entry_order_id"), order.get("stop_order_id"),
+             order.get("target_order_id")), broker_orders), recv)
+
+
+def _on_stream_order(account_id: str, broker_order: dict, recv: float):
+    """broker_stream callback: an order event — fill-check every tracked lid that
+    references it (entry, stop or target), against the streamed order book."""
+    if account_id not in ACCOUNT_WHITELIST:
+        return
+    oid = broker_order.get("OrderID")
+    with _lock:
+        hits = [(lid, o) for lid, o in _active_orders.items()
+                if o.get("account_id") == account_id
+                and o["status"] in ("pending_entry", "pending_limit", "pending_stop_entry", "filled")
+                and oid in (o.get("entry_order_id"), o.get("stop_order_id"),
+                            o.get("target_order_id"))]
+    if not hits:
+        return
+    broker_orders = {**broker_stream.orders(account_id), oid: broker_order}
+    for lid, order in hits:
+        try:
+            _check_fills(lid, order, broker_orders, "stream", recv)
+        except Exception as e:
+            print(f"[real-trader] stream fill-check error lid={lid} acct={account_id}: "
+                  f"{type(e).__name__}: {e}", flush=True)
+
+
 # 2026-06-02 S200: dedup state for reconcile mismatch alerts that we CAN'T auto-heal.
 # Keyed by acct_id -> ((acct, expected, broker), last_alert_monotonic). Previously the
 # "QTY MISMATCH ... Check manually" branch fired on every 30s reconcile cycle with no
@@ -2674,8 +2738,8 @@ def _reconcile_positions():
             # network call, so without this the two views disagree — see the long
             # comment at the `_qty_to_close` computation.
             _counted_lids = {lid for lid, _ in _counted}
-        # Query broker
-        broker_pos = _get_broker_position(acct_id)
+        # Query broker (the position stream's book while it is live)
+        broker_pos = _get_broker_position(acct_id, from_stream=True)
         broker_qty = broker_pos["qty"] if broker_pos else 0
         if broker_qty != expected_qty:
             print(f"[real-trader] RECONCILE MISMATCH on {acct_id}: "
@@ -3477,11 +3541,12 @@ def update_trail(setup_log_id: int, current_es_price: float):
 
     is_long = order["direction"].lower() in ("long", "bullish")
 
-    # Per-setup trail params (DD Exhaustion = continuous 10/10 no-BE; else SC globals).
-    _ov = _SETUP_TRAIL_OVERRIDE.get(order.get("setup_name") or "", {})
-    _be_trigger = _ov["be_trigger"] if "be_trigger" in _ov else BE_TRIGGER_PTS
-    _trail_act = _ov.get("activation", TRAIL_ACTIVATION_PTS)
-    _trail_gap = _ov.get("gap", TRAIL_GAP_PTS)
+    # Per-setup trail params (DD Exhaustion = continuous 10/10 no-BE; else SC globals),
+    # from the same helper the simulators use.
+    _tp = trail_sim.real_trail(order.get("setup_name"))
+    _be_trigger = _tp["be_trigger"]
+    _trail_act = _tp["activation"]
+    _trail_gap = _tp["gap"]
 
     # Calculate current profit
     if is_long:
@@ -3505,11 +3570,11 @@ def update_trail(setup_log_id: int, current_es_price: float):
         if _be_trigger is not None and not order.get("be_triggered") and max_fav >= _be_trigger:
             order["be_triggered"] = True
             if is_long:
-                be_stop = _round_mes(fill_price + BE_BUFFER_PTS)
+                be_stop = _round_mes(fill_price + _tp["be_lock"])
                 if be_stop > current_stop:
                     new_stop = be_stop
             else:
-                be_stop = _round_mes(fill_price - BE_BUFFER_PTS)
+                be_stop = _round_mes(fill_price - _tp["be_lock"])
                 if be_stop < current_stop:
                     new_stop = be_stop
 
@@ -4065,7 +4130,21 @@ def get_full_status() -> dict:
 
 # ====== BROKER QUERIES ======
 
-def _get_broker_position(account_id: str, expect_position: bool = False) -> dict | None:
+def _mes_position(positions) -> dict | None:
+    for pos in positions or []:
+        symbol = pos.get("Symbol", "")
+        qty = abs(int(pos.get("Quantity", "0")))
+        if qty > 0 and "MES" in symbol.upper():
+            return {
+                "qty": qty,
+                "long_short": pos.get("LongShort", ""),
+                "symbol": symbol,
+            }
+    return None
+
+
+def _get_broker_position(account_id: str, expect_position: bool = False,
+                         from_stream: bool = False) -> dict | None:
     """Query broker for actual MES position on a specific account.
     Returns {'qty': int, 'long_short': str, 'symbol': str} or None if flat.
 
@@ -4080,22 +4159,26 @@ def _get_broker_position(account_id: str, expect_position: bool = False) -> dict
     caught hours later by reconciler. Reconciler/other callers keep single-shot
     semantics (expect_position=False) so they can detect genuine flat-broker
     states without latency cost.
+
+    from_stream: answer from broker_stream's position book when that stream is live
+    (the 30s reconcile); flatten / EOD verification keep the fresh GET.
     """
     if account_id not in ACCOUNT_WHITELIST:
         return None
+    if from_stream:
+        streamed = broker_stream.positions(account_id)
+        if streamed is not None:
+            try:
+                return _mes_position(streamed)
+            except (TypeError, ValueError):
+                pass  # malformed stream item — fall through to the GET
     attempts = 3 if expect_position else 1
     for attempt in range(attempts):
         try:
             pos_data = _ts_api("GET", f"/brokerage/accounts/{account_id}/positions", None, account_id)
-            for pos in (pos_data or {}).get("Positions", []):
-                symbol = pos.get("Symbol", "")
-                qty = abs(int(pos.get("Quantity", "0")))
-                if qty > 0 and "MES" in symbol.upper():
-                    return {
-                        "qty": qty,
-                        "long_short": pos.get("LongShort", ""),
-                        "symbol": symbol,
-                    }
+            mes = _mes_position((pos_data or {}).get("Positions", []))
+            if mes:
+                return mes
             # No position found in this response — may be transient false-flat
             if expect_position and attempt < attempts - 1:
                 time.sleep(1.0)
@@ -4264,16 +4347,12 @@ def _ts_api(method: str, path: str, json_body: dict | None,
             else:
                 print(f"[real-trader] API {method} {path} acct={account_id}", flush=True)
 
-            if method == "GET":
-                r = requests.get(url, headers=headers, timeout=10)
-            elif method == "POST":
-                r = requests.post(url, headers=headers, json=json_body, timeout=10)
-            elif method == "PUT":
-                r = requests.put(url, headers=headers, json=json_body, timeout=10)
-            elif method == "DELETE":
-                r = requests.delete(url, headers=headers, timeout=10)
-            else:
+            if method not in ("GET", "POST", "PUT", "DELETE"):
                 return None
+            # Shared keep-alive session, order lane of the TS rate limiter
+            r = ts_client.request(method, url, lane="order", headers=headers,
+                                  json=json_body if method in ("POST", "PUT") else None,
+                                  timeout=10)
 
             # Log response
             print(f"[real-trader] API {method} {path} [{r.status_code}] "
@@ -0,0 +1,144 @@
+"""Version-keyed response cache for the hot read endpoints — JSON bytes + ETag / 304.
+
+Before this, `/api/series`, `/api/snapshot`, the Volland windows, `/api/statistics_levels`,
+`/api/gex-state/latest` and `/api/darkmate/levels` recomputed from Postgres (and
+re-serialised) on every request, although their inputs only change once per 30s chain
+pull, 120s Volland cycle or 2 min gex-state capture.
+
+Each endpoint now passes the version of the data it reads (chain snapshot version,
+Volland snapshot id, gex_state capture count, plus its own query params) as `key`:
+  - hit:  the JSON bytes built for that key are served as-is, no query, no encode;
+  - miss: `build()` runs once per key (concurrent misses of the same key wait for it;
+          other keys and uncached builds don't), the result is encoded once and stored
+          with a strong ETag (hash of the bytes).
+Every response carries the ETag and `Cache-Control: no-cache`, so a browser fetch with
+`cache: 'no-cache'` revalidates with If-None-Match and gets an empty 304 while the data
+is unchanged. key=None means the version is unknown right now (e.g. the Volland
+listener is down): the response is built every time, concurrently, but still ETag'd.
+
+Not stored: Response objects returned by `build()` (error JSONResponses pass straight
+through) and empty / {"error": ...} payloads, so a transient failure is not pinned
+until the next data version.
+
+API:
+  cached(request, name, key, build) -> Response
+  status() -> {name: {hits, misses, uncached, not_modified, hit_rate, entries}}
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+# Entries kept per endpoint — one per live param combination plus a few history keys.
+MAX_ENTRIES = 32
+
+_lock = Lock()             # guards _store / _stats / _build_locks
+_store: dict = {}          # name -> OrderedDict(key -> (etag, body)), LRU order
+_stats: dict = {}          # name -> counters
+_build_locks: dict = {}    # (name, key) -> [Lock, users] while misses of that key build
+
+
+def _encode(obj) -> bytes:
+    # Same encoding as FastAPI's default JSONResponse
+    return json.dumps(jsonable_encoder(obj), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _cacheable(obj) -> bool:
+    return not (obj is None or (isinstance(obj, dict) and (not obj or "error" in obj)))
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+
+def _counters(name: str) -> dict:
+    st = _stats.get(name)
+    if st is None:
+        st = _stats[name] = {"hits": 0, "misses": 0, "uncached": 0, "not_modified": 0}
+        _store[name] = OrderedDict()
+    return st
+
+
+def _lookup(name: str, key):
+    ent = _store[name].get(key)
+    if ent is not None:
+        _store[name].move_to_end(key)
+    return ent
+
+
+def _build(name: str, key, st: dict, build):
+    """Run build() -> (etag, body) entry, stored when cacheable; a Response passes through."""
+    obj = build()
+    if isinstance(obj, Response):
+        with _lock:
+            st["uncached"] += 1
+        return obj
+    body = _encode(obj)
+    ent = ('"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"', body)
+    with _lock:
+        if key is not None and _cacheable(obj):
+            st["misses"] += 1
+            _store[name][key] = ent
+            while len(_store[name]) > MAX_ENTRIES:
+                _store[name].popitem(last=False)
+        else:
+            st["uncached"] += 1
+    return ent
+
+
+def cached(request, name: str, key, build) -> Response:
+    """Serve `name` for data version `key` (hashable, None = don't cache) from the cache,
+    building it with `build()` -> JSON-able | Response on a miss."""
+    with _lock:
+        st = _counters(name)
+        ent = _lookup(name, key) if key is not None else None
+        if ent is not None:
+            st["hits"] += 1
+        elif key is not None:
+            slot = _build_locks.setdefault((name, key), [Lock(), 0])
+            slot[1] += 1
+    if ent is None and key is None:
+        ent = _build(name, key, st, build)
+    elif ent is None:
+        try:
+            with slot[0]:
+                with _lock:
+                    ent = _lookup(name, key)
+                    if ent is not None:
+                        st["hits"] += 1        # built by a concurrent request
+                if ent is None:
+                    ent = _build(name, key, st, build)
+        finally:
+            with _lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    _build_locks.pop((name, key), None)
+    if isinstance(ent, Response):
+        return ent
+    etag, body = ent
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        with _lock:
+            st["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def status() -> dict:
+    with _lock:
+        out = {}
+        for name, st in _stats.items():
+            total = st["hits"] + st["misses"] + st["uncached"]
+            out[name] = {**st, "hit_rate": round(st["hits"] / total, 3) if total else None,
+                         "entries": len(_store[name])}
+    return out
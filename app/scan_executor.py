@@ -0,0 +1,158 @@
+"""Scan executor — the GEX scanners' chain fetches, in parallel on one bounded pool.
+
+Before this, stock_gex_scanner.run_scan walked its 14 names one at a time with a 5s
+INTER_STOCK_DELAY after each, stock_gex_live._run_gex_scan_inner slept 1s after each of
+its 52, and dte0_gex_scanner.run_scan did SPX/SPY/QQQ/IWM back to back. A weekly+opex
+"10:00 snapshot" was really chains fetched over several minutes, and the sleeps were all
+that kept a scan off TS's rate limit. Nothing recorded how long a scan took.
+
+Now a scanner hands its items to run(name, items, fetch): fetch(item) runs on a shared
+pool of MAX_WORKERS threads (all scanners together — a 10:00 stock scan and the dte0
+scan don't stack up), and the request rate is ts_client's token bucket, where the bulk
+lane queues behind the data and order lanes. No fixed sleeps.
+  - per item: a TIMEOUT_SEC deadline per attempt (counted from when it starts on a
+    worker; a hung fetch is abandoned, its request times out on its own) and up to
+    RETRIES retries when fetch raises or returns None, RETRY_DELAY_SEC * attempt apart;
+  - skew: the first result opens a MAX_SKEW_SEC window. A retry that can't land in it
+    isn't started and an item still pending when it closes is dropped ("skew"), so the
+    results a scanner stores are at most MAX_SKEW_SEC apart.
+The caller keeps its compute / DB writes / in-memory update, per item, in its own thread.
+
+API:
+  run(name, items, fetch, timeout=None, retries=None, max_skew=None)
+      -> ({item: result}, report)   report: duration_s, skew_s, ok, failed {item: reason},
+                                    retries, timeouts, skew_dropped
+  status() -> per scanner name: runs, last report, duration_s mean / max, skew_s max
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+
+MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "4"))
+TIMEOUT_SEC = float(os.getenv("SCAN_TIMEOUT_SEC", "45"))
+RETRIES = int(os.getenv("SCAN_RETRIES", "1"))
+RETRY_DELAY_SEC = 2.0
+MAX_SKEW_SEC = float(os.getenv("SCAN_MAX_SKEW_SEC", "120"))
+
+_lock = Lock()
+_pool = None
+_stats: dict = {}          # scanner name -> {"runs", "duration_s_total", ...}
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS), thread_name_prefix="scan")
+        return _pool
+
+
+def _attempt(fetch, item, delay, started, fut_id):
+    if delay:
+        time.sleep(delay)
+    with _lock:
+        started[fut_id] = time.time()
+    return fetch(item)
+
+
+def run(name: str, items, fetch, timeout: float | None = None, retries: int | None = None,
+        max_skew: float | None = None):
+    """fetch(item) for every item on the pool. Returns ({item: result}, report) —
+    items whose fetch failed, timed out or fell outside the skew window are in
+    report["failed"] and not in the results."""
+    timeout = TIMEOUT_SEC if timeout is None else timeout
+    retries = RETRIES if retries is None else retries
+    max_skew = MAX_SKEW_SEC if max_skew is None else max_skew
+    pool = _executor()
+    started: dict = {}         # attempt id -> epoch its fetch started on a worker
+    pending: dict = {}         # future -> (item, attempt no, attempt id)
+    seq = 0
+
+    def submit(item, attempt):
+        nonlocal seq
+        seq += 1
+        delay = RETRY_DELAY_SEC * attempt if attempt else 0.0
+        pending[pool.submit(_attempt, fetch, item, delay, started, seq)] = (item, attempt, seq)
+
+    t0 = time.time()
+    for item in items:
+        submit(item, 0)
+
+    results: dict = {}
+    failed: dict = {}
+    first_at = last_at = None
+    n_retries = n_timeouts = n_skew = 0
+
+    def give_up_or_retry(item, attempt, reason, now):
+        nonlocal n_retries
+        next_at = now + RETRY_DELAY_SEC * (attempt + 1)
+        if attempt < retries and (first_at is None or next_at - first_at <= max_skew):
+            n_retries += 1
+            submit(item, attempt + 1)
+        else:
+            failed[item] = reason
+
+    while pending:
+        done, _ = wait(list(pending), timeout=0.5, return_when=FIRST_COMPLETED)
+        now = time.time()
+        for fut in done:
+            item, attempt, _aid = pending.pop(fut)
+            try:
+                res, reason = fut.result(), "no data"
+            except Exception as e:
+                res, reason = None, f"{type(e).__name__}: {e}"[:120]
+            if res is None:
+                give_up_or_retry(item, attempt, reason, now)
+            elif first_at is not None and now - first_at > max_skew:
+                n_skew += 1
+                failed[item] = "skew"
+            else:
+                results[item] = res
+                first_at = first_at or now
+                last_at = now
+        with _lock:
+            started_now = dict(started)
+        for fut, (item, attempt, aid) in list(pending.items()):
+            st = started_now.get(aid)
+            if first_at is not None and now - first_at > max_skew:
+                pending.pop(fut)
+                fut.cancel()
+                n_skew += 1
+                failed[item] = "skew"
+            elif st is not None and now - st > timeout:
+                pending.pop(fut)
+                n_timeouts += 1
+                give_up_or_retry(item, attempt, f"timeout {timeout:g}s", now)
+
+    report = {"started": t0, "duration_s": round(time.time() - t0, 2),
+              "skew_s": round(last_at - first_at, 2) if first_at else None,
+              "items": len(results) + len(failed), "ok": len(results),
+              "failed": {str(k): v for k, v in failed.items()},
+              "retries": n_retries, "timeouts": n_timeouts, "skew_dropped": n_skew}
+    with _lock:
+        st = _stats.setdefault(name, {"runs": 0, "duration_s_total": 0.0, "duration_s_max": 0.0,
+                                      "skew_s_max": 0.0})
+        st["runs"] += 1
+        st["duration_s_total"] += report["duration_s"]
+        st["duration_s_max"] = max(st["duration_s_max"], report["duration_s"])
+        st["skew_s_max"] = max(st["skew_s_max"], report["skew_s"] or 0.0)
+        st["last"] = report
+    print(f"[scan-exec] {name}: {report['ok']}/{report['items']} in {report['duration_s']}s "
+          f"(skew {report['skew_s']}s, retries {n_retries}, timeouts {n_timeouts}, "
+          f"skew-dropped {n_skew})", flush=True)
+    return results, report
+
+
+def status() -> dict:
+    with _lock:
+        scans = {}
+        for name, st in _stats.items():
+            scans[name] = {"runs": st["runs"],
+                           "duration_s_mean": round(st["duration_s_total"] / st["runs"], 2),
+                           "duration_s_max": st["duration_s_max"], "skew_s_max": st["skew_s_max"],
+                           "last": st.get("last")}
+    return {"max_workers": MAX_WORKERS, "timeout_sec": TIMEOUT_SEC, "retries": RETRIES,
+            "max_skew_sec": MAX_SKEW_SEC, "scans": scans}
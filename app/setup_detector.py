@@ -10,6 +10,8 @@ import os
 import re
 import pytz
 
+from app.bar_features import features_for
+
 NY = pytz.timezone("US/Eastern")
 
 # ── Default settings (exported so main.py can seed its global) ──────────────
@@ -1482,11 +1484,11 @@ def evaluate_absorption(bars, volland_stats, settings, spx_spot=None, vix=None,
     if len(bars) < min_bars:
         return None
 
-    closed = [b for b in bars if b.get("status") == "closed"]
-    if len(closed) < min_bars:
+    f = features_for(bars)
+    if f.n < min_bars:
         return None
 
-    trigger = closed[-1]
+    trigger = f.bar(-1)
     trigger_idx = trigger["idx"]
 
     # Skip if already checked this bar
@@ -1495,10 +1497,9 @@ def evaluate_absorption(bars, volland_stats, settings, spx_spot=None, vix=None,
     _cooldown_absorption["last_checked_idx"] = trigger_idx
 
     # --- Volume gate ---
-    recent_vols = [b["volume"] for b in closed[-(vol_window + 1):-1]]
-    if not recent_vols:
+    vol_avg = f.mean("volume", vol_window, lag=1)
+    if vol_avg is None:
         return None
-    vol_avg = sum(recent_vols) / len(recent_vols)
     if vol_avg <= 0:
         return None
     vol_ratio = trigger["volume"] / vol_avg
@@ -1506,20 +1507,17 @@ def evaluate_absorption(bars, volland_stats, settings, spx_spot=None, vix=None,
         return None
 
     # --- Divergence over lookback window ---
-    window = closed[-(lookback + 1):]
-    lows = [b["low"] for b in window]
-    highs = [b["high"] for b in window]
-    cvds = [b["cvd"] for b in window]
+    first = f.bar(-(lookback + 1))
 
-    cvd_start, cvd_end = cvds[0], cvds[-1]
+    cvd_start, cvd_end = first["cvd"], trigger["cvd"]
     cvd_slope = cvd_end - cvd_start
-    cvd_range = max(cvds) - min(cvds)
+    cvd_range = f.high("cvd", lookback + 1) - f.low("cvd", lookback + 1)
     if cvd_range == 0:
         return None
 
-    price_low_start, price_low_end = lows[0], lows[-1]
-    price_high_start, price_high_end = highs[0], highs[-1]
-    price_range = max(highs) - min(lows)
+    price_low_start, price_low_end = first["low"], trigger["low"]
+    price_high_start, price_high_end = first["high"], trigger["high"]
+    price_range = f.high("high", lookback + 1) - f.low("low", lookback + 1)
     if price_range == 0:
         return None
 
@@ -1800,11 +1798,11 @@ def evaluate_single_bar_absorption(bars, volland_stats, settings, spx_spot=None,
     vol_window = 20
 
     min_bars = vol_window + cvd_lookback
-    closed = [b for b in bars if b.get("status") == "closed"]
-    if len(closed) < min_bars:
+    f = features_for(bars)
+    if f.n < min_bars:
         return None
 
-    trigger = closed[-1]
+    trigger = f.bar(-1)
     trigger_idx = trigger["idx"]
 
     # Dedup: skip if already checked this bar
@@ -1813,10 +1811,9 @@ def evaluate_single_bar_absorption(bars, volland_stats, settings, spx_spot=None,
     cd["last_checked_idx"] = trigger_idx
 
     # --- Volume gate ---
-    recent_vols = [b["volume"] for b in closed[-(vol_window + 1):-1]]
-    if not recent_vols:
+    vol_avg = f.mean("volume", vol_window, lag=1)
+    if vol_avg is None:
         return None
-    vol_avg = sum(recent_vols) / len(recent_vols)
     if vol_avg <= 0:
         return None
     vol_ratio = trigger["volume"] / vol_avg
@@ -1824,8 +1821,7 @@ def evaluate_single_bar_absorption(bars, volland_stats, settings, spx_spot=None,
         return None
 
     # --- Delta gate ---
-    recent_deltas = [abs(b.get("delta", 0)) for b in closed[-(vol_window + 1):-1]]
-    delta_avg = sum(recent_deltas) / len(recent_deltas) if recent_deltas else 0
+    delta_avg = f.mean("abs_delta", vol_window, lag=1) or 0
     if delta_avg <= 0:
         return None
     delta_ratio = abs(trigger.get("delta", 0)) / delta_avg
@@ -1848,7 +1844,7 @@ def evaluate_single_bar_absorption(bars, volland_stats, settings, spx_spot=None,
     # --- CVD trend alignment (8-bar) ---
     # Bearish absorption: CVD should be rising into the top (buyers exhausting)
     # Bullish absorption: CVD should be falling into the bottom (sellers exhausting)
-    cvd_start = closed[-(cvd_lookback + 1)]["cvd"]
+    cvd_start = f.bar(-(cvd_lookback + 1))["cvd"]
     cvd_end = trigger["cvd"]
     cvd_trend = cvd_end - cvd_start
 
@@ -1907,7 +1903,7 @@ def evaluate_single_bar_absorption(bars, volland_stats, settings, spx_spot=None,
         return None
 
     # --- Price trend context (8-bar) ---
-    price_trend = trigger["close"] - closed[-(cvd_lookback + 1)]["close"]
+    price_trend = trigger["close"] - f.bar(-(cvd_lookback + 1))["close"]
 
     # --- Scoring (0-100) ---
     # Volume strength (0-25): how much above threshold
@@ -2188,17 +2184,15 @@ def evaluate_sb2_absorption(bars, volland_stats, settings, spx_spot=None, cooldo
     delta_mult = settings.get("sb2_delta_mult", 1.3)
     gate_mode = settings.get("sb2_gate_mode", "OR")
 
-    lookback = bars[-22:-2]  # 20 bars before flush bar
-    volumes = [b.get("volume", 0) for b in lookback if b.get("volume", 0) > 0]
-    if not volumes:
+    f = features_for(bars)  # 20 bars before flush bar: window of 20, lag 2
+    avg_vol = f.mean("pos_volume", 20, lag=2, count="pos_volume_n")
+    if avg_vol is None:
         return None
-    avg_vol = sum(volumes) / len(volumes)
     flush_vol = flush_bar.get("volume", 0)
     vol_pass = avg_vol > 0 and flush_vol >= avg_vol * vol_mult
     vol_ratio = round(flush_vol / avg_vol, 1) if avg_vol > 0 else 0.0
 
-    deltas = [abs(b.get("delta", 0)) for b in lookback if b.get("delta", 0) != 0]
-    avg_delta = sum(deltas) / len(deltas) if deltas else 1
+    avg_delta = f.mean("abs_delta", 20, lag=2, count="nz_delta_n") or 1
     flush_delta = flush_bar.get("delta", 0)
     delta_pass = avg_delta > 0 and abs(flush_delta) >= avg_delta * delta_mult
     delta_ratio = round(abs(flush_delta) / avg_delta, 1) if avg_delta > 0 else 0.0
@@ -2460,11 +2454,11 @@ def evaluate_delta_absorption(bars, volland_stats, settings, spx_spot=None, vix=
     if not settings.get("delta_absorption_enabled", True):
         return None
 
-    closed = [b for b in bars if b.get("status") == "closed"]
-    if len(closed) < 25:
+    f = features_for(bars)
+    if f.n < 25:
         return None
 
-    trigger = closed[-1]
+    trigger = f.bar(-1)
     trigger_idx = trigger["idx"]
 
     # Dedup: skip if already checked this bar
@@ -2506,9 +2500,9 @@ def evaluate_delta_absorption(bars, volland_stats, settings, spx_spot=None, vix=
         direction = "bearish"
     elif delta < 0 and color == "GREEN":
         direction = "bullish"
-    elif body <= doji_thresh and len(closed) >= 2:
+    elif body <= doji_thresh and f.n >= 2:
         # Doji: delta opposes prior bar's trend direction
-        prev = closed[-2]
+        prev = f.bar(-2)
         prev_color = "GREEN" if prev["close"] >= prev["open"] else "RED"
         if delta > 0 and prev_color == "GREEN":
             direction = "bearish"
@@ -2530,10 +2524,10 @@ def evaluate_delta_absorption(bars, volland_stats, settings, spx_spot=None, vix=
     # Trend precondition: >=3 of last 5 bars in opposite direction
     trend_window = settings.get("da_trend_bars", 5)
     trend_min = settings.get("da_trend_min", 3)
-    if len(closed) >= trend_window + 1:
-        lookback = closed[-(trend_window + 1):-1]  # last N bars before trigger
-        greens = sum(1 for b in lookback if b["close"] >= b["open"])
-        reds = len(lookback) - greens
+    if f.n >= trend_window + 1:
+        # last N bars before trigger
+        greens = f.total("green", trend_window, lag=1)
+        reds = f.count(trend_window, lag=1) - greens
         if direction == "bearish" and greens < trend_min:
             return None
         if direction == "bullish" and reds < trend_min:
@@ -3407,22 +3401,23 @@ def format_vix_divergence_message(result, alignment=None):
 
 # ── IV Momentum (Apollo) ───────────────────────────────────────────────
 
-def update_iv_momentum_tracker(spot, chain_df):
-    """Track per-strike put IV for momentum detection. Called every 30s from main.py."""
-    if spot is None or chain_df is None or chain_df.empty:
+def update_iv_momentum_tracker(spot, chain):
+    """Track per-strike put IV for momentum detection. Called every 30s from main.py.
+
+    `chain` is main's ChainSnapshot (app/chain_columns.py) — read in place, not copied.
+    """
+    if spot is None or chain is None or chain.empty:
         return
     now_str = datetime.now(NY).strftime("%Y-%m-%d %H:%M:%S")
 
     # Extract put IV at ATM and nearby strikes (ATM, ATM-5, ATM-10)
     strike_ivs = {}
     try:
-        for _, row in chain_df.iterrows():
-            strike = float(row.get("Strike", 0))
-            p_iv = row.get("P_IV")
-            if strike > 0 and p_iv is not None and float(p_iv) > 0:
-                # Only keep strikes within 15 pts of spot
-                if abs(strike - spot) <= 15:
-                    strike_ivs[strike] = float(p_iv)
+        # Only keep strikes within 15 pts of spot
+        band = chain.window(spot - 15, spot + 15)
+        for strike, p_iv in zip(chain.strikes[band].tolist(), chain.col("P_IV")[band].tolist()):
+            if strike > 0 and p_iv > 0:  # NaN compares False
+                strike_ivs[strike] = p_iv
     except Exception:
         return
 
@@ -3633,7 +3628,7 @@ def format_iv_momentum_message(result, alignment=None):
 
 # ── Vanna Butterfly (Pin Setup) ────────────────────────────────────────
 
-def evaluate_vanna_butterfly(spot, chain_df, vanna_pin_strike, vanna_pin_value, vix,
+def evaluate_vanna_butterfly(spot, chain, vanna_pin_strike, vanna_pin_value, vix,
                              paradigm=None):
     """
     Evaluate Vanna Pin Butterfly setup.
@@ -3646,7 +3641,7 @@ def evaluate_vanna_butterfly(spot, chain_df, vanna_pin_strike, vanna_pin_value,
     Width changed 30pt→40pt (higher total P&L, same WR).
     Gap filter widened 20→30 (GREEN pulls price even from 25+ pts).
     """
-    if spot is None or chain_df is None or chain_df.empty:
+    if spot is None or chain is None or chain.empty:
         return None
     if vanna_pin_strike is None or vanna_pin_value is None:
         return None
@@ -3679,19 +3674,12 @@ def evaluate_vanna_butterfly(spot, chain_df, vanna_pin_strike, vanna_pin_value,
     upper = pin + width
 
     def get_call_price(strike, side='ask'):
-        """Get call bid or ask at a strike from chain_df."""
-        idx_col = 'Strike'
+        """Get call bid or ask at a strike from the chain snapshot (O(log n) lookup)."""
         try:
-            row = chain_df[chain_df[idx_col].astype(float) == strike]
-            if row.empty:
-                return None
-            if side == 'ask':
-                val = row.iloc[0].get('C_Ask')
-            else:
-                val = row.iloc[0].get('C_Bid')
-            if val is None or float(val) <= 0:
+            val = chain.value(float(strike), 'C_Ask' if side == 'ask' else 'C_Bid')
+            if val is None or val <= 0:
                 return None
-            return float(val)
+            return val
         except Exception:
             return None
 
@@ -4604,18 +4592,21 @@ def evaluate_vanna_pivot_bounce(spot, vanna_levels, range_bars, settings):
         for b in range_bars:
             b["cvd"] = b.get("cumulative_delta", 0)
 
-    # Find swings and divergences
-    swings = _vp_find_swings(range_bars, pivot_n=2)
-    if len(swings) < 2:
-        return None
-    divergences = _vp_detect_divergences(range_bars, swings)
-    if not divergences:
-        return None
-
     # Only consider recent divergences (last 40 bars from the end)
     last_bar_idx = len(range_bars) - 1
     max_lookback = 40
-    recent_divs = [d for d in divergences if d["bar_idx"] >= last_bar_idx - max_lookback]
+
+    # Swings + divergences: confirmed pivots come from the incremental series state,
+    # only the forming tail is re-scanned. Full scan if the list doesn't line up.
+    found = features_for(range_bars).vp_divergences(range_bars, last_bar_idx - max_lookback)
+    if found is None:
+        swings = _vp_find_swings(range_bars, pivot_n=2)
+        divergences = _vp_detect_divergences(range_bars, swings) if len(swings) >= 2 else []
+        found = (len(swings),
+                 [d for d in divergences if d["bar_idx"] >= last_bar_idx - max_lookback])
+    n_swings, recent_divs = found
+    if n_swings < 2:
+        return None
     if not recent_divs:
         return None
 
@@ -4810,7 +4801,7 @@ def check_setups(spot, paradigm, lis, target, max_plus_gex, max_minus_gex, setti
                  skew_value=None, skew_change_pct=None,
                  vanna_levels=None, es_range_bars=None,
                  vix=None,
-                 vanna_pin_strike=None, vanna_pin_value=None, chain_df=None,
+                 vanna_pin_strike=None, vanna_pin_value=None, chain=None,
                  vanna_all=None,
                  svb_correlation=None, vanna_0dte_ratio=None,
                  gex_long_v3_features=None):
@@ -4833,7 +4824,7 @@ def check_setups(spot, paradigm, lis, target, max_plus_gex, max_minus_gex, setti
       vix: current VIX value (VIX Divergence)
       vanna_pin_strike: max absolute 0DTE vanna strike (Vanna Butterfly)
       vanna_pin_value: vanna notional at pin strike (Vanna Butterfly)
-      chain_df: current options chain DataFrame (Vanna Butterfly pricing)
+      chain: current options ChainSnapshot (Vanna Butterfly pricing)
       vanna_all: vanna ALL value for greek alignment (DD Exhaustion contrarian scoring)
     """
     results = []
@@ -5018,7 +5009,7 @@ def check_setups(spot, paradigm, lis, target, max_plus_gex, max_minus_gex, setti
         })
 
     # ── Vanna Butterfly (Pin Setup) — once per day at ~15:00 ET ──
-    vb_result = evaluate_vanna_butterfly(spot, chain_df, vanna_pin_strike, vanna_pin_value, vix,
+    vb_result = evaluate_vanna_butterfly(spot, chain, vanna_pin_strike, vanna_pin_value, vix,
                                          paradigm=paradigm)
     if vb_result is not None:
         notify_vb, reason_vb = should_notify_vanna_butterfly(vb_result)
@@ -0,0 +1,283 @@
+"""Eval signal feed — today's filtered signals and outcomes, pushed to the traders.
+
+Before this, eval_trader.APIPoller (the LONG and SHORT instances, eval_trader_sierra)
+GET'd /api/eval/signals?since_id=N every 2s. Every poll ran `ts::date = :today` on
+setup_log (a cast ix_setup_log_ts can't serve), re-ran _passes_live_filter and
+_compute_setup_levels on every row returned, and a signal sat for up to a poll interval
+plus a request round-trip before the trader saw it.
+
+Now log_setups() hands each committed row to logged(): the live-filter verdict and the
+levels are computed there ONCE (main._eval_signal_entry) and a passing row becomes a
+`signal` event in an in-memory journal of today's events; the outcome writers call
+outcome(), which adds an `outcome` event for a journalled signal. Consumers:
+  /api/eval/stream?cursor=C  server-sent events, one per journal event:
+                                 id: <cursor>  event: signal|outcome  data: {...}
+                             plus a `quote` event ({"es_price"}) every QUOTE_SEC.
+  /api/eval/signals          same response as before, served from the journal (no query).
+A cursor is "<boot>:<seq>". Reconnecting with a cursor of this process resumes right
+after it; no cursor, or one from an earlier boot, replays the whole day — consumers
+dedup by setup_log id as they always have. After a restart the journal is seeded once
+from setup_log (today's rows by ts range).
+
+Latency: each signal carries logged_at (epoch s, row committed). status() has
+commit_ms (row ts -> journal) and deliver_ms (journal -> written to a stream); the
+trader logs receive -> order.
+
+Init from main.py:  signal_feed.init(engine, _eval_signal_entry, es_price_fn)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+
+ET = ZoneInfo("America/New_York")
+QUOTE_SEC = 2.0
+MAX_SUBSCRIBERS = 8
+
+# setup_log columns _entry_fn reads (also what log_setups hands over for a new row)
+COLUMNS = ("id, ts, setup_name, direction, grade, score, spot, target, lis, "
+           "paradigm, bofa_stop_level, bofa_target_level, abs_es_price, "
+           "max_plus_gex, max_minus_gex, outcome_result, outcome_pnl, "
+           "vanna_all, vanna_weekly, vanna_monthly, spot_vol_beta, greek_alignment, "
+           "charm_limit_entry, overvix, vix, vanna_regime, basket_pct")
+
+_BOOT = format(int(time.time()), "x")
+_lock = Lock()
+_engine = None
+_entry_fn = None           # row dict -> signal entry dict | None (fails the live filter)
+_es_price_fn = None
+_day = None                # ET date the journal holds
+_seeded = False
+_rows: dict = {}           # id -> today's setup_log row (non-LOG), for re-evaluation
+_entries: dict = {}        # id -> published signal entry
+_outcomes: dict = {}       # id -> {"id", "setup_name", "outcome_result", "outcome_pnl"}
+_events: list = []         # [(seq, bytes, published epoch)] today's encoded events, in seq order
+_seq = 0
+_subs: set = set()         # (loop, asyncio.Event) per open stream
+_stats = {"signals": 0, "outcomes": 0, "filtered": 0, "replays": 0, "resumes": 0,
+          "commit_ms_last": None, "commit_ms_max": 0.0,
+          "deliver_ms_last": None, "deliver_ms_max": 0.0, "seed_ms": None, "errors": 0}
+
+
+def init(engine, entry_fn, es_price_fn):
+    global _engine, _entry_fn, _es_price_fn
+    _engine, _entry_fn, _es_price_fn = engine, entry_fn, es_price_fn
+    try:
+        _ensure_day()
+    except Exception as e:
+        print(f"[signal-feed] seed error (non-fatal, retried on first read): {e}", flush=True)
+
+
+def _clean(obj):
+    # NaN / Inf floats break JSON serialization
+    if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+        return None
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_clean(i) for i in obj]
+    return obj
+
+
+def _ensure_day():
+    """Roll the journal at the ET date change; seed it from setup_log after a restart."""
+    global _day, _seeded
+    today = datetime.now(ET).date()
+    with _lock:
+        if _day != today:
+            if _day is not None:
+                _seeded = True         # a new day starts empty — nothing to read back
+            _day = today
+            for d in (_rows, _entries, _outcomes):
+                d.clear()
+            _events.clear()
+        if _seeded or _engine is None:
+            return
+    t0 = time.perf_counter()
+    start = datetime(today.year, today.month, today.day, tzinfo=ET)
+    with _engine.connect() as conn:
+        rows = conn.execute(text(
+            f"SELECT {COLUMNS} FROM setup_log "
+            "WHERE ts >= :start AND ts < :end AND grade != 'LOG' ORDER BY id"
+        ), {"start": start, "end": start + timedelta(days=1)}).mappings().all()
+    fresh = [dict(r) for r in rows]
+    with _lock:
+        fresh = [r for r in fresh if r["id"] not in _rows]
+    for r in fresh:
+        _add(r, logged_at=None)
+        if r.get("outcome_result"):
+            outcome(r["id"], r["outcome_result"], r.get("outcome_pnl"))
+    with _lock:
+        _seeded = True
+        _stats["seed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    print(f"[signal-feed] seeded {len(fresh)} rows for {today} "
+          f"({len(_entries)} pass the live filter)", flush=True)
+
+
+def _publish(kind: str, payload: dict):
+    """Append an event to the journal and wake the streams. Caller holds _lock."""
+    global _seq
+    _seq += 1
+    body = json.dumps(payload, default=str, separators=(",", ":"))
+    _events.append((_seq, f"id: {_BOOT}:{_seq}\nevent: {kind}\ndata: {body}\n\n".encode(),
+                    time.time()))
+    for loop, ev in list(_subs):
+        try:
+            loop.call_soon_threadsafe(ev.set)
+        except RuntimeError:
+            _subs.discard((loop, ev))  # its event loop is gone
+
+
+def _add(row: dict, logged_at):
+    try:
+        entry = _entry_fn(row)
+    except Exception as e:
+        with _lock:
+            _stats["errors"] += 1
+        print(f"[signal-feed] id={row.get('id')} entry error: {e}", flush=True)
+        return
+    entry = _clean(entry) if entry else None
+    with _lock:
+        lid = row["id"]
+        _rows[lid] = row
+        if entry is None:
+            _stats["filtered"] += 1
+            return
+        if lid in _entries:
+            _entries[lid].update(entry)        # re-graded row: already sent, keep it current
+            return
+        entry["logged_at"] = logged_at
+        _entries[lid] = entry
+        _stats["signals"] += 1
+        if logged_at and row.get("ts") is not None and hasattr(row["ts"], "timestamp"):
+            ms = round((time.time() - row["ts"].timestamp()) * 1000, 1)
+            _stats["commit_ms_last"] = ms
+            _stats["commit_ms_max"] = max(_stats["commit_ms_max"], ms)
+        _publish("signal", entry)
+
+
+def logged(rows):
+    """log_setups() after commit: [{"id", ..., "update": bool}] — new rows carry every
+    COLUMNS field, re-graded rows only the fields their UPDATE changed."""
+    if _entry_fn is None or not rows:
+        return
+    try:
+        _ensure_day()
+    except Exception as e:
+        print(f"[signal-feed] seed error (non-fatal): {e}", flush=True)
+    now = time.time()
+    for r in rows:
+        r = dict(r)
+        if r.pop("update", False):
+            with _lock:
+                base = _rows.get(r["id"])
+            if base is None:
+                continue
+            r = {**base, **r}
+        elif r.get("grade") == "LOG":
+            continue
+        _add(r, logged_at=now)
+
+
+def outcome(log_id, result, pnl):
+    """An outcome was written for setup_log row `log_id` (ignored unless it was a signal)."""
+    if not result:
+        return
+    with _lock:
+        if log_id in _rows:
+            _rows[log_id]["outcome_result"] = result
+            _rows[log_id]["outcome_pnl"] = pnl
+        entry = _entries.get(log_id)
+        if entry is None:
+            return
+        entry["outcome_result"] = result
+        prev = _outcomes.get(log_id)
+        o = {"id": log_id, "setup_name": entry["setup_name"],
+             "outcome_result": result, "outcome_pnl": pnl}
+        _outcomes[log_id] = o
+        if prev != o:
+            _stats["outcomes"] += 1
+            _publish("outcome", o)
+
+
+def signals(since_id: int) -> dict:
+    """/api/eval/signals body: journalled signals with id > since_id, their outcomes and
+    the current ES price (eval_trader sizes MES stops/targets off it)."""
+    _ensure_day()
+    with _lock:
+        sigs = [dict(e) for lid, e in sorted(_entries.items()) if lid > since_id]
+        outs = [dict(_outcomes[e["id"]]) for e in sigs if e["id"] in _outcomes]
+    es = _es_price_fn() if _es_price_fn else None
+    return {"signals": sigs, "outcomes": outs, "es_price": _clean(es)}
+
+
+def _after(cursor: str | None) -> int:
+    """Journal position to stream from for a client cursor (0 = replay the day)."""
+    boot, _, seq = (cursor or "").partition(":")
+    with _lock:
+        if boot == _BOOT and seq.isdigit() and _events and int(seq) >= _events[0][0] - 1:
+            _stats["resumes"] += 1
+            return int(seq)
+        _stats["replays"] += 1
+    return 0
+
+
+def subscribe(loop):
+    """(loop, wake Event) for a new stream; None when MAX_SUBSCRIBERS are connected."""
+    sub = (loop, asyncio.Event())
+    with _lock:
+        if len(_subs) >= MAX_SUBSCRIBERS:
+            return None
+        _subs.add(sub)
+    return sub
+
+
+async def events(sub, cursor: str | None):
+    """Async generator for StreamingResponse: journal events after `cursor`, then live
+    ones as they are published, with a quote event every QUOTE_SEC."""
+    loop, wake = sub
+    try:
+        try:
+            await asyncio.to_thread(_ensure_day)
+        except Exception as e:
+            print(f"[signal-feed] seed error (non-fatal): {e}", flush=True)
+        after = _after(cursor)
+        day = _day
+        yield b"retry: 2000\n\n"
+        while True:
+            wake.clear()
+            with _lock:
+                # New session: the journal was cleared but seq keeps rising across
+                # days, so after=0 replays the whole of the new day's journal.
+                if _day != day:
+                    day, after = _day, 0
+                pending = [e for e in _events if e[0] > after]
+            for seq, msg, t_pub in pending:
+                yield msg
+                after = seq
+                ms = round((time.time() - t_pub) * 1000, 1)
+                with _lock:
+                    _stats["deliver_ms_last"] = ms
+                    _stats["deliver_ms_max"] = max(_stats["deliver_ms_max"], ms)
+            try:
+                await asyncio.wait_for(wake.wait(), QUOTE_SEC)
+            except asyncio.TimeoutError:
+                es = _es_price_fn() if _es_price_fn else None
+                yield f"event: quote\ndata: {json.dumps({'es_price': _clean(es)})}\n\n".encode()
+    finally:
+        with _lock:
+            _subs.discard(sub)
+
+
+def status() -> dict:
+    with _lock:
+        return {**_stats, "boot": _BOOT, "day": str(_day) if _day else None,
+                "seeded": _seeded, "seq": _seq, "journal": len(_events),
+                "subscribers": len(_subs)}
@@ -0,0 +1,111 @@
+"""Phased startup — critical path first, warm-up in the background, readiness flag.
+
+Before this, on_startup() ran everything in sequence — db_init (migrations, settings,
+cooldowns, the whole outcome backfill, open trades), the scheduler, the feeds and the
+init() of every trader / scanner / monitor — before the app served a request, while
+the scheduler (started half-way through) could already fire a market cycle, and so a
+signal and an order, against traders that were not initialised yet.
+
+Now on_startup() is two phases:
+  critical  DB schema + settings + cooldowns + open trades, data feeds, traders, then
+            the scheduler. mark(step) after each block records its duration;
+            critical_done() sets ready() and starts the warm-up.
+  warmup    defer(name, fn) tasks — outcome backfill, overlay caches, monitoring /
+            scanner inits — run in order on one background thread after the critical
+            phase, each timed, errors contained.
+ready() gates order placement: a signal before the critical phase finished is logged
+(skip_reason "startup_not_ready") but not traded.
+
+API:
+  mark(step)           end of a critical step (duration since the previous mark)
+  defer(name, fn)      queue a warm-up task
+  critical_done()      ready() -> True, start the warm-up thread
+  ready() -> bool
+  status() -> {"ready", "critical": {...}, "warmup": {...}}
+"""
+from __future__ import annotations
+
+import time
+from threading import Lock, Thread
+
+_lock = Lock()
+_t0 = time.perf_counter()         # module import ~ process start
+_last = _t0
+_ready = False
+_deferred = []                    # [(name, fn)] in submission order
+_thread = None
+_phases = {
+    "critical": {"ms": None, "steps": {}},
+    "warmup": {"ms": None, "steps": {}, "errors": {}, "running": None},
+}
+
+
+def mark(step: str):
+    """Close critical step `step`: its duration is the time since the previous mark."""
+    global _last
+    now = time.perf_counter()
+    with _lock:
+        _phases["critical"]["steps"][step] = round((now - _last) * 1000, 1)
+        _last = now
+
+
+def defer(name: str, fn):
+    """Run fn() in the warm-up phase (after critical_done(), in submission order)."""
+    with _lock:
+        _deferred.append((name, fn))
+
+
+def critical_done():
+    """End of the critical phase: open the trading gate and start the warm-up."""
+    global _ready, _thread
+    now = time.perf_counter()
+    with _lock:
+        _ready = True
+        _phases["critical"]["ms"] = round((now - _t0) * 1000, 1)
+    print(f"[startup] critical phase done in {(now - _t0):.1f}s — ready "
+          f"({len(_deferred)} warm-up tasks deferred)", flush=True)
+    if _thread is None:
+        _thread = Thread(target=_warmup, name="startup-warmup", daemon=True)
+        _thread.start()
+
+
+def ready() -> bool:
+    return _ready
+
+
+def status() -> dict:
+    with _lock:
+        crit = _phases["critical"]
+        warm = _phases["warmup"]
+        return {
+            "ready": _ready,
+            "critical": {"ms": crit["ms"], "steps": dict(crit["steps"])},
+            "warmup": {"ms": warm["ms"], "steps": dict(warm["steps"]),
+                       "errors": dict(warm["errors"]), "running": warm["running"],
+                       "pending": len(_deferred)},
+        }
+
+
+def _warmup():
+    t_start = time.perf_counter()
+    while True:
+        with _lock:
+            if not _deferred:
+                break
+            name, fn = _deferred.pop(0)
+            _phases["warmup"]["running"] = name
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            with _lock:
+                _phases["warmup"]["errors"][name] = str(e)[:200]
+            print(f"[startup] warm-up {name} error (non-fatal): {e}", flush=True)
+        ms = (time.perf_counter() - t0) * 1000
+        with _lock:
+            _phases["warmup"]["steps"][name] = round(ms, 1)
+    total = time.perf_counter() - t_start
+    with _lock:
+        _phases["warmup"]["ms"] = round(total * 1000, 1)
+        _phases["warmup"]["running"] = None
+    print(f"[startup] warm-up done in {total:.1f}s", flush=True)
@@ -23,6 +23,8 @@ from zoneinfo import ZoneInfo
 import requests
 from sqlalchemy import text
 
+from app import migrations
+
 # ── Config ──────────────────────────────────────────────────────────
 
 ET = ZoneInfo("US/Eastern")
@@ -54,6 +56,7 @@ MIN_MAGNETS_ABOVE = 1
 ENTRY_OFFSET_PCT = 1.0  # entry at -GEX minus this %
 SKIP_0930 = True
 GEX_SIGNIFICANCE_THRESHOLD = 0.20  # level must be >= 20% of max
+SCAN_TIMEOUT_SEC = 25  # per-stock chain deadline (2 expiration formats, 8s reads)
 
 # ── Module State ────────────────────────────────────────────────────
 
@@ -525,68 +528,66 @@ def _fetch_option_quote(symbol, expiration, strike, right="C"):
 # ── DB ──────────────────────────────────────────────────────────────
 
 def _db_init():
-    """Create tables if needed + add missing columns."""
-    if not _engine:
-        return
-    with _engine.begin() as conn:
-        # Add missing columns to existing tables (each in its own transaction)
-        for col, typ in [("grade", "VARCHAR(2)"), ("neg_levels", "JSONB"), ("pos_levels", "JSONB")]:
-            try:
-                with _engine.begin() as c2:
-                    c2.execute(text(f"ALTER TABLE stock_gex_live_trades ADD COLUMN {col} {typ}"))
-            except Exception:
-                pass  # column already exists
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS stock_gex_live_levels (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR(10) NOT NULL,
-                scan_ts TIMESTAMPTZ DEFAULT NOW(),
-                scan_date DATE NOT NULL,
-                spot FLOAT,
-                expiration VARCHAR(12),
-                levels JSONB,
-                ratio FLOAT,
-                zone_width FLOAT,
-                passes_filter BOOLEAN DEFAULT FALSE,
-                filter_reason VARCHAR(100)
-            )
-        """))
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS stock_gex_live_trades (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR(10) NOT NULL,
-                tier VARCHAR(1),
-                grade VARCHAR(2),
-                trade_date DATE NOT NULL,
-                entry_ts TIMESTAMPTZ,
-                entry_price FLOAT,
-                entry_spot FLOAT,
-                strike FLOAT,
-                expiration VARCHAR(12),
-                call_bid FLOAT,
-                call_ask FLOAT,
-                call_delta FLOAT,
-                call_iv FLOAT,
-                gex_ratio FLOAT,
-                zone_width FLOAT,
-                highest_neg FLOAT,
-                lowest_pos FLOAT,
-                neg_levels JSONB,
-                pos_levels JSONB,
-                t1_price FLOAT,
-                t2_price FLOAT,
-                exit_ts TIMESTAMPTZ,
-                exit_price FLOAT,
-                exit_spot FLOAT,
-                exit_call_bid FLOAT,
-                exit_call_ask FLOAT,
-                exit_reason VARCHAR(20),
-                option_pnl_pct FLOAT,
-                stock_pnl_pct FLOAT,
-                hold_minutes INT,
-                status VARCHAR(20) DEFAULT 'open'
-            )
-        """))
+    """Create tables if needed + add missing columns (once each — app/migrations.py ledger)."""
+    if _engine:
+        migrations.apply(_engine, "stock_gex_live", _MIGRATIONS)
+
+
+def _schema_v1(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stock_gex_live_levels (
+            id SERIAL PRIMARY KEY,
+            symbol VARCHAR(10) NOT NULL,
+            scan_ts TIMESTAMPTZ DEFAULT NOW(),
+            scan_date DATE NOT NULL,
+            spot FLOAT,
+            expiration VARCHAR(12),
+            levels JSONB,
+            ratio FLOAT,
+            zone_width FLOAT,
+            passes_filter BOOLEAN DEFAULT FALSE,
+            filter_reason VARCHAR(100)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stock_gex_live_trades (
+            id SERIAL PRIMARY KEY,
+            symbol VARCHAR(10) NOT NULL,
+            tier VARCHAR(1),
+            grade VARCHAR(2),
+            trade_date DATE NOT NULL,
+            entry_ts TIMESTAMPTZ,
+            entry_price FLOAT,
+            entry_spot FLOAT,
+            strike FLOAT,
+            expiration VARCHAR(12),
+            call_bid FLOAT,
+            call_ask FLOAT,
+            call_delta FLOAT,
+            call_iv FLOAT,
+            gex_ratio FLOAT,
+            zone_width FLOAT,
+            highest_neg FLOAT,
+            lowest_pos FLOAT,
+            neg_levels JSONB,
+            pos_levels JSONB,
+            t1_price FLOAT,
+            t2_price FLOAT,
+            exit_ts TIMESTAMPTZ,
+            exit_price FLOAT,
+            exit_spot FLOAT,
+            exit_call_bid FLOAT,
+            exit_call_ask FLOAT,
+            exit_reason VARCHAR(20),
+            option_pnl_pct FLOAT,
+            stock_pnl_pct FLOAT,
+            hold_minutes INT,
+            status VARCHAR(20) DEFAULT 'open'
+        )
+    """))
+    # Columns added after the first deploy
+    for col, typ in [("grade", "VARCHAR(2)"), ("neg_levels", "JSONB"), ("pos_levels", "JSONB")]:
+        conn.execute(text(f"ALTER TABLE stock_gex_live_trades ADD COLUMN IF NOT EXISTS {col} {typ}"))
 
 
 def _save_levels(symbol, levels, exp, passes, reason):
@@ -788,21 +789,32 @@ def _run_gex_scan_inner(now):
     passed = 0
     chain_errors = 0
 
+    from app import scan_executor
+
+    names = []
     for symbol in STOCKS:
+        quote = quotes.get(symbol)
+        if not quote or quote["last"] <= 0:
+            print(f"[stock-gex-live] SKIP {symbol}: no quote or price=0", flush=True)
+            continue
+        names.append(symbol)
+
+    # Chains fetched concurrently under the shared TS rate budget (main passes the
+    # bulk-lane api_get) — the 1s sleep per stock is gone
+    chains, report = scan_executor.run(
+        "stock_gex_live", names,
+        lambda s: _fetch_chain(s, exp, quotes[s]["last"]),
+        timeout=SCAN_TIMEOUT_SEC)
+    for symbol, reason in report["failed"].items():
+        chain_errors += 1
+        print(f"[stock-gex-live] SKIP {symbol}: chain fetch returned no data ({reason})", flush=True)
+
+    for symbol in names:
+        chain = chains.get(symbol)
+        if not chain:
+            continue
         try:
-            quote = quotes.get(symbol)
-            if not quote or quote["last"] <= 0:
-                print(f"[stock-gex-live] SKIP {symbol}: no quote or price=0", flush=True)
-                continue
-
-            spot = quote["last"]
-
-            # Fetch chain and compute GEX
-            chain = _fetch_chain(symbol, exp, spot)
-            if not chain:
-                chain_errors += 1
-                print(f"[stock-gex-live] SKIP {symbol}: chain fetch returned no data", flush=True)
-                continue
+            spot = quotes[symbol]["last"]
 
             levels = _compute_stock_gex(symbol, chain, spot)
             if not levels:
@@ -826,9 +838,6 @@ def _run_gex_scan_inner(now):
                 new_watchlist[symbol] = levels
                 passed += 1
 
-            # Rate limit: stagger requests to avoid TS API throttling
-            time.sleep(1.0)
-
         except Exception as e:
             print(f"[stock-gex-live] scan error {symbol}: {e}", flush=True)
 
@@ -850,7 +859,8 @@ def _run_gex_scan_inner(now):
     _scan_count += 1
 
     print(f"[stock-gex-live] GEX scan done: {scanned} scanned, "
-          f"{passed} on watchlist, exp={exp}", flush=True)
+          f"{passed} on watchlist, exp={exp} in {report['duration_s']}s "
+          f"(skew {report['skew_s']}s)", flush=True)
 
     # No Telegram for routine scans — only trades and errors
 
@@ -1292,9 +1302,8 @@ def init(engine, api_get_fn, send_telegram_fn=None):
     _send_telegram = send_telegram_fn
     _initialized = True
 
-    _db_init()
+    _db_init()          # stock + 0DTE tables
     _load_latest_levels()
-    _0dte_db_init()
     _load_latest_0dte_levels()
     _close_stale_trades()
     _hydrate_open_trades()
@@ -1439,61 +1448,65 @@ def _get_0dte_expiration():
     return datetime.now(ET).date().isoformat()
 
 
-def _0dte_db_init():
-    """Create 0DTE tables if needed."""
-    if not _engine:
-        return
-    with _engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS dte0_gex_levels (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR(10) NOT NULL,
-                scan_ts TIMESTAMPTZ DEFAULT NOW(),
-                scan_date DATE NOT NULL,
-                spot FLOAT,
-                expiration VARCHAR(12),
-                levels JSONB,
-                ratio FLOAT,
-                zone_width FLOAT,
-                passes_filter BOOLEAN DEFAULT FALSE,
-                filter_reason VARCHAR(100)
-            )
-        """))
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS dte0_gex_trades (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR(10) NOT NULL,
-                grade VARCHAR(2),
-                trade_date DATE NOT NULL,
-                entry_ts TIMESTAMPTZ,
-                entry_price FLOAT,
-                entry_spot FLOAT,
-                strike FLOAT,
-                expiration VARCHAR(12),
-                call_bid FLOAT,
-                call_ask FLOAT,
-                call_delta FLOAT,
-                call_iv FLOAT,
-                gex_ratio FLOAT,
-                zone_width FLOAT,
-                highest_neg FLOAT,
-                lowest_pos FLOAT,
-                neg_levels JSONB,
-                pos_levels JSONB,
-                t1_price FLOAT,
-                t2_price FLOAT,
-                exit_ts TIMESTAMPTZ,
-                exit_price FLOAT,
-                exit_spot FLOAT,
-                exit_call_bid FLOAT,
-                exit_call_ask FLOAT,
-                exit_reason VARCHAR(20),
-                option_pnl_pct FLOAT,
-                stock_pnl_pct FLOAT,
-                hold_minutes INT,
-                status VARCHAR(20) DEFAULT 'open'
-            )
-        """))
+def _schema_0dte_v1(conn):
+    """0DTE tables."""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS dte0_gex_levels (
+            id SERIAL PRIMARY KEY,
+            symbol VARCHAR(10) NOT NULL,
+            scan_ts TIMESTAMPTZ DEFAULT NOW(),
+            scan_date DATE NOT NULL,
+            spot FLOAT,
+            expiration VARCHAR(12),
+            levels JSONB,
+            ratio FLOAT,
+            zone_width FLOAT,
+            passes_filter BOOLEAN DEFAULT FALSE,
+            filter_reason VARCHAR(100)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS dte0_gex_trades (
+            id SERIAL PRIMARY KEY,
+            symbol VARCHAR(10) NOT NULL,
+            grade VARCHAR(2),
+            trade_date DATE NOT NULL,
+            entry_ts TIMESTAMPTZ,
+            entry_price FLOAT,
+            entry_spot FLOAT,
+            strike FLOAT,
+            expiration VARCHAR(12),
+            call_bid FLOAT,
+            call_ask FLOAT,
+            call_delta FLOAT,
+            call_iv FLOAT,
+            gex_ratio FLOAT,
+            zone_width FLOAT,
+            highest_neg FLOAT,
+            lowest_pos FLOAT,
+            neg_levels JSONB,
+            pos_levels JSONB,
+            t1_price FLOAT,
+            t2_price FLOAT,
+            exit_ts TIMESTAMPTZ,
+            exit_price FLOAT,
+            exit_spot FLOAT,
+            exit_call_bid FLOAT,
+            exit_call_ask FLOAT,
+            exit_reason VARCHAR(20),
+            option_pnl_pct FLOAT,
+            stock_pnl_pct FLOAT,
+            hold_minutes INT,
+            status VARCHAR(20) DEFAULT 'open'
+        )
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "stock_gex_live levels + trades", _schema_v1),
+    (2, "dte0_gex levels + trades", _schema_0dte_v1),
+]
 
 
 def _save_0dte_levels(symbol, levels, exp, passes, reason):
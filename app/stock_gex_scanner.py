@@ -4,12 +4,12 @@ Stock GEX Scanner — Independent data collection for stock GEX levels.
 Completely isolated from 0DTE SPX pipeline.
 Schedule: Weekly GEX 3x/day (10:00, 12:00, 15:00 ET), Opex 1x/day (10:00 ET).
 Spot monitor: batch quotes every 5 min (1 API call for all stocks).
-5-second delay between stocks to avoid TS API rate limiting.
+Chains are fetched concurrently (app/scan_executor.py) under the shared TS rate budget.
 
 Sends Telegram alert on scan failures (>50% stocks failed).
 """
 
-import json, time
+import json
 from datetime import datetime, date, timedelta, time as dtime
 from threading import Lock
 from zoneinfo import ZoneInfo
@@ -28,8 +28,8 @@ DEFAULT_STOCKS = [
 
 # ±10% of spot price for strike range
 PROXIMITY_PCT = 0.10
-# Delay between API calls per stock (5s to avoid TS rate limiting)
-INTER_STOCK_DELAY = 5.0
+# Per-stock deadline: expirations lookup + up to 2 labels x 2 expiration formats
+SCAN_TIMEOUT_SEC = 60
 
 # ── State ───────────────────────────────────────────────────────────
 
@@ -74,40 +74,50 @@ def _alert(msg: str):
 # ── Database ────────────────────────────────────────────────────────
 
 def _db_init():
-    """Create table if it doesn't exist."""
-    from sqlalchemy import text
-    with _engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS stock_gex_scans (
-                id              BIGSERIAL PRIMARY KEY,
-                symbol          VARCHAR(10) NOT NULL,
-                scan_ts         TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                scan_date       DATE NOT NULL,
-                spot            DOUBLE PRECISION NOT NULL,
-                expiration      DATE,
-                exp_label       VARCHAR(10) NOT NULL DEFAULT 'weekly',
-                key_levels      JSONB NOT NULL DEFAULT '{}',
-                gex_data        JSONB NOT NULL DEFAULT '[]',
-                total_call_gex  DOUBLE PRECISION,
-                total_put_gex   DOUBLE PRECISION,
-                total_net_gex   DOUBLE PRECISION
-            );
-            CREATE INDEX IF NOT EXISTS ix_stock_gex_scans_ts
-                ON stock_gex_scans (scan_ts DESC);
-            CREATE INDEX IF NOT EXISTS ix_stock_gex_scans_date_sym
-                ON stock_gex_scans (scan_date, symbol);
-        """))
-        # Migration: add exp_label if table existed before this column
-        conn.execute(text("""
-            DO $$ BEGIN
-                ALTER TABLE stock_gex_scans ADD COLUMN IF NOT EXISTS
-                    exp_label VARCHAR(10) NOT NULL DEFAULT 'weekly';
-            EXCEPTION WHEN OTHERS THEN NULL;
-            END $$;
-        """))
+    """Create table if it doesn't exist (once — app/migrations.py ledger)."""
+    from app import migrations
+    migrations.apply(_engine, "stock_gex", _MIGRATIONS)
     print("[stock-gex] table ready", flush=True)
 
 
+def _schema_v1(conn):
+    from sqlalchemy import text
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stock_gex_scans (
+            id              BIGSERIAL PRIMARY KEY,
+            symbol          VARCHAR(10) NOT NULL,
+            scan_ts         TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            scan_date       DATE NOT NULL,
+            spot            DOUBLE PRECISION NOT NULL,
+            expiration      DATE,
+            exp_label       VARCHAR(10) NOT NULL DEFAULT 'weekly',
+            key_levels      JSONB NOT NULL DEFAULT '{}',
+            gex_data        JSONB NOT NULL DEFAULT '[]',
+            total_call_gex  DOUBLE PRECISION,
+            total_put_gex   DOUBLE PRECISION,
+            total_net_gex   DOUBLE PRECISION
+        );
+        CREATE INDEX IF NOT EXISTS ix_stock_gex_scans_ts
+            ON stock_gex_scans (scan_ts DESC);
+        CREATE INDEX IF NOT EXISTS ix_stock_gex_scans_date_sym
+            ON stock_gex_scans (scan_date, symbol);
+    """))
+    # Migration: add exp_label if table existed before this column
+    conn.execute(text("""
+        DO $$ BEGIN
+            ALTER TABLE stock_gex_scans ADD COLUMN IF NOT EXISTS
+                exp_label VARCHAR(10) NOT NULL DEFAULT 'weekly';
+        EXCEPTION WHEN OTHERS THEN NULL;
+        END $$;
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "stock_gex_scans", _schema_v1),
+]
+
+
 def _load_latest():
     """Load today's most recent scan per stock+exp_label into memory on startup."""
     global _latest
@@ -434,7 +444,7 @@ def run_scan(scan_labels=None):
 
     today = now.date()
     label_str = "+".join(scan_labels)
-    print(f"[stock-gex] {label_str} scan: {len(DEFAULT_STOCKS)} stocks (delay={INTER_STOCK_DELAY}s)...", flush=True)
+    print(f"[stock-gex] {label_str} scan: {len(DEFAULT_STOCKS)} stocks...", flush=True)
 
     quotes = _get_batch_quotes(DEFAULT_STOCKS)
     if not quotes:
@@ -443,30 +453,31 @@ def run_scan(scan_labels=None):
         return
 
     from sqlalchemy import text
+    from app import scan_executor
+
+    def fetch(symbol):
+        """[(target, rows)] for the requested labels; None (retried) when the expirations
+        or every requested chain came back empty."""
+        targets = _get_target_expirations(symbol)
+        if not targets:
+            return None
+        # OpEx week: the weekly expiration is relabelled "opex" — nothing to do for "weekly"
+        chains = [(tgt, _fetch_chain(symbol, tgt["exp"], quotes[symbol]))
+                  for tgt in targets if tgt["label"] in scan_labels]
+        return chains if not chains or any(rows for _, rows in chains) else None
+
+    fetched, report = scan_executor.run(f"stock_gex_{label_str}",
+                                        [s for s in DEFAULT_STOCKS if quotes.get(s)], fetch,
+                                        timeout=SCAN_TIMEOUT_SEC)
     scanned = 0
-    failed = 0
-
-    for symbol in DEFAULT_STOCKS:
-        spot = quotes.get(symbol)
-        if not spot:
-            failed += 1
-            continue
+    failed = len(DEFAULT_STOCKS) - len(fetched)
 
+    for symbol, chains in fetched.items():
+        spot = quotes[symbol]
         try:
-            targets = _get_target_expirations(symbol)
-            if not targets:
-                failed += 1
-                continue
-
-            for tgt in targets:
+            for tgt, rows in chains:
                 exp = tgt["exp"]
                 label = tgt["label"]
-
-                # Skip labels not requested
-                if label not in scan_labels:
-                    continue
-
-                rows = _fetch_chain(symbol, exp, spot)
                 if len(rows) < 10:
                     continue
 
@@ -507,15 +518,16 @@ def run_scan(scan_labels=None):
                     }
 
             scanned += 1
-            time.sleep(INTER_STOCK_DELAY)
 
         except Exception as e:
             print(f"[stock-gex] {symbol}: {e}", flush=True)
             failed += 1
 
-    msg = f"{label_str} scanned {scanned}/{len(DEFAULT_STOCKS)}, failed {failed}"
+    msg = (f"{label_str} scanned {scanned}/{len(DEFAULT_STOCKS)}, failed {failed} "
+           f"in {report['duration_s']}s (skew {report['skew_s']}s)")
     ok = failed < len(DEFAULT_STOCKS) // 2
-    _last_scan_status = {"ts": str(now), "ok": ok, "msg": msg}
+    _last_scan_status = {"ts": str(now), "ok": ok, "msg": msg,
+                         "duration_s": report["duration_s"], "skew_s": report["skew_s"]}
     print(f"[stock-gex] done: {msg}", flush=True)
 
     if not ok:
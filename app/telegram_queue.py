@@ -0,0 +1,379 @@
+"""Outbound Telegram queue — callers enqueue, background workers deliver.
+
+Before this, send_telegram / send_telegram_setups / send_telegram_stock_gex POSTed to
+api.telegram.org synchronously (10s timeout) and then INSERTed the telegram_alerts row,
+on the caller's thread: run_market_job, log_setup, the watchdogs, real_trader's _alert.
+A slow or rate-limiting Telegram API ate directly into the 90s market-job budget, and
+an outcome burst (several setups resolving in one cycle) was N sequential POSTs —
+exactly the burst Telegram answers with 429.
+
+Now enqueue() returns at once and one worker thread per chat delivers, in order:
+  - rate limit: at most one POST per chat every CHAT_INTERVAL_SEC; a 429 pauses that
+    chat for the retry_after Telegram sends back;
+  - coalescing: whatever queued up for a chat while it waited goes out as ONE message
+    (joined with a blank line, up to MAX_LEN chars); a merged message Telegram rejects
+    (400) is retried one by one;
+  - telegram_alerts: rows for delivered messages (one per original message, send time)
+    are batch-inserted by a flusher thread every FLUSH_SEC;
+  - durable spill: a message still undelivered after MAX_ATTEMPTS, queued beyond
+    MAX_QUEUE, or pending at shutdown is written to telegram_outbox; attach() re-queues
+    spilled rows younger than SPILL_MAX_AGE_SEC and deletes them, and the flusher does
+    the same whenever the outbox has rows at its RESPOOL_SEC check (this process's
+    spills during a Telegram outage, or what an older process spilled at shutdown after
+    this one attached, as on a rolling deploy). A re-queued message
+    keeps its original text and enqueue time — spilled again it is the same row, so the
+    age limit holds across respools — and gets its "delayed" line when it is sent.
+    A hard kill loses only what was still in memory.
+
+API:
+  init(bot_token)     attach(engine)
+  enqueue(chat_id, text, channel=None, tag="telegram", ts=None) -> bool
+                      (False: not configured; ts = original enqueue epoch, marks it delayed)
+  send_now(chat_id, text) -> bool        synchronous POST (test endpoints)
+  shutdown(timeout)                      drain, spill the rest, flush the log rows
+  status() -> {chat: {queued, sent, coalesced, rate_limited, ...}, ...}
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from datetime import datetime
+from threading import Condition, Event, Lock, Thread
+from zoneinfo import ZoneInfo
+
+import requests
+from sqlalchemy import text
+
+from app import migrations
+
+ET = ZoneInfo("America/New_York")
+CHAT_INTERVAL_SEC = float(os.getenv("TELEGRAM_CHAT_INTERVAL_SEC", "1.0"))
+MAX_LEN = 4000                 # Telegram's limit is 4096 characters per message
+MAX_QUEUE = 500                # per chat; beyond this new messages go to the spill
+MAX_ATTEMPTS = 5               # network errors / 5xx before a message is spilled
+FLUSH_SEC = 2.0
+SPILL_MAX_AGE_SEC = 12 * 3600  # older spilled messages are dropped on reload
+RESPOOL_SEC = 300              # check telegram_outbox for spilled messages this often
+SEND_TIMEOUT = 10
+
+_bot_token = None
+_engine = None
+_lock = Lock()
+_chats: dict = {}              # chat_id -> _Chat
+_log_rows: list = []           # delivered: {"c", "m", "ts"} for telegram_alerts
+_spill_rows: list = []         # undelivered: {"ts", "chat", "c", "m", "reason"}
+_flush_wake = Event()
+_flusher = None
+_stats = {"logged": 0, "spilled": 0, "respooled": 0, "log_errors": 0}
+
+
+def _schema_v1(c):
+    c.execute(text("""
+        CREATE TABLE IF NOT EXISTS telegram_outbox (
+            id BIGSERIAL PRIMARY KEY,
+            ts TIMESTAMPTZ NOT NULL,
+            chat_id TEXT NOT NULL,
+            channel TEXT,
+            message TEXT NOT NULL,
+            reason TEXT
+        )
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "telegram_outbox", _schema_v1),
+]
+
+
+def init(bot_token: str):
+    """Start accepting messages (at import of main — alerts can fire before the DB is up)."""
+    global _bot_token, _flusher
+    _bot_token = bot_token
+    if _flusher is None:
+        _flusher = Thread(target=_flush_loop, daemon=True, name="telegram-flush")
+        _flusher.start()
+
+
+def attach(engine):
+    """DB for telegram_alerts / telegram_outbox; re-queues what earlier processes spilled.
+    Rows collected before this are written on the next flush."""
+    global _engine
+    _engine = engine
+    if engine is None:
+        return
+    try:
+        migrations.apply(engine, "telegram_queue", _MIGRATIONS)
+        _respool()
+    except Exception as e:
+        print(f"[telegram] outbox reload error (non-fatal): {e}", flush=True)
+
+
+def _respool():
+    """Re-queue spilled messages (a previous process's, or this one's send failures)."""
+    with _engine.begin() as conn:
+        rows = conn.execute(text(
+            "DELETE FROM telegram_outbox RETURNING ts, chat_id, channel, message")).all()
+    cutoff = time.time() - SPILL_MAX_AGE_SEC
+    n = 0
+    for ts, chat_id, channel, message in sorted(rows, key=lambda r: r[0]):
+        if ts.timestamp() < cutoff:
+            continue
+        enqueue(chat_id, message, channel=channel, ts=ts.timestamp())
+        n += 1
+    with _lock:
+        _stats["respooled"] += n
+    if rows:
+        print(f"[telegram] outbox: re-queued {n} of {len(rows)} spilled messages", flush=True)
+
+
+class _Chat:
+    """Queue + delivery worker for one chat_id."""
+
+    def __init__(self, chat_id: str):
+        self.chat_id = chat_id
+        self.q = deque()          # {"text", "channel", "tag", "ts", "tries", "merge", "delayed"}
+        self.cond = Condition(_lock)
+        self.next_at = 0.0        # monotonic: earliest next POST
+        self.busy = False
+        self.stats = {"sent": 0, "messages": 0, "coalesced": 0, "rate_limited": 0,
+                      "errors": 0, "dropped": 0, "spilled": 0, "send_ms_last": None,
+                      "send_ms_max": 0.0, "queue_ms_max": 0.0}
+        self.thread = Thread(target=self._run, daemon=True, name=f"telegram-{chat_id}")
+
+    def _batch(self) -> list:
+        """Pop the messages for the next POST. Caller holds _lock."""
+        first = self.q.popleft()
+        batch = [first]
+        if not first["merge"]:
+            return batch
+        size = len(_render(first))
+        while self.q and self.q[0]["merge"] and size + 2 + len(_render(self.q[0])) <= MAX_LEN:
+            size += 2 + len(_render(self.q[0]))
+            batch.append(self.q.popleft())
+        return batch
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.q:
+                    self.cond.wait()
+                wait = self.next_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self.cond:
+                if not self.q:
+                    continue
+                batch = self._batch()
+                self.busy = True
+            try:
+                self._deliver(batch)
+            finally:
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+
+    def _requeue(self, batch, merge=True):
+        with self.cond:
+            for m in reversed(batch):
+                m["merge"] = m["merge"] and merge
+                self.q.appendleft(m)
+
+    def _deliver(self, batch):
+        body = "\n\n".join(_render(m) for m in batch)
+        t0 = time.perf_counter()
+        status, retry_after, err = _post(self.chat_id, body)
+        now = time.monotonic()
+        ms = round((time.perf_counter() - t0) * 1000, 1)
+        self.next_at = now + CHAT_INTERVAL_SEC
+        st = self.stats
+        if status == 200:
+            sent_at = datetime.now(ET)
+            tag = batch[0]["tag"]
+            print(f"[{tag}] sent: {body[:50]}..."
+                  + (f" ({len(batch)} coalesced)" if len(batch) > 1 else ""), flush=True)
+            with _lock:
+                st["sent"] += 1
+                st["messages"] += len(batch)
+                st["coalesced"] += len(batch) - 1
+                st["send_ms_last"] = ms
+                st["send_ms_max"] = max(st["send_ms_max"], ms)
+                st["queue_ms_max"] = max(st["queue_ms_max"],
+                                         round((time.time() - batch[0]["ts"]) * 1000, 1))
+                _log_rows.extend({"c": m["channel"], "m": _render(m)[:4000], "ts": sent_at}
+                                 for m in batch if m["channel"])
+            return
+        if status == 429:
+            with _lock:
+                st["rate_limited"] += 1
+            self.next_at = now + max(retry_after or 1.0, CHAT_INTERVAL_SEC)
+            print(f"[{batch[0]['tag']}] rate limited, retry in {retry_after}s "
+                  f"({len(self.q) + len(batch)} queued)", flush=True)
+            self._requeue(batch)
+            return
+        with _lock:
+            st["errors"] += 1
+        if status is not None and 400 <= status < 500:
+            if len(batch) > 1:
+                self._requeue(batch, merge=False)     # find the one Telegram refuses
+                return
+            with _lock:
+                st["dropped"] += 1
+            print(f"[{batch[0]['tag']}] error: {status} {err}", flush=True)
+            return
+        # Network error / 5xx: back off and retry, spill after MAX_ATTEMPTS
+        print(f"[{batch[0]['tag']}] exception: {err or status}", flush=True)
+        retry = []
+        for m in batch:
+            m["tries"] += 1
+            if m["tries"] >= MAX_ATTEMPTS:
+                _spill(self.chat_id, m, "send_failed")
+            else:
+                retry.append(m)
+        self.next_at = now + min(2 ** max((m["tries"] for m in batch), default=1), 60)
+        if retry:
+            self._requeue(retry)
+
+
+def _post(chat_id: str, body: str):
+    """(status, retry_after, error text) of one sendMessage; status None on exception."""
+    try:
+        resp = requests.post(f"https://api.telegram.org/bot{_bot_token}/sendMessage", json={
+            "chat_id": chat_id,
+            "text": body,
+            "parse_mode": "HTML"
+        }, timeout=SEND_TIMEOUT)
+    except Exception as e:
+        return None, None, str(e)[:200]
+    retry_after = None
+    if resp.status_code == 429:
+        try:
+            retry_after = float(resp.json().get("parameters", {}).get("retry_after", 1))
+        except Exception:
+            retry_after = 1.0
+    return resp.status_code, retry_after, resp.text[:300] if resp.status_code != 200 else None
+
+
+def _render(m) -> str:
+    """The text POSTed for a queued message: a respooled one gets its delayed line here,
+    once, from its original enqueue time."""
+    if not m["delayed"]:
+        return m["text"]
+    when = datetime.fromtimestamp(m["ts"], ET).strftime("%m-%d %H:%M ET")
+    return f"⏳ <i>delayed — queued {when}</i>\n{m['text']}"
+
+
+def _spill(chat_id, m, reason):
+    with _lock:
+        _spill_rows.append({"ts": datetime.fromtimestamp(m["ts"], ET), "chat": chat_id,
+                            "c": m["channel"], "m": m["text"], "reason": reason})
+        _stats["spilled"] += 1
+        ch = _chats.get(chat_id)
+        if ch:
+            ch.stats["spilled"] += 1
+    _flush_wake.set()
+
+
+def enqueue(chat_id, message: str, channel: str | None = None, tag: str = "telegram",
+            ts: float | None = None) -> bool:
+    """Queue `message` for `chat_id`. `channel` names the telegram_alerts row (None: not
+    recorded). `ts` is set by the respool only: the message's original enqueue epoch,
+    kept through further spills, and it marks the message delayed. Returns False only
+    when Telegram is not configured."""
+    if not _bot_token or not chat_id:
+        return False
+    chat_id = str(chat_id)
+    m = {"text": message, "channel": channel, "tag": tag, "ts": time.time() if ts is None else ts,
+         "tries": 0, "merge": True, "delayed": ts is not None}
+    with _lock:
+        ch = _chats.get(chat_id)
+        if ch is None:
+            ch = _chats[chat_id] = _Chat(chat_id)
+            ch.thread.start()
+        full = len(ch.q) >= MAX_QUEUE
+        if not full:
+            ch.q.append(m)
+            ch.cond.notify()
+    if full:
+        _spill(chat_id, m, "queue_full")
+    return True
+
+
+def send_now(chat_id, message: str) -> bool:
+    """Synchronous POST, bypassing the queue — for the test-alert endpoints."""
+    if not _bot_token or not chat_id:
+        return False
+    status, _, err = _post(str(chat_id), message)
+    if status != 200:
+        print(f"[telegram] send_now error: {status} {err}", flush=True)
+    return status == 200
+
+
+def _flush():
+    if _engine is None:
+        return
+    with _lock:
+        logs, spills = _log_rows[:], _spill_rows[:]
+        _log_rows.clear()
+        _spill_rows.clear()
+    if not logs and not spills:
+        return
+    try:
+        with _engine.begin() as conn:
+            if logs:
+                conn.execute(text(
+                    "INSERT INTO telegram_alerts (ts, channel, message) VALUES (:ts, :c, :m)"), logs)
+            if spills:
+                conn.execute(text(
+                    "INSERT INTO telegram_outbox (ts, chat_id, channel, message, reason) "
+                    "VALUES (:ts, :chat, :c, :m, :reason)"), spills)
+        with _lock:
+            _stats["logged"] += len(logs)
+    except Exception as e:
+        with _lock:
+            _stats["log_errors"] += 1
+            # keep the spill (it IS the undelivered message); the log rows are best-effort
+            _spill_rows[:0] = spills
+        print(f"[telegram] flush error (non-fatal): {e}", flush=True)
+
+
+def _flush_loop():
+    last_respool = time.monotonic()
+    while True:
+        _flush_wake.wait(FLUSH_SEC)
+        _flush_wake.clear()
+        _flush()
+        if _engine is not None and time.monotonic() - last_respool > RESPOOL_SEC:
+            last_respool = time.monotonic()
+            try:
+                with _engine.connect() as conn:
+                    spilled = conn.execute(text(
+                        "SELECT EXISTS (SELECT 1 FROM telegram_outbox)")).scalar()
+                if spilled:
+                    _respool()
+            except Exception as e:
+                print(f"[telegram] outbox respool error (non-fatal): {e}", flush=True)
+
+
+def shutdown(timeout: float = 5.0):
+    """Give the workers `timeout` s to drain, spill what is left, flush to the DB."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with _lock:
+            if not any(ch.q or ch.busy for ch in _chats.values()):
+                break
+        time.sleep(0.1)
+    with _lock:
+        left = [(cid, ch.q.popleft()) for cid, ch in _chats.items() for _ in range(len(ch.q))]
+    for cid, m in left:
+        _spill(cid, m, "shutdown")
+    _flush()
+    if left:
+        print(f"[telegram] shutdown: spilled {len(left)} undelivered messages", flush=True)
+
+
+def status() -> dict:
+    with _lock:
+        return {**_stats, "pending_log_rows": len(_log_rows),
+                "chats": {cid: {"queued": len(ch.q), **ch.stats} for cid, ch in _chats.items()}}
@@ -20,7 +20,7 @@ from datetime import datetime, time as dtime
 from typing import Any
 from zoneinfo import ZoneInfo
 
-import requests
+from app import ts_client
 
 NY = ZoneInfo("America/New_York")
 MES_DOLLAR_PER_PT = 5.0
@@ -58,8 +58,8 @@ def _broker_realized_pnl(account_id: str) -> float | None:
         return None
     try:
         token = _get_token()
-        r = requests.get(
-            f"{REAL_BASE}/brokerage/accounts/{account_id}/balances",
+        r = ts_client.request(
+            "GET", f"{REAL_BASE}/brokerage/accounts/{account_id}/balances", lane="bulk",
             headers={"Authorization": f"Bearer {token}"},
             timeout=10,
         )
@@ -0,0 +1,232 @@
+"""Trail-exit simulator — BE + activation/gap trailing stop, vectorized over a batch.
+
+The same walk lived in four places (`mes_sim_backfill.mes_walk`, the chain walk in
+main._calculate_setup_outcome, `walk()` in the S227 counterfactual engine and the live
+`real_trader.update_trail`), each a per-bar Python loop. Sweeps over thousands of
+trades x parameter sets spent nearly all their time in those loops.
+
+The stop is a monotone function of the running max favourable excursion (MFE), so the
+walk reduces to array ops:
+    F[i]  = MFE through bar i                                  (cummax)
+    S[i]  = stop entering bar i = g(F[i-1])                    (-sl, BE lock, F - gap)
+    exit  = first bar whose adverse extreme reaches S[i]       (adverse-first)
+Every trade of a batch is one row of a (trades x bars) matrix over a shared price path,
+so one pass prices them all. A parameter sweep is the same trade repeated with
+different sl/be/activation/gap columns.
+
+Semantics (identical to mes_walk and the S227 walk):
+  - adverse-first inside a bar: the stop entering the bar is checked before that
+    bar's favourable extreme can ratchet it, and a stop fills AT the stop level;
+  - an optional fixed target is checked after the stop in the same bar;
+  - BE moves the stop to entry + be_lock once MFE >= be_trigger, the trail to
+    entry + (MFE - gap) once MFE >= activation; the stop never loosens;
+  - no exit inside the window: marked to the close of the window's last bar.
+A tick path (SPX spot, the chain walk) is a bar path with high = low = close. Live
+`update_trail` additionally rounds stops to the MES tick; the simulator does not.
+
+API:
+  simulate(high, low, close, start, end, entry, is_long, sl, ...) -> dict of arrays
+  window_end(ts, start, max_minutes)   -> per-trade `end` for a max hold
+  portal_trail(tp, sl=None)            -> simulate() kwargs for a main.py `_trail_params` entry
+  real_trail(setup_name, sl=None)      -> simulate() kwargs for real_trader (`_SETUP_TRAIL_OVERRIDE`)
+
+tools/trail_sim_check.py replays random paths through simulate() and the loop walkers
+(the chain walk, update_trail, the old mes_walk) and reports any mismatch.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# simulate() "reason" codes
+NO_BARS, EOD, STOP, TARGET = -1, 0, 1, 2
+REASONS = {NO_BARS: "no_bars", EOD: "eod", STOP: "stop", TARGET: "target"}
+
+# Cells (trades x bars) per matrix pass — bounds memory to a few ~32 MB float64 matrices.
+_CHUNK_CELLS = 4_000_000
+
+
+def _col(x, n: int, dtype=np.float64) -> np.ndarray:
+    """Per-trade column of length n; None (scalar or element) -> NaN = rule off."""
+    if x is None:
+        return np.full(n, np.nan)
+    if np.ndim(x) == 0:
+        return np.full(n, x, dtype=dtype)
+    if dtype is np.float64:
+        return np.array([np.nan if v is None else v for v in x], dtype=np.float64)
+    return np.asarray(x, dtype=dtype)
+
+
+def simulate(high, low, close, start, end, entry, is_long, sl,
+             be_trigger=None, be_lock=0.0, activation=None, gap=0.0,
+             target=None, be_below_activation: bool = False) -> Dict[str, np.ndarray]:
+    """Walk a batch of trades over one price path.
+
+    Args:
+        high, low, close: the path, one value per bar (ticks: pass the same array 3x)
+        start, end:  per-trade bar window [start, end) — entry bar first, `end`
+                     exclusive (see window_end() for a max hold)
+        entry:       entry price
+        is_long:     direction
+        sl:          initial stop distance (pts)
+        be_trigger:  MFE that moves the stop to entry + be_lock (None/NaN = no BE)
+        be_lock:     pts locked by BE
+        activation:  MFE that starts the trail (None/NaN = no trail)
+        gap:         trail distance below MFE (pts)
+        target:      fixed target distance (pts, None/NaN = none)
+        be_below_activation: BE only fires while MFE is still below activation (the
+                     main.py "hybrid" walk and S227); default: BE and trail are
+                     independent ratchets (mes_walk, real_trader)
+    Every argument after the path is a scalar or a per-trade sequence.
+
+    Returns a dict of per-trade arrays: pnl (pts), reason (NO_BARS/EOD/STOP/TARGET),
+    exit_idx (bar index into the path, -1 if no bars), exit_price, mfe, mae (>= 0,
+    through the exit bar), stop (the stop level entering the exit bar) and stop_out
+    (the stop once the exit bar's MFE has ratcheted it — the level a loop walker holds
+    after its last bar).
+    """
+    H = np.asarray(high, dtype=np.float64)
+    L = np.asarray(low, dtype=np.float64)
+    C = np.asarray(close, dtype=np.float64)
+    args = (start, end, entry, is_long, sl, be_trigger, be_lock, activation, gap, target)
+    n = max(1 if np.ndim(a) == 0 else len(a) for a in args)
+    s = _col(start, n, np.int64)
+    e = np.minimum(_col(end, n, np.int64), len(C))
+    en = _col(entry, n)
+    lg = _col(is_long, n, bool)
+    cols = [_col(a, n) for a in (sl, be_trigger, be_lock, activation, gap, target)]
+
+    out = {
+        "pnl": np.zeros(n), "reason": np.full(n, NO_BARS, dtype=np.int8),
+        "exit_idx": np.full(n, -1, dtype=np.int64), "exit_price": en.copy(),
+        "mfe": np.zeros(n), "mae": np.zeros(n), "stop": np.full(n, np.nan),
+        "stop_out": np.full(n, np.nan),
+    }
+    live = np.flatnonzero(e > s)
+    if not len(live):
+        return out
+    # Chunk rows so each matrix stays under _CHUNK_CELLS
+    width = int((e[live] - s[live]).max())
+    step = max(1, _CHUNK_CELLS // width)
+    for i in range(0, len(live), step):
+        rows = live[i:i + step]
+        _walk(H, L, C, rows, s[rows], e[rows], en[rows], lg[rows],
+              *(c[rows] for c in cols), be_below_activation, out)
+    return out
+
+
+def _walk(H, L, C, rows, s, e, en, lg, sl, bt, bl, act, gp, tg, be_below_act, out):
+    m = len(rows)
+    W = int((e - s).max())
+    k = np.arange(W)
+    idx = s[:, None] + k
+    valid = idx < e[:, None]
+    idx = np.minimum(idx, len(C) - 1)
+    hi, lo = H[idx], L[idx]
+    sgn = np.where(lg, 1.0, -1.0)
+    lg2, en2, sg2 = lg[:, None], en[:, None], sgn[:, None]
+
+    fav = np.where(lg2, hi - en2, en2 - lo)
+    adv = np.where(lg2, en2 - lo, hi - en2)
+    fav[~valid] = -np.inf
+    adv[~valid] = -np.inf
+    F = np.maximum(np.maximum.accumulate(fav, axis=1), 0.0)   # MFE through bar i
+    Fp = np.full_like(F, -np.inf)                              # MFE entering bar i
+    Fp[:, 1:] = F[:, :-1]                                      # (nothing ratchets before bar 0)
+
+    # Stop entering each bar, in price space (the same float ops the loop walkers use)
+    stop = np.broadcast_to((en - sgn * sl)[:, None], F.shape)
+    be_px = (en + sgn * bl)[:, None]
+    be_on = Fp >= bt[:, None]
+    if be_below_act:
+        be_on = np.logical_or.accumulate(be_on & ~(Fp >= act[:, None]), axis=1)
+    tr_px = en2 + sg2 * (Fp - gp[:, None])
+    tr_on = Fp >= act[:, None]
+    if lg.all():
+        stop = np.where(be_on, np.maximum(stop, be_px), stop)
+        stop = np.where(tr_on, np.maximum(stop, tr_px), stop)
+    else:
+        tighter = lambda a, b: np.where(lg2, np.maximum(a, b), np.minimum(a, b))
+        stop = np.where(be_on, tighter(stop, be_px), stop)
+        stop = np.where(tr_on, tighter(stop, tr_px), stop)
+
+    stop_hit = valid & np.where(lg2, lo <= stop, hi >= stop)
+    tg_px = en + sgn * tg
+    tg_hit = valid & np.where(lg2, hi >= tg_px[:, None], lo <= tg_px[:, None])
+
+    r = np.arange(m)
+    si = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), W)
+    ti = np.where(tg_hit.any(axis=1), tg_hit.argmax(axis=1), W)
+    last = e - s - 1
+    is_stop = (si <= ti) & (si < W)
+    is_tg = (ti < si)
+    xk = np.where(is_stop, si, np.where(is_tg, ti, last))
+
+    stop_x = stop[r, xk]
+    px = np.where(is_stop, stop_x, np.where(is_tg, tg_px, C[s + last]))
+    out["pnl"][rows] = sgn * (px - en)
+    out["reason"][rows] = np.where(is_stop, STOP, np.where(is_tg, TARGET, EOD))
+    out["exit_idx"][rows] = s + xk
+    out["exit_price"][rows] = px
+    out["mfe"][rows] = F[r, xk]
+    out["mae"][rows] = np.maximum(np.maximum.accumulate(adv, axis=1)[r, xk], 0.0)
+    out["stop"][rows] = stop_x
+    # Ratchet the exit bar's MFE into the stop (1-D: only the exit column is needed)
+    fx = F[r, xk]
+    be_out = fx >= bt
+    if be_below_act:
+        be_out = be_on[r, xk] | (be_out & ~(fx >= act))
+    tr_out = en + sgn * (fx - gp)
+    stop_out = np.where(be_out, np.where(lg, np.maximum(stop_x, en + sgn * bl),
+                                         np.minimum(stop_x, en + sgn * bl)), stop_x)
+    stop_out = np.where(fx >= act, np.where(lg, np.maximum(stop_out, tr_out),
+                                            np.minimum(stop_out, tr_out)), stop_out)
+    out["stop_out"][rows] = stop_out
+
+
+def window_end(ts, start, max_minutes) -> np.ndarray:
+    """`end` per trade for a max hold: first bar starting after ts[start] + max_minutes.
+
+    ts: bar start times (datetimes or epoch seconds), ascending.
+    """
+    t = np.array([x.timestamp() if hasattr(x, "timestamp") else x for x in ts], dtype=np.float64)
+    s = np.atleast_1d(np.asarray(start, dtype=np.int64))
+    cutoff = t[s] + np.asarray(max_minutes, dtype=np.float64) * 60.0
+    return np.searchsorted(t, cutoff, side="right")
+
+
+def portal_trail(tp: Dict[str, Any], sl: Optional[float] = None) -> Dict[str, Any]:
+    """simulate() kwargs for a main.py `_trail_params` entry ("continuous" / "hybrid").
+
+    sl defaults to the entry's initial_sl (AG Short has none — its stop is LIS-based,
+    so pass sl explicitly).
+    """
+    mode = tp.get("mode")
+    if mode not in ("continuous", "hybrid"):
+        raise ValueError(f"unsupported trail mode: {mode!r}")
+    return {
+        "sl": tp["initial_sl"] if sl is None else sl,
+        "be_trigger": tp.get("be_trigger") if mode == "hybrid" else None,
+        "be_lock": 0.0,
+        "activation": tp["activation"],
+        "gap": tp["gap"],
+        "be_below_activation": True,
+    }
+
+
+def real_trail(setup_name: str, sl: Optional[float] = None) -> Dict[str, Any]:
+    """simulate() kwargs for a real_trader position (SC globals + `_SETUP_TRAIL_OVERRIDE`).
+
+    update_trail() reads its BE / trail parameters from here too; it passes no sl (the
+    live stop is already on the order).
+    """
+    from app import real_trader as rt
+    ov = rt._SETUP_TRAIL_OVERRIDE.get(setup_name or "", {})
+    return {
+        "sl": sl,
+        "be_trigger": ov["be_trigger"] if "be_trigger" in ov else rt.BE_TRIGGER_PTS,
+        "be_lock": rt.BE_BUFFER_PTS,
+        "activation": ov.get("activation", rt.TRAIL_ACTIVATION_PTS),
+        "gap": ov.get("gap", rt.TRAIL_GAP_PTS),
+    }
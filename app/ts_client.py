@@ -0,0 +1,168 @@
+"""Shared TradeStation HTTP client — keep-alive pools, one rate limiter, request metrics.
+
+Before this, real_trader._ts_api issued a bare requests.get/post/put/delete per call (a
+fresh TLS handshake to api.tradestation.com on the real-money path); auto_trader and
+options_trader (_sim_api), fifo_reconcile._ts_get, trade_reconcile, friday_spread and
+tsrt_weekly_report had their own variants; only main.api_get (and the scanners it is
+handed to) reused a Session. Nothing bounded the combined request rate, so a stock GEX
+scan burst could push the order calls into TS's rate limit.
+
+Now every TS REST call goes through request():
+  - one requests.Session per host (api / sim-api), HTTPAdapter pool of POOL_MAXSIZE,
+    recreated every SESSION_MAX_AGE s (stale keep-alive connections);
+  - one token bucket for the process (TS_RATE_PER_SEC, burst TS_RATE_BURST) with
+    priority lanes — a lane may only take a token while the bucket stays above its
+    reserve, so the lower lanes queue first and the order lane always has headroom:
+        order  brokerage / order execution (real_trader, auto_trader, options_trader,
+               friday_spread orders)                         reserve 0
+        data   market cycle quotes / chains (main.api_get)   reserve RESERVE_DATA
+        bulk   scanners, reconcile, reports                  reserve RESERVE_BULK
+  - per endpoint (method + path, ids folded to {}): count, errors, 429s, latency
+    histogram; per lane: limiter waits.
+request() returns the requests.Response (or raises) exactly like requests.request, so
+callers keep their status / error handling.
+
+API:
+  request(method, url, lane=None, **kw) -> requests.Response   (lane default from path)
+  status() -> {"limiter": {...}, "lanes": {...}, "endpoints": {...}}
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RATE_PER_SEC = float(os.getenv("TS_RATE_PER_SEC", "8"))
+BURST = float(os.getenv("TS_RATE_BURST", "24"))
+# Tokens the bucket keeps back from each lane (order lane: none)
+RESERVE = {"order": 0.0,
+           "data": float(os.getenv("TS_RATE_RESERVE_DATA", "4")),
+           "bulk": float(os.getenv("TS_RATE_RESERVE_BULK", "10"))}
+POOL_MAXSIZE = 16
+SESSION_MAX_AGE = 1800          # s — as main._get_ts_session did
+# Latency histogram upper bounds (ms); the last bucket is everything slower
+BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+_lock = Lock()                  # guards _sessions / _stats
+_sessions: dict = {}            # host -> (Session, created epoch)
+_bucket_lock = Lock()
+_tokens = BURST
+_refilled = time.monotonic()
+_lanes = {lane: {"requests": 0, "waited": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+          for lane in RESERVE}
+_endpoints: dict = {}           # "GET /marketdata/quotes/{}" -> counters + histogram
+
+_ID_SEG = re.compile(r"^(?!v\d+$).*[0-9%$@,]")     # ids / symbols, not the /v3 prefix
+
+
+def _session(host: str) -> requests.Session:
+    now = time.time()
+    with _lock:
+        ent = _sessions.get(host)
+        if ent and now - ent[1] <= SESSION_MAX_AGE:
+            return ent[0]
+        if ent:
+            try:
+                ent[0].close()
+            except Exception:
+                pass
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_MAXSIZE)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _sessions[host] = (s, now)
+    print(f"[ts-client] new session for {host} (pool {POOL_MAXSIZE}, "
+          f"age limit {SESSION_MAX_AGE}s)", flush=True)
+    return s
+
+
+def _lane_for(path: str) -> str:
+    return "order" if path.startswith(("/v3/orderexecution", "/v3/brokerage")) else "data"
+
+
+def _endpoint(method: str, path: str) -> str:
+    parts = [("{}" if _ID_SEG.search(p) else p) for p in path.split("/")]
+    return f"{method} {'/'.join(parts)}"
+
+
+def _acquire(lane: str) -> float:
+    """Take one token for `lane`, sleeping until the bucket (minus the lane's reserve)
+    has one. Returns the time waited in ms."""
+    global _tokens, _refilled
+    # never hold back the whole bucket, whatever the env says
+    reserve = min(RESERVE.get(lane, RESERVE["bulk"]), BURST - 1)
+    t0 = time.monotonic()
+    while True:
+        with _bucket_lock:
+            now = time.monotonic()
+            _tokens = min(BURST, _tokens + (now - _refilled) * RATE_PER_SEC)
+            _refilled = now
+            if _tokens - 1 >= reserve:
+                _tokens -= 1
+                return (now - t0) * 1000
+            need = reserve + 1 - _tokens
+        time.sleep(min(max(need / RATE_PER_SEC, 0.01), 0.5))
+
+
+def _record(lane, ep, wait_ms, ms, status):
+    with _lock:
+        ln = _lanes.setdefault(lane, {"requests": 0, "waited": 0, "wait_ms_total": 0.0,
+                                      "wait_ms_max": 0.0})
+        ln["requests"] += 1
+        if wait_ms >= 1:
+            ln["waited"] += 1
+            ln["wait_ms_total"] += wait_ms
+            ln["wait_ms_max"] = max(ln["wait_ms_max"], round(wait_ms, 1))
+        st = _endpoints.get(ep)
+        if st is None:
+            st = _endpoints[ep] = {"count": 0, "errors": 0, "rate_limited": 0, "ms_total": 0.0,
+                                   "ms_max": 0.0, "hist": [0] * (len(BUCKETS_MS) + 1)}
+        st["count"] += 1
+        st["ms_total"] += ms
+        st["ms_max"] = max(st["ms_max"], round(ms, 1))
+        st["hist"][next((i for i, b in enumerate(BUCKETS_MS) if ms <= b), len(BUCKETS_MS))] += 1
+        if status is None or status >= 400:
+            st["errors"] += 1
+        if status == 429:
+            st["rate_limited"] += 1
+
+
+def request(method: str, url: str, lane: str | None = None, **kw) -> requests.Response:
+    """requests.request() on the shared pooled session, rate limited in `lane`
+    (order / data / bulk; default from the path) and timed per endpoint."""
+    parts = urlsplit(url)
+    lane = lane or _lane_for(parts.path)
+    ep = _endpoint(method.upper(), parts.path)
+    wait_ms = _acquire(lane)
+    sess = _session(parts.netloc)
+    t0 = time.perf_counter()
+    status = None
+    try:
+        r = sess.request(method, url, **kw)
+        status = r.status_code
+        return r
+    finally:
+        _record(lane, ep, wait_ms, (time.perf_counter() - t0) * 1000, status)
+
+
+def status() -> dict:
+    with _bucket_lock:
+        tokens = min(BURST, _tokens + (time.monotonic() - _refilled) * RATE_PER_SEC)
+    with _lock:
+        lanes = {k: {**v, "wait_ms_total": round(v["wait_ms_total"], 1)} for k, v in _lanes.items()}
+        eps = {}
+        for ep, st in sorted(_endpoints.items()):
+            eps[ep] = {"count": st["count"], "errors": st["errors"],
+                       "rate_limited": st["rate_limited"],
+                       "ms_mean": round(st["ms_total"] / st["count"], 1) if st["count"] else None,
+                       "ms_max": st["ms_max"],
+                       "hist": dict(zip([f"<={b}" for b in BUCKETS_MS] + ["slower"], st["hist"]))}
+        sessions = sorted(_sessions)
+    return {"limiter": {"rate_per_sec": RATE_PER_SEC, "burst": BURST, "tokens": round(tokens, 1),
+                        "reserve": RESERVE},
+            "sessions": sessions, "lanes": lanes, "endpoints": eps}
@@ -24,6 +24,8 @@ from zoneinfo import ZoneInfo
 import requests
 from sqlalchemy import text
 
+from app import migrations, ts_client
+
 NY = ZoneInfo("America/New_York")
 MES_PT = 5.0
 SAR = 3.75  # USD/SAR peg
@@ -79,18 +81,27 @@ def init(engine, get_token_fn) -> None:
 
 
 def _ensure_table() -> None:
-    with _engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS tsrt_daily_stmt (
-                day DATE PRIMARY KEY,
-                gross NUMERIC,
-                comm NUMERIC,
-                net NUMERIC,
-                n_trades INT,
-                n_wins INT,
-                trades JSONB
-            )
-        """))
+    migrations.apply(_engine, "tsrt_weekly", _MIGRATIONS)
+
+
+def _schema_v1(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS tsrt_daily_stmt (
+            day DATE PRIMARY KEY,
+            gross NUMERIC,
+            comm NUMERIC,
+            net NUMERIC,
+            n_trades INT,
+            n_wins INT,
+            trades JSONB
+        )
+    """))
+
+
+# Schema steps (app/migrations.py) — append new numbers, never renumber.
+_MIGRATIONS = [
+    (1, "tsrt_daily_stmt", _schema_v1),
+]
 
 
 def _to_et(ts: str) -> datetime:
@@ -110,7 +121,8 @@ def _pull_and_match(token: str, since: str) -> dict[str, list[dict]]:
         for url in (f"{REAL_BASE}/brokerage/accounts/{acct}/historicalorders"
                     f"?since={since}&pageSize=600",
                     f"{REAL_BASE}/brokerage/accounts/{acct}/orders?pageSize=600"):
-            r = requests.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+            r = ts_client.request("GET", url, lane="bulk",
+                                  headers={"Authorization": f"Bearer {token}"}, timeout=30)
             r.raise_for_status()
             for o in r.json().get("Orders", []):
                 oid = o.get("OrderID")
@@ -215,8 +227,9 @@ def _live_equity(token: str) -> float | None:
     total = 0.0
     try:
         for acct in ACCOUNTS:
-            r = requests.get(f"{REAL_BASE}/brokerage/accounts/{acct}/balances",
-                             headers={"Authorization": f"Bearer {token}"}, timeout=15)
+            r = ts_client.request("GET", f"{REAL_BASE}/brokerage/accounts/{acct}/balances",
+                                  lane="bulk", headers={"Authorization": f"Bearer {token}"},
+                                  timeout=15)
             b = r.json().get("Balances", [{}])
             b = b[0] if isinstance(b, list) and b else b
             detail = b.get("BalanceDetail", {}) or {}
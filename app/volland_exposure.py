@@ -0,0 +1,158 @@
+"""Packed Volland exposure snapshots — one row per (ts, ticker, greek, expiration_option).
+
+The Volland workers write every greek/expiration every 120s. volland_exposure_points
+stores that as one NUMERIC row per strike, so every "latest charm" read was a
+MAX(ts_utc) subquery plus casts over millions of rows.
+
+volland_exposure_snapshots holds the same data as one row per snapshot with
+strike-sorted DOUBLE PRECISION[] arrays (`strikes`, `vals`) — one TOASTed, compressed
+value instead of ~200 tuples. volland_exposure_latest is a tiny pointer table
+(ticker, greek, expiration_option) -> newest snapshot id, upserted by the workers, so
+"latest" reads are a primary-key lookup.
+
+expiration_option is stored as '' where the legacy table had NULL (the workers write
+0DTE charm without an option); helpers hand it back as None.
+
+Reads (all take an open SQLAlchemy connection):
+    latest(conn, greek, expiration_option=ANY, ticker=None)       -> snapshot | None
+    latest_many(conn, greek, expiration_options, ticker=None)     -> {exp: snapshot}
+    at_or_before(conn, greek, ts, expiration_option=ANY, ...)     -> snapshot | None
+    between(conn, greek, t0, t1, expiration_option=ANY, ...)      -> [snapshot, ...]
+    points(snap, lo=None, hi=None)                                -> [(strike, value), ...]
+
+A snapshot is a dict: id, ts_utc, ticker, greek, expiration_option, current_price,
+strikes (list), vals (list).
+
+Backfill the history with volland_exposure_pack_backfill.py.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+
+from sqlalchemy import text
+
+SNAPSHOT_TABLE = "volland_exposure_snapshots"
+LATEST_TABLE = "volland_exposure_latest"
+
+ANY = object()   # expiration_option sentinel: do not filter (legacy "greek only" reads)
+
+DDL = f"""
+CREATE TABLE IF NOT EXISTS {SNAPSHOT_TABLE} (
+    id BIGSERIAL PRIMARY KEY,
+    ts_utc TIMESTAMPTZ NOT NULL,
+    ticker VARCHAR(20) NOT NULL DEFAULT 'SPX',
+    greek VARCHAR(20) NOT NULL,
+    expiration_option VARCHAR(30) NOT NULL DEFAULT '',
+    current_price DOUBLE PRECISION,
+    strikes DOUBLE PRECISION[] NOT NULL,
+    vals DOUBLE PRECISION[] NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_volland_es_key
+    ON {SNAPSHOT_TABLE} (greek, expiration_option, ts_utc, ticker);
+CREATE INDEX IF NOT EXISTS ix_volland_es_greek_ts ON {SNAPSHOT_TABLE} (greek, ts_utc DESC);
+CREATE TABLE IF NOT EXISTS {LATEST_TABLE} (
+    ticker VARCHAR(20) NOT NULL,
+    greek VARCHAR(20) NOT NULL,
+    expiration_option VARCHAR(30) NOT NULL,
+    snapshot_id BIGINT NOT NULL,
+    ts_utc TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (ticker, greek, expiration_option)
+);
+"""
+
+_COLS = "s.id, s.ts_utc, s.ticker, s.greek, s.expiration_option, s.current_price, s.strikes, s.vals"
+
+
+def _snap(r) -> dict:
+    return {
+        "id": r[0], "ts_utc": r[1], "ticker": r[2], "greek": r[3],
+        "expiration_option": r[4] or None,
+        "current_price": float(r[5]) if r[5] is not None else None,
+        "strikes": list(r[6] or []), "vals": list(r[7] or []),
+    }
+
+
+def _filters(alias: str, greek: str, expiration_option, ticker) -> tuple[str, dict]:
+    where = [f"{alias}.greek = :g"]
+    params = {"g": greek}
+    if expiration_option is not ANY:
+        where.append(f"{alias}.expiration_option = :e")
+        params["e"] = expiration_option or ""
+    if ticker:
+        where.append(f"{alias}.ticker = :tk")
+        params["tk"] = ticker
+    return " AND ".join(where), params
+
+
+def latest(conn, greek: str, expiration_option=ANY, ticker: str | None = None) -> dict | None:
+    """Newest snapshot for greek (and expiration / ticker when given), via the pointer table."""
+    where, params = _filters("l", greek, expiration_option, ticker)
+    r = conn.execute(text(f"""
+        SELECT {_COLS} FROM {LATEST_TABLE} l
+        JOIN {SNAPSHOT_TABLE} s ON s.id = l.snapshot_id
+        WHERE {where} ORDER BY l.ts_utc DESC LIMIT 1"""), params).fetchone()
+    return _snap(r) if r else None
+
+
+def latest_many(conn, greek: str, expiration_options, ticker: str | None = None) -> dict:
+    """{expiration_option: newest snapshot} for several expirations in one query."""
+    params = {"g": greek, "es": [e or "" for e in expiration_options]}
+    tk = ""
+    if ticker:
+        tk = "AND l.ticker = :tk"
+        params["tk"] = ticker
+    rows = conn.execute(text(f"""
+        SELECT DISTINCT ON (l.expiration_option) {_COLS} FROM {LATEST_TABLE} l
+        JOIN {SNAPSHOT_TABLE} s ON s.id = l.snapshot_id
+        WHERE l.greek = :g AND l.expiration_option = ANY(:es) {tk}
+        ORDER BY l.expiration_option, l.ts_utc DESC"""), params).fetchall()
+    return {s["expiration_option"]: s for s in map(_snap, rows)}
+
+
+def at_or_before(conn, greek: str, ts, expiration_option=ANY, ticker: str | None = None,
+                 max_age=None) -> dict | None:
+    """Newest snapshot with ts_utc <= ts (and > ts - max_age when given)."""
+    where, params = _filters("s", greek, expiration_option, ticker)
+    params["t"] = ts
+    if max_age is not None:
+        where += " AND s.ts_utc > :t0"
+        params["t0"] = ts - max_age
+    r = conn.execute(text(f"""
+        SELECT {_COLS} FROM {SNAPSHOT_TABLE} s
+        WHERE {where} AND s.ts_utc <= :t ORDER BY s.ts_utc DESC LIMIT 1"""), params).fetchone()
+    return _snap(r) if r else None
+
+
+def between(conn, greek: str, t0, t1, expiration_option=ANY, ticker: str | None = None) -> list:
+    """All snapshots with t0 <= ts_utc <= t1, oldest first."""
+    where, params = _filters("s", greek, expiration_option, ticker)
+    params.update(t0=t0, t1=t1)
+    rows = conn.execute(text(f"""
+        SELECT {_COLS} FROM {SNAPSHOT_TABLE} s
+        WHERE {where} AND s.ts_utc >= :t0 AND s.ts_utc <= :t1 ORDER BY s.ts_utc"""),
+        params).fetchall()
+    return [_snap(r) for r in rows]
+
+
+def points(snap: dict | None, lo: float | None = None, hi: float | None = None) -> list:
+    """[(strike, value)] of a snapshot, strike-sorted, optionally limited to [lo, hi]."""
+    if not snap:
+        return []
+    ks, vs = snap["strikes"], snap["vals"]
+    i = bisect_left(ks, lo) if lo is not None else 0
+    j = bisect_right(ks, hi) if hi is not None else len(ks)
+    return list(zip(ks[i:j], vs[i:j]))
+
+
+def window(snap: dict | None, limit: int) -> tuple:
+    """(mid_strike, [(strike, value, rel)]) — the `limit` strikes nearest the snapshot's
+    current_price (else the max-|value| strike), strike-sorted."""
+    pts = points(snap)
+    if not pts:
+        return None, []
+    mid = snap["current_price"]
+    if mid is None:
+        mid = max(pts, key=lambda p: abs(p[1]))[0]
+    near = sorted(pts, key=lambda p: (abs(p[0] - mid), p[0]))[:limit]
+    near.sort()
+    return mid, [(k, v, k - mid) for k, v in near]
@@ -0,0 +1,113 @@
+"""Volland "new snapshot" notifications — Postgres LISTEN on CHANNEL.
+
+Before this, `_refresh_volland_cache` re-queried Volland on a 90s TTL. With the workers
+on a 120s cycle, setups could run on data up to ~3.5 min old, and the queries ran
+whether or not anything had changed.
+
+The Volland workers now `pg_notify(CHANNEL, '{"id": .., "ts": .., "data_ts": ..}')` in
+the same transaction that inserts the volland_snapshots row (after the cycle's exposure
+snapshots are written), so the notification arrives exactly when the new cycle is
+readable. This module holds ONE dedicated autocommit connection LISTENing on CHANNEL
+and calls `on_snapshot(payload)` for each one — main.py refreshes its cache there, once
+per Volland cycle.
+
+While the listener is down (`listening()` False) main.py falls back to its TTL refresh.
+Notifications sent while disconnected are lost, so every (re)connect also calls
+`on_snapshot(None)` to catch up on whatever landed in the gap.
+
+Init from main.py:  volland_notify.init(os.getenv("DATABASE_URL"), _on_volland_snapshot)
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from threading import Thread
+
+CHANNEL = "volland_snapshot"
+
+# notifies() wake-up interval: bounds how long a dead socket goes unnoticed.
+POLL_TIMEOUT_SEC = 60
+
+_RECONNECT_MIN_SEC = 2
+_RECONNECT_MAX_SEC = 60
+
+_dsn = None
+_on_snapshot = None
+_thread = None
+_state = {"connected": False, "last_id": None, "last_at": None, "count": 0,
+          "reconnects": 0, "error": None}
+
+
+def enabled() -> bool:
+    return os.getenv("VOLLAND_NOTIFY_ENABLED", "true").lower() == "true"
+
+
+def init(dsn: str, on_snapshot):
+    """Start the LISTEN thread. Called from main.py on_startup().
+
+    Args:
+        dsn:         libpq connection string / URL (the raw DATABASE_URL)
+        on_snapshot: callable(payload: dict | None) — None means "catch up" after (re)connect
+    """
+    global _dsn, _on_snapshot, _thread
+    _dsn = dsn
+    _on_snapshot = on_snapshot
+    if not dsn or not enabled():
+        print(f"[volland-notify] disabled (dsn={'set' if dsn else 'missing'}, "
+              f"enabled={enabled()})", flush=True)
+        return
+    if _thread is None or not _thread.is_alive():
+        _thread = Thread(target=_run, name="volland-notify", daemon=True)
+        _thread.start()
+    print(f"[volland-notify] listening on '{CHANNEL}'", flush=True)
+
+
+def listening() -> bool:
+    return _state["connected"]
+
+
+def status() -> dict:
+    out = dict(_state)
+    if out["last_at"]:
+        out["last_age_s"] = round(time.time() - out["last_at"], 1)
+    return out
+
+
+def _dispatch(payload):
+    try:
+        _on_snapshot(payload)
+    except Exception as e:
+        print(f"[volland-notify] handler error: {e}", flush=True)
+
+
+def _run():
+    import psycopg
+
+    backoff = _RECONNECT_MIN_SEC
+    while True:
+        try:
+            with psycopg.connect(_dsn, autocommit=True) as conn:
+                conn.execute(f"LISTEN {CHANNEL}")
+                _state.update(connected=True, error=None)
+                backoff = _RECONNECT_MIN_SEC
+                print(f"[volland-notify] connected, LISTEN {CHANNEL}", flush=True)
+                _dispatch(None)
+                while True:
+                    for n in conn.notifies(timeout=POLL_TIMEOUT_SEC):
+                        try:
+                            payload = json.loads(n.payload) if n.payload else {}
+                        except ValueError:
+                            payload = {"id": n.payload}
+                        _state["last_id"] = payload.get("id")
+                        _state["last_at"] = time.time()
+                        _state["count"] += 1
+                        _dispatch(payload)
+                    # timeout with no notification: cheap round trip proves the socket
+                    conn.execute("SELECT 1")
+        except Exception as e:
+            _state.update(connected=False, error=str(e)[:200])
+            _state["reconnects"] += 1
+            print(f"[volland-notify] connection lost ({e}); reconnect in {backoff}s", flush=True)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, _RECONNECT_MAX_SEC)
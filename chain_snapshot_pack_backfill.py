@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Backfill chain_snapshots.packed (and spy_chain_snapshots.packed) from the JSONB rows.
+
+Why: every 2-minute chain was stored as JSONB positional rows ("" for NaN) — by far
+the biggest table, and every historical scan (gex_state, gex_long_v3, friday_spread,
+apollo_iv_bridge, the research scripts) re-parses that JSON. app/chain_columns.pack()
+stores the same chain as zlib-compressed float32 columns, ~6x smaller, decoded straight
+into a ChainSnapshot.
+
+Cutover:
+  1. deploy with CHAIN_SNAPSHOT_FORMAT=dual (default) — new rows carry both formats
+  2. run this script — packs every historical row, verifying each round trip
+  3. once readers are on decode()/decode_rows(): set CHAIN_SNAPSHOT_FORMAT=packed
+  4. optionally re-run with --drop-json to NULL the JSONB rows whose packed copy this
+     run verified — the ones it packs, and the dual-written / already-packed ones, whose
+     existing blob is checked the same way — then VACUUM (FULL, off-hours) the table to
+     hand the space back
+
+Verification decodes the blob back to positional rows and compares them with the
+original JSON cell by cell: same strikes, "" in the same places, values within float32
+tolerance. Rows that fail are left JSON-only (a failing existing packed copy keeps its
+JSON too) and reported — dual-read keeps them readable.
+
+The packed column and the nullable rows are db_init()'s DDL (app/main.py); this script
+runs no ALTERs and exits if the column is not there yet.
+
+DB discipline (2026-06-03 outage): AUTOCOMMIT and one bulk write per day. A long
+read transaction against prod holds AccessShareLock and blocks db_init()'s startup
+ALTERs, which crash-loops every deploy.
+
+Run:  python chain_snapshot_pack_backfill.py [--table chain_snapshots] [--since 2026-01-01]
+                                             [--dry-run] [--drop-json]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from app.chain_columns import CANONICAL_COLS, decode_rows, from_positional_rows, pack  # noqa: E402
+
+TABLES = ("chain_snapshots", "spy_chain_snapshots")
+_WIDTH = len(CANONICAL_COLS)
+_STRIKE = CANONICAL_COLS.index("Strike")
+
+
+def _cell(v):
+    """JSON cell -> float, None for missing ("" / null / absent)."""
+    if v is None or v == "":
+        return None
+    return float(v)
+
+
+def _verified(blob, rows) -> bool:
+    """Does the packed blob decode back to the original JSON rows? Checked against the
+    JSON itself (not from_positional_rows, which pack() went through): every row kept,
+    same strikes in strike order, "" exactly where the JSON had no value, and every
+    value within float32 precision."""
+    try:
+        want = []
+        for r in rows:
+            if len(r) > _WIDTH:
+                return False
+            cells = [_cell(v) for v in list(r) + [None] * (_WIDTH - len(r))]
+            if cells[_STRIKE] is None:
+                return False
+            want.append(cells)
+        back = decode_rows(blob)
+    except (TypeError, ValueError):
+        return False
+    want.sort(key=lambda r: r[_STRIKE])
+    if len(back) != len(want):
+        return False
+    for got_row, want_row in zip(back, want):
+        for got, exp in zip(got_row, want_row):
+            if exp is None or got == "":
+                if not (exp is None and got == ""):
+                    return False
+            elif not math.isclose(got, exp, rel_tol=1e-6, abs_tol=0.0):
+                return False
+    return True
+
+
+def _round_trips(rows) -> bytes | None:
+    """Packed blob for `rows`, or None when the packed copy would not match them."""
+    try:
+        blob = pack(from_positional_rows(rows))
+    except (TypeError, ValueError):
+        return None
+    return blob if _verified(blob, rows) else None
+
+
+def _has_packed(c, table) -> bool:
+    return c.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = :t AND column_name = 'packed'"), {"t": table}).first() is not None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--table", choices=TABLES + ("all",), default="all")
+    ap.add_argument("--since", default="2000-01-01")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--drop-json", action="store_true",
+                    help="NULL the JSONB rows whose packed copy this run verified")
+    args = ap.parse_args()
+    tables = TABLES if args.table == "all" else (args.table,)
+
+    eng = create_engine(os.environ["DATABASE_URL"])
+    with eng.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
+        missing = [t for t in tables if not _has_packed(c, t)]
+        if missing:
+            sys.exit(f"{', '.join(missing)}: no packed column yet — deploy first (db_init adds "
+                     f"it); this script does not ALTER the chain tables")
+        for table in tables:
+            # With --drop-json, also the rows that already carry a packed copy (dual-written
+            # or packed by an earlier run): their blob is verified before their JSON goes.
+            todo = "rows IS NOT NULL" + ("" if args.drop_json else " AND packed IS NULL")
+            days = [r[0] for r in c.execute(text(
+                f"SELECT DISTINCT date(ts AT TIME ZONE 'America/New_York') d FROM {table} "
+                f"WHERE {todo} AND ts >= :s ORDER BY d"),
+                {"s": args.since}).fetchall()]
+            print(f"{table}: {len(days)} sessions to check from {args.since}")
+
+            total = failed = dropped = json_bytes = packed_bytes = 0
+            for d in days:
+                snaps = c.execute(text(
+                    f"SELECT id, rows, packed FROM {table} "
+                    f"WHERE {todo} "
+                    "  AND date(ts AT TIME ZONE 'America/New_York') = :d ORDER BY ts"),
+                    {"d": d}).fetchall()
+                out, verified = [], []
+                for sid, rows, packed in snaps:
+                    rows = rows if isinstance(rows, list) else json.loads(rows)
+                    if packed is not None:
+                        if _verified(packed, rows):
+                            verified.append(sid)
+                        else:
+                            failed += 1
+                            print(f"\n  {table} id={sid}: existing packed copy does not match "
+                                  f"the JSON — JSON kept")
+                        continue
+                    blob = _round_trips(rows)
+                    if blob is None:
+                        failed += 1
+                        print(f"\n  {table} id={sid}: packed copy does not round-trip — kept JSON-only")
+                        continue
+                    json_bytes += len(json.dumps(rows))
+                    packed_bytes += len(blob)
+                    out.append((sid, blob))
+                    verified.append(sid)
+                if out and not args.dry_run:
+                    # ONE bulk UPDATE per day (see gex_state_backfill.py)
+                    import psycopg2.extras
+                    raw = c.connection.driver_connection
+                    with raw.cursor() as cur:
+                        psycopg2.extras.execute_values(cur, f"""
+                            UPDATE {table} t SET packed = v.p
+                            FROM (VALUES %s) AS v(id, p)
+                            WHERE t.id = v.id AND t.packed IS NULL""",
+                            [(sid, psycopg2.Binary(blob)) for sid, blob in out],
+                            page_size=500)
+                if args.drop_json and verified and not args.dry_run:
+                    dropped += c.execute(text(
+                        f"UPDATE {table} SET rows = NULL "
+                        "WHERE id = ANY(:ids) AND packed IS NOT NULL AND rows IS NOT NULL"),
+                        {"ids": verified}).rowcount
+                total += len(out)
+                print(f"  {d}  {len(out):>4} rows   (running {total})", end="\r")
+
+            ratio = (json_bytes / packed_bytes) if packed_bytes else 0.0
+            print(f"\n{table}: packed {total} rows, {failed} failed verification (JSON kept); "
+                  f"JSON text {json_bytes / 1e6:.1f} MB -> packed {packed_bytes / 1e6:.1f} MB "
+                  f"({ratio:.1f}x)")
+            if args.drop_json and not args.dry_run:
+                print(f"{table}: dropped JSON rows on {dropped} verified snapshots — "
+                      f"VACUUM (FULL) {table} off-hours to reclaim the space")
+
+        if args.dry_run:
+            print("DRY RUN — nothing written")
+            return
+        for table in tables:
+            n, p, j = c.execute(text(
+                f"SELECT count(*), count(packed), count(rows) FROM {table}")).fetchone()
+            size = c.execute(text(
+                f"SELECT pg_size_pretty(pg_total_relation_size('{table}'))")).scalar()
+            print(f"{table} now: {n} rows, {p} packed, {j} with JSON rows, {size}")
+
+
+if __name__ == "__main__":
+    main()
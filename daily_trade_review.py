@@ -254,7 +254,8 @@ def _load_range_bars(engine, trade_date):
         df = pd.read_sql(sa_text(
             "SELECT bar_idx, bar_open, bar_high, bar_low, bar_close, "
             "bar_volume, ts_start FROM es_range_bars "
-            "WHERE trade_date = :d AND source = :src ORDER BY bar_idx"
+            "WHERE trade_date = :d AND source = :src AND range_pts = 5.0 "
+            "ORDER BY bar_idx"
         ), engine, params={"d": date_str, "src": source})
         if len(df) > 0:
             df['ts_start'] = pd.to_datetime(df['ts_start'], utc=True)
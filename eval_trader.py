@@ -20,8 +20,9 @@ crashes, your stops and targets remain live. The script's job is signal
 reception, compliance gating, order placement, and P&L tracking.
 """
 
-import os, sys, json, re, time, logging, calendar, argparse, atexit
+import os, sys, json, re, time, logging, calendar, argparse, atexit, threading
 from datetime import datetime, timedelta, time as dtime, date
+from collections import deque
 from pathlib import Path
 
 try:
@@ -192,6 +193,7 @@ DEFAULT_CONFIG = {
     "signal_source": "api",
     "railway_api_url": "",         # e.g. "https://0dtealpha-production.up.railway.app"
     "eval_api_key": "",            # Must match EVAL_API_KEY env var on Railway
+    "api_signal_stream": True,     # Push: /api/eval/stream (SSE); False = since_id polling only
 
     # ── Telegram (legacy fallback — used when signal_source="telegram") ──
     "telegram_bot_token": "",
@@ -328,16 +330,34 @@ class TelegramPoller:
 # ═════════════════════════════════════════════════════════════════════════════
 
 class APIPoller:
-    """Polls Railway /api/eval/signals for setup signals and outcomes."""
+    """Railway signals and outcomes: pushed over /api/eval/stream (server-sent events,
+    read on a background thread), falling back to polling /api/eval/signals?since_id
+    while the stream is down.
 
-    def __init__(self, api_url: str, api_key: str):
+    poll() never blocks on the stream — it drains what the reader thread queued.
+    wait(timeout) sleeps until the next pushed event (or timeout), so the main loop
+    acts on a signal as it arrives instead of on its next poll tick.
+    """
+
+    STREAM_RETRY_S = 2       # reconnect delay after a dropped stream
+    STREAM_OFF_S = 60        # server has no stream (404): poll, re-check this often
+
+    def __init__(self, api_url: str, api_key: str, stream: bool = True):
         self.url = api_url.rstrip("/") + "/api/eval/signals"
+        self.stream_url = api_url.rstrip("/") + "/api/eval/stream"
         self.api_key = api_key
         self.last_id = 0
+        self.cursor = ""                        # last /api/eval/stream event id
         self._seen_signals: set[int] = set()   # track signal IDs already emitted
         self._seen_outcomes: set[int] = set()   # track outcome IDs already processed
         self._state_date: str = ""  # date string for daily reset
+        self._inbox: deque = deque()            # (kind, payload, recv epoch, event id)
+        self._es_price = None
+        self._wake = threading.Event()
+        self.stream_up = False
         self._load_state()
+        if stream:
+            threading.Thread(target=self._stream_loop, name="api-stream", daemon=True).start()
 
     def _state_file(self) -> Path:
         return API_STATE_FILE
@@ -352,6 +372,7 @@ class APIPoller:
                 today = date.today().isoformat()
                 if saved_date == today:
                     self.last_id = data.get("last_id", 0)
+                    self.cursor = data.get("cursor", "")
                     self._seen_signals = set(data.get("seen_signals", []))
                     self._seen_outcomes = set(data.get("seen_outcomes", []))
                     self._state_date = today
@@ -380,6 +401,7 @@ class APIPoller:
         self._state_file().write_text(json.dumps({
             "date": date.today().isoformat(),
             "last_id": self.last_id,
+            "cursor": self.cursor,
             "seen_signals": list(self._seen_signals),
             "seen_outcomes": list(self._seen_outcomes),
             "trade_dedup": dedup_serialized,
@@ -394,6 +416,19 @@ class APIPoller:
           {setup_name, result, pnl_pts}
         es_price: current ES/MES price from Railway quote stream (for trailing stop)
         """
+        if self.stream_up:
+            raw_signals, raw_outcomes, recv = [], [], {}
+            while self._inbox:
+                kind, payload, t_recv, event_id = self._inbox.popleft()
+                # cursor only advances past events handed to the caller, so a restart
+                # resumes at the first event this process never acted on
+                self.cursor = event_id or self.cursor
+                if kind == "signal":
+                    raw_signals.append(payload)
+                    recv[payload["id"]] = t_recv
+                else:
+                    raw_outcomes.append(payload)
+            return self._ingest(raw_signals, raw_outcomes, self._es_price, recv)
         try:
             resp = requests.get(
                 self.url,
@@ -416,9 +451,12 @@ class APIPoller:
             log.error(f"API poll error: {e}")
             return [], [], None
 
-        raw_signals = data.get("signals", [])
-        raw_outcomes = data.get("outcomes", [])
         es_price = data.get("es_price")  # current MES/ES price from Railway
+        return self._ingest(data.get("signals", []), data.get("outcomes", []), es_price,
+                            dict.fromkeys((s["id"] for s in data.get("signals", [])), time.time()))
+
+    def _ingest(self, raw_signals, raw_outcomes, es_price, recv):
+        """Dedup + convert raw API entries (from the stream or a poll); see poll()."""
         if es_price is not None:
             es_price = float(es_price)
 
@@ -443,6 +481,8 @@ class APIPoller:
             sig = self._api_to_signal(s)
             if sig:
                 sig["es_price"] = es_price
+                sig["logged_at"] = s.get("logged_at")   # Railway commit (epoch s)
+                sig["recv_ts"] = recv.get(sid)
                 new_signals.append(sig)
         if new_signals:
             self._save_state()
@@ -464,6 +504,61 @@ class APIPoller:
 
         return new_signals, new_outcomes, es_price
 
+    def wait(self, timeout: float):
+        """Sleep up to `timeout` s; returns early when the stream delivers an event."""
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def _stream_loop(self):
+        while True:
+            try:
+                with requests.get(
+                    self.stream_url,
+                    params={"cursor": self.cursor} if self.cursor else None,
+                    headers={"Authorization": f"Bearer {self.api_key}",
+                             "Accept": "text/event-stream"},
+                    stream=True, timeout=(8, 30),
+                ) as resp:
+                    if resp.status_code != 200:
+                        log.warning(f"Signal stream: HTTP {resp.status_code} — polling "
+                                    f"(retry in {self.STREAM_OFF_S}s)")
+                        time.sleep(self.STREAM_OFF_S)
+                        continue
+                    self.stream_up = True
+                    log.info(f"Signal stream connected (cursor={self.cursor or 'replay'})")
+                    self._read_events(resp)
+            except Exception as e:
+                log.debug(f"Signal stream dropped: {e}")
+            if self.stream_up:
+                log.info("Signal stream lost — polling until it reconnects")
+            self.stream_up = False
+            time.sleep(self.STREAM_RETRY_S)
+
+    def _read_events(self, resp):
+        event_id, kind, data = None, "message", []
+        for line in resp.iter_lines(decode_unicode=True):
+            if line is None:
+                continue
+            if line:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id":
+                    event_id = value
+                elif field == "event":
+                    kind = value
+                elif field == "data":
+                    data.append(value)
+                continue
+            if data:
+                payload = json.loads("\n".join(data))
+                if kind == "quote":
+                    if payload.get("es_price") is not None:
+                        self._es_price = payload["es_price"]
+                elif kind in ("signal", "outcome"):
+                    self._inbox.append((kind, payload, time.time(), event_id))
+                    self._wake.set()
+            event_id, kind, data = None, "message", []
+
     def _api_to_signal(self, s: dict) -> dict | None:
         """Convert API signal entry to the dict format expected by open_trade()."""
         setup = s.get("setup_name")
@@ -506,20 +601,41 @@ class APIPoller:
         }
 
 
+def log_signal_latency(signal: dict):
+    """Log signal -> order timing for an API signal, right after the order went out:
+    Railway commit -> received here (wall clocks of both hosts) -> order placed."""
+    now = time.time()
+    recv, logged = signal.get("recv_ts"), signal.get("logged_at")
+    parts = []
+    if recv and logged:
+        parts.append(f"commit→recv {(recv - logged) * 1000:.0f}ms")
+    if recv:
+        parts.append(f"recv→order {(now - recv) * 1000:.0f}ms")
+    if parts:
+        log.info(f"  Latency: {', '.join(parts)}")
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 #  TRADESTATION QUOTE POLLER (for breakeven stop)
 # ═════════════════════════════════════════════════════════════════════════════
 
 class TSQuotePoller:
-    """Polls TradeStation API for ES quotes (used for breakeven stop logic)."""
+    """ES quotes for the entry / breakeven stop logic.
+
+    Asks Railway's shared quote feed first (/api/eval/quote — the one @ES stream the
+    server already holds); only when that is unreachable or its stream is down does
+    it fall back to its own TradeStation REST quote (needs TS_* credentials)."""
 
-    def __init__(self):
+    def __init__(self, api_url: str | None = None, api_key: str | None = None):
+        self.api_url = (api_url or "").rstrip("/")
+        self.api_key = api_key
         self.client_id = os.environ.get("TS_CLIENT_ID", "")
         self.client_secret = os.environ.get("TS_CLIENT_SECRET", "")
         self.refresh_token = os.environ.get("TS_REFRESH_TOKEN", "")
         self.access_token = None
         self.token_expiry = 0
-        self.available = bool(self.client_id and self.client_secret and self.refresh_token)
+        self.ts_available = bool(self.client_id and self.client_secret and self.refresh_token)
+        self.available = bool(self.api_url) or self.ts_available
         if not self.available:
             log.info("TS API credentials not set — breakeven stop disabled")
 
@@ -550,9 +666,25 @@ class TSQuotePoller:
             log.warning(f"TS token refresh error: {e}")
             return False
 
+    def _railway_price(self) -> float | None:
+        try:
+            resp = requests.get(f"{self.api_url}/api/eval/quote", params={"symbol": "@ES"},
+                                headers={"Authorization": f"Bearer {self.api_key}"}, timeout=3)
+            if resp.status_code == 200:
+                q = resp.json()
+                if q.get("stream_up") and q.get("last"):
+                    return float(q["last"])
+        except Exception as e:
+            log.debug(f"Railway quote error: {e}")
+        return None
+
     def get_es_price(self) -> float | None:
         """Get current ES price. Returns None on failure."""
-        if not self.available:
+        if self.api_url:
+            px = self._railway_price()
+            if px:
+                return px
+        if not self.ts_available:
             return None
         if time.time() >= self.token_expiry:
             if not self._refresh_access_token():
@@ -3392,13 +3524,15 @@ def main():
 
     # Initialize components
     if use_api:
-        api_poller = APIPoller(cfg["railway_api_url"], cfg["eval_api_key"])
+        api_poller = APIPoller(cfg["railway_api_url"], cfg["eval_api_key"],
+                               stream=cfg.get("api_signal_stream", True))
         log.info(f"Signal source: Railway API ({cfg['railway_api_url']})")
     else:
         telegram_poller = TelegramPoller(cfg["telegram_bot_token"], cfg["telegram_chat_id"])
         log.info(f"Signal source: Telegram (legacy)")
 
-    quote_poller = TSQuotePoller()
+    quote_poller = (TSQuotePoller(cfg["railway_api_url"], cfg["eval_api_key"]) if use_api
+                    else TSQuotePoller())
     compliance = ComplianceGate(cfg)
     nt8 = NT8Bridge(cfg["nt8_incoming_folder"], cfg["nt8_account_id"], mes_symbol)
     nt8.cleanup_stale_position_files()  # S220: drop prior-month position files (roll insurance)
@@ -3814,6 +3948,7 @@ def main():
                         continue
                     _trade_dedup[dedup_key] = now_ts
                     tracker.open_trade(signal)
+                    log_signal_latency(signal)
             else:
                 messages = telegram_poller.poll()
                 for msg in messages:
@@ -3834,7 +3969,10 @@ def main():
                         continue
                     tracker.open_trade(signal)
 
-            time.sleep(poll_interval)
+            if use_api:
+                api_poller.wait(poll_interval)   # returns early on a pushed signal
+            else:
+                time.sleep(poll_interval)
 
     except KeyboardInterrupt:
         log.info("")
@@ -34,7 +34,7 @@ from eval_trader import (
     # Functions
     _init_file_paths, _acquire_singleton_lock, _init_log_file,
     load_config, save_config, current_mes_symbol, _round_tick, _calc_qty,
-    parse_signal, parse_outcome,
+    parse_signal, parse_outcome, log_signal_latency,
     # Classes
     APIPoller, TelegramPoller, TSQuotePoller, ComplianceGate,
     PositionTracker,
@@ -144,10 +144,11 @@ def main():
     _banner_sierra(cfg, sierra_sym)
 
     # Initialize components
-    api_poller = APIPoller(cfg["railway_api_url"], cfg["eval_api_key"])
+    api_poller = APIPoller(cfg["railway_api_url"], cfg["eval_api_key"],
+                           stream=cfg.get("api_signal_stream", True))
     log.info(f"Signal source: Railway API ({cfg['railway_api_url']})")
 
-    quote_poller = TSQuotePoller()
+    quote_poller = TSQuotePoller(cfg["railway_api_url"], cfg["eval_api_key"])
     compliance = ComplianceGate(cfg)
 
     # Create Sierra DTC bridge (drop-in for NT8Bridge)
@@ -441,8 +442,9 @@ def main():
                     continue
                 _trade_dedup[dedup_key] = now_ts
                 tracker.open_trade(signal)
+                log_signal_latency(signal)
 
-            time.sleep(poll_interval)
+            api_poller.wait(poll_interval)   # returns early on a pushed signal
 
     except KeyboardInterrupt:
         log.info("")
@@ -7,7 +7,7 @@ setup_log stamps instead, which is a SECOND path to the same numbers. Filling th
 table means the live gate and the analysis read the SAME source, which is the
 whole point of having one compute().
 
-Uses gex_state.compute() unchanged — one implementation, live and historical.
+Uses gex_state.compute_chain() — the one implementation, live and historical.
 
 DB discipline (2026-06-03 outage): AUTOCOMMIT and one bulk write per day. A long
 read transaction against prod holds AccessShareLock and blocks db_init()'s startup
@@ -26,7 +26,8 @@ from sqlalchemy import create_engine, text
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
 
-from app.gex_state import compute, ET  # noqa: E402
+from app.chain_columns import decode  # noqa: E402
+from app.gex_state import compute_chain, ET  # noqa: E402
 
 
 def main():
@@ -53,17 +54,16 @@ def main():
         total = skipped = 0
         for d in days:
             snaps = c.execute(text(
-                "SELECT ts, spot, rows FROM chain_snapshots "
+                "SELECT ts, spot, rows, packed FROM chain_snapshots "
                 "WHERE spot IS NOT NULL AND spot > 100 "
                 "  AND ts >= CAST(:d AS date) - 1 AND ts < CAST(:d AS date) + 1 "
                 "ORDER BY ts"), {"d": d}).fetchall()
             out = []
-            for ts, spot, rows in snaps:
+            for ts, spot, rows, packed in snaps:
                 et = ts.astimezone(ET).replace(tzinfo=None)
                 if et.date() != d:
                     continue
-                rows = rows if isinstance(rows, list) else json.loads(rows)
-                f = compute(float(spot), rows)
+                f = compute_chain(float(spot), decode(packed, rows))
                 if not f:
                     skipped += 1
                     continue
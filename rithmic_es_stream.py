@@ -1,12 +1,21 @@
 # Rithmic ES Tick Data Stream — parallel pipeline writing to @ES-R
 # Self-contained module. Imported by main.py, receives engine + send_telegram as params.
 # NO imports from app.main — all state is local.
+#
+# Range bars: one RangeBarEngine builds every size in RANGE_SIZES (RITHMIC_RANGE_SIZES,
+# default 2,5,10,20 — 5 and 10 are always on) from a single pass over each trade.
+# Closed bars live in a preallocated float64 array per size; bar-complete callbacks get
+# a read-only BarsView of the session instead of a fresh list-of-dicts copy per close.
+# Per-tick engine cost is tracked in get_rithmic_state()["tick_cost_us"].
 
 import os
 import time
 import asyncio
 import threading
+from collections.abc import Sequence
 from datetime import datetime, time as dtime, timedelta
+
+import numpy as np
 import pytz
 
 ET = pytz.timezone("US/Eastern")
@@ -20,6 +29,18 @@ RITHMIC_SYMBOL = "@ES-R"   # parallel symbol — change to @ES when migrating
 RITHMIC_CONFORMANCE = os.getenv("RITHMIC_CONFORMANCE", "").lower() == "true"
 RANGE_PTS = 5.0
 RANGE_PTS_10 = 10.0
+RANGE_SIZES = tuple(sorted(
+    {float(x) for x in os.getenv("RITHMIC_RANGE_SIZES", "2,5,10,20").split(",") if x.strip()}
+    | {RANGE_PTS, RANGE_PTS_10}
+))
+
+# Closed-bar array layout (one row per bar). ts_start / ts_end / status ride alongside
+# in plain lists; "cvd" is cvd_close, as before.
+BAR_COLS = ("idx", "open", "high", "low", "close", "volume", "delta",
+            "buy_volume", "sell_volume", "cvd_open", "cvd_high", "cvd_low", "cvd_close")
+_COL = {c: i for i, c in enumerate(BAR_COLS)}
+_PRICE_COLS = frozenset(("open", "high", "low", "close"))
+_BAR_CAPACITY = 1024   # initial rows per size; doubles when full (2pt runs ~1-3k/session)
 
 # ====== STATE ======
 _lock = threading.Lock()
@@ -34,12 +55,7 @@ _state = {
     "buy_volume": 0,
     "sell_volume": 0,
     "trade_count": 0,
-    "_forming_bar": None,
-    "_completed_bars": [],
-    "_completed_bars_flushed": 0,
-    "_cvd": 0,
-    "_bar_idx": 0,
-    "_flush_buffer": [],
+    "_bars": None,   # RangeBarEngine for the current session (set by _reset_session)
     "_last_trade_time": None,
     # Rithmic-specific diagnostics
     "_aggressor_count": 0,
@@ -47,31 +63,33 @@ _state = {
     "_connection_errors": 0,
     "_last_connect_time": None,
     "_front_month": None,
-    # ── 10-pt range bar state (parallel pipeline) ──
-    "_forming_bar_10": None,
-    "_completed_bars_10": [],
-    "_bar_idx_10": 0,
-    "_flush_buffer_10": [],
-    "_live_since_idx_10": 0,
 }
 
-# Callback invoked (outside lock) whenever a range bar completes.
-# Signature: callback(all_completed_bars: list[dict])
-# Set by main.py via set_on_bar_complete().
-_on_bar_complete = None
-_on_bar_10_complete = None
+# Callbacks invoked (outside lock) whenever a range bar of that size completes.
+# Signature: callback(bars: BarsView) — read-only sequence of bar dicts, oldest first.
+# Set by main.py via set_on_bar_complete() / set_on_bar_10_complete() /
+# set_on_range_bar_complete().
+_bar_callbacks = {}
+
+
+def set_on_range_bar_complete(range_pts, callback):
+    """Register a callback that fires each time a `range_pts` range bar completes."""
+    range_pts = float(range_pts)
+    if range_pts not in RANGE_SIZES:
+        print(f"[rithmic] callback for {range_pts}pt bars ignored: not in "
+              f"RITHMIC_RANGE_SIZES {RANGE_SIZES}", flush=True)
+        return
+    _bar_callbacks[range_pts] = callback
 
 
 def set_on_bar_complete(callback):
     """Register a callback that fires each time a 5-pt range bar completes."""
-    global _on_bar_complete
-    _on_bar_complete = callback
+    set_on_range_bar_complete(RANGE_PTS, callback)
 
 
 def set_on_bar_10_complete(callback):
     """Register a callback that fires each time a 10-pt range bar completes."""
-    global _on_bar_10_complete
-    _on_bar_10_complete = callback
+    set_on_range_bar_complete(RANGE_PTS_10, callback)
 
 
 def _now_et():
@@ -128,23 +146,198 @@ def _classify_aggressor(aggressor, price, bid, ask, volume):
 
 # ====== RANGE BAR BUILDING ======
 
-def _new_range_bar(price, ts):
-    """Create a new forming range bar."""
-    return {
-        "open": price, "high": price, "low": price, "close": price,
-        "volume": 0, "buy": 0, "sell": 0, "delta": 0,
-        "ts_start": ts, "ts_end": ts,
-        "cvd_open": _state["_cvd"],
-        "cvd_high": _state["_cvd"],
-        "cvd_low": _state["_cvd"],
-    }
+def _bar_dict(row, ts_start, ts_end, status):
+    """Bar dict (the shape setup_detector and the API expect) from one array row."""
+    d = {c: (float(v) if c in _PRICE_COLS else int(v)) for c, v in zip(BAR_COLS, row.tolist())}
+    d["cvd"] = d["cvd_close"]
+    d["ts_start"] = ts_start
+    d["ts_end"] = ts_end
+    d["status"] = status
+    return d
+
+
+class BarsView(Sequence):
+    """Read-only view of the first `n` closed bars of one range size.
+
+    Bars are append-only, so rows < n never change after the view is taken and it stays
+    valid without holding _lock (a capacity grow copies into a new array; the view keeps
+    the old one). Items are the usual bar dicts, built on first access and cached —
+    detectors that only look at the tail never pay for the whole session. column(name)
+    hands out a read-only numpy slice for vectorised readers.
+    """
+
+    __slots__ = ("range_pts", "_num", "_ts_start", "_ts_end", "_status", "_n", "_cache")
+
+    def __init__(self, range_pts, num, ts_start, ts_end, status, n):
+        self.range_pts = range_pts
+        self._num = num
+        self._ts_start = ts_start
+        self._ts_end = ts_end
+        self._status = status
+        self._n = n
+        self._cache = {}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("bar index out of range")
+        d = self._cache.get(i)
+        if d is None:
+            d = self._cache[i] = _bar_dict(self._num[i], self._ts_start[i],
+                                           self._ts_end[i], self._status[i])
+        return d
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def column(self, name):
+        """Read-only numpy array of one BAR_COLS column over the view's bars."""
+        col = self._num[:self._n, _COL[name]]
+        col.flags.writeable = False
+        return col
+
+    @property
+    def last_idx(self):
+        return int(self._num[self._n - 1, 0]) if self._n else -1
+
+
+class _RangeBars:
+    """One range size: the forming bar as plain attributes, closed bars as rows of a
+    preallocated (capacity x len(BAR_COLS)) float64 array."""
+
+    __slots__ = ("range_pts", "_thresh", "num", "ts_start", "ts_end", "status", "n",
+                 "next_idx", "live_since_idx", "flushed",
+                 "f_open", "f_high", "f_low", "f_close", "f_volume", "f_buy", "f_sell",
+                 "f_delta", "f_cvd_open", "f_cvd_high", "f_cvd_low", "f_ts_start", "f_ts_end")
+
+    def __init__(self, range_pts, restored=()):
+        self.range_pts = range_pts
+        self._thresh = range_pts - 0.001
+        self.num = np.zeros((max(_BAR_CAPACITY, 2 * len(restored)), len(BAR_COLS)))
+        self.ts_start, self.ts_end, self.status = [], [], []
+        self.n = 0
+        self.f_open = None
+        for b in restored:
+            self._append((b["idx"], b["open"], b["high"], b["low"], b["close"],
+                          b["volume"], b["delta"], b["buy_volume"], b["sell_volume"],
+                          b["cvd_open"], b["cvd_high"], b["cvd_low"], b["cvd_close"]),
+                         b["ts_start"], b["ts_end"], b["status"])
+        self.next_idx = (restored[-1]["idx"] + 1) if restored else 0
+        self.live_since_idx = self.next_idx
+        self.flushed = self.n
+
+    def _append(self, row, ts_start, ts_end, status):
+        if self.n == len(self.num):
+            grown = np.zeros((2 * len(self.num), len(BAR_COLS)))
+            grown[:self.n] = self.num
+            self.num = grown
+        self.num[self.n] = row
+        self.ts_start.append(ts_start)
+        self.ts_end.append(ts_end)
+        self.status.append(status)
+        self.n += 1
+
+    def _open_bar(self, price, ts, cvd):
+        self.f_open = self.f_high = self.f_low = self.f_close = price
+        self.f_volume = self.f_buy = self.f_sell = self.f_delta = 0
+        self.f_cvd_open = self.f_cvd_high = self.f_cvd_low = cvd
+        self.f_ts_start = self.f_ts_end = ts
+
+    def view(self):
+        return BarsView(self.range_pts, self.num, self.ts_start, self.ts_end, self.status, self.n)
+
+    def forming(self, cvd_now):
+        """The forming bar as an "open" bar dict, or None when it has no trades yet."""
+        if self.f_open is None or (self.f_volume <= 0 and abs(self.f_open - self.f_close) <= 0.001):
+            return None
+        return {
+            "idx": self.next_idx,
+            "open": self.f_open, "high": self.f_high,
+            "low": self.f_low, "close": self.f_close,
+            "volume": self.f_volume, "delta": self.f_delta,
+            "buy_volume": self.f_buy, "sell_volume": self.f_sell,
+            "cvd": cvd_now,
+            "cvd_open": self.f_cvd_open,
+            "cvd_high": self.f_cvd_high,
+            "cvd_low": self.f_cvd_low,
+            "cvd_close": cvd_now,
+            "ts_start": self.f_ts_start, "ts_end": self.f_ts_end,
+            "status": "open",
+        }
+
+
+class RangeBarEngine:
+    """Builds every configured range size from one pass over each trade."""
+
+    def __init__(self, sizes=RANGE_SIZES, restored=None, cvd=0):
+        restored = restored or {}
+        self.books = {rp: _RangeBars(rp, restored.get(rp, ())) for rp in sizes}
+        self._books = tuple(self.books.values())
+        self.cvd = cvd
+        self.ticks = 0
+        self.tick_ns = 0
+        self.tick_ns_max = 0
+
+    def on_trade(self, price, volume, buy, sell, delta, ts):
+        """Apply one trade to every size. Returns the _RangeBars whose bar closed on it."""
+        t0 = time.perf_counter_ns()
+        cvd0 = self.cvd
+        cvd = self.cvd = cvd0 + delta
+        closed = None
+        for b in self._books:
+            if b.f_open is None:
+                b._open_bar(price, ts, cvd0)
+            b.f_close = price
+            if price > b.f_high:
+                b.f_high = price
+            elif price < b.f_low:
+                b.f_low = price
+            b.f_volume += volume
+            b.f_buy += buy
+            b.f_sell += sell
+            b.f_delta += delta
+            b.f_ts_end = ts
+            if cvd > b.f_cvd_high:
+                b.f_cvd_high = cvd
+            elif cvd < b.f_cvd_low:
+                b.f_cvd_low = cvd
+            if b.f_high - b.f_low >= b._thresh:
+                b._append((b.next_idx, b.f_open, b.f_high, b.f_low, price,
+                           b.f_volume, b.f_delta, b.f_buy, b.f_sell,
+                           b.f_cvd_open, b.f_cvd_high, b.f_cvd_low, cvd),
+                          b.f_ts_start, ts, "closed")
+                b.next_idx += 1
+                b._open_bar(price, ts, cvd)
+                if closed is None:
+                    closed = []
+                closed.append(b)
+        dt = time.perf_counter_ns() - t0
+        self.ticks += 1
+        self.tick_ns += dt
+        if dt > self.tick_ns_max:
+            self.tick_ns_max = dt
+        return closed
+
+    def tick_cost(self):
+        return {
+            "ticks": self.ticks,
+            "mean_us": round(self.tick_ns / self.ticks / 1000, 2) if self.ticks else None,
+            "max_us": round(self.tick_ns_max / 1000, 1),
+        }
 
 
 def _process_trade(price, volume, aggressor, bid, ask, ts):
     """Process a single trade tick into range bars. Must be called under _lock.
 
-    Returns list snapshot of completed bars if a bar just closed (for callback),
-    or None if no bar completed.
+    Returns [(callback, BarsView, closed_bar_dict), ...] for the sizes whose bar just
+    closed, or None if no bar completed. callback may be None (close logged only).
     """
     s = _state
     buy_vol, sell_vol, delta, used_agg = _classify_aggressor(
@@ -166,163 +359,81 @@ def _process_trade(price, volume, aggressor, bid, ask, ts):
     else:
         s["_inferred_count"] += 1
 
-    # Ensure forming bar exists
-    if s["_forming_bar"] is None:
-        s["_forming_bar"] = _new_range_bar(price, ts)
-
-    bar = s["_forming_bar"]
-    bar["close"] = price
-    bar["high"] = max(bar["high"], price)
-    bar["low"] = min(bar["low"], price)
-    bar["volume"] += volume
-    bar["buy"] += buy_vol
-    bar["sell"] += sell_vol
-    bar["delta"] += delta
-    bar["ts_end"] = ts
-
-    # Track CVD within bar
-    s["_cvd"] += delta
-    bar["cvd_high"] = max(bar["cvd_high"], s["_cvd"])
-    bar["cvd_low"] = min(bar["cvd_low"], s["_cvd"])
-
-    # Check if 5-pt range bar is complete
-    bar_5_snapshot = None
-    if bar["high"] - bar["low"] >= RANGE_PTS - 0.001:
-        completed = {
-            "idx": s["_bar_idx"],
-            "open": bar["open"], "high": bar["high"],
-            "low": bar["low"], "close": bar["close"],
-            "volume": bar["volume"], "delta": bar["delta"],
-            "buy_volume": bar["buy"], "sell_volume": bar["sell"],
-            "cvd": s["_cvd"],
-            "cvd_open": bar["cvd_open"],
-            "cvd_high": bar["cvd_high"],
-            "cvd_low": bar["cvd_low"],
-            "cvd_close": s["_cvd"],
-            "ts_start": bar["ts_start"], "ts_end": bar["ts_end"],
-            "status": "closed",
-        }
-        s["_completed_bars"].append(completed)
-        s["_flush_buffer"].append(completed)
-        s["_bar_idx"] += 1
-        agg_pct = (s["_aggressor_count"] / max(s["trade_count"], 1)) * 100
-        print(f"[rithmic] bar #{completed['idx']} closed: "
-              f"O={completed['open']:.2f} H={completed['high']:.2f} "
-              f"L={completed['low']:.2f} C={completed['close']:.2f} "
-              f"vol={completed['volume']} delta={completed['delta']:+d} "
-              f"cvd={completed['cvd']:+d} agg={agg_pct:.0f}%", flush=True)
-        s["_forming_bar"] = _new_range_bar(price, ts)
-        if _on_bar_complete:
-            bar_5_snapshot = list(s["_completed_bars"])
-
-    # ── 10-pt range bar builder (parallel, same tick) ──
-    bar_10_snapshot = None
-    if s["_forming_bar_10"] is None:
-        s["_forming_bar_10"] = _new_range_bar(price, ts)
-    b10 = s["_forming_bar_10"]
-    b10["close"] = price
-    b10["high"] = max(b10["high"], price)
-    b10["low"] = min(b10["low"], price)
-    b10["volume"] += volume
-    b10["buy"] += buy_vol
-    b10["sell"] += sell_vol
-    b10["delta"] += delta
-    b10["ts_end"] = ts
-    b10["cvd_high"] = max(b10["cvd_high"], s["_cvd"])
-    b10["cvd_low"] = min(b10["cvd_low"], s["_cvd"])
-
-    if b10["high"] - b10["low"] >= RANGE_PTS_10 - 0.001:
-        completed_10 = {
-            "idx": s["_bar_idx_10"],
-            "open": b10["open"], "high": b10["high"],
-            "low": b10["low"], "close": b10["close"],
-            "volume": b10["volume"], "delta": b10["delta"],
-            "buy_volume": b10["buy"], "sell_volume": b10["sell"],
-            "cvd": s["_cvd"],
-            "cvd_open": b10["cvd_open"],
-            "cvd_high": b10["cvd_high"],
-            "cvd_low": b10["cvd_low"],
-            "cvd_close": s["_cvd"],
-            "ts_start": b10["ts_start"], "ts_end": b10["ts_end"],
-            "status": "closed",
-        }
-        s["_completed_bars_10"].append(completed_10)
-        s["_flush_buffer_10"].append(completed_10)
-        s["_bar_idx_10"] += 1
-        print(f"[rithmic-10pt] bar #{completed_10['idx']} closed: "
-              f"O={completed_10['open']:.2f} H={completed_10['high']:.2f} "
-              f"L={completed_10['low']:.2f} C={completed_10['close']:.2f} "
-              f"vol={completed_10['volume']} delta={completed_10['delta']:+d} "
-              f"cvd={completed_10['cvd']:+d}", flush=True)
-        s["_forming_bar_10"] = _new_range_bar(price, ts)
-        if _on_bar_10_complete:
-            bar_10_snapshot = list(s["_completed_bars_10"])
+    if s["_bars"] is None:
+        s["_bars"] = RangeBarEngine()
+    closed = s["_bars"].on_trade(price, volume, buy_vol, sell_vol, delta, ts)
+    if not closed:
+        return None
+    out = []
+    for b in closed:
+        view = b.view()
+        out.append((_bar_callbacks.get(b.range_pts), view, view[-1]))
+    return out
+
 
-    return bar_5_snapshot, bar_10_snapshot
+def _log_closed(closed):
+    """One line per closing tick for all sizes that closed on it (printed outside _lock)."""
+    s = _state
+    agg_pct = (s["_aggressor_count"] / max(s["trade_count"], 1)) * 100
+    parts = [f"{view.range_pts:g}pt #{b['idx']} O={b['open']:.2f} H={b['high']:.2f} "
+             f"L={b['low']:.2f} C={b['close']:.2f} vol={b['volume']} "
+             f"delta={b['delta']:+d} cvd={b['cvd']:+d}"
+             for _, view, b in closed]
+    print(f"[rithmic] closed {' | '.join(parts)} agg={agg_pct:.0f}%", flush=True)
 
 
 # ====== SESSION RESET ======
 
 def _reset_session(engine):
-    """Reset state for new session. Reloads prior bars from DB."""
+    """Reset state for new session. Reloads prior bars (every size) from DB."""
     session_date = _es_session_date()
-    db_bars = []
-    db_bars_10 = []
+    restored = {rp: [] for rp in RANGE_SIZES}
     if engine:
         try:
             from sqlalchemy import text
             with engine.begin() as conn:
-                # Load 5-pt bars
                 rows = conn.execute(text("""
-                    SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
+                    SELECT range_pts, bar_idx, bar_open, bar_high, bar_low, bar_close,
                            bar_volume, bar_buy_volume, bar_sell_volume, bar_delta,
                            cumulative_delta, cvd_open, cvd_high, cvd_low, cvd_close,
                            ts_start, ts_end, status
                     FROM es_range_bars
-                    WHERE trade_date = :td AND symbol = :sym AND range_pts = :rp
-                    ORDER BY bar_idx ASC
-                """), {"td": session_date, "sym": RITHMIC_SYMBOL, "rp": RANGE_PTS}).mappings().all()
+                    WHERE trade_date = :td AND symbol = :sym AND range_pts = ANY(:rps)
+                    ORDER BY range_pts, bar_idx ASC
+                """), {"td": session_date, "sym": RITHMIC_SYMBOL,
+                       "rps": list(RANGE_SIZES)}).mappings().all()
+                skipped = 0
                 for r in rows:
-                    db_bars.append({
+                    if None in (r["bar_idx"], r["bar_open"], r["bar_high"], r["bar_low"],
+                                r["bar_close"]):
+                        skipped += 1       # not a usable bar
+                        continue
+                    # Older rows predate the volume split / CVD columns: NULL -> 0, so
+                    # the float64 bar array can hold them
+                    z = {k: (0 if r[k] is None else r[k]) for k in (
+                        "bar_volume", "bar_delta", "bar_buy_volume", "bar_sell_volume",
+                        "cvd_open", "cvd_high", "cvd_low", "cvd_close")}
+                    restored[float(r["range_pts"])].append({
                         "idx": r["bar_idx"],
                         "open": r["bar_open"], "high": r["bar_high"],
                         "low": r["bar_low"], "close": r["bar_close"],
-                        "volume": r["bar_volume"], "delta": r["bar_delta"],
-                        "buy_volume": r["bar_buy_volume"], "sell_volume": r["bar_sell_volume"],
-                        "cvd": r["cvd_close"],
-                        "cvd_open": r["cvd_open"], "cvd_high": r["cvd_high"],
-                        "cvd_low": r["cvd_low"], "cvd_close": r["cvd_close"],
-                        "ts_start": r["ts_start"].isoformat() if r["ts_start"] else "",
-                        "ts_end": r["ts_end"].isoformat() if r["ts_end"] else "",
-                        "status": r["status"],
-                    })
-                # Load 10-pt bars
-                rows10 = conn.execute(text("""
-                    SELECT bar_idx, bar_open, bar_high, bar_low, bar_close,
-                           bar_volume, bar_buy_volume, bar_sell_volume, bar_delta,
-                           cumulative_delta, cvd_open, cvd_high, cvd_low, cvd_close,
-                           ts_start, ts_end, status
-                    FROM es_range_bars
-                    WHERE trade_date = :td AND symbol = :sym AND range_pts = :rp
-                    ORDER BY bar_idx ASC
-                """), {"td": session_date, "sym": RITHMIC_SYMBOL, "rp": RANGE_PTS_10}).mappings().all()
-                for r in rows10:
-                    db_bars_10.append({
-                        "idx": r["bar_idx"],
-                        "open": r["bar_open"], "high": r["bar_high"],
-                        "low": r["bar_low"], "close": r["bar_close"],
-                        "volume": r["bar_volume"], "delta": r["bar_delta"],
-                        "buy_volume": r["bar_buy_volume"], "sell_volume": r["bar_sell_volume"],
-                        "cvd": r["cvd_close"],
-                        "cvd_open": r["cvd_open"], "cvd_high": r["cvd_high"],
-                        "cvd_low": r["cvd_low"], "cvd_close": r["cvd_close"],
+                        "volume": z["bar_volume"], "delta": z["bar_delta"],
+                        "buy_volume": z["bar_buy_volume"], "sell_volume": z["bar_sell_volume"],
+                        "cvd_open": z["cvd_open"], "cvd_high": z["cvd_high"],
+                        "cvd_low": z["cvd_low"], "cvd_close": z["cvd_close"],
                         "ts_start": r["ts_start"].isoformat() if r["ts_start"] else "",
                         "ts_end": r["ts_end"].isoformat() if r["ts_end"] else "",
                         "status": r["status"],
                     })
+                if skipped:
+                    print(f"[rithmic] DB reload: skipped {skipped} bars with NULL idx/OHLC",
+                          flush=True)
         except Exception as e:
             print(f"[rithmic] DB reload error: {e}", flush=True)
 
+    db_bars = restored[RANGE_PTS]
+    bars = RangeBarEngine(RANGE_SIZES, restored,
+                          cvd=db_bars[-1]["cvd_close"] if db_bars else 0)
     with _lock:
         _state.update({
             "connected": False,
@@ -335,50 +446,72 @@ def _reset_session(engine):
             "buy_volume": 0,
             "sell_volume": 0,
             "trade_count": 0,
-            "_forming_bar": None,
-            "_completed_bars": db_bars,
-            "_completed_bars_flushed": len(db_bars),
-            "_live_since_idx": (db_bars[-1]["idx"] + 1) if db_bars else 0,
-            "_cvd": db_bars[-1]["cvd_close"] if db_bars else 0,
-            "_bar_idx": (db_bars[-1]["idx"] + 1) if db_bars else 0,
-            "_flush_buffer": [],
+            "_bars": bars,
             "_last_trade_time": None,
             "_aggressor_count": 0,
             "_inferred_count": 0,
-            # 10-pt state
-            "_forming_bar_10": None,
-            "_completed_bars_10": db_bars_10,
-            "_bar_idx_10": (db_bars_10[-1]["idx"] + 1) if db_bars_10 else 0,
-            "_flush_buffer_10": [],
-            "_live_since_idx_10": (db_bars_10[-1]["idx"] + 1) if db_bars_10 else 0,
         })
-    if db_bars:
-        print(f"[rithmic] restored {len(db_bars)} 5pt bars from DB (session {session_date}, "
-              f"cvd={_state['_cvd']:+d})", flush=True)
+    if any(restored.values()):
+        counts = ", ".join(f"{len(v)}x{rp:g}pt" for rp, v in restored.items() if v)
+        print(f"[rithmic] restored {counts} bars from DB (session {session_date}, "
+              f"cvd={bars.cvd:+d})", flush=True)
     else:
         print(f"[rithmic] fresh session {session_date} (no prior bars)", flush=True)
-    if db_bars_10:
-        print(f"[rithmic] restored {len(db_bars_10)} 10pt bars from DB", flush=True)
 
 
 # ====== DB FLUSH ======
 
+_UPSERT_SQL = """
+    INSERT INTO es_range_bars
+        (trade_date, symbol, bar_idx, range_pts,
+         bar_open, bar_high, bar_low, bar_close,
+         bar_volume, bar_buy_volume, bar_sell_volume, bar_delta,
+         cumulative_delta, cvd_open, cvd_high, cvd_low, cvd_close,
+         ts_start, ts_end, status, source)
+    VALUES (:td, :sym, :idx, :rp,
+            :bo, :bh, :bl, :bc,
+            :bv, :bbv, :bsv, :bd,
+            :cd, :co, :ch, :cl, :cc,
+            :ts0, :ts1, :st, 'rithmic')
+    ON CONFLICT (trade_date, symbol, bar_idx, range_pts) DO UPDATE SET
+        bar_open = EXCLUDED.bar_open, bar_high = EXCLUDED.bar_high,
+        bar_low = EXCLUDED.bar_low, bar_close = EXCLUDED.bar_close,
+        bar_volume = EXCLUDED.bar_volume, bar_buy_volume = EXCLUDED.bar_buy_volume,
+        bar_sell_volume = EXCLUDED.bar_sell_volume, bar_delta = EXCLUDED.bar_delta,
+        cumulative_delta = EXCLUDED.cumulative_delta,
+        cvd_open = EXCLUDED.cvd_open, cvd_high = EXCLUDED.cvd_high,
+        cvd_low = EXCLUDED.cvd_low, cvd_close = EXCLUDED.cvd_close,
+        ts_start = EXCLUDED.ts_start, ts_end = EXCLUDED.ts_end,
+        status = EXCLUDED.status
+"""
+
+
 def flush_rithmic_bars(engine):
-    """Scheduler job: flush completed range bars to DB. Writes symbol='@ES-R'."""
+    """Scheduler job: flush completed range bars (all sizes) to DB. Writes symbol='@ES-R'.
+
+    Each size remembers how many bars are already in the DB (`flushed`); the unflushed
+    tail of every size goes out in one executemany upsert. The mark only advances after
+    the commit, so a failed flush is retried next run (the upsert is idempotent).
+    """
     try:
         if not _es_futures_open() or not engine:
             return
         from sqlalchemy import text
 
         with _lock:
-            bars = _state["_flush_buffer"]
-            _state["_flush_buffer"] = []
+            bars_eng = _state["_bars"]
             diag_connected = _state.get("connected", False)
             diag_trades = _state.get("trade_count", 0)
-            diag_completed = len(_state.get("_completed_bars", []))
-            diag_forming = _state.get("_forming_bar")
-
-        if not bars:
+            pending = []
+            if bars_eng is not None:
+                for b in bars_eng._books:
+                    if b.n > b.flushed:
+                        pending.append((b, b.n, b.view()[b.flushed:b.n]))
+            book5 = bars_eng.books[RANGE_PTS] if bars_eng else None
+            diag_completed = book5.n if book5 else 0
+            diag_forming = book5.forming(bars_eng.cvd) if book5 else None
+
+        if not pending:
             forming_info = "none"
             if diag_forming:
                 fr = diag_forming["high"] - diag_forming["low"]
@@ -388,150 +521,72 @@ def flush_rithmic_bars(engine):
             return
 
         today = _state["trade_date"] or _es_session_date()
+        params = [{
+            "td": today, "sym": RITHMIC_SYMBOL, "idx": b["idx"], "rp": book.range_pts,
+            "bo": b["open"], "bh": b["high"], "bl": b["low"], "bc": b["close"],
+            "bv": b["volume"], "bbv": b["buy_volume"], "bsv": b["sell_volume"], "bd": b["delta"],
+            "cd": b["cvd"], "co": b["cvd_open"], "ch": b["cvd_high"],
+            "cl": b["cvd_low"], "cc": b["cvd_close"],
+            "ts0": b["ts_start"], "ts1": b["ts_end"], "st": b["status"],
+        } for book, _, rows in pending for b in rows]
         with engine.begin() as conn:
-            for b in bars:
-                conn.execute(text("""
-                    INSERT INTO es_range_bars
-                        (trade_date, symbol, bar_idx, range_pts,
-                         bar_open, bar_high, bar_low, bar_close,
-                         bar_volume, bar_buy_volume, bar_sell_volume, bar_delta,
-                         cumulative_delta, cvd_open, cvd_high, cvd_low, cvd_close,
-                         ts_start, ts_end, status, source)
-                    VALUES (:td, :sym, :idx, :rp,
-                            :bo, :bh, :bl, :bc,
-                            :bv, :bbv, :bsv, :bd,
-                            :cd, :co, :ch, :cl, :cc,
-                            :ts0, :ts1, :st, 'rithmic')
-                    ON CONFLICT (trade_date, symbol, bar_idx, range_pts) DO UPDATE SET
-                        bar_open = EXCLUDED.bar_open, bar_high = EXCLUDED.bar_high,
-                        bar_low = EXCLUDED.bar_low, bar_close = EXCLUDED.bar_close,
-                        bar_volume = EXCLUDED.bar_volume, bar_buy_volume = EXCLUDED.bar_buy_volume,
-                        bar_sell_volume = EXCLUDED.bar_sell_volume, bar_delta = EXCLUDED.bar_delta,
-                        cumulative_delta = EXCLUDED.cumulative_delta,
-                        cvd_open = EXCLUDED.cvd_open, cvd_high = EXCLUDED.cvd_high,
-                        cvd_low = EXCLUDED.cvd_low, cvd_close = EXCLUDED.cvd_close,
-                        ts_start = EXCLUDED.ts_start, ts_end = EXCLUDED.ts_end,
-                        status = EXCLUDED.status
-                """), {
-                    "td": today, "sym": RITHMIC_SYMBOL, "idx": b["idx"], "rp": RANGE_PTS,
-                    "bo": b["open"], "bh": b["high"], "bl": b["low"], "bc": b["close"],
-                    "bv": b["volume"], "bbv": b["buy_volume"], "bsv": b["sell_volume"], "bd": b["delta"],
-                    "cd": b["cvd"], "co": b["cvd_open"], "ch": b["cvd_high"],
-                    "cl": b["cvd_low"], "cc": b["cvd_close"],
-                    "ts0": b["ts_start"], "ts1": b["ts_end"], "st": b["status"],
-                })
-        print(f"[rithmic] flushed {len(bars)} range bars to DB", flush=True)
-
-        # Flush 10-pt bars (same table, different range_pts)
+            conn.execute(text(_UPSERT_SQL), params)
         with _lock:
-            bars_10 = _state["_flush_buffer_10"]
-            _state["_flush_buffer_10"] = []
-        if bars_10:
-            with engine.begin() as conn:
-                for b in bars_10:
-                    conn.execute(text("""
-                        INSERT INTO es_range_bars
-                            (trade_date, symbol, bar_idx, range_pts,
-                             bar_open, bar_high, bar_low, bar_close,
-                             bar_volume, bar_buy_volume, bar_sell_volume, bar_delta,
-                             cumulative_delta, cvd_open, cvd_high, cvd_low, cvd_close,
-                             ts_start, ts_end, status, source)
-                        VALUES (:td, :sym, :idx, :rp,
-                                :bo, :bh, :bl, :bc,
-                                :bv, :bbv, :bsv, :bd,
-                                :cd, :co, :ch, :cl, :cc,
-                                :ts0, :ts1, :st, 'rithmic')
-                        ON CONFLICT (trade_date, symbol, bar_idx, range_pts) DO UPDATE SET
-                            bar_open = EXCLUDED.bar_open, bar_high = EXCLUDED.bar_high,
-                            bar_low = EXCLUDED.bar_low, bar_close = EXCLUDED.bar_close,
-                            bar_volume = EXCLUDED.bar_volume, bar_buy_volume = EXCLUDED.bar_buy_volume,
-                            bar_sell_volume = EXCLUDED.bar_sell_volume, bar_delta = EXCLUDED.bar_delta,
-                            cumulative_delta = EXCLUDED.cumulative_delta,
-                            cvd_open = EXCLUDED.cvd_open, cvd_high = EXCLUDED.cvd_high,
-                            cvd_low = EXCLUDED.cvd_low, cvd_close = EXCLUDED.cvd_close,
-                            ts_start = EXCLUDED.ts_start, ts_end = EXCLUDED.ts_end,
-                            status = EXCLUDED.status
-                    """), {
-                        "td": today, "sym": RITHMIC_SYMBOL, "idx": b["idx"], "rp": RANGE_PTS_10,
-                        "bo": b["open"], "bh": b["high"], "bl": b["low"], "bc": b["close"],
-                        "bv": b["volume"], "bbv": b["buy_volume"], "bsv": b["sell_volume"], "bd": b["delta"],
-                        "cd": b["cvd"], "co": b["cvd_open"], "ch": b["cvd_high"],
-                        "cl": b["cvd_low"], "cc": b["cvd_close"],
-                        "ts0": b["ts_start"], "ts1": b["ts_end"], "st": b["status"],
-                    })
-            print(f"[rithmic] flushed {len(bars_10)} 10pt range bars to DB", flush=True)
+            for book, upto, _ in pending:
+                book.flushed = max(book.flushed, upto)
+        counts = ", ".join(f"{len(rows)}x{book.range_pts:g}pt" for book, _, rows in pending)
+        print(f"[rithmic] flushed {counts} range bars to DB", flush=True)
     except Exception as e:
         print(f"[rithmic] save error: {e}", flush=True)
 
 
 # ====== PUBLIC API ======
 
-def get_rithmic_bars():
-    """Thread-safe snapshot of completed + forming bars for API."""
+def get_rithmic_bar_view(range_pts=RANGE_PTS):
+    """Read-only BarsView of the closed bars of one size (empty before the first session)."""
     with _lock:
-        completed = list(_state["_completed_bars"])
-        forming = _state["_forming_bar"]
-        cvd_now = _state["_cvd"]
-
-    result = list(completed)
-    if forming and (forming["volume"] > 0 or abs(forming["open"] - forming["close"]) > 0.001):
-        result.append({
-            "idx": len(completed),
-            "open": forming["open"], "high": forming["high"],
-            "low": forming["low"], "close": forming["close"],
-            "volume": forming["volume"], "delta": forming["delta"],
-            "buy_volume": forming["buy"], "sell_volume": forming["sell"],
-            "cvd": cvd_now,
-            "cvd_open": forming["cvd_open"],
-            "cvd_high": forming["cvd_high"],
-            "cvd_low": forming["cvd_low"],
-            "cvd_close": cvd_now,
-            "ts_start": forming["ts_start"], "ts_end": forming["ts_end"],
-            "status": "open",
-        })
+        bars_eng = _state["_bars"]
+        book = bars_eng.books.get(float(range_pts)) if bars_eng else None
+        return book.view() if book else BarsView(float(range_pts), np.zeros((0, len(BAR_COLS))),
+                                                  [], [], [], 0)
+
+
+def get_rithmic_bars(range_pts=RANGE_PTS):
+    """Thread-safe snapshot of completed + forming bars (list of dicts) for API."""
+    with _lock:
+        bars_eng = _state["_bars"]
+        book = bars_eng.books.get(float(range_pts)) if bars_eng else None
+        if book is None:
+            return []
+        view = book.view()
+        forming = book.forming(bars_eng.cvd)
+
+    result = list(view)
+    if forming:
+        result.append(forming)
     return result
 
 
-def get_live_since_idx():
+def get_live_since_idx(range_pts=RANGE_PTS):
     """Return the first bar index built from live ticks (not DB-restored).
 
     Bars with idx < this value are from DB restore after a restart.
     Absorption signals should only fire when trigger bar idx >= this value.
     """
     with _lock:
-        return _state.get("_live_since_idx", 0)
+        bars_eng = _state["_bars"]
+        book = bars_eng.books.get(float(range_pts)) if bars_eng else None
+        return book.live_since_idx if book else 0
 
 
 def get_rithmic_bars_10pt():
     """Thread-safe snapshot of completed + forming 10-pt bars for API."""
-    with _lock:
-        completed = list(_state["_completed_bars_10"])
-        forming = _state["_forming_bar_10"]
-        cvd_now = _state["_cvd"]
-
-    result = list(completed)
-    if forming and (forming["volume"] > 0 or abs(forming["open"] - forming["close"]) > 0.001):
-        result.append({
-            "idx": len(completed),
-            "open": forming["open"], "high": forming["high"],
-            "low": forming["low"], "close": forming["close"],
-            "volume": forming["volume"], "delta": forming["delta"],
-            "buy_volume": forming["buy"], "sell_volume": forming["sell"],
-            "cvd": cvd_now,
-            "cvd_open": forming["cvd_open"],
-            "cvd_high": forming["cvd_high"],
-            "cvd_low": forming["cvd_low"],
-            "cvd_close": cvd_now,
-            "ts_start": forming["ts_start"], "ts_end": forming["ts_end"],
-            "status": "open",
-        })
-    return result
+    return get_rithmic_bars(RANGE_PTS_10)
 
 
 def get_live_since_idx_10pt():
     """Return the first 10-pt bar index built from live ticks."""
-    with _lock:
-        return _state.get("_live_since_idx_10", 0)
+    return get_live_since_idx(RANGE_PTS_10)
 
 
 def get_rithmic_state():
@@ -539,13 +594,17 @@ def get_rithmic_state():
     with _lock:
         total = _state["_aggressor_count"] + _state["_inferred_count"]
         agg_pct = (_state["_aggressor_count"] / total * 100) if total > 0 else 0
+        bars_eng = _state["_bars"]
         return {
             "connected": _state["connected"],
             "trade_date": _state["trade_date"],
             "trade_count": _state["trade_count"],
             "total_volume": _state["total_volume"],
             "cumulative_delta": _state["cumulative_delta"],
-            "completed_bars": len(_state["_completed_bars"]),
+            "completed_bars": bars_eng.books[RANGE_PTS].n if bars_eng else 0,
+            "completed_by_size": {f"{rp:g}": b.n for rp, b in bars_eng.books.items()}
+                                 if bars_eng else {},
+            "tick_cost_us": bars_eng.tick_cost() if bars_eng else None,
             "last_price": _state["last_price"],
             "last_trade_time": _state["_last_trade_time"],
             "aggressor_count": _state["_aggressor_count"],
@@ -644,30 +703,29 @@ async def _rithmic_stream_async(engine, send_telegram_fn):
                                    buf["bid"], buf["ask"], buf["ts"])
                     tc = _state["trade_count"]
                     if tc <= 5 or tc % 1000 == 0:
-                        fb = _state.get("_forming_bar")
-                        fb_range = f"{fb['high'] - fb['low']:.2f}" if fb else "?"
+                        book = _state["_bars"].books[RANGE_PTS]
+                        fb_range = f"{book.f_high - book.f_low:.2f}" if book.f_open is not None else "?"
                         agg_pct = (_state["_aggressor_count"] / max(tc, 1)) * 100
                         print(f"[rithmic] trade #{tc}: price={buf['price']} vol={buf['size']} "
                               f"agg={'BUY' if buf['aggressor'] == 1 else 'SELL' if buf['aggressor'] == 2 else '?'} "
-                              f"completed={len(_state['_completed_bars'])} "
+                              f"completed={book.n} "
                               f"forming_range={fb_range}/{RANGE_PTS} "
-                              f"agg_pct={agg_pct:.0f}%", flush=True)
+                              f"agg_pct={agg_pct:.0f}% "
+                              f"tick_us={_state['_bars'].tick_cost()['mean_us']}", flush=True)
                 buf["order_id"] = None
                 buf["size"] = 0
 
-                # Fire bar-complete callbacks OUTSIDE the lock to avoid deadlocks
+                # Log + fire bar-complete callbacks OUTSIDE the lock to avoid deadlocks
                 if result:
-                    bar_5_snapshot, bar_10_snapshot = result
-                    if bar_5_snapshot and _on_bar_complete:
-                        try:
-                            _on_bar_complete(bar_5_snapshot)
-                        except Exception as e:
-                            print(f"[rithmic] bar_complete callback error: {e}", flush=True)
-                    if bar_10_snapshot and _on_bar_10_complete:
+                    _log_closed(result)
+                    for callback, view, _ in result:
+                        if callback is None:
+                            continue
                         try:
-                            _on_bar_10_complete(bar_10_snapshot)
+                            callback(view)
                         except Exception as e:
-                            print(f"[rithmic] bar_10_complete callback error: {e}", flush=True)
+                            print(f"[rithmic] {view.range_pts:g}pt bar_complete callback error: {e}",
+                                  flush=True)
 
             # Tick callback
             async def on_tick(data):
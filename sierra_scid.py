@@ -0,0 +1,304 @@
+"""
+sierra_scid.py — Vectorized Sierra Chart .scid reader + range-bar/CVD builder.
+
+Shared by vps_data_bridge.py (gap backfill, live tailer) and vps_historical_upload.py.
+
+The old readers decoded one 40-byte record at a time with struct.unpack_from and built
+a datetime + dict per tick, then fed a per-tick Python range-bar builder. A session of
+ES is millions of records, so a gap backfill or a historical upload took minutes.
+
+Here the file is memory-mapped as a NumPy structured array (SCID_DTYPE), the start
+record is found by binary search on the DateTime column, and the whole range is
+decoded/filtered in a handful of array ops. build_range_bars() then cuts bars with
+running max/min over tick chunks (one small NumPy pass per bar, not per tick) and
+produces exactly what RangeBarBuilder.process_tick / force_close produce — same
+fields, same floats, same ISO timestamps, same session split (6 PM ET).
+
+Requirements: numpy, pytz
+"""
+
+import mmap
+import os
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+ET = pytz.timezone("US/Eastern")
+
+SCID_HEADER_SIZE = 56
+SCID_RECORD_SIZE = 40
+SC_EPOCH = datetime(1899, 12, 30)
+_SC_EPOCH64 = np.datetime64("1899-12-30T00:00:00", "us")
+
+# s_IntradayRecord: SCDateTimeMS (int64 microseconds since 1899-12-30, UTC) +
+# OHLC float32 + NumTrades/TotalVolume/BidVolume/AskVolume uint32.
+SCID_DTYPE = np.dtype([
+    ("dt", "<i8"),
+    ("open", "<f4"), ("high", "<f4"), ("low", "<f4"), ("close", "<f4"),
+    ("num_trades", "<u4"), ("volume", "<u4"), ("bid_vol", "<u4"), ("ask_vol", "<u4"),
+])
+assert SCID_DTYPE.itemsize == SCID_RECORD_SIZE
+
+_FIRST_CHUNK = 2048   # ticks scanned per step when looking for a bar close (doubles)
+
+
+class ScidTicks:
+    """Decoded trade ticks as parallel arrays (already filtered: dt > 0, price > 0,
+    volume > 0). dt_us is microseconds since SC_EPOCH, naive UTC."""
+
+    __slots__ = ("dt_us", "price", "low", "volume", "bid_vol", "ask_vol")
+
+    def __init__(self, dt_us, price, low, volume, bid_vol, ask_vol):
+        self.dt_us = dt_us
+        self.price = price
+        self.low = low
+        self.volume = volume
+        self.bid_vol = bid_vol
+        self.ask_vol = ask_vol
+
+    def __len__(self):
+        return len(self.dt_us)
+
+    def iso(self):
+        """ts.isoformat() of every tick, vectorized."""
+        return iso_strings(self.dt_us)
+
+    def iter_dicts(self):
+        """Per-tick dicts in the legacy read_scid_ticks shape ({ts, price, volume, ...})."""
+        for us, p, lo, v, b, a in zip(self.dt_us.tolist(), self.price.tolist(),
+                                      self.low.tolist(), self.volume.tolist(),
+                                      self.bid_vol.tolist(), self.ask_vol.tolist()):
+            yield {"ts": SC_EPOCH + timedelta(microseconds=us), "price": p, "low": lo,
+                   "volume": v, "bid_vol": b, "ask_vol": a}
+
+
+def to_us(ts: datetime) -> int:
+    """Naive datetime -> SCDateTimeMS microseconds."""
+    return (ts - SC_EPOCH) // timedelta(microseconds=1)
+
+
+def iso_strings(dt_us) -> list:
+    """datetime.isoformat() for an array of SCDateTimeMS values (no '.000000' on whole
+    seconds, exactly like Python)."""
+    dt_us = np.asarray(dt_us, dtype=np.int64)
+    s = np.datetime_as_string(_SC_EPOCH64 + dt_us.astype("timedelta64[us]"), unit="us")
+    whole = (dt_us % 1_000_000) == 0
+    out = s.tolist()
+    for i in np.flatnonzero(whole).tolist():
+        out[i] = out[i][:-7]
+    return out
+
+
+def _iso(us: int) -> str:
+    return (SC_EPOCH + timedelta(microseconds=int(us))).isoformat()
+
+
+def _decode(recs, lo=0, since_us=None, since_day_us=None) -> ScidTicks:
+    """Filter + decode a record array slice into ScidTicks (copies out of the map)."""
+    recs = recs[lo:]
+    dt = recs["dt"]
+    high = recs["high"]
+    close = recs["close"]
+    vol = recs["volume"]
+    price = np.where(high > 0, high, close)
+    keep = (dt > 0) & (price > 0) & (vol > 0)
+    if since_us is not None:
+        keep &= dt > since_us
+    if since_day_us is not None:
+        keep &= dt >= since_day_us
+    idx = np.flatnonzero(keep)
+    return ScidTicks(
+        dt_us=dt[idx].astype(np.int64),
+        price=price[idx].astype(np.float64),
+        low=recs["low"][idx].astype(np.float64),
+        volume=vol[idx].astype(np.int64),
+        bid_vol=recs["bid_vol"][idx].astype(np.int64),
+        ask_vol=recs["ask_vol"][idx].astype(np.int64),
+    )
+
+
+def decode_buffer(buf) -> ScidTicks:
+    """Decode whole records from a bytes buffer (the tailer's newly appended data)."""
+    n = len(buf) // SCID_RECORD_SIZE
+    return _decode(np.frombuffer(buf, dtype=SCID_DTYPE, count=n))
+
+
+def num_records(filepath) -> int:
+    return max(0, (os.path.getsize(filepath) - SCID_HEADER_SIZE) // SCID_RECORD_SIZE)
+
+
+def search_after(filepath, target_us: int) -> int:
+    """Index of the first record with dt > target_us (binary search on the mapped file;
+    only ~log2(n) records are touched)."""
+    n = num_records(filepath)
+    if n <= 0:
+        return 0
+    with open(filepath, "rb") as f, \
+            mmap.mmap(f.fileno(), SCID_HEADER_SIZE + n * SCID_RECORD_SIZE,
+                      access=mmap.ACCESS_READ) as mm:
+        recs = np.frombuffer(mm, dtype=SCID_DTYPE, count=n, offset=SCID_HEADER_SIZE)
+        try:
+            return bisect_right(recs["dt"], target_us)
+        finally:
+            del recs
+
+
+def read_ticks(filepath, since_ts=None, since_date=None) -> ScidTicks:
+    """Decode a .scid file into ScidTicks.
+
+    since_ts:   naive UTC datetime — only ticks strictly after it (binary-searched start;
+                the search compares against since_ts in ET like the old reader did,
+                which only ever starts a little early, then filters exactly)
+    since_date: date — only ticks whose UTC date is >= since_date
+    """
+    filepath = Path(filepath)
+    n = num_records(filepath)
+    empty = np.zeros(0, dtype=np.int64)
+    if n <= 0:
+        return ScidTicks(empty, empty.astype(np.float64), empty.astype(np.float64),
+                         empty, empty, empty)
+    since_us = to_us(since_ts) if since_ts is not None else None
+    since_day_us = (to_us(datetime(since_date.year, since_date.month, since_date.day))
+                    if since_date is not None else None)
+
+    with open(filepath, "rb") as f, \
+            mmap.mmap(f.fileno(), SCID_HEADER_SIZE + n * SCID_RECORD_SIZE,
+                      access=mmap.ACCESS_READ) as mm:
+        recs = np.frombuffer(mm, dtype=SCID_DTYPE, count=n, offset=SCID_HEADER_SIZE)
+        try:
+            lo = 0
+            if since_ts is not None and n > 1000:
+                since_et = pytz.utc.localize(since_ts).astimezone(ET).replace(tzinfo=None)
+                lo = max(0, bisect_right(recs["dt"], to_us(since_et)) - 10)
+            elif since_day_us is not None and n > 1000:
+                lo = max(0, bisect_right(recs["dt"], since_day_us - 1) - 10)
+            return _decode(recs, lo, since_us, since_day_us)
+        finally:
+            del recs   # release the buffer export so the map can close
+
+
+# ─── Sessions ────────────────────────────────────────────────────────────────
+
+def session_runs(dt_us):
+    """Split ticks into ES sessions (6 PM ET -> next calendar date).
+
+    Returns [(session_date, start, stop), ...] over consecutive runs — a new run starts
+    whenever the session date changes, exactly like the per-tick rollover checks.
+    """
+    n = len(dt_us)
+    if n == 0:
+        return []
+    d0 = (SC_EPOCH + timedelta(microseconds=int(dt_us.min()))).date() - timedelta(days=1)
+    d1 = (SC_EPOCH + timedelta(microseconds=int(dt_us.max()))).date() + timedelta(days=1)
+    days, bounds = [], []
+    d = d0
+    while d <= d1:
+        cut = ET.localize(datetime(d.year, d.month, d.day, 18)).astimezone(pytz.utc)
+        days.append(d)
+        bounds.append(to_us(cut.replace(tzinfo=None)))
+        d += timedelta(days=1)
+    # tick in [18:00 ET of days[k], 18:00 ET of days[k+1]) -> session days[k] + 1
+    k = np.searchsorted(np.asarray(bounds, dtype=np.int64), dt_us, side="right") - 1
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(k)) + 1))
+    stops = np.concatenate((starts[1:], [n]))
+    return [(days[k[s]] + timedelta(days=1), int(s), int(e))
+            for s, e in zip(starts.tolist(), stops.tolist())]
+
+
+# ─── Range bars ──────────────────────────────────────────────────────────────
+
+def classify(bid_vol, ask_vol, volume):
+    """Vectorized _classify_scid -> (buy, sell, delta) int64 arrays."""
+    buyer = (ask_vol > 0) & (bid_vol == 0)
+    seller = (bid_vol > 0) & (ask_vol == 0)
+    buy = np.where(buyer, volume, np.where(seller, 0, ask_vol))
+    sell = np.where(buyer, 0, np.where(seller, volume, bid_vol))
+    return buy, sell, buy - sell
+
+
+def _bar(idx, o, h, lo, c, vol, delta, buy, sell, cvd_open, cvd_high, cvd_low, cvd_close,
+         ts_start, ts_end):
+    return {
+        "idx": idx,
+        "open": o, "high": h, "low": lo, "close": c,
+        "volume": vol, "delta": delta,
+        "buy_volume": buy, "sell_volume": sell,
+        "cvd": cvd_close,
+        "cvd_open": cvd_open, "cvd_high": cvd_high, "cvd_low": cvd_low,
+        "cvd_close": cvd_close,
+        "ts_start": ts_start, "ts_end": ts_end,
+        "status": "closed",
+    }
+
+
+def _segment_bars(price, dt_us, volume, buy, sell, delta, range_pts,
+                  start_idx=0, start_cvd=0, force_close=True):
+    """Range bars over one session's ticks — RangeBarBuilder semantics:
+
+    the first bar opens on the first tick (and includes it); every later bar opens at
+    the close tick of the previous one (its price + time, not its volume); a bar closes
+    on the first tick where high - low >= range_pts - 0.001; force_close emits the
+    forming bar if it traded.
+    """
+    n = len(price)
+    thresh = range_pts - 0.001
+    cvd = start_cvd + np.cumsum(delta)
+    cum = {k: np.concatenate(([0], np.cumsum(a))) for k, a in
+           (("v", volume), ("b", buy), ("s", sell), ("d", delta))}
+    bars = []
+    idx = start_idx
+    a, first, c_anchor = 0, 0, start_cvd   # anchor tick, first included tick, cvd_open
+    while first < n:
+        run_hi = run_lo = price[a]
+        start, chunk, t = first, _FIRST_CHUNK, None
+        while start < n:
+            end = min(n, start + chunk)
+            mx = np.maximum.accumulate(np.maximum(price[start:end], run_hi))
+            mn = np.minimum.accumulate(np.minimum(price[start:end], run_lo))
+            hit = np.flatnonzero(mx - mn >= thresh)
+            if hit.size:
+                t = start + int(hit[0])
+                hi, lo = float(mx[hit[0]]), float(mn[hit[0]])
+                break
+            run_hi, run_lo = mx[-1], mn[-1]
+            start, chunk = end, chunk * 2
+        last = t if t is not None else n - 1
+        vol = int(cum["v"][last + 1] - cum["v"][first])
+        if t is None:
+            if not (force_close and vol > 0):
+                break
+            hi, lo = float(run_hi), float(run_lo)
+        seg = cvd[first:last + 1]
+        bars.append(_bar(
+            idx, float(price[a]), hi, lo, float(price[last]), vol,
+            int(cum["d"][last + 1] - cum["d"][first]),
+            int(cum["b"][last + 1] - cum["b"][first]),
+            int(cum["s"][last + 1] - cum["s"][first]),
+            int(c_anchor), int(max(c_anchor, seg.max())), int(min(c_anchor, seg.min())),
+            int(cvd[last]), _iso(dt_us[a]), _iso(dt_us[last]),
+        ))
+        idx += 1
+        if t is None:
+            break
+        a, first, c_anchor = t, t + 1, cvd[t]
+    return bars
+
+
+def build_range_bars(ticks: ScidTicks, range_pts=5.0, force_close=True):
+    """[(session_date, bar_dict), ...] for every session in `ticks`, bar_idx and CVD
+    reset per session, the forming bar force-closed at each rollover (and at the end
+    when force_close) — identical to feeding the ticks through
+    RangeBarBuilder.process_tick with reset_session()/force_close() on rollover."""
+    buy, sell, delta = classify(ticks.bid_vol, ticks.ask_vol, ticks.volume)
+    out = []
+    runs = session_runs(ticks.dt_us)
+    for i, (session, s, e) in enumerate(runs):
+        last_run = i == len(runs) - 1
+        for bar in _segment_bars(ticks.price[s:e], ticks.dt_us[s:e], ticks.volume[s:e],
+                                 buy[s:e], sell[s:e], delta[s:e], range_pts,
+                                 force_close=force_close or not last_run):
+            out.append((session, bar))
+    return out
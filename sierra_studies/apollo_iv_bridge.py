@@ -34,7 +34,7 @@ Environment:
   DATABASE_URL — PostgreSQL connection string (same as Railway app)
 
 Requirements:
-  pip install psycopg2-binary sqlalchemy pandas
+  pip install psycopg2-binary sqlalchemy pandas numpy (and a checkout of this repo)
 """
 
 import os
@@ -56,6 +56,14 @@ except ImportError:
     sys.exit(1)
 
 
+# ─── Chain decode ────────────────────────────────────────────────────────────
+# chain_snapshots rows/packed are read through app/chain_columns.decode() (the repo
+# root must be importable — run from a checkout, as the VPS does), so the packed
+# format has exactly one decoder.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.chain_columns import ChainSnapshot, decode as decode_chain  # noqa: E402
+
+
 # ─── Configuration ───────────────────────────────────────────────────────────
 
 DEFAULT_DB_URL = os.environ.get("DATABASE_URL", "")
@@ -133,16 +141,16 @@ class ApolloIVBridge:
 
     # ─── DB Query ────────────────────────────────────────────────────────────
 
-    def fetch_latest_chain(self) -> tuple[datetime, float, list[dict]] | None:
+    def fetch_latest_chain(self) -> tuple[datetime, float, ChainSnapshot] | None:
         """Fetch the most recent chain_snapshot from the database.
 
-        Returns (timestamp, spot, rows_list) or None if no data.
-        The rows are the JSONB array of option chain rows.
+        Returns (timestamp, spot, chain) or None if no data. `chain` is a columnar
+        ChainSnapshot (packed or legacy JSONB rows, via chain_columns.decode).
         """
         try:
             with self.engine.connect() as conn:
                 result = conn.execute(text("""
-                    SELECT ts, spot, columns, rows
+                    SELECT ts, spot, rows, packed
                     FROM chain_snapshots
                     ORDER BY ts DESC
                     LIMIT 1
@@ -151,45 +159,16 @@ class ApolloIVBridge:
                 if not result:
                     return None
 
-                ts = result["ts"]
-                spot = float(result["spot"])
-                columns = json.loads(result["columns"]) if isinstance(result["columns"], str) else result["columns"]
-                raw_rows = json.loads(result["rows"]) if isinstance(result["rows"], str) else result["rows"]
-
-                # Convert array-of-arrays to list-of-dicts using column names
-                # columns format: ["Volume","Open Int","IV","Gamma","Delta","BID","BID QTY",
-                #                   "ASK","ASK QTY","LAST","Strike","LAST","ASK","ASK QTY",
-                #                   "BID","BID QTY","Delta","Gamma","IV","Open Int","Volume"]
-                #
-                # This is side-by-side format. We need to extract put IVs.
-                # Calls are columns 0-9, Strike is 10, Puts are columns 11-20.
-                # Call IV = columns[2], Put IV = columns[18]
-
-                rows = []
-                for arr in raw_rows:
-                    if len(arr) < 21:
-                        continue
-                    row = {}
-                    for i, col in enumerate(columns):
-                        row[f"{col}_{i}"] = arr[i]
-                    # Extract the fields we need
-                    strike = arr[10]  # Strike column
-                    put_iv = arr[18]  # Put IV (right side)
-                    call_iv = arr[2]  # Call IV (left side)
-                    if strike is not None:
-                        rows.append({
-                            "strike": float(strike) if strike else 0,
-                            "put_iv": float(put_iv) if put_iv else 0,
-                            "call_iv": float(call_iv) if call_iv else 0,
-                        })
-
-                return (ts, spot, rows)
+                chain = decode_chain(result["packed"], result["rows"])
+                if chain is None:
+                    return None
+                return (result["ts"], float(result["spot"]), chain)
 
         except Exception as e:
             log.error(f"DB query failed: {e}")
             return None
 
-    def fetch_chain_at_time(self, target_time: datetime) -> tuple[datetime, float, list[dict]] | None:
+    def fetch_chain_at_time(self, target_time: datetime) -> tuple[datetime, float, ChainSnapshot] | None:
         """Fetch the chain_snapshot closest to a target time (for lookback comparison).
 
         Finds the snapshot closest to target_time within +/- 3 minutes.
@@ -197,7 +176,7 @@ class ApolloIVBridge:
         try:
             with self.engine.connect() as conn:
                 result = conn.execute(text("""
-                    SELECT ts, spot, columns, rows
+                    SELECT ts, spot, rows, packed
                     FROM chain_snapshots
                     WHERE ts BETWEEN :t_start AND :t_end
                     ORDER BY ABS(EXTRACT(EPOCH FROM ts - :target))
@@ -211,26 +190,10 @@ class ApolloIVBridge:
                 if not result:
                     return None
 
-                ts = result["ts"]
-                spot = float(result["spot"])
-                columns = json.loads(result["columns"]) if isinstance(result["columns"], str) else result["columns"]
-                raw_rows = json.loads(result["rows"]) if isinstance(result["rows"], str) else result["rows"]
-
-                rows = []
-                for arr in raw_rows:
-                    if len(arr) < 21:
-                        continue
-                    strike = arr[10]
-                    put_iv = arr[18]
-                    call_iv = arr[2]
-                    if strike is not None:
-                        rows.append({
-                            "strike": float(strike) if strike else 0,
-                            "put_iv": float(put_iv) if put_iv else 0,
-                            "call_iv": float(call_iv) if call_iv else 0,
-                        })
-
-                return (ts, spot, rows)
+                chain = decode_chain(result["packed"], result["rows"])
+                if chain is None:
+                    return None
+                return (result["ts"], float(result["spot"]), chain)
 
         except Exception as e:
             log.error(f"DB lookback query failed: {e}")
@@ -238,21 +201,15 @@ class ApolloIVBridge:
 
     # ─── IV Extraction ───────────────────────────────────────────────────────
 
-    def extract_put_ivs(self, rows: list[dict], target_strikes: list[float]) -> dict:
+    def extract_put_ivs(self, chain, target_strikes: list[float]) -> dict:
         """Extract put IVs at specific strikes from chain data.
 
         Returns {strike: iv, ...}. Missing strikes get iv=0.
         """
-        # Build strike -> put_iv map
-        strike_map = {}
-        for r in rows:
-            s = r["strike"]
-            if s > 0 and r["put_iv"] > 0:
-                strike_map[s] = r["put_iv"]
-
         result = {}
         for ts in target_strikes:
-            result[ts] = strike_map.get(ts, 0.0)
+            iv = chain.value(ts, "P_IV")
+            result[ts] = iv if iv and iv > 0 else 0.0
 
         return result
 
@@ -302,7 +259,7 @@ class ApolloIVBridge:
             return {"direction": 0, "iv_change": 0, "spot_price": 0,
                     "spot_change": 0, "details": "No chain data"}
 
-        now_ts, spot, rows = latest
+        now_ts, spot, chain = latest
 
         # 2. Update reference strikes
         self.update_reference_strikes(spot, now_ts)
@@ -315,11 +272,11 @@ class ApolloIVBridge:
             return {"direction": 0, "iv_change": 0, "spot_price": spot,
                     "spot_change": 0, "details": f"No lookback data at {lookback_target}"}
 
-        lb_ts, lb_spot, lb_rows = lookback
+        lb_ts, lb_spot, lb_chain = lookback
 
         # 4. Extract IVs at reference strikes (current and lookback)
-        current_ivs = self.extract_put_ivs(rows, self._ref_strikes)
-        lookback_ivs = self.extract_put_ivs(lb_rows, self._ref_strikes)
+        current_ivs = self.extract_put_ivs(chain, self._ref_strikes)
+        lookback_ivs = self.extract_put_ivs(lb_chain, self._ref_strikes)
 
         # 5. Compute IV changes
         iv_changes = {}
@@ -0,0 +1,212 @@
+"""
+Trail simulator equivalence check — app.trail_sim vs the loop walkers it stands in for.
+Usage: python tools/trail_sim_check.py [--trades 2000] [--seed 7]
+
+Replays random price paths through simulate() (parameters from portal_trail() /
+real_trail(), i.e. from the _trail_params / _SETUP_TRAIL_OVERRIDE tables) and through:
+  1. chain: the per-tick trailing loop _calculate_setup_outcome ran before it called
+     simulate() (kept below verbatim) — exit tick, final stop, max favourable
+  2. live:  real_trader.update_trail itself, tick by tick, on MES-tick paths (broker
+     stop check first, then the trail update; update_stop only records the new level)
+  3. mes:   the mes_walk bar loop from before it became a simulate() wrapper, and the
+     current mes_sim_backfill.mes_walk
+Prints the mismatch count per walker and exits 1 on any mismatch.
+"""
+import os, sys, argparse, random
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import trail_sim, mes_sim_backfill
+from app import real_trader as rt
+
+# Shapes of main._calculate_setup_outcome's _trail_params (AG Short has no initial_sl:
+# its stop is LIS-based and passed in).
+CHAIN_PARAMS = [
+    {"mode": "continuous", "activation": 10, "gap": 10, "initial_sl": 12},
+    {"mode": "continuous", "activation": 15, "gap": 5, "initial_sl": 14},
+    {"mode": "hybrid", "be_trigger": 8, "activation": 10, "gap": 5, "initial_sl": 8},
+    {"mode": "hybrid", "be_trigger": 10, "activation": 12, "gap": 5},
+    {"mode": "hybrid", "be_trigger": 10, "activation": 10, "gap": 5, "initial_sl": 14},
+    {"mode": "continuous", "activation": 10, "gap": 8, "initial_sl": 8},
+]
+LIVE_SETUPS = ["DD Exhaustion", "Skew Charm", "AG Short", "GEX Long"]
+
+
+def _path(rng, n, start, step, tick=None):
+    px, out = start, []
+    for _ in range(n):
+        px += rng.gauss(0, step)
+        out.append(round(round(px / tick) * tick, 2) if tick else round(px, 2))
+    return out
+
+
+# -- 1. chain walk (pre-simulate() trailing loop of _calculate_setup_outcome) --
+
+def chain_loop(prices, spot, is_long, tp, stop_level):
+    trail_max_fav = 0.0
+    for i, price in enumerate(prices):
+        profit = price - spot if is_long else spot - price
+        if profit > trail_max_fav:
+            trail_max_fav = profit
+        trail_lock = None
+        if tp["mode"] == "continuous":
+            if trail_max_fav >= tp["activation"]:
+                trail_lock = trail_max_fav - tp["gap"]
+        elif tp["mode"] == "hybrid":
+            if trail_max_fav >= tp["activation"]:
+                trail_lock = trail_max_fav - tp["gap"]
+            elif tp["be_trigger"] is not None and trail_max_fav >= tp["be_trigger"]:
+                trail_lock = 0  # breakeven
+        if trail_lock is not None:
+            if is_long:
+                new_stop = spot + trail_lock
+                if new_stop > stop_level:
+                    stop_level = new_stop
+            else:
+                new_stop = spot - trail_lock
+                if new_stop < stop_level:
+                    stop_level = new_stop
+        if (is_long and price <= stop_level) or (not is_long and price >= stop_level):
+            return i, stop_level, trail_max_fav
+    return None, stop_level, trail_max_fav
+
+
+def check_chain(rng, n):
+    bad = 0
+    for _ in range(n):
+        tp = rng.choice(CHAIN_PARAMS)
+        is_long = rng.random() < 0.5
+        prices = _path(rng, rng.randint(5, 200), 5800 + rng.random() * 100, 2.0)
+        spot = prices[0]
+        if "initial_sl" in tp:
+            stop0 = spot - tp["initial_sl"] if is_long else spot + tp["initial_sl"]
+        else:
+            lis = round(spot + (rng.uniform(-25, -3) if is_long else rng.uniform(3, 25)), 2)
+            stop0 = max(lis - 5, spot - 20) if is_long else min(lis + 5, spot + 20)
+        want = chain_loop(prices, spot, is_long, tp, stop0)
+        # the call _calculate_setup_outcome makes
+        r = trail_sim.simulate(prices, prices, prices, 0, len(prices), spot, is_long,
+                               **trail_sim.portal_trail(tp, sl=abs(spot - stop0)))
+        got = (int(r["exit_idx"][0]) if r["reason"][0] == trail_sim.STOP else None,
+               float(r["stop_out"][0]), float(r["mfe"][0]))
+        if got != want:
+            bad += 1
+            if bad <= 3:
+                print(f"  chain mismatch tp={tp} long={is_long}: loop={want} sim={got}")
+    return bad
+
+
+# -- 2. live update_trail --
+
+def live_loop(setup, prices, fill, is_long, stop0):
+    lid = -1
+    rt._active_orders[lid] = {"status": "filled", "fill_price": fill, "setup_name": setup,
+                              "direction": "long" if is_long else "short",
+                              "current_stop": stop0, "max_favorable": 0}
+    try:
+        for i, price in enumerate(prices):
+            stop = rt._active_orders[lid]["current_stop"]
+            if (is_long and price <= stop) or (not is_long and price >= stop):
+                return i, stop
+            rt.update_trail(lid, price)
+        return None, rt._active_orders[lid]["current_stop"]
+    finally:
+        rt._active_orders.pop(lid, None)
+
+
+def check_live(rng, n):
+    def _record(lid, px):
+        rt._active_orders[lid]["current_stop"] = px
+    rt.update_stop = _record
+    os.environ["SPX_EXIT_ENABLED"] = "false"
+    bad = 0
+    for _ in range(n):
+        setup = rng.choice(LIVE_SETUPS)
+        is_long = rng.random() < 0.5
+        prices = _path(rng, rng.randint(5, 200), 5800 + rng.random() * 100, 2.0, tick=rt.MES_TICK_SIZE)
+        fill, sl = prices[0], rng.choice([8.0, 12.0, 14.0])
+        want = live_loop(setup, prices, fill, is_long, fill - sl if is_long else fill + sl)
+        r = trail_sim.simulate(prices, prices, prices, 0, len(prices), fill, is_long,
+                               **trail_sim.real_trail(setup, sl))
+        hit = r["reason"][0] == trail_sim.STOP
+        got = (int(r["exit_idx"][0]) if hit else None,
+               float(r["stop"][0] if hit else r["stop_out"][0]))
+        if got != want:
+            bad += 1
+            if bad <= 3:
+                print(f"  live mismatch {setup} long={is_long}: update_trail={want} sim={got}")
+    return bad
+
+
+# -- 3. mes_walk (bar loop before it wrapped simulate()) --
+
+def mes_loop(bars, entry_es, is_long, sl_pts, be_trigger, be_lock, trail_act, trail_gap, max_minutes):
+    stop = entry_es - sl_pts if is_long else entry_es + sl_pts
+    max_fav = max_adv = 0.0
+    be_done = False
+    cutoff = bars[0][0] + timedelta(minutes=max_minutes)
+    for ts_s, ts_e, b_o, b_h, b_l, b_c in bars:
+        if ts_s > cutoff:
+            break
+        fav = b_h - entry_es if is_long else entry_es - b_l
+        adv = entry_es - b_l if is_long else b_h - entry_es
+        max_fav, max_adv = max(max_fav, fav), max(max_adv, adv)
+        if (is_long and b_l <= stop) or ((not is_long) and b_h >= stop):
+            pnl = (stop - entry_es) if is_long else (entry_es - stop)
+            return {"pnl": pnl, "mfe": max_fav, "mae": max_adv, "reason": "stop",
+                    "exit_ts": ts_e, "exit_price": stop}
+        if (not be_done) and be_trigger is not None and max_fav >= be_trigger:
+            be_done = True
+            new_stop = entry_es + be_lock if is_long else entry_es - be_lock
+            stop = max(stop, new_stop) if is_long else min(stop, new_stop)
+        if trail_act is not None and max_fav >= trail_act:
+            ts = entry_es + (max_fav - trail_gap) if is_long else entry_es - (max_fav - trail_gap)
+            stop = max(stop, ts) if is_long else min(stop, ts)
+    ts_s, ts_e, b_o, b_h, b_l, b_c = bars[-1]
+    pnl = (b_c - entry_es) if is_long else (entry_es - b_c)
+    return {"pnl": pnl, "mfe": max_fav, "mae": max_adv, "reason": "eod",
+            "exit_ts": ts_e, "exit_price": b_c}
+
+
+def check_mes(rng, n):
+    bad = 0
+    t0 = datetime(2026, 6, 1, 9, 30)
+    for _ in range(n):
+        p = rng.choice(list(mes_sim_backfill._DEFAULT_PARAMS.values()))
+        closes = _path(rng, rng.randint(1, 150), 5800 + rng.random() * 100, 3.0, tick=0.25)
+        bars, t = [], t0
+        for c in closes:
+            o = round(c + rng.choice([-1, 1]) * 0.25 * rng.randint(0, 12), 2)
+            h = max(o, c) + 0.25 * rng.randint(0, 8)
+            l = min(o, c) - 0.25 * rng.randint(0, 8)
+            dt = timedelta(seconds=rng.randint(10, 300))
+            bars.append((t, t + dt, o, h, l, c))
+            t += dt
+        args = (bars, bars[0][2], rng.random() < 0.5, p["sl"], p["be_trigger"], p["be_lock"],
+                p["trail_act"], p["trail_gap"], rng.choice([30, 60, 120, 390]))
+        want, got = mes_loop(*args), mes_sim_backfill.mes_walk(*args)
+        if want != got:
+            bad += 1
+            if bad <= 3:
+                print(f"  mes mismatch {p}: loop={want} mes_walk={got}")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trades", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=7)
+    a = ap.parse_args()
+    rng = random.Random(a.seed)
+    total = 0
+    for name, fn in (("chain", check_chain), ("live", check_live), ("mes", check_mes)):
+        bad = fn(rng, a.trades)
+        total += bad
+        print(f"{name:5s} {a.trades} trades, {bad} mismatches")
+    sys.exit(1 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
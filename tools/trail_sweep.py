@@ -0,0 +1,464 @@
+"""
+Trail / SL parameter sweep — cached day paths, process pool, walk-forward + LOMO splits.
+Usage: railway run python tools/trail_sweep.py --setup "DD Exhaustion" --direction long \
+           --source es --start 2026-03-23 --sl 12 --act 8,10,12,15,20 --gap 3,5,8,10
+
+Replaces the one-off sweep scripts (_sc_trail_sweep*.py, _tmp_dd_trail_sweep*.py,
+_tmp_ag_sl_sweep.py, ...), which re-queried bars per trade and looped params x trades
+serially.
+
+  1. trades: setup_log rows matching the setup filter (setup, direction, dates, and an
+     optional extra SQL predicate on setup_log)
+  2. paths:  each session day's path (5pt ES range bars from the ES_DATA_SOURCE table,
+     or spx_ohlc_1m, up to the cash close) is queried ONCE and — once the day's path
+     reaches the close — kept in exports/sweep_cache/paths/. All days are laid end to
+     end in ONE shared-memory block every pool worker attaches to
+  3. grid:   cells (sl, be_trigger, be_lock, activation, gap, target, max_hold) fan out
+     over a process pool; a task prices every trade for a slice of cells in one
+     app.trail_sim.simulate() batch
+  4. result: tidy table (one row per trade x cell), cached per trade filter under
+     exports/sweep_cache/results/ — a rerun with a widened grid (or a later --end)
+     only computes the missing (trade, cell) pairs
+  5. splits: walk_forward() / lomo() pick the best cell in-sample per fold (by month)
+     and score it out of sample
+
+Library use (repo root on sys.path):
+    from tools.trail_sweep import Sweep, grid, walk_forward, lomo
+    sw = Sweep(engine, "DD Exhaustion", direction="long", source="es", start="2026-03-23")
+    df = sw.run(grid(sl=[12], activation=[8, 10, 12], gap=[3, 5, 10]))
+    print(walk_forward(df)); print(lomo(df))
+"""
+import os, sys, argparse, hashlib, itertools, json, pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, time as dtime
+from multiprocessing import shared_memory
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text, bindparam
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from app import trail_sim  # noqa: E402
+
+ET = ZoneInfo("America/New_York")
+CACHE_DIR = os.path.join(ROOT, "exports", "sweep_cache")
+
+# Grid cell fields and their "rule off" defaults (None = off / to the close)
+PARAMS = {"sl": 12.0, "be_trigger": None, "be_lock": 0.0, "activation": None, "gap": 0.0,
+          "target": None, "max_hold": None, "be_below_activation": False}
+
+_SOURCES = {
+    # name: (SQL for a set of session days -> trade_date, ts, o, h, l, c ordered by time)
+    # {es_table}/{es_filter}: the ES bar table the live outcome path reads (_es_source)
+    "es": """
+        SELECT trade_date, ts_start, bar_open, bar_high, bar_low, bar_close
+        FROM {es_table}
+        WHERE trade_date = ANY(:days) AND range_pts = 5 AND status = 'closed'{es_filter}
+        ORDER BY trade_date, bar_idx
+    """,
+    "spx": """
+        SELECT trade_date, ts, bar_open, bar_high, bar_low, bar_close
+        FROM spx_ohlc_1m
+        WHERE trade_date = ANY(:days)
+        ORDER BY ts
+    """,
+}
+
+
+# A day's path is complete (safe to cache) once its last bar is this close to the cash
+# close — the same tolerances main._outcome_path_complete checkpoints the backfill on.
+_CLOSE_SLACK_MIN = {"es": 10, "spx": 5}
+
+
+def _es_source():
+    """(table, extra WHERE) for ES bars, routed by ES_DATA_SOURCE exactly like
+    main._es_bars_table_filter, so a sweep replays the bars live outcomes use."""
+    if (os.getenv("ES_DATA_SOURCE", "sierra").strip().lower() or "sierra") == "rithmic":
+        return "es_range_bars", " AND source = 'rithmic'"
+    return "vps_es_range_bars", ""
+
+
+def _session_close(day):
+    """Cash close (ET) of a session day — mirrors main._session_close (13:00 on Jul 3 /
+    Dec 24 Mon-Thu and the day after Thanksgiving, 16:00 otherwise)."""
+    if day.weekday() <= 3 and (day.month, day.day) in ((7, 3), (12, 24)):
+        return dtime(13, 0)
+    if day.month == 11 and day.weekday() == 4 and 23 <= day.day <= 29:
+        return dtime(13, 0)
+    return dtime(16, 0)
+
+
+def grid(**values):
+    """Cartesian grid of cells: grid(sl=[8, 12], activation=[10, 15], gap=[5]).
+    Fields not given take their PARAMS default."""
+    unknown = set(values) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"unknown grid fields: {sorted(unknown)}")
+    keys = list(values)
+    return [{**PARAMS, **dict(zip(keys, combo))}
+            for combo in itertools.product(*(values[k] for k in keys))]
+
+
+def _closed_days(df, partial=()):
+    """Results of closed sessions only: a trade on today's still-growing path, or on a
+    day whose path stopped short of the close, must be recomputed on the next run, never
+    served from the result cache (as load_paths never caches those paths). None when
+    there are none."""
+    if df is None or df.empty:
+        return None
+    today = datetime.now(ET).date()
+    df = df[df["ts"].map(lambda x: x.date() < today and x.date() not in partial)]
+    df = df.reset_index(drop=True)
+    return None if df.empty else df
+
+
+def cell_key(cell):
+    return "|".join(f"{k}={'-' if cell.get(k, d) is None else cell.get(k, d)}"
+                    for k, d in PARAMS.items())
+
+
+# ---------------------------------------------------------------------------
+# Pool workers — attach to the shared path block once, then price cell slices
+# ---------------------------------------------------------------------------
+_shm = None
+_path = None
+
+
+def _attach(name, shape):
+    global _shm, _path
+    _shm = shared_memory.SharedMemory(name=name)
+    _path = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+
+
+def _price_cells(trades, cells):
+    """Every trade x every cell in one trail_sim batch. Returns per-cell result arrays."""
+    t, _o, h, l, c = _path
+    start, day_end, entry, is_long = trades
+    m, k = len(start), len(cells)
+    col = lambda f: np.repeat([np.nan if cl[f] is None else cl[f] for cl in cells], m)
+    S = np.tile(start, k)
+    E = np.tile(day_end, k)
+    hold = col("max_hold")
+    capped = ~np.isnan(hold)
+    if capped.any():
+        cut = t[S[capped]] + hold[capped] * 60.0
+        E[capped] = np.minimum(E[capped], np.searchsorted(t, cut, side="right"))
+    out = {}
+    for bba in (False, True):
+        sel = np.repeat([bool(cl["be_below_activation"]) == bba for cl in cells], m)
+        if not sel.any():
+            continue
+        r = trail_sim.simulate(
+            h, l, c, S[sel], E[sel], np.tile(entry, k)[sel], np.tile(is_long, k)[sel],
+            col("sl")[sel], be_trigger=col("be_trigger")[sel], be_lock=col("be_lock")[sel],
+            activation=col("activation")[sel], gap=col("gap")[sel], target=col("target")[sel],
+            be_below_activation=bba)
+        for f in ("pnl", "reason", "mfe", "mae", "exit_idx"):
+            out.setdefault(f, np.empty(m * k, dtype=r[f].dtype))[sel] = r[f]
+    held = np.where(out["exit_idx"] >= 0, (t[np.maximum(out["exit_idx"], 0)] - t[S]) / 60.0, np.nan)
+    return {f: v.reshape(k, m) for f, v in [*out.items(), ("held_min", held)]}
+
+
+class Sweep:
+    """One trade universe (setup filter + path source) and its result cache."""
+
+    def __init__(self, engine, setup, direction=None, source="es", start=None, end=None,
+                 where=None, workers=None):
+        if source not in _SOURCES:
+            raise ValueError(f"source must be one of {sorted(_SOURCES)}")
+        self.engine = engine
+        self.setup, self.direction, self.source = setup, direction, source
+        self.start, self.end, self.where = start, end, where
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        # Cache files are keyed by the bar table too: switching ES_DATA_SOURCE must not
+        # serve paths / results built from the other feed.
+        self.path_tag = f"es-{_es_source()[0]}" if source == "es" else source
+        self.partial_days = set()   # days whose path stopped short of the close
+        tag = json.dumps([setup, direction, self.path_tag, start, where])
+        self.cache_file = os.path.join(
+            CACHE_DIR, "results", f"{source}_{hashlib.sha1(tag.encode()).hexdigest()[:12]}.pkl")
+
+    # -- inputs -------------------------------------------------------------
+    def load_trades(self):
+        sql = "SELECT id, ts, direction, spot, abs_es_price FROM setup_log WHERE setup_name = :setup"
+        params = {"setup": self.setup}
+        if self.direction:
+            sql += " AND lower(direction) IN :dirs"
+            params["dirs"] = ("long", "bullish") if self.direction == "long" else ("short", "bearish")
+        if self.start:
+            sql += " AND ts >= :start"
+            params["start"] = self.start
+        if self.end:
+            sql += " AND ts < :end"
+            params["end"] = self.end
+        if self.where:
+            sql += f" AND ({self.where})"
+        stmt = text(sql + " ORDER BY ts")
+        if self.direction:
+            stmt = stmt.bindparams(bindparam("dirs", expanding=True))
+            params["dirs"] = list(params["dirs"])
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt, params).fetchall()
+        return [{"id": r[0], "ts": r[1], "is_long": (r[2] or "").lower() in ("long", "bullish"),
+                 "spot": r[3], "es": r[4]} for r in rows]
+
+    def load_paths(self, days):
+        """{day: (t, o, h, l, c)} — disk cache first, one query for the missing days.
+
+        Only a closed day whose path reaches the session close is cached: an empty or
+        truncated path (ES bars uploaded later by GapBackfiller / vps_historical_upload)
+        is re-queried on every run until the bars are there, and recorded in
+        self.partial_days so its trade results stay out of the result cache too.
+        """
+        pdir = os.path.join(CACHE_DIR, "paths")
+        os.makedirs(pdir, exist_ok=True)
+        today = datetime.now(ET).date()
+        paths, missing = {}, []
+        for d in days:
+            f = os.path.join(pdir, f"{self.path_tag}_{d}.npy")
+            if os.path.exists(f):
+                paths[d] = np.load(f)
+            else:
+                missing.append(d)
+        if missing:
+            sql = _SOURCES[self.source]
+            if self.source == "es":
+                es_table, es_filter = _es_source()
+                sql = sql.format(es_table=es_table, es_filter=es_filter)
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(sql), {"days": missing}).fetchall()
+            by_day = {}
+            for td, ts, o, h, l, c in rows:
+                if o is None or ts.astimezone(ET).time() > _session_close(td):
+                    continue
+                by_day.setdefault(td, []).append((ts.timestamp(), o, h, l, c))
+            for d in missing:
+                arr = np.array(by_day.get(d, []), dtype=np.float64).reshape(-1, 5).T
+                paths[d] = arr
+                # a live session's path is still growing; a short one may still be filled
+                if d < today and self._path_complete(d, arr):
+                    np.save(os.path.join(pdir, f"{self.path_tag}_{d}.npy"), arr)
+                else:
+                    self.partial_days.add(d)
+            print(f"[sweep] loaded {len(missing)} day paths from DB, "
+                  f"{len(days) - len(missing)} from cache", flush=True)
+            if self.partial_days:
+                print(f"[sweep] {len(self.partial_days)} day(s) with no / partial path, "
+                      f"not cached", flush=True)
+        return paths
+
+    def _path_complete(self, day, arr):
+        """True when the day's path ends within the close slack of the session close."""
+        if not arr.shape[1]:
+            return False
+        close = datetime.combine(day, _session_close(day), tzinfo=ET)
+        cut = close - timedelta(minutes=_CLOSE_SLACK_MIN[self.source])
+        return arr[0, -1] >= cut.timestamp()
+
+    # -- run ----------------------------------------------------------------
+    def run(self, cells, fresh=False):
+        """Tidy DataFrame: one row per (trade, cell) for every requested cell."""
+        cached = None
+        if not fresh and os.path.exists(self.cache_file):
+            with open(self.cache_file, "rb") as f:
+                cached = _closed_days(pickle.load(f))
+        trades = self.load_trades()
+        if not trades:
+            return pd.DataFrame()
+        by_day = {}
+        for tr in trades:
+            by_day.setdefault(tr["ts"].astimezone(ET).date(), []).append(tr)
+        keys = [cell_key(c) for c in cells]
+        have = cached.groupby("cell")["id"].apply(set).to_dict() if cached is not None else {}
+        ids = {tr["id"] for tr in trades}
+        todo = {}     # frozenset(missing ids) -> [cells]
+        for cell, key in zip(cells, keys):
+            miss = frozenset(ids - have.get(key, set()))
+            if miss:
+                todo.setdefault(miss, []).append(cell)
+        frames = [cached[cached["cell"].isin(keys) & cached["id"].isin(ids)]] if cached is not None else []
+        if todo:
+            new = self._compute(by_day, todo)
+            frames.append(new)
+            keep = [cached] if cached is not None else []
+            closed = _closed_days(pd.concat(keep + [new], ignore_index=True),
+                                  self.partial_days)
+            if closed is not None:
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+                with open(self.cache_file, "wb") as f:
+                    pickle.dump(closed, f)
+        df = pd.concat(frames, ignore_index=True)
+        if df.empty:      # no bars / no trades on a path: _compute's bare DataFrame
+            return df
+        return df.sort_values(["cell", "ts"]).reset_index(drop=True)
+
+    def _compute(self, by_day, todo):
+        need = set().union(*todo)
+        need_days = sorted(d for d, trs in by_day.items() if any(tr["id"] in need for tr in trs))
+        paths = self.load_paths(need_days)
+        # Lay the days end to end: one block, trade windows never cross a day end
+        blocks, offsets, n = [], {}, 0
+        for d in need_days:
+            offsets[d] = (n, n + paths[d].shape[1])
+            blocks.append(paths[d])
+            n += paths[d].shape[1]
+        if not n:
+            print("[sweep] no bars for the requested days", flush=True)
+            return pd.DataFrame()
+        block = np.concatenate(blocks, axis=1)
+        shm = shared_memory.SharedMemory(create=True, size=block.nbytes)
+        try:
+            np.ndarray(block.shape, dtype=np.float64, buffer=shm.buf)[:] = block
+            t = block[0]
+            frames = []
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_attach,
+                                     initargs=(shm.name, block.shape)) as pool:
+                futs = []
+                for miss, cells in todo.items():
+                    rows = []
+                    for d in need_days:
+                        lo, hi = offsets[d]
+                        for tr in by_day.get(d, []):
+                            if tr["id"] not in miss:
+                                continue
+                            s = lo + int(np.searchsorted(t[lo:hi], tr["ts"].timestamp(), side="left"))
+                            if s >= hi:
+                                continue   # signal after the day's last bar
+                            px = tr["es"] if self.source == "es" else tr["spot"]
+                            entry = float(px) if px and float(px) > 1000 else float(block[1, s])
+                            rows.append((tr, s, hi, entry))
+                    if not rows:
+                        continue
+                    arrs = (np.array([r[1] for r in rows]), np.array([r[2] for r in rows]),
+                            np.array([r[3] for r in rows]), np.array([r[0]["is_long"] for r in rows]))
+                    step = max(1, len(cells) // (self.workers * 4))
+                    for i in range(0, len(cells), step):
+                        part = cells[i:i + step]
+                        futs.append((rows, part, pool.submit(_price_cells, arrs, part)))
+                for rows, part, fut in futs:
+                    frames.append(self._tidy(rows, part, fut.result()))
+        finally:
+            shm.close()
+            shm.unlink()
+        print(f"[sweep] computed {sum(len(f) for f in frames)} trade x cell results", flush=True)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _tidy(self, rows, cells, res):
+        out = []
+        for j, cell in enumerate(cells):
+            df = pd.DataFrame({
+                "id": [r[0]["id"] for r in rows],
+                "ts": [r[0]["ts"].astimezone(ET) for r in rows],
+                "is_long": [r[0]["is_long"] for r in rows],
+                "entry": [r[3] for r in rows],
+                "pnl": res["pnl"][j], "mfe": res["mfe"][j], "mae": res["mae"][j],
+                "reason": [trail_sim.REASONS[int(x)] for x in res["reason"][j]],
+                "held_min": res["held_min"][j],
+            })
+            for k in PARAMS:
+                df[k] = cell[k]
+            df["cell"] = cell_key(cell)
+            out.append(df)
+        df = pd.concat(out, ignore_index=True)
+        df["month"] = df["ts"].map(lambda x: x.strftime("%Y-%m"))
+        return df
+
+
+# ---------------------------------------------------------------------------
+# Summaries and splits
+# ---------------------------------------------------------------------------
+def summarize(df):
+    """Per cell: n, total, avg, WR%, maxDD (equity in trade-time order)."""
+    def one(g):
+        p = g.sort_values("ts")["pnl"].to_numpy()
+        eq = np.cumsum(p)
+        dd = float((eq - np.maximum.accumulate(np.maximum(eq, 0))).min()) if len(p) else 0.0
+        return pd.Series({"n": len(p), "total": round(p.sum(), 1), "avg": round(p.mean(), 2),
+                          "wr": round(100.0 * (p > 0).mean(), 1), "maxdd": round(dd, 1)})
+    return df.groupby("cell").apply(one, include_groups=False).sort_values("total", ascending=False)
+
+
+def _fold(df, train_months, test_month, metric):
+    s_tr = summarize(df[df["month"].isin(train_months)])
+    s_te = summarize(df[df["month"] == test_month])
+    best = s_tr[metric].idxmax()
+    return {"train": f"{train_months[0]}..{train_months[-1]}", "test": test_month,
+            "cell": best, "train_" + metric: s_tr.loc[best, metric],
+            "test_n": int(s_te.loc[best, "n"]), "test_total": s_te.loc[best, "total"],
+            "test_wr": s_te.loc[best, "wr"], "oracle_cell": s_te["total"].idxmax(),
+            "oracle_total": s_te["total"].max()}
+
+
+def walk_forward(df, min_train_months=1, metric="total"):
+    """Expanding window by month: fit on months[:i], score on months[i]."""
+    months = sorted(df["month"].unique())
+    return pd.DataFrame([_fold(df, months[:i], months[i], metric)
+                         for i in range(min_train_months, len(months))])
+
+
+def lomo(df, metric="total"):
+    """Leave-one-month-out: fit on every other month, score on the held-out one."""
+    months = sorted(df["month"].unique())
+    if len(months) < 2:
+        return pd.DataFrame()
+    return pd.DataFrame([_fold(df, [m for m in months if m != test], test, metric)
+                         for test in months])
+
+
+def _values(s, cast=float):
+    """'8,10,12' -> [8.0, 10.0, 12.0]; 'none' -> None."""
+    return [None if v.strip().lower() in ("none", "-") else cast(v) for v in s.split(",")]
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Trail / SL parameter sweep")
+    parser.add_argument("--setup", required=True, help="Setup name (e.g., 'Skew Charm')")
+    parser.add_argument("--direction", choices=("long", "short"))
+    parser.add_argument("--source", choices=sorted(_SOURCES), default="es")
+    parser.add_argument("--start", help="First signal date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date, exclusive (YYYY-MM-DD)")
+    parser.add_argument("--where", help="Extra SQL predicate on setup_log (e.g. \"grade != 'C'\")")
+    parser.add_argument("--sl", default="12")
+    parser.add_argument("--be", default="none", help="BE triggers")
+    parser.add_argument("--be-lock", default="0")
+    parser.add_argument("--act", default="10", help="Trail activations")
+    parser.add_argument("--gap", default="5")
+    parser.add_argument("--target", default="none")
+    parser.add_argument("--max-hold", default="none", help="Max hold minutes")
+    parser.add_argument("--hybrid", action="store_true",
+                        help="BE only below activation (main.py 'hybrid' walk)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--fresh", action="store_true", help="Ignore the result cache")
+    parser.add_argument("--out", help="Write the tidy table to this CSV")
+    args = parser.parse_args()
+
+    db_url = os.getenv('DATABASE_URL', '').replace('postgres://', 'postgresql://')
+    if not db_url:
+        print("FAIL: DATABASE_URL not set")
+        sys.exit(1)
+    engine = create_engine(db_url, isolation_level="AUTOCOMMIT")
+
+    cells = grid(sl=_values(args.sl), be_trigger=_values(args.be), be_lock=_values(args.be_lock),
+                 activation=_values(args.act), gap=_values(args.gap), target=_values(args.target),
+                 max_hold=_values(args.max_hold), be_below_activation=[args.hybrid])
+    sw = Sweep(engine, args.setup, args.direction, args.source, args.start, args.end,
+               args.where, args.workers)
+    df = sw.run(cells, fresh=args.fresh)
+    if df.empty:
+        print("No trades / bars for this filter.")
+        sys.exit(1)
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_colwidth", 90)
+    print(f"\n=== {args.setup} {args.direction or ''} ({df['id'].nunique()} trades, "
+          f"{df['cell'].nunique()} cells, source={args.source}) ===")
+    print(summarize(df).head(20).to_string())
+    print("\n=== walk-forward (expanding, by month) ===")
+    print(walk_forward(df).to_string(index=False))
+    print("\n=== leave-one-month-out ===")
+    print(lomo(df).to_string(index=False))
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print(f"\nwrote {len(df)} rows -> {args.out}")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Backfill volland_exposure_snapshots (+ the latest pointer) from volland_exposure_points.
+
+Why: the Volland workers wrote one NUMERIC row per strike per greek per expiration
+every 120s, and every reader ran MAX(ts_utc) subqueries and casts over millions of
+those rows. The workers now also write one packed row per snapshot (strike-sorted
+DOUBLE PRECISION[] arrays, see app/volland_exposure.py) and the readers use it —
+this converts the history so as-of reads (gex_long_v3, darkmate history, the briefing)
+see the same data for old dates.
+
+A snapshot = all rows sharing (ts_utc, ticker, greek, expiration_option), which is
+exactly one save_exposure_points() call. ON CONFLICT DO NOTHING makes re-runs and
+overlap with the workers' own dual writes safe.
+
+DB discipline (2026-06-03 outage): AUTOCOMMIT and one bulk write per day. A long
+read transaction against prod holds AccessShareLock and blocks db_init()'s startup
+ALTERs, which crash-loops every deploy.
+
+Run:  python volland_exposure_pack_backfill.py [--since 2026-01-01] [--dry-run]
+"""
+import argparse
+import os
+import sys
+from itertools import groupby
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from app.volland_exposure import DDL, LATEST_TABLE, SNAPSHOT_TABLE  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--since", default="2000-01-01")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    eng = create_engine(os.environ["DATABASE_URL"])
+    with eng.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
+        c.execute(text(DDL))
+        have = c.execute(text(f"SELECT count(*) FROM {SNAPSHOT_TABLE}")).scalar()
+        days = [r[0] for r in c.execute(text(
+            "SELECT DISTINCT date(ts_utc AT TIME ZONE 'America/New_York') d "
+            "FROM volland_exposure_points WHERE ts_utc >= :s ORDER BY d"),
+            {"s": args.since}).fetchall()]
+        print(f"{SNAPSHOT_TABLE} currently holds {have} rows; {len(days)} sessions to "
+              f"process from {args.since}")
+
+        total = points = 0
+        for d in days:
+            rows = c.execute(text(
+                "SELECT ts_utc, COALESCE(ticker, 'SPX'), greek, COALESCE(expiration_option, ''), "
+                "       strike::float8, value::float8, current_price::float8 "
+                "FROM volland_exposure_points "
+                "WHERE date(ts_utc AT TIME ZONE 'America/New_York') = :d "
+                "  AND greek IS NOT NULL AND strike IS NOT NULL AND value IS NOT NULL "
+                "ORDER BY ts_utc, greek, 4, 2, strike"), {"d": d}).fetchall()
+            out = []
+            for key, grp in groupby(rows, key=lambda r: (r[0], r[1], r[2], r[3])):
+                grp = list(grp)
+                cp = next((r[6] for r in grp if r[6] is not None), None)
+                out.append((key[0], key[1], key[2], key[3], cp,
+                            [r[4] for r in grp], [r[5] for r in grp]))
+            if out and not args.dry_run:
+                # ONE bulk insert per day (see gex_state_backfill.py)
+                import psycopg2.extras
+                raw = c.connection.driver_connection
+                with raw.cursor() as cur:
+                    psycopg2.extras.execute_values(cur, f"""
+                        INSERT INTO {SNAPSHOT_TABLE}
+                          (ts_utc, ticker, greek, expiration_option, current_price, strikes, vals)
+                        VALUES %s
+                        ON CONFLICT (greek, expiration_option, ts_utc, ticker) DO NOTHING""",
+                        out, page_size=200)
+            total += len(out)
+            points += len(rows)
+            print(f"  {d}  {len(out):>5} snapshots   (running {total})", end="\r")
+
+        print(f"\npacked {points} per-strike rows into {total} snapshots")
+        if args.dry_run:
+            print("DRY RUN — nothing written")
+            return
+        # Re-point "latest" at the newest snapshot per key (the workers keep it current
+        # from here on; this only matters on a fresh table).
+        c.execute(text(f"""
+            INSERT INTO {LATEST_TABLE} (ticker, greek, expiration_option, snapshot_id, ts_utc)
+            SELECT DISTINCT ON (ticker, greek, expiration_option)
+                   ticker, greek, expiration_option, id, ts_utc
+            FROM {SNAPSHOT_TABLE}
+            ORDER BY ticker, greek, expiration_option, ts_utc DESC
+            ON CONFLICT (ticker, greek, expiration_option) DO UPDATE
+              SET snapshot_id = EXCLUDED.snapshot_id, ts_utc = EXCLUDED.ts_utc
+              WHERE {LATEST_TABLE}.ts_utc <= EXCLUDED.ts_utc"""))
+        n, d0, d1 = c.execute(text(
+            f"SELECT count(*), min(ts_utc)::date, max(ts_utc)::date FROM {SNAPSHOT_TABLE}")).fetchone()
+        print(f"{SNAPSHOT_TABLE} now: {n} snapshots, {d0} -> {d1}")
+        for g, e, cnt in c.execute(text(
+                f"SELECT greek, expiration_option, count(*) FROM {SNAPSHOT_TABLE} "
+                "GROUP BY 1, 2 ORDER BY 1, 2")).fetchall():
+            print(f"    {g:<12} {e or '(none)':<18} {cnt}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,10 @@ SYNC_POLL_SEC = int(os.getenv("VOLLAND_SYNC_POLL_SEC", "20"))
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID   = os.getenv("TELEGRAM_CHAT_ID", "")
+
+# dual (default): packed volland_exposure_snapshots AND legacy per-strike rows;
+# packed: snapshot table only (once research scripts no longer need the per-strike rows)
+EXPOSURE_FORMAT = os.getenv("VOLLAND_EXPOSURE_FORMAT", "dual").strip().lower()
 ZERO_POINTS_THRESHOLD = 3  # consecutive zero-point cycles before alerting
 AUTO_RESTART_THRESHOLD = 5  # consecutive zero-point cycles before browser restart
 STALE_MODIFIED_RELOAD = 5   # consecutive unchanged-lastModified cycles before page reload
@@ -166,14 +170,72 @@ def ensure_tables():
         cur.execute("CREATE INDEX IF NOT EXISTS idx_volland_exposure_points_ts ON volland_exposure_points(ts_utc DESC);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_volland_exposure_points_greek ON volland_exposure_points(greek);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_volland_ep_greek_ts ON volland_exposure_points(greek, ts_utc DESC);")
+        # Packed per-snapshot table + latest pointer (app/volland_exposure.py)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS volland_exposure_snapshots (
+          id BIGSERIAL PRIMARY KEY,
+          ts_utc TIMESTAMPTZ NOT NULL,
+          ticker VARCHAR(20) NOT NULL DEFAULT 'SPX',
+          greek VARCHAR(20) NOT NULL,
+          expiration_option VARCHAR(30) NOT NULL DEFAULT '',
+          current_price DOUBLE PRECISION,
+          strikes DOUBLE PRECISION[] NOT NULL,
+          vals DOUBLE PRECISION[] NOT NULL
+        );
+        """)
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_volland_es_key ON volland_exposure_snapshots(greek, expiration_option, ts_utc, ticker);")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_volland_es_greek_ts ON volland_exposure_snapshots(greek, ts_utc DESC);")
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS volland_exposure_latest (
+          ticker VARCHAR(20) NOT NULL,
+          greek VARCHAR(20) NOT NULL,
+          expiration_option VARCHAR(30) NOT NULL,
+          snapshot_id BIGINT NOT NULL,
+          ts_utc TIMESTAMPTZ NOT NULL,
+          PRIMARY KEY (ticker, greek, expiration_option)
+        );
+        """)
 
 
 def save_snapshot(payload: dict, data_ts=None):
-    with db() as conn, conn.cursor() as cur:
+    """Insert the cycle's volland_snapshots row and, for real cycles, NOTIFY the app
+    (app/volland_notify.py) in the same transaction — delivered on commit, i.e. only
+    once the whole cycle (exposures first, then this row) is readable."""
+    with db() as conn, conn.transaction(), conn.cursor() as cur:
         cur.execute(
-            "INSERT INTO volland_snapshots(payload, data_ts) VALUES (%s::jsonb, %s)",
+            "INSERT INTO volland_snapshots(payload, data_ts) VALUES (%s::jsonb, %s) RETURNING id, ts",
             (json.dumps(payload), data_ts),
         )
+        r = cur.fetchone()
+        if "error_event" not in payload:
+            cur.execute("SELECT pg_notify('volland_snapshot', %s)", (json.dumps({
+                "id": r["id"], "ts": r["ts"].isoformat(),
+                "data_ts": data_ts.isoformat() if data_ts else None,
+            }),))
+
+
+def _save_exposure_snapshot(cur, rows: list):
+    """One packed volland_exposure_snapshots row (strike-sorted arrays) + latest pointer."""
+    ts_utc, ticker, greek, expiration_option = rows[0][:4]
+    pts = sorted((r[4], r[5]) for r in rows)
+    cur.execute("""
+        INSERT INTO volland_exposure_snapshots
+        (ts_utc, ticker, greek, expiration_option, current_price, strikes, vals)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (greek, expiration_option, ts_utc, ticker) DO NOTHING
+        RETURNING id
+    """, (ts_utc, ticker, greek, expiration_option or "", rows[0][6],
+          [p[0] for p in pts], [p[1] for p in pts]))
+    r = cur.fetchone()
+    if not r:
+        return
+    cur.execute("""
+        INSERT INTO volland_exposure_latest (ticker, greek, expiration_option, snapshot_id, ts_utc)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (ticker, greek, expiration_option) DO UPDATE
+          SET snapshot_id = EXCLUDED.snapshot_id, ts_utc = EXCLUDED.ts_utc
+          WHERE volland_exposure_latest.ts_utc <= EXCLUDED.ts_utc
+    """, (ticker, greek, expiration_option or "", r["id"], ts_utc))
 
 
 def save_exposure_points(points: list, greek: str, ticker: str = "SPX",
@@ -193,12 +255,14 @@ def save_exposure_points(points: list, greek: str, ticker: str = "SPX",
         return 0
     for attempt in range(2):
         try:
-            with db() as conn, conn.cursor() as cur:
-                cur.executemany("""
-                    INSERT INTO volland_exposure_points
-                    (ts_utc, ticker, greek, expiration_option, strike, value, current_price)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, rows)
+            with db() as conn, conn.transaction(), conn.cursor() as cur:
+                _save_exposure_snapshot(cur, rows)
+                if EXPOSURE_FORMAT != "packed":
+                    cur.executemany("""
+                        INSERT INTO volland_exposure_points
+                        (ts_utc, ticker, greek, expiration_option, strike, value, current_price)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """, rows)
             return len(rows)
         except Exception as e:
             if attempt == 0:
@@ -17,12 +17,11 @@ Self-healing features:
 Fully independent data pipeline — does NOT touch existing Rithmic tables.
 Data goes to: vps_es_range_bars, vps_vix_ticks, vps_heartbeats.
 
-Requirements: Python 3.10+, requests, pytz
+Requirements: Python 3.10+, requests, pytz, numpy (+ sierra_scid.py next to this file)
 Usage: python vps_data_bridge.py [--config vps_bridge_config.json]
 """
 
 import json
-import struct
 import time
 import threading
 import logging
@@ -36,6 +35,8 @@ from pathlib import Path
 import pytz
 import requests
 
+import sierra_scid
+
 # ─── Logging ─────────────────────────────────────────────────────────────────
 from logging.handlers import RotatingFileHandler
 
@@ -317,72 +318,32 @@ def read_scid_ticks(filepath, since_ts=None):
 
     Args:
         filepath: Path to .scid file
-        since_ts: Only yield ticks after this datetime (naive, exchange time)
+        since_ts: Only yield ticks after this datetime (naive UTC)
 
     Yields: dict with {ts, price, volume, bid_vol, ask_vol}
+
+    Decoding is vectorized (sierra_scid.read_ticks); prefer read_scid_arrays() and
+    sierra_scid.build_range_bars() for bulk work — this per-tick view is kept for
+    callers that want dicts.
     """
-    filepath = Path(filepath)
-    if not filepath.exists():
-        log.warning(f"SCID file not found: {filepath}")
+    ticks = read_scid_arrays(filepath, since_ts)
+    if ticks is None:
         return
+    yield from ticks.iter_dicts()
 
-    file_size = os.path.getsize(filepath)
-    num_records = (file_size - SCID_HEADER_SIZE) // SCID_RECORD_SIZE
-    log.info(f"Reading {filepath.name}: {num_records:,} records")
-
-    with open(filepath, 'rb') as f:
-        # Binary search to skip ahead if since_ts is set (avoids scanning millions of records)
-        start_record = 0
-        if since_ts and num_records > 1000:
-            lo, hi = 0, num_records - 1
-            # Convert since_ts (naive UTC) back to ET microseconds for comparison
-            since_et = pytz.utc.localize(since_ts).astimezone(ET).replace(tzinfo=None)
-            target_us = int((since_et - SC_EPOCH).total_seconds() * 1_000_000)
-            while lo < hi:
-                mid = (lo + hi) // 2
-                f.seek(SCID_HEADER_SIZE + mid * SCID_RECORD_SIZE)
-                data = f.read(SCID_RECORD_SIZE)
-                dt_int = struct.unpack_from('<q', data, 0)[0]
-                if dt_int <= target_us:
-                    lo = mid + 1
-                else:
-                    hi = mid
-            start_record = max(0, lo - 10)  # small buffer
-            log.info(f"  Binary search: skipping to record {start_record:,} / {num_records:,}")
-
-        f.seek(SCID_HEADER_SIZE + start_record * SCID_RECORD_SIZE)
-        count = 0
-
-        for i in range(start_record, num_records):
-            data = f.read(SCID_RECORD_SIZE)
-            if len(data) < SCID_RECORD_SIZE:
-                break
-
-            dt_int = struct.unpack_from('<q', data, 0)[0]
-            if dt_int <= 0:
-                continue
-
-            # Sierra .scid timestamps are in UTC (after Sierra timezone fix).
-            ts = SC_EPOCH + timedelta(microseconds=dt_int)
-
-            if since_ts and ts <= since_ts:
-                continue
-
-            _, h, l, c = struct.unpack_from('<ffff', data, 8)
-            _, vol, bid_vol, ask_vol = struct.unpack_from('<IIII', data, 24)
 
-            price = h if h > 0 else c
-            if price <= 0 or vol <= 0:
-                continue
-
-            count += 1
-            if count % 2_000_000 == 0:
-                log.info(f"  SCID read: {count:,} ticks @ {ts}")
-
-            yield {"ts": ts, "price": price, "volume": vol,
-                   "bid_vol": bid_vol, "ask_vol": ask_vol}
-
-    log.info(f"  SCID done: {count:,} ticks read")
+def read_scid_arrays(filepath, since_ts=None):
+    """Memory-mapped, vectorized read of a .scid file -> sierra_scid.ScidTicks (or None
+    if the file is missing). Binary-searches to since_ts, then decodes in one pass."""
+    filepath = Path(filepath)
+    if not filepath.exists():
+        log.warning(f"SCID file not found: {filepath}")
+        return None
+    t0 = time.time()
+    ticks = sierra_scid.read_ticks(filepath, since_ts=since_ts)
+    log.info(f"Read {filepath.name}: {sierra_scid.num_records(filepath):,} records -> "
+             f"{len(ticks):,} ticks in {time.time() - t0:.2f}s")
+    return ticks
 
 
 # ─── Railway Poster ──────────────────────────────────────────────────────────
@@ -493,38 +454,13 @@ class GapBackfiller:
             last_ts = datetime(2026, 3, 23)  # ESM26 (June) contract — backfill from Mar 23
             log.info("No ES bars in Railway — backfilling from 2026-03-23")
 
-        # Read .scid ticks after last_ts and build bars
-        builder = RangeBarBuilder(self.range_pts)
-        bars_to_upload = []  # (session_date_str, bar_dict)
-        current_session = None
-
-        for tick in read_scid_ticks(scid_path, since_ts=last_ts):
-            session = _session_date_from_ts(tick["ts"])
-
-            # Session rollover
-            if session != current_session:
-                if current_session is not None:
-                    bar = builder.force_close()
-                    if bar:
-                        bars_to_upload.append((str(current_session), bar))
-                current_session = session
-                builder.reset_session()
-
-            buy_vol, sell_vol, delta = _classify_scid(
-                tick["bid_vol"], tick["ask_vol"], tick["volume"]
-            )
-            completed = builder.process_tick(
-                tick["price"], tick["volume"],
-                buy_vol, sell_vol, delta,
-                tick["ts"].isoformat(),
-            )
-            if completed:
-                bars_to_upload.append((str(current_session), completed))
-
-        # Force close last forming bar
-        bar = builder.force_close()
-        if bar and current_session:
-            bars_to_upload.append((str(current_session), bar))
+        # Read .scid ticks after last_ts and build bars (vectorized — same output as
+        # RangeBarBuilder.process_tick with a reset + force_close per session)
+        ticks = read_scid_arrays(scid_path, since_ts=last_ts)
+        t0 = time.time()
+        bars_to_upload = [(str(session), bar) for session, bar in
+                          sierra_scid.build_range_bars(ticks, self.range_pts)]
+        log.info(f"ES: built {len(bars_to_upload):,} bars in {time.time() - t0:.2f}s")
 
         if not bars_to_upload:
             log.info("ES: No gap detected — data is up to date")
@@ -563,20 +499,20 @@ class GapBackfiller:
             log.info("No VX ticks in Railway — backfilling from 2026-03-23")
 
         # Read .scid ticks after last_ts
+        ticks = read_scid_arrays(scid_path, since_ts=last_ts)
         batch = []
         total = 0
 
-        for tick in read_scid_ticks(scid_path, since_ts=last_ts):
-            buy_vol, sell_vol, delta = _classify_scid(
-                tick["bid_vol"], tick["ask_vol"], tick["volume"]
-            )
+        _, _, deltas = sierra_scid.classify(ticks.bid_vol, ticks.ask_vol, ticks.volume)
+        for price, volume, delta, ts in zip(ticks.price.tolist(), ticks.volume.tolist(),
+                                            deltas.tolist(), ticks.iso()):
             batch.append({
-                "price": round(tick["price"], 2),
-                "volume": tick["volume"],
+                "price": round(price, 2),
+                "volume": volume,
                 "delta": delta,
                 "bid": None,
                 "ask": None,
-                "ts": tick["ts"].isoformat(),
+                "ts": ts,
             })
 
             if len(batch) >= 500:
@@ -621,28 +557,14 @@ class SCIDTailer:
         """Set offset via binary search to start reading from a specific time."""
         if not self.filepath.exists():
             return
-        file_size = os.path.getsize(self.filepath)
-        num_records = (file_size - SCID_HEADER_SIZE) // SCID_RECORD_SIZE
-        if num_records <= 0:
+        if sierra_scid.num_records(self.filepath) <= 0:
             self._offset = SCID_HEADER_SIZE
             return
 
         # Binary search for the record closest to since_ts
         since_et = pytz.utc.localize(since_ts).astimezone(ET).replace(tzinfo=None)
-        target_us = int((since_et - SC_EPOCH).total_seconds() * 1_000_000)
-
-        with open(self.filepath, 'rb') as f:
-            lo, hi = 0, num_records - 1
-            while lo < hi:
-                mid = (lo + hi) // 2
-                f.seek(SCID_HEADER_SIZE + mid * SCID_RECORD_SIZE)
-                data = f.read(SCID_RECORD_SIZE)
-                dt_int = struct.unpack_from('<q', data, 0)[0]
-                if dt_int <= target_us:
-                    lo = mid + 1
-                else:
-                    hi = mid
-            self._offset = SCID_HEADER_SIZE + max(0, lo - 5) * SCID_RECORD_SIZE
+        lo = sierra_scid.search_after(self.filepath, sierra_scid.to_us(since_et))
+        self._offset = SCID_HEADER_SIZE + max(0, lo - 5) * SCID_RECORD_SIZE
 
         log.info(f"SCID tailer: {self.filepath.name} → seeking to record ~{lo} "
                  f"(offset {self._offset:,})")
@@ -656,43 +578,17 @@ class SCIDTailer:
         if file_size <= self._offset:
             return []  # No new data
 
-        ticks = []
         with open(self.filepath, 'rb') as f:
             f.seek(self._offset)
-            bytes_available = file_size - self._offset
-            records_available = bytes_available // SCID_RECORD_SIZE
-
-            for _ in range(records_available):
-                data = f.read(SCID_RECORD_SIZE)
-                if len(data) < SCID_RECORD_SIZE:
-                    break
-
-                dt_int = struct.unpack_from('<q', data, 0)[0]
-                if dt_int <= 0:
-                    continue
-
-                ts = SC_EPOCH + timedelta(microseconds=dt_int)
-                _, h, l, c = struct.unpack_from('<ffff', data, 8)
-                _, vol, bid_vol, ask_vol = struct.unpack_from('<IIII', data, 24)
-
-                price = h if h > 0 else c
-                if price <= 0 or vol <= 0:
-                    continue
-
-                ticks.append({
-                    "ts": ts,
-                    "price": price,
-                    "volume": vol,
-                    "bid_vol": bid_vol,
-                    "ask_vol": ask_vol,
-                })
-
-            # Update offset to where we stopped reading
-            self._offset = SCID_HEADER_SIZE + (
-                (self._offset - SCID_HEADER_SIZE) // SCID_RECORD_SIZE + records_available
-            ) * SCID_RECORD_SIZE
-
-        return ticks
+            records_available = (file_size - self._offset) // SCID_RECORD_SIZE
+            data = f.read(records_available * SCID_RECORD_SIZE)
+
+        # Whole records only — a partially flushed record is picked up next poll
+        records_read = len(data) // SCID_RECORD_SIZE
+        self._offset = SCID_HEADER_SIZE + (
+            (self._offset - SCID_HEADER_SIZE) // SCID_RECORD_SIZE + records_read
+        ) * SCID_RECORD_SIZE
+        return list(sierra_scid.decode_buffer(data).iter_dicts())
 
     @property
     def file_size(self):
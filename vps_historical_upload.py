@@ -10,6 +10,10 @@ Usage:
     python vps_historical_upload.py --vx-only                # VX ticks only
     python vps_historical_upload.py --since 2026-01-01       # Only data from Jan 1+
     python vps_historical_upload.py --dry-run                # Parse + count, no upload
+    python vps_historical_upload.py --check --dry-run        # also rebuild per-tick and diff
+
+Reads via sierra_scid (memory-mapped, vectorized); HistoricalBarBuilder is the per-tick
+reference implementation used by --check.
 """
 
 import struct
@@ -25,6 +29,8 @@ from pathlib import Path
 import pytz
 import requests
 
+import sierra_scid
+
 ET = pytz.timezone("US/Eastern")
 SC_EPOCH = datetime(1899, 12, 30)
 HEADER_SIZE = 56
@@ -353,6 +359,8 @@ def main():
     parser.add_argument("--vx-only", action="store_true", help="Only upload VX ticks")
     parser.add_argument("--since", type=str, help="Only data from this date (YYYY-MM-DD)")
     parser.add_argument("--dry-run", action="store_true", help="Parse and count, no upload")
+    parser.add_argument("--check", action="store_true",
+                        help="Also build ES bars with the per-tick builder and diff")
     parser.add_argument("--railway-url", type=str, default=None)
     parser.add_argument("--api-key", type=str, default=None)
     args = parser.parse_args()
@@ -379,29 +387,39 @@ def main():
             print("  BUILDING ES 5-PT RANGE BARS")
             print("=" * 50)
 
-            builder = HistoricalBarBuilder(RANGE_PTS)
             t0 = time.time()
-
-            for tick in read_scid_ticks(ES_FILE, since_date):
-                builder.process_tick(tick)
-
-            # Force close last forming bar
-            if builder.forming_bar:
-                builder._force_close(datetime.now())
+            ticks = sierra_scid.read_ticks(ES_FILE, since_date=since_date)
+            print(f"Read {len(ticks):,} ticks in {time.time() - t0:.1f}s")
+            all_bars = sierra_scid.build_range_bars(ticks, RANGE_PTS)
 
             elapsed = time.time() - t0
-            print(f"Built {len(builder.all_bars):,} range bars in {elapsed:.1f}s")
+            print(f"Built {len(all_bars):,} range bars in {elapsed:.1f}s")
+
+            if args.check:
+                builder = HistoricalBarBuilder(RANGE_PTS)
+                for tick in read_scid_ticks(ES_FILE, since_date):
+                    builder.process_tick(tick)
+                if builder.forming_bar:
+                    builder._force_close(datetime.now())
+                diff = next((i for i, (a, b) in enumerate(zip(builder.all_bars, all_bars))
+                             if a != b), None)
+                if diff is None and len(builder.all_bars) == len(all_bars):
+                    print(f"Check OK: per-tick builder matches ({len(all_bars):,} bars)")
+                else:
+                    print(f"Check FAILED: per-tick {len(builder.all_bars):,} bars vs "
+                          f"vectorized {len(all_bars):,}, first diff at {diff}")
+                    sys.exit(1)
 
             # Summary by date
             by_date = defaultdict(int)
-            for d, _ in builder.all_bars:
+            for d, _ in all_bars:
                 by_date[str(d)] += 1
             for d in sorted(by_date.keys())[-10:]:
                 print(f"  {d}: {by_date[d]} bars")
             if len(by_date) > 10:
                 print(f"  ... ({len(by_date)} total dates)")
 
-            upload_es_bars(builder.all_bars, dry_run=args.dry_run)
+            upload_es_bars(all_bars, dry_run=args.dry_run)
 
     # ── VX Ticks ──
     if do_vx:
@@ -412,18 +430,17 @@ def main():
             print("  READING VX TICKS")
             print("=" * 50)
 
-            vx_ticks = []
-            for tick in read_scid_ticks(VX_FILE, since_date, progress_every=50_000):
-                buy_vol, sell_vol = tick["ask_vol"], tick["bid_vol"]
-                delta = buy_vol - sell_vol
-                vx_ticks.append({
-                    "price": round(tick["price"], 2),
-                    "volume": tick["volume"],
-                    "delta": delta,
-                    "bid": round(tick["low"], 2) if tick["low"] > 0 else None,
-                    "ask": None,
-                    "ts": tick["ts"].isoformat(),
-                })
+            ticks = sierra_scid.read_ticks(VX_FILE, since_date=since_date)
+            vx_ticks = [{
+                "price": round(price, 2),
+                "volume": volume,
+                "delta": ask_vol - bid_vol,
+                "bid": round(low, 2) if low > 0 else None,
+                "ask": None,
+                "ts": ts,
+            } for price, volume, bid_vol, ask_vol, low, ts in zip(
+                ticks.price.tolist(), ticks.volume.tolist(), ticks.bid_vol.tolist(),
+                ticks.ask_vol.tolist(), ticks.low.tolist(), ticks.iso())]
 
             print(f"Total VX ticks: {len(vx_ticks):,}")
             upload_vx_ticks(vx_ticks, dry_run=args.dry_run)